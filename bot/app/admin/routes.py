@@ -30,7 +30,7 @@ async def admin_dashboard(request: Request):
 @router.get("/admin/ticket/{ticket_id}")
 async def ticket_detail(request: Request, ticket_id: int):
 
-    ticket = ticket_service.get_ticket(ticket_id)
+    ticket = await ticket_service.get_ticket(ticket_id)
 
     return templates.TemplateResponse(
         "admin/ticket.html",
@@ -46,7 +46,7 @@ async def ticket_detail(request: Request, ticket_id: int):
 @router.post("/admin/status/{ticket_id}")
 async def change_status(ticket_id: int, status: str = Form(...)):
 
-    ticket_service.update_status(ticket_id, status)
+    await ticket_service.update_status(ticket_id, status)
 
     return RedirectResponse(
         f"/admin/ticket/{ticket_id}",
@@ -1,15 +1,21 @@
 # app/api/admin_api.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Optional
 from app.services.ticket_service_compat import (
-    get_all_tickets,
+    get_tickets_page,
     get_ticket,
     update_status,
     assign_master,
     get_all_masters,
     get_statistics
 )
+from app.core.executor import offload
+from app.core.fastjson import FastJSONResponse
+from app.core.http_cache import conditional
+from app.core.ticket_query import TicketQuery, fetch_page
+from app.core.ticket_search import search_tickets
+from app.config import TICKETS_PAGE_SIZE, TICKET_SEARCH_LIMIT
 
 router = APIRouter(prefix="/api/admin")
 
@@ -21,21 +27,57 @@ class MasterAssign(BaseModel):
     master_id: int
 
 class TicketFilter(BaseModel):
+    # Одиночные значения - прежний формат запроса
     status: Optional[str] = None
     master_id: Optional[int] = None
     branch: Optional[str] = None
     date_from: Optional[str] = None
     date_to: Optional[str] = None
+    statuses: List[str] = []
+    branches: List[str] = []
+    categories: List[str] = []
+    master_ids: List[int] = []
+    urgencies: List[str] = []
+    delivery_methods: List[str] = []
+    unassigned: bool = False
+    sort: str = "created_at"
+    descending: bool = True
+    cursor: Optional[str] = None
+    limit: int = TICKETS_PAGE_SIZE
 
 # Эндпоинты для заявок
-@router.get("/tickets")
-async def get_tickets():
-    """Получить все заявки"""
-    tickets = get_all_tickets()
-    return {"success": True, "data": tickets}
+@router.get("/tickets", response_class=FastJSONResponse)
+@conditional("tickets", "clients", "masters")
+@offload()
+def get_tickets(cursor: Optional[str] = None, limit: int = TICKETS_PAGE_SIZE, with_total: bool = False):
+    """Заявки страницами от новых к старым
+
+    Следующая страница - ?cursor=<next_cursor> из предыдущего ответа.
+    with_total=true добавляет общее количество и разбивку по статусам.
+    """
+    try:
+        page = get_tickets_page(cursor, limit, with_total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"success": True, "data": page.pop("items"), **page})
+
+# Объявлен до /tickets/{ticket_id}, иначе "search" разбирается как ID
+@router.get("/tickets/search")
+@offload()
+def search_tickets_endpoint(q: str = Query(..., min_length=2), limit: int = TICKET_SEARCH_LIMIT):
+    """Поиск по телефону (в том числе последним цифрам), имени, бренду и тексту проблемы"""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = search_tickets(db, q, limit)
+        return {"success": True, "data": result["items"], "query": result["query"]}
+    finally:
+        db.close()
 
 @router.get("/tickets/{ticket_id}")
-async def get_ticket_by_id(ticket_id: int):
+@offload()
+def get_ticket_by_id(ticket_id: int):
     """Получить заявку по ID"""
     ticket = get_ticket(ticket_id)
     if not ticket:
@@ -43,7 +85,8 @@ async def get_ticket_by_id(ticket_id: int):
     return {"success": True, "data": ticket}
 
 @router.put("/tickets/{ticket_id}/status")
-async def update_ticket_status(ticket_id: int, status_data: StatusUpdate):
+@offload()
+def update_ticket_status(ticket_id: int, status_data: StatusUpdate):
     """Обновить статус заявки"""
     success = update_status(ticket_id, status_data.status)
     if not success:
@@ -51,7 +94,8 @@ async def update_ticket_status(ticket_id: int, status_data: StatusUpdate):
     return {"success": True, "message": "Статус обновлен"}
 
 @router.put("/tickets/{ticket_id}/master")
-async def assign_ticket_master(ticket_id: int, master_data: MasterAssign):
+@offload()
+def assign_ticket_master(ticket_id: int, master_data: MasterAssign):
     """Назначить мастера на заявку"""
     success = assign_master(ticket_id, master_data.master_id)
     if not success:
@@ -60,13 +104,15 @@ async def assign_ticket_master(ticket_id: int, master_data: MasterAssign):
 
 # Эндпоинты для мастеров
 @router.get("/masters")
-async def get_masters():
+@offload()
+def get_masters():
     """Получить всех мастеров"""
     masters = get_all_masters()
     return {"success": True, "data": masters}
 
 @router.get("/masters/{master_id}")
-async def get_master_by_id(master_id: int):
+@offload()
+def get_master_by_id(master_id: int):
     """Получить мастера по ID"""
     masters = get_all_masters()
     master = next((m for m in masters if m["id"] == master_id), None)
@@ -76,17 +122,18 @@ async def get_master_by_id(master_id: int):
 
 # Эндпоинты для статистики
 @router.get("/statistics")
-async def get_admin_statistics():
+@offload()
+def get_admin_statistics():
     """Получить статистику"""
     stats = get_statistics()
     return {"success": True, "data": stats}
 
 # Эндпоинты для клиентов
 @router.get("/clients")
-async def get_clients():
+@offload()
+def get_clients():
     """Получить всех клиентов"""
     from app.models.client import Client
-    from app.models.ticket import Ticket
     from app.database import SessionLocal
     
     db = SessionLocal()
@@ -94,9 +141,7 @@ async def get_clients():
         clients = db.query(Client).all()
         result = []
         for c in clients:
-            # Используем отдельный запрос для подсчета, не обращаемся к c.tickets
-            ticket_count = db.query(Ticket).filter(Ticket.client_id == c.id).count()
-            
+            # Счетчик заявок хранится в самой строке клиента (app/models/counters.py)
             result.append({
                 "id": c.id,
                 "name": c.name or "Без имени",
@@ -106,7 +151,8 @@ async def get_clients():
                 "full_name": c.name,
                 "loyalty": "medium",  # Заглушка
                 "created_at": c.created_at.isoformat() if c.created_at else "",
-                "ticket_count": ticket_count
+                "ticket_count": c.ticket_count,
+                "last_ticket_at": c.last_ticket_at.isoformat() if c.last_ticket_at else None
             })
         return {"success": True, "data": result}
     finally:
@@ -114,62 +160,33 @@ async def get_clients():
 
 # Фильтрация заявок
 @router.post("/tickets/filter")
-async def filter_tickets(filter_data: TicketFilter):
-    """Фильтрация заявок"""
+@offload()
+def filter_tickets(filter_data: TicketFilter):
+    """Фильтрация заявок: страница с next_cursor (app/core/ticket_query.py)"""
     from app.database import SessionLocal
-    from app.models.ticket import Ticket
-    from sqlalchemy.orm import joinedload
-    from datetime import datetime
+
+    try:
+        query = TicketQuery(
+            statuses=filter_data.statuses + [filter_data.status],
+            branches=filter_data.branches + [filter_data.branch],
+            categories=filter_data.categories,
+            master_ids=filter_data.master_ids + [filter_data.master_id],
+            urgencies=filter_data.urgencies,
+            delivery_methods=filter_data.delivery_methods,
+            unassigned=filter_data.unassigned,
+            date_from=filter_data.date_from,
+            date_to=filter_data.date_to,
+            sort=filter_data.sort,
+            descending=filter_data.descending,
+            cursor=filter_data.cursor,
+            limit=filter_data.limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     db = SessionLocal()
     try:
-        query = db.query(Ticket).options(
-            joinedload(Ticket.client),
-            joinedload(Ticket.master)
-        )
-        
-        # Применяем фильтры
-        if filter_data.status:
-            query = query.filter(Ticket.status == filter_data.status)
-        
-        if filter_data.master_id:
-            query = query.filter(Ticket.master_id == filter_data.master_id)
-        
-        if filter_data.branch:
-            query = query.filter(Ticket.branch == filter_data.branch)
-        
-        if filter_data.date_from:
-            try:
-                date_from = datetime.fromisoformat(filter_data.date_from)
-                query = query.filter(Ticket.created_at >= date_from)
-            except:
-                pass
-        
-        if filter_data.date_to:
-            try:
-                date_to = datetime.fromisoformat(filter_data.date_to)
-                query = query.filter(Ticket.created_at <= date_to)
-            except:
-                pass
-        
-        tickets = query.order_by(Ticket.created_at.desc()).all()
-        
-        # Форматируем результат
-        result = []
-        for ticket in tickets:
-            result.append({
-                "id": ticket.id,
-                "client_name": ticket.client.name if ticket.client else ticket.walkin_name or "Клиент",
-                "client_phone": ticket.client.phone if ticket.client else ticket.walkin_phone or "",
-                "status": ticket.status,
-                "master_name": ticket.master.name if ticket.master else "Не назначен",
-                "category": ticket.category or "",
-                "brand": ticket.brand or "",
-                "created_at": ticket.created_at.isoformat() if ticket.created_at else "",
-                "branch": ticket.branch or ""
-            })
-        
-        return {"success": True, "data": result}
-        
+        page = fetch_page(db, query)
+        return {"success": True, "data": page["items"], "next_cursor": page["next_cursor"]}
     finally:
         db.close()
\ No newline at end of file
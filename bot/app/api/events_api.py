@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from pydantic import BaseModel
 from typing import Optional, List
 from app.services import event_service
+from app.core.executor import offload
 from app.database import SessionLocal
 from app.models.master import Master
 from app.models.client import Client
@@ -39,7 +40,8 @@ class EventUpdate(BaseModel):
     reminder_minutes: Optional[int] = None
 
 @router.get("")
-async def get_events(
+@offload()
+def get_events(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     master_id: Optional[int] = Query(None)
@@ -79,7 +81,8 @@ async def get_events(
     return {"success": True, "data": result}
 
 @router.get("/{event_id}")
-async def get_event(event_id: int):
+@offload()
+def get_event(event_id: int):
     """Получить событие по ID"""
     event = event_service.get_event(event_id)
     if not event:
@@ -107,7 +110,8 @@ async def get_event(event_id: int):
     }
 
 @router.post("")
-async def create_event(event_data: EventCreate):
+@offload()
+def create_event(event_data: EventCreate):
     """Создать новое событие"""
     try:
         event = event_service.create_event(event_data.dict())
@@ -120,7 +124,8 @@ async def create_event(event_data: EventCreate):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{event_id}")
-async def update_event(event_id: int, event_data: EventUpdate):
+@offload()
+def update_event(event_id: int, event_data: EventUpdate):
     """Обновить событие"""
     event = event_service.update_event(event_id, event_data.dict(exclude_unset=True))
     if not event:
@@ -132,7 +137,8 @@ async def update_event(event_id: int, event_data: EventUpdate):
     }
 
 @router.delete("/{event_id}")
-async def delete_event(event_id: int):
+@offload()
+def delete_event(event_id: int):
     """Удалить событие"""
     success = event_service.delete_event(event_id)
     if not success:
@@ -144,7 +150,8 @@ async def delete_event(event_id: int):
     }
 
 @router.post("/from-ticket/{ticket_id}")
-async def create_event_from_ticket(ticket_id: int, master_id: Optional[int] = None):
+@offload()
+def create_event_from_ticket(ticket_id: int, master_id: Optional[int] = None):
     """Создать событие из заявки"""
     event = event_service.create_event_from_ticket(ticket_id, master_id)
     if not event:
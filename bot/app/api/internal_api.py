@@ -0,0 +1,46 @@
+# app/api/internal_api.py
+from fastapi import APIRouter
+from app.core.executor import db_executor
+from app.core.pools import pool_stats
+from app.core.cache import stats_cache
+from app.core.realtime import hub
+from app.core.event_bus import bus
+from app.core.stock_alerts import low_stock_stream
+from app.core.backplane import backplane
+
+router = APIRouter(prefix="/api/internal", tags=["internal"])
+
+@router.get("/executor")
+async def get_executor_stats():
+    """Загрузка пула потоков БД и время ожидания/выполнения по эндпоинтам"""
+    return {"success": True, "data": db_executor.stats()}
+
+@router.get("/pools")
+async def get_pool_stats():
+    """Пулы соединений БД: занятые соединения, overflow, время ожидания"""
+    return {"success": True, "data": pool_stats()}
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Кэш статистики: попадания/промахи по эндпоинтам, вытеснения, инвалидации"""
+    return {"success": True, "data": stats_cache.stats()}
+
+@router.get("/realtime")
+async def get_realtime_stats():
+    """WebSocket-хаб: подключения, отключенные медленные клиенты, очереди, опросы"""
+    return {"success": True, "data": hub.stats()}
+
+@router.get("/events")
+async def get_event_bus_stats():
+    """Шина доменных событий: доставки, ошибки и время по подписчикам"""
+    return {"success": True, "data": bus.stats()}
+
+@router.get("/sse")
+async def get_sse_stats():
+    """SSE-поток бейджа склада: клиенты, чтения счетчика, рассылки"""
+    return {"success": True, "data": {"low_stock": low_stock_stream.stats()}}
+
+@router.get("/backplane")
+async def get_backplane_stats():
+    """Обмен событиями между процессами: отправлено, получено, переподключения"""
+    return {"success": True, "data": backplane.stats()}
@@ -2,7 +2,15 @@
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional, List
+import logging
 from app.services import part_service
+from app.core.executor import offload
+from app.core.fastjson import FastJSONResponse
+from app.core.http_cache import conditional
+from app.core.stock_alerts import low_stock_stream
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/parts")
 
@@ -69,13 +77,15 @@ class SupplierCreate(BaseModel):
 # ========================
 
 @router.get("/categories")
-async def get_categories():
+@offload()
+def get_categories():
     """Получить все категории"""
     categories = part_service.get_all_categories()
     return {"success": True, "data": categories}
 
 @router.post("/categories")
-async def create_category(data: PartCategoryCreate):
+@offload()
+def create_category(data: PartCategoryCreate):
     """Создать категорию"""
     try:
         category = part_service.create_category(data.dict())
@@ -84,7 +94,8 @@ async def create_category(data: PartCategoryCreate):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/categories/{category_id}")
-async def update_category(category_id: int, data: PartCategoryUpdate):
+@offload()
+def update_category(category_id: int, data: PartCategoryUpdate):
     """Обновить категорию"""
     category = part_service.update_category(category_id, data.dict(exclude_unset=True))
     if not category:
@@ -92,7 +103,8 @@ async def update_category(category_id: int, data: PartCategoryUpdate):
     return {"success": True, "data": {"id": category.id, "name": category.name}}
 
 @router.delete("/categories/{category_id}")
-async def delete_category(category_id: int):
+@offload()
+def delete_category(category_id: int):
     """Удалить категорию"""
     success, message = part_service.delete_category(category_id)
     if not success:
@@ -103,14 +115,17 @@ async def delete_category(category_id: int):
 # Part Endpoints
 # ========================
 
-@router.get("")
-async def get_parts():
+@router.get("", response_class=FastJSONResponse)
+@conditional("parts", "part_categories", "part_suppliers")
+@offload()
+def get_parts():
     """Получить все запчасти"""
     parts = part_service.get_all_parts()
-    return {"success": True, "data": parts}
+    return FastJSONResponse({"success": True, "data": parts})
 
 @router.get("/{part_id}")
-async def get_part(part_id: int):
+@offload()
+def get_part(part_id: int):
     """Получить запчасть по ID"""
     part = part_service.get_part(part_id)
     if not part:
@@ -118,7 +133,8 @@ async def get_part(part_id: int):
     return {"success": True, "data": part}
 
 @router.post("")
-async def create_part(data: PartCreate):
+@offload()
+def create_part(data: PartCreate):
     """Создать запчасть"""
     try:
         part = part_service.create_part(data.dict())
@@ -127,7 +143,8 @@ async def create_part(data: PartCreate):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{part_id}")
-async def update_part(part_id: int, data: PartUpdate):
+@offload()
+def update_part(part_id: int, data: PartUpdate):
     """Обновить запчасть"""
     try:
         part = part_service.update_part(part_id, data.dict(exclude_unset=True))
@@ -138,7 +155,8 @@ async def update_part(part_id: int, data: PartUpdate):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{part_id}")
-async def delete_part(part_id: int):
+@offload()
+def delete_part(part_id: int):
     """Удалить запчасть"""
     success = part_service.delete_part(part_id)
     if not success:
@@ -146,7 +164,8 @@ async def delete_part(part_id: int):
     return {"success": True, "message": "Запчасть удалена"}
 
 @router.post("/{part_id}/stock")
-async def adjust_stock(part_id: int, data: StockAdjustment):
+@offload()
+def adjust_stock(part_id: int, data: StockAdjustment):
     """Изменить количество на складе"""
     success, message = part_service.adjust_stock(
         part_id, 
@@ -158,8 +177,24 @@ async def adjust_stock(part_id: int, data: StockAdjustment):
         raise HTTPException(status_code=400, detail=message)
     return {"success": True, "message": message}
 
+@router.get("/low-stock/count")
+@offload()
+def get_low_stock_count():
+    """Количество запчастей с низким запасом (для бейджа, без полной статистики)"""
+    return {"success": True, "data": {"count": part_service.get_low_stock_count()}}
+
+@router.get("/low-stock/stream")
+async def stream_low_stock_count(request: Request):
+    """SSE: количество запчастей с низким запасом при каждом изменении"""
+    return StreamingResponse(
+        low_stock_stream.events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/low-stock/all")
-async def get_low_stock():
+@offload()
+def get_low_stock():
     """Получить запчасти с низким запасом"""
     parts = part_service.get_low_stock_parts()
     return {"success": True, "data": parts}
@@ -169,13 +204,15 @@ async def get_low_stock():
 # ========================
 
 @router.get("/suppliers/all")
-async def get_suppliers():
+@offload()
+def get_suppliers():
     """Получить всех поставщиков"""
     suppliers = part_service.get_all_suppliers()
     return {"success": True, "data": suppliers}
 
 @router.post("/suppliers")
-async def create_supplier(data: SupplierCreate):
+@offload()
+def create_supplier(data: SupplierCreate):
     """Создать поставщика"""
     try:
         supplier = part_service.create_supplier(data.dict())
@@ -188,7 +225,9 @@ async def create_supplier(data: SupplierCreate):
 # ========================
 
 @router.get("/stats/all")
-async def get_part_stats():
+@conditional("parts", "part_categories", "part_suppliers")
+@offload()
+def get_part_stats():
     """Получить статистику по запчастям"""
     try:
         stats = part_service.get_part_statistics()
@@ -6,6 +6,7 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from app.api.admin_api import router as admin_api_router
 from app.api.statistics_api import router as statistics_api_router
 from app.api.events_api import router as events_api_router
+from app.api.internal_api import router as internal_api_router
 
 router = APIRouter()
 
@@ -13,6 +14,7 @@ router = APIRouter()
 router.include_router(admin_api_router)
 router.include_router(events_api_router)
 router.include_router(statistics_api_router)
+router.include_router(internal_api_router)
 
 templates = Jinja2Templates(directory="app/templates")
 
@@ -1,501 +1,529 @@
 # app/api/statistics_api.py
+import asyncio
+from collections import Counter
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, extract
+from sqlalchemy import func, and_, or_, extract, select, case, literal_column
 from app.database import SessionLocal
+from app.core.executor import offload, run_db
+from app.core.cache import cached
+from app.core.timeseries import series_range, fill_series
+from app.core.dialects import sql_functions
 from app.models.ticket import Ticket, DeliveryMethod
 from app.models.master import Master
 from app.models.client import Client
-from app.models.part import Part, PartTransaction
+from app.models.part import Part, PartTransaction, PartCategory
+from app.models.rollup import TicketDailyRollup, DEFAULT_STATUS
+from app.core import rollups
+from app.services import part_service
 from typing import Optional
 
 router = APIRouter(prefix="/api/statistics")
 
-@router.get("/overview")
-async def get_statistics_overview(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None
-):
-    """Получить общую статистику"""
+DONE_STATUS = "✅ Готово"
+WEEKDAY_SHORT = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
+MONTH_SHORT = ['Янв', 'Фев', 'Мар', 'Апр', 'Май', 'Июн',
+               'Июл', 'Авг', 'Сен', 'Окт', 'Ноя', 'Дек']
+
+# Период графика -> (интервал, сколько интервалов, подпись)
+TREND_PERIODS = {
+    "week": ("day", 7, lambda day: WEEKDAY_SHORT[day.weekday()]),
+    "month": ("week", 5, lambda monday: monday.strftime("%d.%m")),
+    "year": ("month", 12, lambda first: MONTH_SHORT[first.month - 1]),
+}
+IN_PROGRESS_STATUSES = ["В работе", "🧪 Диагностика", "🔧 В ремонте"]
+COMPARISON_DAYS = {"month": 30, "quarter": 90, "year": 365}
+
+def _count_where(model, *conditions):
+    """(SELECT COUNT(*) FROM ... WHERE ...) для сборки нескольких счетчиков в один запрос
+
+    Каждый счетчик читает только свой диапазон индекса, а база получает
+    один запрос вместо отдельного count() на каждый показатель.
+    """
+    return select(func.count()).select_from(model).where(*conditions).scalar_subquery()
+
+def _ticket_window_counts(db, start, end, prev_start, prev_end, with_statuses=True):
+    """Заявки за текущий и предыдущий период и по статусам
+
+    Целые дни читаются из агрегата (app/models/rollup.py), неполные
+    крайние дни - из tickets (rollups.split_window): два запроса, объем
+    работы не зависит от длины периода, а числа совпадают с COUNT(*).
+    """
+    days, edges = rollups.split_window(start, end)
+    prev_days, prev_edges = rollups.split_window(prev_start, prev_end)
+    rows = db.query(
+        TicketDailyRollup.status,
+        rollups.sum_where(days),
+        rollups.sum_where(prev_days)
+    ).filter(or_(days, prev_days)).group_by(TicketDailyRollup.status).all()
+
+    status = func.coalesce(Ticket.status, DEFAULT_STATUS)
+    edge_rows = db.query(
+        status,
+        func.sum(case((edges, 1), else_=0)),
+        func.sum(case((prev_edges, 1), else_=0))
+    ).filter(or_(edges, prev_edges)).group_by(status).all()
+
+    current = Counter()
+    previous = 0
+    for status, count, prev_count in (*rows, *edge_rows):
+        current[status] += int(count or 0)
+        previous += int(prev_count or 0)
+    counts = {
+        "total": sum(current.values()),
+        "total_prev": previous
+    }
+    if with_statuses:
+        counts["completed"] = current.get(DONE_STATUS, 0)
+        counts["in_progress"] = sum(current.get(status, 0) for status in IN_PROGRESS_STATUSES)
+    return counts
+
+def _client_window_counts(db, start, end, prev_start, prev_end):
+    """Новые клиенты за текущий и предыдущий период - одним запросом"""
+    row = db.query(
+        _count_where(Client, Client.created_at.between(start, end)).label("current"),
+        _count_where(Client, Client.created_at.between(prev_start, prev_end)).label("previous")
+    ).one()
+    return int(row.current), int(row.previous)
+
+def _date_window(start_date: Optional[str] = None, end_date: Optional[str] = None, now: datetime = None):
+    """(start, end, prev_start, prev_end) для фильтра дат, по умолчанию 30 дней"""
+    now = now or datetime.now()
+    start = datetime.fromisoformat(start_date) if start_date else now - timedelta(days=30)
+    end = datetime.fromisoformat(end_date) if end_date else now
+    # Предыдущий период той же длины
+    return start, end, start - (end - start), end - (end - start)
+
+def _comparison_window(period: str, now: datetime = None):
+    """(start, end, prev_start, prev_end) для сравнения за месяц/квартал/год"""
+    now = now or datetime.now()
+    days = COMPARISON_DAYS.get(period, 365)
+    start = now - timedelta(days=days)
+    return start, now, start - timedelta(days=days), now - timedelta(days=days)
+
+def window_totals(db, window):
+    """Заявки (с разбивкой по статусам) и новые клиенты за период и предыдущий"""
+    return _ticket_window_counts(db, *window), _client_window_counts(db, *window)
+
+def _in_session(panel, *args):
+    """Посчитать панель в отдельной сессии (сессия не делится между потоками)"""
     db = SessionLocal()
     try:
-        # Парсим даты
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-        else:
-            start = datetime.now() - timedelta(days=30)
+        return panel(db, *args)
+    finally:
+        db.close()
+
+def _view(panel, *args):
+    """Ответ эндпоинта одной панели"""
+    return {"success": True, "data": _in_session(panel, *args)}
+
+# ========================
+# ПАНЕЛИ СТРАНИЦЫ СТАТИСТИКИ
+# ========================
+
+def overview_panel(db, window, totals=None):
+    """KPI за период; totals - уже посчитанный window_totals(db, window)"""
+    # Основные показатели: по одному запросу на таблицу
+    tickets, (new_customers, _) = totals or window_totals(db, window)
+    total_orders = tickets["total"]
+    completed_orders = tickets["completed"]
+    in_progress = tickets["in_progress"]
+    total_orders_prev = tickets["total_prev"]
+    
+    # У Ticket нет поля total_price, используем количество * среднюю цену или 0
+    total_revenue = 0  # Заглушка, пока нет данных о ценах
+    
+    avg_rating = db.query(func.avg(Master.rating)).filter(
+        Master.rating_count > 0
+    ).scalar() or 0
+    
+    # Расчет эффективности
+    efficiency = (completed_orders / total_orders * 100) if total_orders > 0 else 0
+    
+    # Расчет маржи (заглушка)
+    profit_margin = 32.0
+    
+    # Рост показателей
+    orders_growth = ((total_orders - total_orders_prev) / total_orders_prev * 100) if total_orders_prev > 0 else 0
+    revenue_growth = 12.0  # Заглушка
+    customers_growth = 8.0  # Заглушка
+    rating_growth = ((avg_rating - 4.5) / 4.5 * 100) if avg_rating > 0 else 0
+    
+    return {
+        "kpis": {
+            "totalOrders": total_orders,
+            "totalRevenue": total_revenue,
+            "newCustomers": new_customers,
+            "averageRating": round(avg_rating, 2),
+            "efficiency": round(efficiency, 1),
+            "profitMargin": profit_margin,
+            "completedOrders": completed_orders,
+            "inProgress": in_progress
+        },
+        "comparison": {
+            "ordersGrowth": round(orders_growth, 1),
+            "revenueGrowth": revenue_growth,
+            "customersGrowth": customers_growth,
+            "ratingGrowth": round(rating_growth, 1)
+        }
+    }
+
+def trends_panel(db, period: str):
+    """Тренды заявок"""
+    # Один GROUP BY по агрегату за дни, пустые интервалы дозаполняются нулями
+    granularity, periods, label = TREND_PERIODS[period]
+    start, end = series_range(granularity, periods)
+    rows = db.execute(rollups.trend_query(db, granularity, start, end)).all()
+    series = fill_series(rows, granularity, start, end)
+    
+    labels = [label(bucket) for bucket, _ in series]
+    values = [count for _, count in series]
+    
+    return {
+        "labels": labels,
+        "values": values
+    }
+
+def orders_by_type_panel(db):
+    """Распределение заявок по категориям"""
+    # Группируем по категориям устройств (из агрегата по дням)
+    categories = sorted(rollups.counts_by(
+        db, TicketDailyRollup.category, TicketDailyRollup.category != ''
+    ).items(), key=lambda item: item[1], reverse=True)
+    
+    labels = []
+    values = []
+    colors = ['#2563EB', '#10B981', '#F59E0B', '#8B5CF6', '#EF4444', '#6B7280']
+    
+    for category in categories[:6]:  # Берем топ-6 категорий
+        labels.append(category[0])
+        values.append(category[1])
+    
+    # Если нет данных, добавляем заглушку
+    if not labels:
+        labels = ['Нет данных']
+        values = [1]
+    
+    return {
+        "labels": labels,
+        "values": values,
+        "colors": colors[:len(labels)]
+    }
+
+def masters_rating_panel(db, sort_by: str):
+    """Рейтинг мастеров"""
+    # У мастера нет поля is_active, используем status
+    masters = db.query(Master).filter(
+        Master.status == "active"
+    ).all()
+    
+    if sort_by == "rating":
+        masters.sort(key=lambda x: x.rating or 0, reverse=True)
+    elif sort_by == "orders":
+        masters.sort(key=lambda x: x.completed_orders or 0, reverse=True)
+    else:  # revenue - приблизительный расчет
+        masters.sort(key=lambda x: (x.completed_orders or 0) * 1000, reverse=True)
+    
+    labels = []
+    values = []
+    colors = ['#2563EB', '#10B981', '#F59E0B', '#8B5CF6', '#EF4444']
+    
+    for master in masters[:5]:
+        name = f"{master.name} {master.surname[0]}." if master.surname else master.name
+        labels.append(name)
         
-        if end_date:
-            end = datetime.fromisoformat(end_date)
+        if sort_by == "rating":
+            values.append(master.rating or 0)
+        elif sort_by == "orders":
+            values.append(master.completed_orders or 0)
         else:
-            end = datetime.now()
-        
-        # Основные показатели
-        total_orders = db.query(Ticket).filter(
-            Ticket.created_at.between(start, end)
-        ).count()
-        
-        # У Ticket нет поля total_price, используем количество * среднюю цену или 0
-        total_revenue = 0  # Заглушка, пока нет данных о ценах
-        
-        new_customers = db.query(Client).filter(
-            Client.created_at.between(start, end)
-        ).count()
-        
-        avg_rating = db.query(func.avg(Master.rating)).filter(
-            Master.rating_count > 0
-        ).scalar() or 0
-        
-        completed_orders = db.query(Ticket).filter(
-            Ticket.created_at.between(start, end),
-            Ticket.status == "✅ Готово"
-        ).count()
-        
-        # Заявки в работе
-        in_progress = db.query(Ticket).filter(
-            Ticket.created_at.between(start, end),
-            Ticket.status.in_(["В работе", "🧪 Диагностика", "🔧 В ремонте"])
-        ).count()
-        
-        total_orders_prev = db.query(Ticket).filter(
-            Ticket.created_at.between(
-                start - (end - start),
-                end - (end - start)
-            )
-        ).count()
-        
-        # Расчет эффективности
-        efficiency = (completed_orders / total_orders * 100) if total_orders > 0 else 0
-        
-        # Расчет маржи (заглушка)
-        profit_margin = 32.0
-        
-        # Рост показателей
-        orders_growth = ((total_orders - total_orders_prev) / total_orders_prev * 100) if total_orders_prev > 0 else 0
-        revenue_growth = 12.0  # Заглушка
-        customers_growth = 8.0  # Заглушка
-        rating_growth = ((avg_rating - 4.5) / 4.5 * 100) if avg_rating > 0 else 0
-        
-        return {
-            "success": True,
-            "data": {
-                "kpis": {
-                    "totalOrders": total_orders,
-                    "totalRevenue": total_revenue,
-                    "newCustomers": new_customers,
-                    "averageRating": round(avg_rating, 2),
-                    "efficiency": round(efficiency, 1),
-                    "profitMargin": profit_margin,
-                    "completedOrders": completed_orders,
-                    "inProgress": in_progress
-                },
-                "comparison": {
-                    "ordersGrowth": round(orders_growth, 1),
-                    "revenueGrowth": revenue_growth,
-                    "customersGrowth": customers_growth,
-                    "ratingGrowth": round(rating_growth, 1)
-                }
-            }
+            values.append((master.completed_orders or 0) * 1000)
+    
+    # Если нет мастеров, добавляем заглушку
+    if not labels:
+        labels = ['Нет данных']
+        values = [0]
+    
+    return {
+        "labels": labels,
+        "values": values,
+        "colors": colors[:len(labels)]
+    }
+
+def top_customers_panel(db, limit: int):
+    """Топ клиентов по количеству заявок"""
+    # Получаем клиентов с количеством заявок
+    customers = db.query(
+        Client,
+        func.count(Ticket.id).label('ticket_count')
+    ).join(
+        Ticket, Ticket.client_id == Client.id, isouter=True
+    ).group_by(
+        Client.id
+    ).order_by(
+        func.count(Ticket.id).desc()
+    ).limit(limit).all()
+    
+    result = []
+    for client, ticket_count in customers:
+        # Приблизительная выручка
+        revenue = ticket_count * 1000
+        trend = "up" if ticket_count > 5 else "stable" if ticket_count > 2 else "down"
+        
+        result.append({
+            "name": client.name or f"Клиент #{client.id}",
+            "orders": ticket_count,
+            "revenue": revenue,
+            "trend": trend
+        })
+    
+    return result
+
+def weekday_panel(db):
+    """Статистика по дням недели (ошибка БД уходит в ответ 500, а не нулями)"""
+    days = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье']
+    sql = sql_functions(db)
+    
+    # Один агрегат по дню недели (0 = понедельник). Время ремонта - от
+    # создания до completed_at; заявки без него (выполнены до ревизии 0013
+    # или еще в работе) в среднее не входят. Заявки без created_at дня
+    # недели не имеют и в панель не попадают.
+    repair_hours = case(
+        (Ticket.completed_at.isnot(None), sql.hours_between(Ticket.created_at, Ticket.completed_at)),
+        else_=None
+    )
+    rows = db.execute(
+        select(
+            sql.weekday(Ticket.created_at).label("weekday"),
+            func.count().label("orders"),
+            func.avg(repair_hours).label("avg_hours")
+        )
+        .where(Ticket.created_at.isnot(None))
+        .group_by(literal_column("weekday"))
+    ).all()
+    
+    by_weekday = {int(weekday): (orders, avg_hours) for weekday, orders, avg_hours in rows}
+    total_orders = sum(orders for orders, _ in by_weekday.values())
+    
+    result = []
+    for i, day in enumerate(days):
+        orders, avg_hours = by_weekday.get(i, (0, None))
+        revenue = orders * 1000  # Заглушка
+        percentage = (orders / total_orders * 100) if total_orders > 0 else 0
+        
+        result.append({
+            "day": day,
+            "orders": orders,
+            "revenue": revenue,
+            # Нет выполненных заявок с известным временем - нет и среднего
+            "avgTime": f"{float(avg_hours):.1f}ч" if avg_hours is not None else "—",
+            "percentage": round(percentage, 1)
+        })
+    
+    return result
+
+def comparison_panel(db, window, totals=None):
+    """Сравнение с предыдущим периодом; totals - как в overview_panel"""
+    # Текущие и предыдущие показатели: по одному запросу на таблицу
+    tickets, (current_customers, prev_customers) = totals or window_totals(db, window)
+    current_orders = tickets["total"]
+    prev_orders = tickets["total_prev"]
+    
+    current_revenue = 0  # Заглушка
+    prev_revenue = 0  # Заглушка
+    
+    # Истории рейтингов нет, поэтому для обоих периодов берется текущий средний
+    current_avg_rating = db.query(func.avg(Master.rating)).scalar() or 0
+    prev_avg_rating = current_avg_rating
+    
+    # Расчет времени ремонта (заглушка)
+    repair_time_current = 2.4
+    repair_time_prev = 2.6
+    
+    comparison = [
+        {
+            "title": "Выручка",
+            "current": current_revenue,
+            "previous": prev_revenue,
+            "change": round(((current_revenue - prev_revenue) / prev_revenue * 100) if prev_revenue > 0 else 0, 1)
+        },
+        {
+            "title": "Количество заявок",
+            "current": current_orders,
+            "previous": prev_orders,
+            "change": round(((current_orders - prev_orders) / prev_orders * 100) if prev_orders > 0 else 0, 1)
+        },
+        {
+            "title": "Новые клиенты",
+            "current": current_customers,
+            "previous": prev_customers,
+            "change": round(((current_customers - prev_customers) / prev_customers * 100) if prev_customers > 0 else 0, 1)
+        },
+        {
+            "title": "Средний чек",
+            "current": 0,
+            "previous": 0,
+            "change": 0
+        },
+        {
+            "title": "Время ремонта",
+            "current": repair_time_current,
+            "previous": repair_time_prev,
+            "change": round((repair_time_current - repair_time_prev) / repair_time_prev * 100, 1)
+        },
+        {
+            "title": "Удовлетворенность",
+            "current": round(current_avg_rating, 2),
+            "previous": round(prev_avg_rating, 2),
+            "change": round((current_avg_rating - prev_avg_rating) / prev_avg_rating * 100, 1) if prev_avg_rating > 0 else 0
         }
-        
-    finally:
-        db.close()
+    ]
+    
+    return comparison
+
+def parts_panel(db):
+    """Статистика по запчастям"""
+    # Один GROUP BY по parts, итоги - сумма по категориям
+    aggregates = part_service.category_aggregates(db)
+    totals = part_service.sum_aggregates(aggregates)
+    categories = db.query(PartCategory.id, PartCategory.name).all()
+    
+    categories_stats = []
+    for cat_id, cat_name in categories:
+        cat = aggregates.get(cat_id, {})
+        categories_stats.append({
+            "id": cat_id,
+            "name": cat_name,
+            "count": int(cat.get("parts", 0)),
+            "total_value": float(cat.get("purchase_value", 0))
+        })
+    
+    return {
+        "total_parts": int(totals.get("parts", 0)),
+        "total_stock": int(totals.get("stock", 0)),
+        "total_value": float(totals.get("purchase_value", 0)),
+        "low_stock": int(totals.get("low_stock", 0)),
+        "categories": categories_stats
+    }
+
+# ========================
+# ЭНДПОИНТЫ
+# ========================
+
+@router.get("/overview")
+@cached("tickets", "clients", "masters")
+@offload()
+def get_statistics_overview(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    """Получить общую статистику"""
+    return _view(overview_panel, _date_window(start_date, end_date))
 
 @router.get("/trends")
-async def get_trends(
+@cached("tickets")
+@offload()
+def get_trends(
     period: str = Query("week", enum=["week", "month", "year"])
 ):
     """Получить тренды заявок"""
-    db = SessionLocal()
-    try:
-        now = datetime.now()
-        
-        if period == "week":
-            # Последние 7 дней
-            labels = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
-            values = []
-            
-            for i in range(7):
-                date = (now - timedelta(days=6-i)).date()
-                count = db.query(Ticket).filter(
-                    func.date(Ticket.created_at) == date
-                ).count()
-                values.append(count)
-                
-        elif period == "month":
-            # Последние 5 недель
-            labels = ['1-7', '8-14', '15-21', '22-28', '29-31']
-            values = []
-            
-            for i in range(5):
-                start = now - timedelta(days=30 - i*7)
-                end = start + timedelta(days=6)
-                count = db.query(Ticket).filter(
-                    Ticket.created_at.between(start, end)
-                ).count()
-                values.append(count)
-                
-        else:  # year
-            # Последние 12 месяцев
-            labels = ['Янв', 'Фев', 'Мар', 'Апр', 'Май', 'Июн', 
-                     'Июл', 'Авг', 'Сен', 'Окт', 'Ноя', 'Дек']
-            values = []
-            
-            for i in range(12):
-                month = now.month - i
-                year = now.year
-                if month <= 0:
-                    month += 12
-                    year -= 1
-                
-                # Для MySQL используем EXTRACT или MONTH/YEAR
-                count = db.query(Ticket).filter(
-                    func.extract('year', Ticket.created_at) == year,
-                    func.extract('month', Ticket.created_at) == month
-                ).count()
-                values.insert(0, count)
-        
-        return {
-            "success": True,
-            "data": {
-                "labels": labels,
-                "values": values
-            }
-        }
-        
-    finally:
-        db.close()
+    return _view(trends_panel, period)
 
 @router.get("/orders-by-type")
-async def get_orders_by_type():
+@cached("tickets")
+@offload()
+def get_orders_by_type():
     """Получить распределение заявок по категориям"""
-    db = SessionLocal()
-    try:
-        # Группируем по категориям устройств
-        categories = db.query(
-            Ticket.category,
-            func.count(Ticket.id).label('count')
-        ).filter(
-            Ticket.category.isnot(None),
-            Ticket.category != ''
-        ).group_by(Ticket.category).all()
-        
-        labels = []
-        values = []
-        colors = ['#2563EB', '#10B981', '#F59E0B', '#8B5CF6', '#EF4444', '#6B7280']
-        
-        for category in categories[:6]:  # Берем топ-6 категорий
-            labels.append(category[0])
-            values.append(category[1])
-        
-        # Если нет данных, добавляем заглушку
-        if not labels:
-            labels = ['Нет данных']
-            values = [1]
-        
-        return {
-            "success": True,
-            "data": {
-                "labels": labels,
-                "values": values,
-                "colors": colors[:len(labels)]
-            }
-        }
-        
-    finally:
-        db.close()
+    return _view(orders_by_type_panel)
 
 @router.get("/masters-rating")
-async def get_masters_rating(
+@cached("masters")
+@offload()
+def get_masters_rating(
     sort_by: str = Query("rating", enum=["rating", "orders", "revenue"])
 ):
     """Получить рейтинг мастеров"""
-    db = SessionLocal()
-    try:
-        # У мастера нет поля is_active, используем status
-        masters = db.query(Master).filter(
-            Master.status == "active"
-        ).all()
-        
-        if sort_by == "rating":
-            masters.sort(key=lambda x: x.rating or 0, reverse=True)
-        elif sort_by == "orders":
-            masters.sort(key=lambda x: x.completed_orders or 0, reverse=True)
-        else:  # revenue - приблизительный расчет
-            masters.sort(key=lambda x: (x.completed_orders or 0) * 1000, reverse=True)
-        
-        labels = []
-        values = []
-        colors = ['#2563EB', '#10B981', '#F59E0B', '#8B5CF6', '#EF4444']
-        
-        for master in masters[:5]:
-            name = f"{master.name} {master.surname[0]}." if master.surname else master.name
-            labels.append(name)
-            
-            if sort_by == "rating":
-                values.append(master.rating or 0)
-            elif sort_by == "orders":
-                values.append(master.completed_orders or 0)
-            else:
-                values.append((master.completed_orders or 0) * 1000)
-        
-        # Если нет мастеров, добавляем заглушку
-        if not labels:
-            labels = ['Нет данных']
-            values = [0]
-        
-        return {
-            "success": True,
-            "data": {
-                "labels": labels,
-                "values": values,
-                "colors": colors[:len(labels)]
-            }
-        }
-        
-    finally:
-        db.close()
+    return _view(masters_rating_panel, sort_by)
 
 @router.get("/top-customers")
-async def get_top_customers(limit: int = 5):
+@cached("clients", "tickets")
+@offload()
+def get_top_customers(limit: int = 5):
     """Получить топ клиентов по количеству заявок"""
-    db = SessionLocal()
-    try:
-        # Получаем клиентов с количеством заявок
-        customers = db.query(
-            Client,
-            func.count(Ticket.id).label('ticket_count')
-        ).join(
-            Ticket, Ticket.client_id == Client.id, isouter=True
-        ).group_by(
-            Client.id
-        ).order_by(
-            func.count(Ticket.id).desc()
-        ).limit(limit).all()
-        
-        result = []
-        for client, ticket_count in customers:
-            # Приблизительная выручка
-            revenue = ticket_count * 1000
-            trend = "up" if ticket_count > 5 else "stable" if ticket_count > 2 else "down"
-            
-            result.append({
-                "name": client.name or f"Клиент #{client.id}",
-                "orders": ticket_count,
-                "revenue": revenue,
-                "trend": trend
-            })
-        
-        return {
-            "success": True,
-            "data": result
-        }
-        
-    finally:
-        db.close()
+    return _view(top_customers_panel, limit)
 
 @router.get("/weekday-stats")
-async def get_weekday_stats():
+@cached("tickets")
+@offload()
+def get_weekday_stats():
     """Получить статистику по дням недели"""
-    db = SessionLocal()
-    try:
-        days = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье']
-        result = []
-        
-        for i, day in enumerate(days, 1):
-            # Для MySQL/MariaDB используем DAYOFWEEK()
-            # DAYOFWEEK() возвращает 1 = воскресенье, 2 = понедельник, ..., 7 = суббота
-            # Нам нужно: 1 = понедельник, 2 = вторник, ..., 7 = воскресенье
-            # Поэтому делаем преобразование
-            mysql_weekday = i + 1  # преобразуем наш формат (1=пн) в MySQL DAYOFWEEK (2=пн)
-            if mysql_weekday > 7:
-                mysql_weekday = 1  # воскресенье = 1
-                
-            tickets = db.query(Ticket).filter(
-                func.dayofweek(Ticket.created_at) == mysql_weekday
-            ).all()
-            
-            orders = len(tickets)
-            revenue = orders * 1000  # Заглушка
-            avg_time = f"{2 + i % 3}.{i % 2 * 5}ч"
-            
-            # Считаем процент от общего количества
-            total_orders = db.query(Ticket).count()
-            percentage = (orders / total_orders * 100) if total_orders > 0 else 0
-            
-            result.append({
-                "day": day,
-                "orders": orders,
-                "revenue": revenue,
-                "avgTime": avg_time,
-                "percentage": round(percentage, 1)
-            })
-        
-        # Сортируем по дням недели (пн-вс)
-        return {
-            "success": True,
-            "data": result
-        }
-        
-    except Exception as e:
-        print(f"Error in get_weekday_stats: {e}")
-        # Возвращаем пустые данные в случае ошибки
-        return {
-            "success": True,
-            "data": [
-                {"day": "Понедельник", "orders": 0, "revenue": 0, "avgTime": "0ч", "percentage": 0},
-                {"day": "Вторник", "orders": 0, "revenue": 0, "avgTime": "0ч", "percentage": 0},
-                {"day": "Среда", "orders": 0, "revenue": 0, "avgTime": "0ч", "percentage": 0},
-                {"day": "Четверг", "orders": 0, "revenue": 0, "avgTime": "0ч", "percentage": 0},
-                {"day": "Пятница", "orders": 0, "revenue": 0, "avgTime": "0ч", "percentage": 0},
-                {"day": "Суббота", "orders": 0, "revenue": 0, "avgTime": "0ч", "percentage": 0},
-                {"day": "Воскресенье", "orders": 0, "revenue": 0, "avgTime": "0ч", "percentage": 0}
-            ]
-        }
-    finally:
-        db.close()
+    return _view(weekday_panel)
+
 @router.get("/comparison")
-async def get_comparison(
+@cached("tickets", "clients", "masters")
+@offload()
+def get_comparison(
     period: str = Query("month", enum=["month", "quarter", "year"])
 ):
     """Получить сравнение с предыдущим периодом"""
-    db = SessionLocal()
-    try:
-        now = datetime.now()
-        
-        if period == "month":
-            days = 30
-        elif period == "quarter":
-            days = 90
-        else:  # year
-            days = 365
-        
-        # Текущий период
-        current_start = now - timedelta(days=days)
-        current_end = now
-        
-        # Предыдущий период
-        prev_start = current_start - timedelta(days=days)
-        prev_end = current_end - timedelta(days=days)
-        
-        # Текущие показатели
-        current_orders = db.query(Ticket).filter(
-            Ticket.created_at.between(current_start, current_end)
-        ).count()
-        
-        current_revenue = 0  # Заглушка
-        
-        current_customers = db.query(Client).filter(
-            Client.created_at.between(current_start, current_end)
-        ).count()
-        
-        current_avg_rating = db.query(func.avg(Master.rating)).scalar() or 0
-        
-        # Предыдущие показатели
-        prev_orders = db.query(Ticket).filter(
-            Ticket.created_at.between(prev_start, prev_end)
-        ).count()
-        
-        prev_revenue = 0  # Заглушка
-        
-        prev_customers = db.query(Client).filter(
-            Client.created_at.between(prev_start, prev_end)
-        ).count()
-        
-        prev_avg_rating = db.query(func.avg(Master.rating)).scalar() or 0
-        
-        # Расчет времени ремонта (заглушка)
-        repair_time_current = 2.4
-        repair_time_prev = 2.6
-        
-        comparison = [
-            {
-                "title": "Выручка",
-                "current": current_revenue,
-                "previous": prev_revenue,
-                "change": round(((current_revenue - prev_revenue) / prev_revenue * 100) if prev_revenue > 0 else 0, 1)
-            },
-            {
-                "title": "Количество заявок",
-                "current": current_orders,
-                "previous": prev_orders,
-                "change": round(((current_orders - prev_orders) / prev_orders * 100) if prev_orders > 0 else 0, 1)
-            },
-            {
-                "title": "Новые клиенты",
-                "current": current_customers,
-                "previous": prev_customers,
-                "change": round(((current_customers - prev_customers) / prev_customers * 100) if prev_customers > 0 else 0, 1)
-            },
-            {
-                "title": "Средний чек",
-                "current": 0,
-                "previous": 0,
-                "change": 0
-            },
-            {
-                "title": "Время ремонта",
-                "current": repair_time_current,
-                "previous": repair_time_prev,
-                "change": round((repair_time_current - repair_time_prev) / repair_time_prev * 100, 1)
-            },
-            {
-                "title": "Удовлетворенность",
-                "current": round(current_avg_rating, 2),
-                "previous": round(prev_avg_rating, 2),
-                "change": round((current_avg_rating - prev_avg_rating) / prev_avg_rating * 100, 1) if prev_avg_rating > 0 else 0
-            }
-        ]
-        
-        return {
-            "success": True,
-            "data": comparison
-        }
-        
-    finally:
-        db.close()
+    return _view(comparison_panel, _comparison_window(period))
 
 @router.get("/parts-stats")
-async def get_parts_statistics():
+@cached("parts", "part_categories")
+@offload()
+def get_parts_statistics():
     """Получить статистику по запчастям"""
-    db = SessionLocal()
+    return _view(parts_panel)
+
+@router.get("/dashboard")
+@cached("tickets", "clients", "masters", "parts", "part_categories")
+async def get_dashboard(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    period: str = Query("week", enum=["week", "month", "year"]),
+    sort_by: str = Query("rating", enum=["rating", "orders", "revenue"]),
+    compare: str = Query("month", enum=["month", "quarter", "year"]),
+    limit: int = 5
+):
+    """Все панели страницы статистики одним ответом
+
+    Панели считаются параллельно в пуле db_executor, каждая в своей сессии.
+    Итоги за период (window_totals) считаются один раз на окно и
+    используются и в KPI, и в сравнении, если окна совпадают.
+    """
+    now = datetime.now()
+    window = _date_window(start_date, end_date, now)
+    compare_window = _comparison_window(compare, now)
+
+    totals = {
+        key: asyncio.ensure_future(run_db("statistics_api.dashboard.totals", _in_session, window_totals, key))
+        for key in {window, compare_window}
+    }
+
+    def panel(fn, *args):
+        return run_db(f"statistics_api.dashboard.{fn.__name__}", _in_session, fn, *args)
+
+    async def with_totals(fn, key):
+        return await panel(fn, key, await totals[key])
+
+    panels = {
+        "overview": with_totals(overview_panel, window),
+        "trends": panel(trends_panel, period),
+        "ordersByType": panel(orders_by_type_panel),
+        "mastersRating": panel(masters_rating_panel, sort_by),
+        "topCustomers": panel(top_customers_panel, limit),
+        "weekdayStats": panel(weekday_panel),
+        "lowStockParts": run_db("statistics_api.dashboard.low_stock_parts", part_service.get_low_stock_parts),
+        "partCategories": run_db("statistics_api.dashboard.part_categories", part_service.get_all_categories),
+        "comparison": with_totals(comparison_panel, compare_window),
+    }
     try:
-        # Общая статистика по запчастям
-        total_parts = db.query(Part).count()
-        total_stock = db.query(func.sum(Part.stock)).scalar() or 0
-        total_value = db.query(func.sum(Part.purchase_price * Part.stock)).scalar() or 0
-        low_stock = db.query(Part).filter(
-            Part.stock < Part.min_stock
-        ).count()
-        
-        # Статистика по категориям
-        from app.models.part import PartCategory
-        categories = db.query(PartCategory).all()
-        categories_stats = []
-        
-        for cat in categories:
-            cat_parts = db.query(Part).filter(Part.category_id == cat.id).count()
-            cat_value = db.query(func.sum(Part.purchase_price * Part.stock)).filter(
-                Part.category_id == cat.id
-            ).scalar() or 0
-            
-            categories_stats.append({
-                "id": cat.id,
-                "name": cat.name,
-                "count": cat_parts,
-                "total_value": float(cat_value)
-            })
-        
-        return {
-            "success": True,
-            "data": {
-                "total_parts": total_parts,
-                "total_stock": total_stock,
-                "total_value": float(total_value),
-                "low_stock": low_stock,
-                "categories": categories_stats
-            }
-        }
-        
+        results = await asyncio.gather(*panels.values())
     finally:
-        db.close()
\ No newline at end of file
+        for future in totals.values():
+            future.cancel()
+
+    return {
+        "success": True,
+        "data": dict(zip(panels, results))
+    }
@@ -8,12 +8,12 @@ from aiogram.dispatcher import Dispatcher
 from app.models.ticket import DeliveryMethod
 
 from app.models.master import Master
-from app.models.ticket import Ticket
-from app.database import SessionLocal
+from app.db.engine import AsyncSessionLocal
+from app.core import rollups
 from app.bot.config import ADMIN_IDS
 from app.bot.states.master import AddMaster, EditMaster
 import app.bot.services.ticket_service as ticket_service
-from app.services.master_service import create_master, get_all_masters
+import app.bot.services.master_service as master_service
 from aiogram.utils.exceptions import NetworkError, RetryAfter
 from asyncio import sleep
 
@@ -29,6 +29,24 @@ logger = logging.getLogger(__name__)
 def is_admin(user_id):
     return user_id in ADMIN_IDS
 
+# Фильтры списка заявок: код в callback_data -> (кнопка, статусы)
+TICKET_LIST_FILTERS = {
+    "all": ("📋 Все", None),
+    "new": ("🆕 Новые", ["Новая"]),
+    "work": ("🔧 В работе", ["🧪 Диагностика", "🔧 В ремонте", "В работе"]),
+    "done": ("✅ Готово", ["✅ Готово"]),
+}
+
+def ticket_filter_buttons(current):
+    """Ряд кнопок фильтра списка заявок"""
+    return [
+        InlineKeyboardButton(
+            ("• " if key == current else "") + title,
+            callback_data=f"admin_tickets:{key}"
+        )
+        for key, (title, _) in TICKET_LIST_FILTERS.items()
+    ]
+
 def admin_menu():
     """Клавиатура для админ-панели"""
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -135,7 +153,6 @@ def register_admin_handlers(dp: Dispatcher):
         skills = [s.strip() for s in message.text.split(",")]
         skills_str = ", ".join(skills)
         
-        db = SessionLocal()
         master_data = {
             "name": data["name"],
             "surname": data["surname"],
@@ -151,13 +168,12 @@ def register_admin_handlers(dp: Dispatcher):
             master_data["telegram_id"] = data["telegram_id"]
         
         try:
-            master = create_master(db, master_data)
+            master = await master_service.create_master(master_data)
             await message.answer(f"✅ Мастер создан ID {master.id}")
         except Exception as e:
             logger.error(f"Ошибка при создании мастера: {e}")
             await message.answer(f"❌ Ошибка при создании мастера: {str(e)}")
         finally:
-            db.close()
             await state.finish()
     
     @dp.callback_query_handler(Text(equals="add_master_fsm"))
@@ -174,27 +190,33 @@ def register_admin_handlers(dp: Dispatcher):
     # ALL TICKETS - ИСПРАВЛЕНО!
     # ==========================
     
-    @dp.callback_query_handler(Text(equals="admin_tickets"))
+    # admin_tickets[:<фильтр>[:<курсор>]] - страница списка заявок
+    @dp.callback_query_handler(Text(startswith="admin_tickets"))
     async def admin_tickets_callback(callback: types.CallbackQuery):
-        """Показать все заявки для админа"""
+        """Показать заявки для админа страницами по 10"""
         if not is_admin(callback.from_user.id):
             await callback.answer("⛔ Доступно только администраторам", show_alert=True)
             return
         
         await callback.answer()
         
-        # Используем существующую функцию из ticket_service
-        tickets = ticket_service.get_all_tickets_with_details()
+        parts = callback.data.split(":", 2)
+        filter_key = parts[1] if len(parts) > 1 and parts[1] in TICKET_LIST_FILTERS else "all"
+        cursor = parts[2] if len(parts) > 2 else None
+        tickets, next_cursor = await ticket_service.get_tickets_page(
+            cursor, limit=10, statuses=TICKET_LIST_FILTERS[filter_key][1]
+        )
         
         if not tickets:
-            kb = InlineKeyboardMarkup().add(
-                InlineKeyboardButton("◀️ Назад", callback_data="admin_menu")
-            )
-            await callback.message.edit_text("📋 Нет заявок в системе", reply_markup=kb)
+            kb = InlineKeyboardMarkup(inline_keyboard=[
+                ticket_filter_buttons(filter_key),
+                [InlineKeyboardButton("◀️ Назад", callback_data="admin_menu")]
+            ])
+            await callback.message.edit_text("📋 Нет заявок", reply_markup=kb)
             return
         
-        buttons = []
-        for t in tickets[:10]:  # Показываем последние 10 заявок
+        buttons = [ticket_filter_buttons(filter_key)]
+        for t in tickets:
             # Определяем эмодзи для статуса
             status_emoji = {
                 "Новая": "🆕",
@@ -218,18 +240,23 @@ def register_admin_handlers(dp: Dispatcher):
             ])
         
         # Добавляем кнопки управления
+        if next_cursor:
+            buttons.append([
+                InlineKeyboardButton("➡️ Дальше", callback_data=f"admin_tickets:{filter_key}:{next_cursor}")
+            ])
         buttons.append([
-            InlineKeyboardButton("🔄 Обновить", callback_data="admin_tickets"),
+            InlineKeyboardButton("🔄 Обновить", callback_data=f"admin_tickets:{filter_key}"),
             InlineKeyboardButton("◀️ Назад", callback_data="admin_menu")
         ])
         
         kb = InlineKeyboardMarkup(inline_keyboard=buttons)
         
-        # Статистика
-        total = len(tickets)
-        new = sum(1 for t in tickets if t['status'] == 'Новая')
-        in_progress = sum(1 for t in tickets if t['status'] not in ['✅ Готово', 'Новая'])
-        completed = sum(1 for t in tickets if t['status'] == '✅ Готово')
+        # Статистика по всем заявкам - из счетчиков статусов
+        by_status = await ticket_service.get_status_counts()
+        total = sum(by_status.values())
+        new = by_status.get('Новая', 0)
+        completed = by_status.get('✅ Готово', 0)
+        in_progress = total - new - completed
         
         stats_text = f"📊 Всего: {total} | 🆕 Новых: {new} | 🔧 В работе: {in_progress} | ✅ Завершено: {completed}"
         
@@ -253,7 +280,7 @@ def register_admin_handlers(dp: Dispatcher):
         ticket_id = int(callback.data.split("_")[2])
 
         # Получаем детали заявки
-        ticket = ticket_service.get_ticket(ticket_id)
+        ticket = await ticket_service.get_ticket(ticket_id)
 
         if not ticket:
             await callback.message.edit_text(
@@ -365,9 +392,7 @@ def register_admin_handlers(dp: Dispatcher):
         
         await callback.answer()
         
-        db = SessionLocal()
-        masters = get_all_masters(db)
-        db.close()
+        masters = await master_service.get_all_masters()
         
         buttons = []
         for m in masters:
@@ -402,9 +427,7 @@ def register_admin_handlers(dp: Dispatcher):
         if not is_admin(message.from_user.id):
             return
         
-        db = SessionLocal()
-        masters = get_all_masters(db)
-        db.close()
+        masters = await master_service.get_all_masters()
         
         buttons = []
         for m in masters:
@@ -442,18 +465,16 @@ def register_admin_handlers(dp: Dispatcher):
     async def edit_master_finish(message: types.Message, state: FSMContext):
         data = await state.get_data()
         
-        db = SessionLocal()
-        master = db.query(Master).get(data["master_id"])
+        master = await master_service.update_master(
+            data["master_id"],
+            {"name": data["name"], "surname": message.text}
+        )
         
         if master:
-            master.name = data["name"]
-            master.surname = message.text
-            db.commit()
             await message.answer("✅ Мастер обновлен")
         else:
             await message.answer("❌ Мастер не найден")
         
-        db.close()
         await state.finish()
     
     # ==========================
@@ -468,17 +489,22 @@ def register_admin_handlers(dp: Dispatcher):
         
         await callback.answer()
         
-        db = SessionLocal()
-        
-        try:
+        def read_counts(db):
             # Статистика по мастерам
             total_masters = db.query(Master).count()
             active_masters = db.query(Master).filter(Master.status == 'active').count()
             
-            # Статистика по заявкам
-            total_tickets = db.query(Ticket).count()
-            completed_tickets = db.query(Ticket).filter(Ticket.status == '✅ Готово').count()
-            new_tickets = db.query(Ticket).filter(Ticket.status == 'Новая').count()
+            # Статистика по заявкам - из агрегатов, без сканирования tickets
+            by_status = rollups.status_counts(db)
+            total_tickets = sum(by_status.values())
+            completed_tickets = by_status.get('✅ Готово', 0)
+            new_tickets = by_status.get('Новая', 0)
+            return total_masters, active_masters, total_tickets, completed_tickets, new_tickets
+        
+        try:
+            async with AsyncSessionLocal() as session:
+                (total_masters, active_masters, total_tickets,
+                 completed_tickets, new_tickets) = await session.run_sync(read_counts)
             
             text = f"""
 📊 СТАТИСТИКА СИСТЕМЫ:
@@ -503,8 +529,6 @@ def register_admin_handlers(dp: Dispatcher):
         except Exception as e:
             print(f"Ошибка при получении статистики: {e}")
             await callback.message.edit_text("❌ Ошибка при получении статистики")
-        finally:
-            db.close()
     
     # ---------- MASTER RATINGS (FOR ADMINS) ----------
     @dp.message_handler(Text(equals="📊 Рейтинги мастеров"))
@@ -514,10 +538,8 @@ def register_admin_handlers(dp: Dispatcher):
             await message.answer("⛔ Доступно только администраторам")
             return
         
-        db = SessionLocal()
-        
         try:
-            masters = db.query(Master).order_by(Master.rating.desc()).all()
+            masters = await master_service.get_all_masters(order_by_rating=True)
             
             if not masters:
                 await message.answer("Нет мастеров в базе данных")
@@ -549,8 +571,6 @@ def register_admin_handlers(dp: Dispatcher):
         except Exception as e:
             print(f"Ошибка при получении рейтингов: {e}")
             await message.answer("❌ Произошла ошибка")
-        finally:
-            db.close()
     
     # ---------- ALL TICKETS (FOR ADMINS) ----------
     @dp.message_handler(Text(equals="📋 Все заявки"))
@@ -560,15 +580,8 @@ def register_admin_handlers(dp: Dispatcher):
             await message.answer("⛔ Доступно только администраторам")
             return
         
-        db = SessionLocal()
-        
         try:
-            from sqlalchemy.orm import joinedload
-            
-            tickets = db.query(Ticket).options(
-                joinedload(Ticket.client),
-                joinedload(Ticket.master)
-            ).order_by(Ticket.created_at.desc()).limit(20).all()
+            tickets = await ticket_service.get_recent_tickets(20)
             
             if not tickets:
                 await message.answer("Нет заявок в базе данных")
@@ -594,8 +607,6 @@ def register_admin_handlers(dp: Dispatcher):
         except Exception as e:
             print(f"Ошибка при получении заявок: {e}")
             await message.answer("❌ Произошла ошибка")
-        finally:
-            db.close()
     
     # ---------- MASTERS LIST (FOR ADMINS) ----------
     @dp.message_handler(Text(equals="👥 Мастера"))
@@ -605,10 +616,8 @@ def register_admin_handlers(dp: Dispatcher):
             await message.answer("⛔ Доступно только администраторам")
             return
         
-        db = SessionLocal()
-        
         try:
-            masters = db.query(Master).all()
+            masters = await master_service.get_all_masters()
             
             if not masters:
                 await message.answer("Нет мастеров в базе данных")
@@ -652,6 +661,4 @@ def register_admin_handlers(dp: Dispatcher):
                 
         except Exception as e:
             print(f"Ошибка при получении мастеров: {e}")
-            await message.answer("❌ Произошла ошибка")
-        finally:
-            db.close()
\ No newline at end of file
+            await message.answer("❌ Произошла ошибка")
\ No newline at end of file
@@ -5,9 +5,7 @@ from aiogram.dispatcher.filters import Text
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 import logging
 from datetime import datetime, timedelta
-from app.database import SessionLocal
-from app.services import event_service
-from app.models.master import Master
+from app.bot.services import event_service, master_service
 from app.bot.config import ADMIN_IDS
 
 logger = logging.getLogger(__name__)
@@ -42,7 +40,7 @@ async def cal_today_callback(callback: types.CallbackQuery):
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
     tomorrow = today + timedelta(days=1)
     
-    events = event_service.get_events(today, tomorrow)
+    events = await event_service.get_events(today, tomorrow)
     
     if not events:
         await callback.message.edit_text(
@@ -87,7 +85,7 @@ async def cal_week_callback(callback: types.CallbackQuery):
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
     week_later = today + timedelta(days=7)
     
-    events = event_service.get_events(today, week_later)
+    events = await event_service.get_events(today, week_later)
     
     text = f"📆 <b>СОБЫТИЯ НА НЕДЕЛЮ ({today.strftime('%d.%m')} - {week_later.strftime('%d.%m')})</b>\n\n"
     
@@ -135,65 +133,58 @@ async def cal_my_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    db = SessionLocal()
-    try:
-        master = db.query(Master).filter(
-            Master.telegram_id == str(callback.from_user.id)
-        ).first()
-        
-        if not master:
-            await callback.message.edit_text(
-                "❌ Вы не зарегистрированы как мастер",
-                reply_markup=InlineKeyboardMarkup().add(
-                    InlineKeyboardButton("◀️ Назад", callback_data="calendar")
-                )
-            )
-            return
-        
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        week_later = today + timedelta(days=7)
-        
-        events = event_service.get_master_events(master.id, today, week_later)
-        
-        if not events:
-            await callback.message.edit_text(
-                f"📋 <b>ВАШИ СОБЫТИЯ</b>\n\n"
-                f"У вас нет запланированных событий на ближайшую неделю.",
-                reply_markup=InlineKeyboardMarkup().add(
-                    InlineKeyboardButton("◀️ Назад", callback_data="calendar")
-                ),
-                parse_mode="HTML"
+    master = await master_service.get_master_by_telegram_id(callback.from_user.id)
+    
+    if not master:
+        await callback.message.edit_text(
+            "❌ Вы не зарегистрированы как мастер",
+            reply_markup=InlineKeyboardMarkup().add(
+                InlineKeyboardButton("◀️ Назад", callback_data="calendar")
             )
-            return
-        
-        text = f"📋 <b>ВАШИ СОБЫТИЯ (ближайшая неделя)</b>\n\n"
-        
-        for event in events:
-            date_str = event.start_date.strftime("%d.%m.%Y")
-            time_str = event.start_date.strftime("%H:%M")
-            emoji = {
-                "repair": "🔧",
-                "delivery": "🚚",
-                "meeting": "👥",
-                "appointment": "📝",
-                "other": "📌"
-            }.get(event.event_type, "📌")
-            
-            text += f"{emoji} <b>{date_str} {time_str}</b>\n"
-            text += f"   {event.title}\n"
-            
-            if event.ticket_id:
-                text += f"   Заявка #{event.ticket_id}\n"
-            
-            text += "\n"
+        )
+        return
+    
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    week_later = today + timedelta(days=7)
+    
+    events = await event_service.get_master_events(master.id, today, week_later)
+    
+    if not events:
+        await callback.message.edit_text(
+            f"📋 <b>ВАШИ СОБЫТИЯ</b>\n\n"
+            f"У вас нет запланированных событий на ближайшую неделю.",
+            reply_markup=InlineKeyboardMarkup().add(
+                InlineKeyboardButton("◀️ Назад", callback_data="calendar")
+            ),
+            parse_mode="HTML"
+        )
+        return
+    
+    text = f"📋 <b>ВАШИ СОБЫТИЯ (ближайшая неделя)</b>\n\n"
+    
+    for event in events:
+        date_str = event.start_date.strftime("%d.%m.%Y")
+        time_str = event.start_date.strftime("%H:%M")
+        emoji = {
+            "repair": "🔧",
+            "delivery": "🚚",
+            "meeting": "👥",
+            "appointment": "📝",
+            "other": "📌"
+        }.get(event.event_type, "📌")
         
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="calendar"))
+        text += f"{emoji} <b>{date_str} {time_str}</b>\n"
+        text += f"   {event.title}\n"
         
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+        if event.ticket_id:
+            text += f"   Заявка #{event.ticket_id}\n"
         
-    finally:
-        db.close()
+        text += "\n"
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="calendar"))
+    
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 def register_calendar_handlers(dp: Dispatcher):
     """Регистрация обработчиков календаря"""
@@ -5,9 +5,7 @@ from aiogram.dispatcher.filters import Text, Command
 from aiogram.dispatcher import FSMContext
 from aiogram.types import ReplyKeyboardRemove, ReplyKeyboardMarkup, KeyboardButton
 
-from app.models.client import Client
-from app.models.ticket import Ticket, DeliveryMethod
-from app.database import SessionLocal
+from app.models.ticket import DeliveryMethod
 from app.bot.states.ticket import TicketState
 import app.bot.services.ticket_service as ticket_service
 
@@ -386,7 +384,7 @@ def register_client_handlers(dp: Dispatcher):
         data = await state.get_data()
         telegram_user = message.from_user
         
-        ticket_id = ticket_service.create_ticket(data, telegram_user)
+        ticket_id = await ticket_service.create_ticket(data, telegram_user)
         
         delivery_text = ""
         if data.get('delivery_method') == DeliveryMethod.DELIVERY.value:
@@ -442,14 +440,10 @@ def register_client_handlers(dp: Dispatcher):
     # ---------- MY TICKETS ----------
     @dp.message_handler(Text(equals="📋 Мои заявки"))
     async def show_my_tickets(message: types.Message):
-        db = SessionLocal()
-        
         try:
-            client = db.query(Client).filter(
-                Client.telegram_id == str(message.from_user.id)
-            ).first()
+            tickets = await ticket_service.get_client_tickets(message.from_user.id, limit=10)
             
-            if not client:
+            if tickets is None:
                 no_tickets_message = """
     📭 У вас еще нет заявок
     
@@ -464,10 +458,6 @@ def register_client_handlers(dp: Dispatcher):
                 await message.answer(no_tickets_message, reply_markup=client_main_keyboard())
                 return
             
-            tickets = db.query(Ticket).filter(
-                Ticket.client_id == client.id
-            ).order_by(Ticket.created_at.desc()).limit(10).all()
-            
             if not tickets:
                 await message.answer("У вас еще нет заявок\n\n"
                                    "Создайте первую заявку с помощью кнопки '📥 Создать заявку'")
@@ -524,28 +514,19 @@ def register_client_handlers(dp: Dispatcher):
             print(f"Ошибка при получении заявок: {e}")
             await message.answer("❌ Произошла ошибка при получении заявок", 
                                reply_markup=client_main_keyboard())
-        finally:
-            db.close()
         # ---------- STATUS CHECK ----------
     @dp.message_handler(Text(equals="⏳ Статус ремонта"))
     async def check_repair_status(message: types.Message):
-        db = SessionLocal()
-        
         try:
-            client = db.query(Client).filter(
-                Client.telegram_id == str(message.from_user.id)
-            ).first()
+            active_tickets = await ticket_service.get_client_tickets(
+                message.from_user.id, active_only=True
+            )
             
-            if not client:
+            if active_tickets is None:
                 await message.answer("У вас нет активных заявок", 
                                    reply_markup=client_main_keyboard())
                 return
             
-            active_tickets = db.query(Ticket).filter(
-                Ticket.client_id == client.id,
-                Ticket.status != "✅ Готово"
-            ).order_by(Ticket.created_at.desc()).all()
-            
             if not active_tickets:
                 status_message = """
 ✅ Все заявки завершены
@@ -575,8 +556,9 @@ def register_client_handlers(dp: Dispatcher):
                 if ticket.master:
                     text += f"👷 Мастер: {ticket.master.name}\n"
                 
-                if ticket.estimated_completion:
-                    text += f"⏰ Примерное время: {ticket.estimated_completion}\n"
+                estimated_completion = getattr(ticket, "estimated_completion", None)
+                if estimated_completion:
+                    text += f"⏰ Примерное время: {estimated_completion}\n"
                 else:
                     if ticket.status == "Новая":
                         text += "⏰ Мастер назначится в течение часа\n"
@@ -600,8 +582,6 @@ Email: support@techrepair.tj
         except Exception as e:
             print(f"Ошибка при проверке статуса: {e}")
             await message.answer("❌ Произошла ошибка", reply_markup=client_main_keyboard())
-        finally:
-            db.close()
     
     # ---------- ABOUT US ----------
     @dp.message_handler(Text(equals="ℹ️ О нас"))
@@ -13,8 +13,7 @@ from aiogram.types import (
 from app.bot.data.masters import MASTERS
 from app.bot.data.categories import CATEGORIES
 from app.bot.data.brands import BRANDS
-from app.models.master import Master
-from app.database import SessionLocal
+from app.bot.services import master_service
 from app.bot.data.masters import MASTERS
 
 STATUS_FLOW = [
@@ -89,73 +88,9 @@ branch_kb = build_keyboard(["🏢 Душанбе", "🏢 Худжанд"])
 urgency_kb = build_keyboard(["⏳ Обычная", "🔥 Срочно"])
 
 # Вспомогательные функции
-def get_or_create_master(master_info):
+async def get_or_create_master(master_info):
     """Найти или создать мастера в базе"""
-    db = SessionLocal()
-    
-    try:
-        # Ищем мастера по telegram_id (теперь он есть в таблице)
-        telegram_id_str = str(master_info.get('telegram_id', ''))
-        
-        if telegram_id_str:
-            master = db.query(Master).filter(
-                Master.telegram_id == telegram_id_str
-            ).first()
-            
-            if master:
-                print(f"Найден мастер по telegram_id: id={master.id}, name={master.name}")
-                db.close()
-                return master
-        
-        # Если не нашли по telegram_id, ищем по имени
-        master = db.query(Master).filter(
-            Master.name == master_info['name']
-        ).first()
-        
-        if master:
-            # Обновляем telegram_id если его нет
-            if not master.telegram_id and telegram_id_str:
-                master.telegram_id = telegram_id_str
-                db.commit()
-                print(f"Обновлен telegram_id для мастера {master.id}")
-            
-            print(f"Найден мастер по имени: id={master.id}, name={master.name}")
-            db.close()
-            return master
-        
-        # Создаем нового мастера
-        print(f"Создаем нового мастера с данными: {master_info}")
-        
-        master = Master(
-            name=master_info['name'],
-            surname=master_info.get('surname', ''),
-            phone=str(master_info.get('phone', '')),  # Если есть phone в данных
-            telegram_id=telegram_id_str,  # Используем поле telegram_id
-            specialization=master_info.get('profession', ''),  # profession -> specialization
-            experience=master_info.get('experience', 0),
-            status='active',
-            rating=0.0,
-            skills=master_info.get('skills', ''),
-            active_orders=0,
-            completed_orders=0,
-            rating_count=0
-        )
-        
-        db.add(master)
-        db.commit()
-        db.refresh(master)
-        print(f"Создан новый мастер: id={master.id}, name={master.name}, telegram_id={master.telegram_id}")
-        
-        return master
-        
-    except Exception as e:
-        print(f"Ошибка при поиске/создании мастера: {e}")
-        import traceback
-        traceback.print_exc()
-        db.rollback()
-        return None
-    finally:
-        db.close()
+    return await master_service.get_or_create_master(master_info)
 
 def register_common_handlers(dp: Dispatcher):  # Добавьте аннотацию типа
     @dp.message_handler(commands=['start', 'help'])
@@ -3,13 +3,10 @@ from aiogram import types
 from aiogram.dispatcher import Dispatcher
 from aiogram.dispatcher.filters import Text
 
-from app.models.master import Master
-from app.models.ticket import Ticket
-from app.models.client import Client
-from app.database import SessionLocal
 from app.bot.data.masters import MASTERS
 from app.bot.config import ADMIN_IDS, MASTER_GROUP_ID
 import app.bot.services.ticket_service as ticket_service
+import app.bot.services.master_service as master_service
 import logging
 
 from .common import (
@@ -44,7 +41,7 @@ def register_master_handlers(dp: Dispatcher):
             logger.info(f"Назначение мастера. Ticket: {ticket_id}, Master Telegram ID: {master_telegram_id}")
 
             # Получаем заявку
-            ticket = ticket_service.get_ticket(ticket_id)
+            ticket = await ticket_service.get_ticket(ticket_id)
 
             if not ticket:
                 await callback.answer("❌ Заявка не найдена", show_alert=True)
@@ -69,7 +66,7 @@ def register_master_handlers(dp: Dispatcher):
                 return
 
             # Находим или создаем мастера
-            master = get_or_create_master(master_info)
+            master = await get_or_create_master(master_info)
             if not master:
                 await callback.answer("❌ Ошибка при создании мастера", show_alert=True)
                 return
@@ -77,7 +74,7 @@ def register_master_handlers(dp: Dispatcher):
             logger.info(f"Мастер создан/найден. ID: {master.id}, Telegram ID: {master.telegram_id}")
 
             # Назначаем мастера на заявку через ticket_service
-            success, message = ticket_service.assign_master_by_telegram(ticket_id, master_telegram_id)
+            success, message = await ticket_service.assign_master_by_telegram(ticket_id, master_telegram_id)
             if not success:
                 logger.error(f"Ошибка при назначении мастера на заявку: {message}")
                 await callback.answer(f"❌ {message}", show_alert=True)
@@ -138,7 +135,7 @@ def register_master_handlers(dp: Dispatcher):
             }
 
             # Получаем заявку
-            ticket = ticket_service.get_ticket(ticket_id)
+            ticket = await ticket_service.get_ticket(ticket_id)
 
             if not ticket:
                 await callback.answer("❌ Заявка не найдена", show_alert=True)
@@ -150,7 +147,7 @@ def register_master_handlers(dp: Dispatcher):
                 return
 
             # ПРОСТОЙ ВАРИАНТ - разрешаем любой статус без проверок
-            success = ticket_service.update_status(ticket_id, new_status)
+            success = await ticket_service.update_status(ticket_id, new_status)
             if not success:
                 await callback.answer("❌ Ошибка при обновлении статуса", show_alert=True)
                 return
@@ -215,33 +212,17 @@ def register_master_handlers(dp: Dispatcher):
             except:
                 pass
             
-            db = SessionLocal()
-            master = db.query(Master).get(master_id)
+            rated = await master_service.update_master_rating(master_id, rating)
             
-            if not master:
+            if not rated:
                 try:
                     await callback.answer("❌ Мастер не найден", show_alert=True)
                 except:
                     pass
-                db.close()
                 return
             
-            # Сохраняем старый рейтинг для отчета
-            old_rating = master.rating
-            old_count = master.rating_count
-            
-            # Рассчитываем новый рейтинг
-            if master.rating_count > 0:
-                master.rating = (
-                    (master.rating * master.rating_count + rating)
-                    / (master.rating_count + 1)
-                )
-            else:
-                master.rating = rating
-            
-            master.rating_count += 1
-            
-            db.commit()
+            # Старый рейтинг нужен для отчета
+            master, old_rating, old_count = rated
             
             # Уведомление мастеру о новом отзыве
             if master.telegram_id:
@@ -290,8 +271,6 @@ def register_master_handlers(dp: Dispatcher):
                 except Exception as e:
                     logger.error(f"Не удалось отправить уведомление админу {admin_id}: {e}")
             
-            db.close()
-            
             # Обновляем сообщение
             try:
                 await callback.message.edit_text(
@@ -314,22 +293,13 @@ def register_master_handlers(dp: Dispatcher):
     @dp.message_handler(commands=['mytickets'])
     async def show_my_tickets(message: types.Message):
         """Показать заявки мастера"""
-        db = SessionLocal()
         try:
-            # Находим мастера по Telegram ID
-            master = db.query(Master).filter(
-                Master.telegram_id == str(message.from_user.id)
-            ).first()
+            master, tickets = await ticket_service.get_master_tickets(message.from_user.id)
             
             if not master:
                 await message.answer("❌ Вы не зарегистрированы как мастер")
                 return
             
-            # Получаем заявки мастера
-            tickets = db.query(Ticket).filter(
-                Ticket.master_id == master.id
-            ).order_by(Ticket.created_at.desc()).all()
-            
             if not tickets:
                 await message.answer("📭 У вас нет назначенных заявок")
                 return
@@ -355,17 +325,12 @@ def register_master_handlers(dp: Dispatcher):
         except Exception as e:
             logger.error(f"Ошибка при получении заявок мастера: {e}")
             await message.answer("❌ Произошла ошибка при получении заявок")
-        finally:
-            db.close()
 
     @dp.message_handler(commands=['myrating'])
     async def show_my_rating(message: types.Message):
         """Показать рейтинг мастера"""
-        db = SessionLocal()
         try:
-            master = db.query(Master).filter(
-                Master.telegram_id == str(message.from_user.id)
-            ).first()
+            master = await master_service.get_master_by_telegram_id(message.from_user.id)
             
             if not master:
                 await message.answer("❌ Вы не зарегистрированы как мастер")
@@ -388,6 +353,4 @@ def register_master_handlers(dp: Dispatcher):
             
         except Exception as e:
             logger.error(f"Ошибка при получении рейтинга мастера: {e}")
-            await message.answer("❌ Произошла ошибка")
-        finally:
-            db.close()
\ No newline at end of file
+            await message.answer("❌ Произошла ошибка")
\ No newline at end of file
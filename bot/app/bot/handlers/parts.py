@@ -9,9 +9,7 @@ from aiogram.dispatcher.filters import Text, Command
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 import logging
 
-from app.database import SessionLocal
-from app.models.part import Part, PartCategory, PartSupplier
-from app.services import part_service
+from app.bot.services import part_service
 from app.bot.config import ADMIN_IDS
 
 logger = logging.getLogger(__name__)
@@ -115,7 +113,7 @@ async def parts_list_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    parts = part_service.get_all_parts()
+    parts = await part_service.get_all_parts()
     
     if not parts:
         keyboard = InlineKeyboardMarkup()
@@ -174,7 +172,7 @@ async def parts_low_stock_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    low_stock = part_service.get_low_stock_parts()
+    low_stock = await part_service.get_low_stock_parts()
     
     if not low_stock:
         keyboard = InlineKeyboardMarkup()
@@ -220,7 +218,7 @@ async def parts_stats_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    stats = part_service.get_part_statistics()
+    stats = await part_service.get_part_statistics()
     
     text = f"""
 📊 <b>СТАТИСТИКА СКЛАДА</b>
@@ -294,9 +292,7 @@ async def process_part_sku(message: types.Message, state: FSMContext):
         return
     
     # Проверяем уникальность SKU
-    db = SessionLocal()
-    existing = db.query(Part).filter(Part.sku == sku).first()
-    db.close()
+    existing = await part_service.get_part_by_sku(sku)
     
     if existing:
         await message.answer(
@@ -309,7 +305,7 @@ async def process_part_sku(message: types.Message, state: FSMContext):
     await state.update_data(sku=sku)
     
     # Получаем список категорий
-    categories = part_service.get_all_categories()
+    categories = await part_service.get_all_categories()
     
     if not categories:
         # Если категорий нет, предлагаем создать
@@ -348,7 +344,7 @@ async def part_category_callback(callback: types.CallbackQuery, state: FSMContex
     await state.update_data(category_id=category_id)
     
     # Получаем название категории
-    categories = part_service.get_all_categories()
+    categories = await part_service.get_all_categories()
     category_name = next((c['name'] for c in categories if c['id'] == category_id), "Неизвестно")
     
     await callback.message.edit_text(
@@ -461,10 +457,10 @@ async def process_part_min_stock(message: types.Message, state: FSMContext):
         }
         
         # Создаем запчасть через сервис
-        part = part_service.create_part(part_data)
+        part = await part_service.create_part(part_data)
         
         # Получаем все категории для отображения названия
-        categories = part_service.get_all_categories()
+        categories = await part_service.get_all_categories()
         
         # Получаем название категории
         category_name = "Неизвестно"
@@ -547,7 +543,7 @@ async def parts_categories_menu_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    categories = part_service.get_all_categories()
+    categories = await part_service.get_all_categories()
     
     text = "🏷️ <b>УПРАВЛЕНИЕ КАТЕГОРИЯМИ</b>\n\n"
     
@@ -613,7 +609,7 @@ async def process_category_description(message: types.Message, state: FSMContext
     
     try:
         # Проверяем, не существует ли уже такая категория
-        categories = part_service.get_all_categories()
+        categories = await part_service.get_all_categories()
         for cat in categories:
             if cat['name'].lower() == data["category_name"].lower():
                 await message.answer(
@@ -623,7 +619,7 @@ async def process_category_description(message: types.Message, state: FSMContext
                 await PartStates.waiting_category_name.set()
                 return
         
-        category = part_service.create_category({
+        category = await part_service.create_category({
             "name": data["category_name"],
             "description": description,
             "icon": "fas fa-box"
@@ -659,7 +655,7 @@ async def parts_category_delete_list_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    categories = part_service.get_all_categories()
+    categories = await part_service.get_all_categories()
     
     if not categories:
         keyboard = InlineKeyboardMarkup()
@@ -699,7 +695,7 @@ async def parts_category_delete_callback(callback: types.CallbackQuery):
     category_id = int(callback.data.split("_")[3])
     
     try:
-        success, message_text = part_service.delete_category(category_id)
+        success, message_text = await part_service.delete_category(category_id)
         
         if success:
             await callback.answer("✅ Категория удалена", show_alert=False)
@@ -743,7 +739,7 @@ async def parts_suppliers_menu_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    suppliers = part_service.get_all_suppliers()
+    suppliers = await part_service.get_all_suppliers()
     
     text = "🚚 <b>УПРАВЛЕНИЕ ПОСТАВЩИКАМИ</b>\n\n"
     
@@ -862,7 +858,7 @@ async def process_supplier_address(message: types.Message, state: FSMContext):
             "notes": None
         }
         
-        supplier = part_service.create_supplier(supplier_data)
+        supplier = await part_service.create_supplier(supplier_data)
         
         success_text = f"""✅ ПОСТАВЩИК УСПЕШНО ДОБАВЛЕН!
 
@@ -904,7 +900,7 @@ async def parts_supplier_delete_list_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    suppliers = part_service.get_all_suppliers()
+    suppliers = await part_service.get_all_suppliers()
     
     if not suppliers:
         keyboard = InlineKeyboardMarkup()
@@ -944,7 +940,7 @@ async def parts_supplier_delete_callback(callback: types.CallbackQuery):
     supplier_id = int(callback.data.split("_")[3])
     
     try:
-        success, message_text = part_service.delete_supplier(supplier_id)
+        success, message_text = await part_service.delete_supplier(supplier_id)
         
         if success:
             await callback.answer("✅ Поставщик удален", show_alert=False)
@@ -1005,15 +1001,7 @@ async def process_parts_search(message: types.Message, state: FSMContext):
         await message.answer("⚠️ Слишком короткий запрос. Введите минимум 2 символа:")
         return
     
-    parts = part_service.get_all_parts()
-    
-    # Фильтруем запчасти
-    found = []
-    for part in parts:
-        if (query in part['name'].lower() or 
-            query in part['sku'].lower() or 
-            (part['brand'] and query in part['brand'].lower())):
-            found.append(part)
+    found, total = await part_service.search_parts(query)
     
     if not found:
         keyboard = InlineKeyboardMarkup()
@@ -1027,9 +1015,9 @@ async def process_parts_search(message: types.Message, state: FSMContext):
         await state.finish()
         return
     
-    text = f"🔍 <b>РЕЗУЛЬТАТЫ ПОИСКА:</b> {len(found)}\n\n"
+    text = f"🔍 <b>РЕЗУЛЬТАТЫ ПОИСКА:</b> {total}\n\n"
     
-    for part in found[:5]:
+    for part in found:
         status_emoji = {
             "high": "✅",
             "medium": "⚡",
@@ -1040,8 +1028,8 @@ async def process_parts_search(message: types.Message, state: FSMContext):
         text += f"{status_emoji} <b>{part['name']}</b>\n"
         text += f"   📋 <code>{part['sku']}</code> - {part['stock']} шт.\n"
     
-    if len(found) > 5:
-        text += f"\n... и еще {len(found) - 5} запчастей\n"
+    if total > len(found):
+        text += f"\n... и еще {total - len(found)} запчастей\n"
     
     keyboard = InlineKeyboardMarkup()
     keyboard.add(InlineKeyboardButton("🔄 Новый поиск", callback_data="parts_search"))
@@ -1062,7 +1050,7 @@ async def parts_restock_menu_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    low_stock = part_service.get_low_stock_parts()
+    low_stock = await part_service.get_low_stock_parts()
     
     keyboard = InlineKeyboardMarkup(row_width=1)
     
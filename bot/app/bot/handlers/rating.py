@@ -1,19 +1,14 @@
 from aiogram import types
 from aiogram.dispatcher import Dispatcher
 from aiogram.dispatcher.filters import Text
-from app.models.master import Master
-from app.database import SessionLocal
+from app.bot.services import master_service
 
 def register_rating_handlers(dp: Dispatcher):
     @dp.message_handler(Text(equals="⭐ Рейтинги мастеров"))
     async def show_master_ratings_for_clients(message: types.Message):
         """Показать рейтинги мастеров для клиентов"""
-        db = SessionLocal()
-        
         try:
-            masters = db.query(Master).filter(
-                Master.rating_count > 0
-            ).order_by(Master.rating.desc()).limit(10).all()
+            masters = await master_service.get_rated_masters(limit=10)
             
             if not masters:
                 await message.answer("🏆 Пока нет оценок мастеров")
@@ -35,6 +30,4 @@ def register_rating_handlers(dp: Dispatcher):
                 
         except Exception as e:
             print(f"Ошибка при получении рейтингов: {e}")
-            await message.answer("❌ Произошла ошибка")
-        finally:
-            db.close()
\ No newline at end of file
+            await message.answer("❌ Произошла ошибка")
\ No newline at end of file
@@ -7,19 +7,91 @@ import logging
 from datetime import datetime, timedelta
 
 from app.bot.config import ADMIN_IDS
-from app.database import SessionLocal
+from app.db.engine import AsyncSessionLocal
+from app.core.timeseries import series_range, fill_series
+from app.core import rollups
 from app.models.ticket import Ticket
 from app.models.master import Master
 from app.models.client import Client
 from app.models.part import Part
-from sqlalchemy import func
+from app.services.part_service import low_stock_count
+from sqlalchemy import func, case
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
+ACTIVE_STATUSES = ["Новая", "🧪 Диагностика", "🔧 В ремонте", "В работе"]
+
 def is_admin(user_id):
     return user_id in ADMIN_IDS
 
+async def _read(fn):
+    """Выполнить fn(db) в асинхронной сессии бота (не блокирует event loop)"""
+    async with AsyncSessionLocal() as session:
+        return await session.run_sync(fn)
+
+# Запросы разделов: fn(db) -> данные для текста, без ORM-объектов
+
+def _overview_numbers(db):
+    # Основные показатели - из агрегатов заявок и счетчиков
+    by_status = rollups.status_counts(db)
+    today = datetime.now().date()
+    return {
+        "total_tickets": sum(by_status.values()),
+        "active_tickets": sum(by_status.get(status, 0) for status in ACTIVE_STATUSES),
+        "completed_tickets": by_status.get("✅ Готово", 0),
+        "tickets_today": rollups.created_on(db, today),
+        "total_masters": db.query(Master).count(),
+        "active_masters": db.query(Master).filter(Master.status == "active").count(),
+        "total_clients": db.query(Client).count(),
+        "new_clients_today": db.query(Client).filter(
+            Client.created_at >= datetime.combine(today, datetime.min.time())
+        ).count(),
+        "avg_rating": db.query(func.avg(Master.rating)).filter(
+            Master.rating_count > 0
+        ).scalar() or 0,
+        "low_stock_parts": low_stock_count(db),
+    }
+
+def _master_rows(db, only_rated: bool, limit: int):
+    query = db.query(
+        Master.name, Master.surname, Master.rating, Master.rating_count,
+        Master.completed_orders, Master.active_orders
+    )
+    if only_rated:
+        query = query.filter(Master.rating_count > 0)
+    else:
+        query = query.filter(Master.status == "active")
+    return query.order_by(Master.rating.desc()).limit(limit).all()
+
+def _parts_numbers(db):
+    totals = db.query(
+        func.count(Part.id),
+        func.coalesce(func.sum(Part.stock), 0),
+        func.coalesce(func.sum(Part.purchase_price * Part.stock), 0),
+        func.coalesce(func.sum(case((Part.stock == 0, 1), else_=0)), 0)
+    ).one()
+    return {
+        "total_parts": totals[0],
+        "total_stock": totals[1],
+        "total_value": totals[2],
+        "low_stock": low_stock_count(db),
+        "out_of_stock": totals[3],
+    }
+
+def _customers_numbers(db):
+    now = datetime.now()
+    return {
+        "total_clients": db.query(Client).count(),
+        "active_clients": db.query(Client).filter(
+            Client.tickets.any(Ticket.created_at >= now - timedelta(days=30))
+        ).count(),
+        "new_clients_week": db.query(Client).filter(
+            Client.created_at >= now - timedelta(days=7)
+        ).count(),
+        "total_tickets": sum(rollups.status_counts(db).values()),
+    }
+
 async def admin_stats_menu(callback: types.CallbackQuery):
     """Меню статистики для админа"""
     if not is_admin(callback.from_user.id):
@@ -60,39 +132,19 @@ async def stats_overview_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    db = SessionLocal()
-    try:
-        # Основные показатели
-        total_tickets = db.query(Ticket).count()
-        active_tickets = db.query(Ticket).filter(
-            Ticket.status.in_(["Новая", "🧪 Диагностика", "🔧 В ремонте", "В работе"])
-        ).count()
-        completed_tickets = db.query(Ticket).filter(Ticket.status == "✅ Готово").count()
-        
-        total_masters = db.query(Master).count()
-        active_masters = db.query(Master).filter(Master.status == "active").count()
-        
-        total_clients = db.query(Client).count()
-        new_clients_today = db.query(Client).filter(
-            func.date(Client.created_at) == datetime.now().date()
-        ).count()
-        
-        # Заявки сегодня
-        tickets_today = db.query(Ticket).filter(
-            func.date(Ticket.created_at) == datetime.now().date()
-        ).count()
-        
-        # Средний рейтинг
-        avg_rating = db.query(func.avg(Master.rating)).filter(
-            Master.rating_count > 0
-        ).scalar() or 0
-        
-        # Запчасти с низким запасом
-        low_stock_parts = db.query(Part).filter(
-            Part.stock < Part.min_stock
-        ).count()
-        
-        text = f"""
+    numbers = await _read(_overview_numbers)
+    total_tickets = numbers["total_tickets"]
+    active_tickets = numbers["active_tickets"]
+    completed_tickets = numbers["completed_tickets"]
+    tickets_today = numbers["tickets_today"]
+    total_clients = numbers["total_clients"]
+    new_clients_today = numbers["new_clients_today"]
+    total_masters = numbers["total_masters"]
+    active_masters = numbers["active_masters"]
+    avg_rating = numbers["avg_rating"]
+    low_stock_parts = numbers["low_stock_parts"]
+    
+    text = f"""
 📊 <b>ОБЩАЯ СТАТИСТИКА</b>
 ━━━━━━━━━━━━━━━━━━━━━
 
@@ -115,15 +167,12 @@ async def stats_overview_callback(callback: types.CallbackQuery):
 📦 <b>СКЛАД:</b>
 • Низкий запас: {low_stock_parts} позиций
 """
-        
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("🔄 Обновить", callback_data="stats_overview"))
-        keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
-        
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
-        
-    finally:
-        db.close()
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("🔄 Обновить", callback_data="stats_overview"))
+    keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
+    
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 async def stats_trends_callback(callback: types.CallbackQuery):
     """Статистика заявок по дням"""
@@ -133,37 +182,33 @@ async def stats_trends_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    db = SessionLocal()
-    try:
-        text = "📈 <b>ДИНАМИКА ЗАЯВОК (7 дней)</b>\n\n"
-        
-        for i in range(6, -1, -1):
-            date = datetime.now() - timedelta(days=i)
-            count = db.query(Ticket).filter(
-                func.date(Ticket.created_at) == date.date()
-            ).count()
-            
-            day_name = ["ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ", "ВС"][date.weekday()]
-            bar = "█" * min(count, 20)
-            text += f"{day_name}: {bar} {count}\n"
-        
-        # Среднее за неделю
-        week_total = db.query(Ticket).filter(
-            Ticket.created_at >= datetime.now() - timedelta(days=7)
-        ).count()
-        week_avg = week_total / 7 if week_total > 0 else 0
-        
-        text += f"\n📊 Всего за неделю: {week_total} заявок"
-        text += f"\n📊 Среднее в день: {week_avg:.1f} заявок"
-        
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("🔄 Обновить", callback_data="stats_trends"))
-        keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
-        
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
-        
-    finally:
-        db.close()
+    # Один GROUP BY по агрегату за 7 дней
+    start, end = series_range("day", 7)
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(
+            rollups.trend_query(session, "day", start, end)
+        )).all()
+    series = fill_series(rows, "day", start, end)
+    
+    text = "📈 <b>ДИНАМИКА ЗАЯВОК (7 дней)</b>\n\n"
+    
+    for day, count in series:
+        day_name = ["ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ", "ВС"][day.weekday()]
+        bar = "█" * min(count, 20)
+        text += f"{day_name}: {bar} {count}\n"
+    
+    # Среднее за неделю
+    week_total = sum(count for _, count in series)
+    week_avg = week_total / 7 if week_total > 0 else 0
+    
+    text += f"\n📊 Всего за неделю: {week_total} заявок"
+    text += f"\n📊 Среднее в день: {week_avg:.1f} заявок"
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("🔄 Обновить", callback_data="stats_trends"))
+    keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
+    
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 async def stats_masters_callback(callback: types.CallbackQuery):
     """Статистика по мастерам"""
@@ -173,32 +218,25 @@ async def stats_masters_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    db = SessionLocal()
-    try:
-        masters = db.query(Master).filter(
-            Master.status == "active"
-        ).order_by(Master.rating.desc()).limit(5).all()
-        
-        text = "👨‍🔧 <b>ТОП МАСТЕРОВ</b>\n\n"
-        
-        if not masters:
-            text += "Нет данных о мастерах"
-        else:
-            for i, master in enumerate(masters, 1):
-                rating_stars = "⭐" * int(master.rating or 0) if (master.rating or 0) > 0 else "Нет оценок"
-                text += f"{i}. <b>{master.name} {master.surname or ''}</b>\n"
-                text += f"   📊 Рейтинг: {master.rating or 0:.2f} {rating_stars}\n"
-                text += f"   ✅ Выполнено: {master.completed_orders or 0}\n"
-                text += f"   🔧 В работе: {master.active_orders or 0}\n\n"
-        
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("📊 Полный рейтинг", callback_data="stats_ratings"))
-        keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
-        
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
-        
-    finally:
-        db.close()
+    masters = await _read(lambda db: _master_rows(db, only_rated=False, limit=5))
+    
+    text = "👨‍🔧 <b>ТОП МАСТЕРОВ</b>\n\n"
+    
+    if not masters:
+        text += "Нет данных о мастерах"
+    else:
+        for i, master in enumerate(masters, 1):
+            rating_stars = "⭐" * int(master.rating or 0) if (master.rating or 0) > 0 else "Нет оценок"
+            text += f"{i}. <b>{master.name} {master.surname or ''}</b>\n"
+            text += f"   📊 Рейтинг: {master.rating or 0:.2f} {rating_stars}\n"
+            text += f"   ✅ Выполнено: {master.completed_orders or 0}\n"
+            text += f"   🔧 В работе: {master.active_orders or 0}\n\n"
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("📊 Полный рейтинг", callback_data="stats_ratings"))
+    keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
+    
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 async def stats_ratings_callback(callback: types.CallbackQuery):
     """Рейтинг мастеров"""
@@ -208,30 +246,23 @@ async def stats_ratings_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    db = SessionLocal()
-    try:
-        masters = db.query(Master).filter(
-            Master.rating_count > 0
-        ).order_by(Master.rating.desc()).all()
-        
-        if not masters:
-            text = "⭐ <b>РЕЙТИНГ МАСТЕРОВ</b>\n\nНет оценок"
-        else:
-            text = "⭐ <b>РЕЙТИНГ МАСТЕРОВ</b>\n\n"
-            
-            for i, master in enumerate(masters[:10], 1):
-                stars = "⭐" * int(master.rating or 0) + "½" * (int((master.rating or 0) % 1 >= 0.5))
-                text += f"{i}. <b>{master.name} {master.surname or ''}</b>\n"
-                text += f"   {stars} {master.rating:.2f}\n"
-                text += f"   📊 Оценок: {master.rating_count}\n\n"
-        
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
-        
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
-        
-    finally:
-        db.close()
+    masters = await _read(lambda db: _master_rows(db, only_rated=True, limit=10))
+    
+    if not masters:
+        text = "⭐ <b>РЕЙТИНГ МАСТЕРОВ</b>\n\nНет оценок"
+    else:
+        text = "⭐ <b>РЕЙТИНГ МАСТЕРОВ</b>\n\n"
+        
+        for i, master in enumerate(masters, 1):
+            stars = "⭐" * int(master.rating or 0) + "½" * (int((master.rating or 0) % 1 >= 0.5))
+            text += f"{i}. <b>{master.name} {master.surname or ''}</b>\n"
+            text += f"   {stars} {master.rating:.2f}\n"
+            text += f"   📊 Оценок: {master.rating_count}\n\n"
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
+    
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 async def stats_parts_callback(callback: types.CallbackQuery):
     """Статистика по запчастям"""
@@ -241,35 +272,26 @@ async def stats_parts_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    db = SessionLocal()
-    try:
-        total_parts = db.query(Part).count()
-        total_stock = db.query(func.sum(Part.stock)).scalar() or 0
-        total_value = db.query(func.sum(Part.purchase_price * Part.stock)).scalar() or 0
-        low_stock = db.query(Part).filter(Part.stock < Part.min_stock).count()
-        out_of_stock = db.query(Part).filter(Part.stock == 0).count()
-        
-        text = f"""
+    numbers = await _read(_parts_numbers)
+    
+    text = f"""
 📦 <b>СТАТИСТИКА СКЛАДА</b>
 
 📊 <b>ОБЩАЯ ИНФОРМАЦИЯ:</b>
-• Всего наименований: {total_parts}
-• Общий остаток: {total_stock} шт.
-• Стоимость склада: {total_value:,.0f} сомони
+• Всего наименований: {numbers["total_parts"]}
+• Общий остаток: {numbers["total_stock"]} шт.
+• Стоимость склада: {numbers["total_value"]:,.0f} сомони
 
 ⚠️ <b>ПРОБЛЕМНЫЕ ПОЗИЦИИ:</b>
-• Низкий запас: {low_stock}
-• Нет в наличии: {out_of_stock}
+• Низкий запас: {numbers["low_stock"]}
+• Нет в наличии: {numbers["out_of_stock"]}
 """
-        
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("🔄 Обновить", callback_data="stats_parts"))
-        keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
-        
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
-        
-    finally:
-        db.close()
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("🔄 Обновить", callback_data="stats_parts"))
+    keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
+    
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 async def stats_customers_callback(callback: types.CallbackQuery):
     """Статистика по клиентам"""
@@ -279,36 +301,26 @@ async def stats_customers_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    db = SessionLocal()
-    try:
-        total_clients = db.query(Client).count()
-        active_clients = db.query(Client).filter(
-            Client.tickets.any(Ticket.created_at >= datetime.now() - timedelta(days=30))
-        ).count()
-        new_clients_week = db.query(Client).filter(
-            Client.created_at >= datetime.now() - timedelta(days=7)
-        ).count()
-        
-        text = f"""
+    numbers = await _read(_customers_numbers)
+    total_clients = numbers["total_clients"]
+    
+    text = f"""
 👥 <b>СТАТИСТИКА КЛИЕНТОВ</b>
 
 📊 <b>ОБЩАЯ ИНФОРМАЦИЯ:</b>
 • Всего клиентов: {total_clients}
-• Активных (30 дней): {active_clients}
-• Новых за неделю: {new_clients_week}
+• Активных (30 дней): {numbers["active_clients"]}
+• Новых за неделю: {numbers["new_clients_week"]}
 
 📈 <b>АКТИВНОСТЬ:</b>
-• Среднее заявок на клиента: {db.query(Ticket).count() / total_clients if total_clients > 0 else 0:.1f}
+• Среднее заявок на клиента: {numbers["total_tickets"] / total_clients if total_clients > 0 else 0:.1f}
 """
-        
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("🔄 Обновить", callback_data="stats_customers"))
-        keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
-        
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
-        
-    finally:
-        db.close()
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("🔄 Обновить", callback_data="stats_customers"))
+    keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
+    
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 async def stats_finance_callback(callback: types.CallbackQuery):
     """Финансовая статистика"""
@@ -318,10 +330,8 @@ async def stats_finance_callback(callback: types.CallbackQuery):
     
     await callback.answer()
     
-    db = SessionLocal()
-    try:
-        # Заглушка, так как нет данных о ценах
-        text = f"""
+    # Заглушка, так как нет данных о ценах
+    text = f"""
 💰 <b>ФИНАНСОВАЯ СТАТИСТИКА</b>
 
 ⚠️ <b>В разработке</b>
@@ -336,14 +346,11 @@ async def stats_finance_callback(callback: types.CallbackQuery):
 📊 Для корректного отображения финансов
    необходимо добавить данные о ценах в заявки.
 """
-        
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
-        
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
-        
-    finally:
-        db.close()
+    
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("◀️ Назад", callback_data="admin_stats_menu"))
+    
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
 def register_statistics_handlers(dp: Dispatcher):
     """Регистрация обработчиков статистики"""
@@ -86,7 +86,7 @@ def register_walkin_handlers(dp: Dispatcher):
         data = await state.get_data()
         
         # Создаем walk-in заявку
-        ticket_id = create_walkin_ticket(
+        ticket_id = await create_walkin_ticket(
             client_name=data.get('walkin_name'),
             client_phone=data.get('walkin_phone'),
             branch=data.get('branch'),
@@ -4,9 +4,10 @@ import sys
 import logging
 import asyncio
 from aiogram import Bot, Dispatcher, types
-from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from aiogram.utils import executor
 
+from app.bot.storage import make_storage
+
 # Для Windows специфичных проблем с asyncio
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -45,7 +46,8 @@ except Exception as e:
 
 # Создаем хранилище и диспетчер
 try:
-    storage = MemoryStorage()
+    # Состояния диалогов переживают перезапуск (FSM_STORAGE_URL)
+    storage = make_storage()
     dp = Dispatcher(bot, storage=storage)
     logger.info("✅ Диспетчер создан")
 except Exception as e:
@@ -85,10 +87,26 @@ async def on_startup(_):
     except Exception as e:
         logger.warning(f"⚠️ Не удалось получить информацию о боте: {e}")
 
+    # Уведомления об изменениях из веб-админки (шина доменных событий)
+    try:
+        from app.bot.subscribers import register_subscribers
+        register_subscribers(bot)
+    except Exception as e:
+        logger.error(f"❌ Ошибка при подписке на события: {e}")
+
+    # События из воркеров веб-админки в отдельных процессах (backplane)
+    try:
+        from app.core.fanout import start_fanout
+        await start_fanout()
+    except Exception as e:
+        logger.error(f"❌ Ошибка при запуске backplane: {e}")
+
 async def on_shutdown(_):
     """Действия при остановке бота"""
     logger.info("🛑 Бот останавливается...")
     try:
+        from app.core.fanout import stop_fanout
+        await stop_fanout()
         await dp.storage.close()
         await dp.storage.wait_closed()
         await bot.close()
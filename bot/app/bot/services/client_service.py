@@ -1,25 +1,15 @@
-from app.models.client import Client
+# app/bot/services/client_service.py
+from app.db.engine import AsyncSessionLocal, session_scope
+from app.repositories import client_repo
 
 
+async def get_client(telegram_id):
+    """Найти клиента по Telegram ID"""
+    async with AsyncSessionLocal() as session:
+        return await client_repo.get_by_telegram_id(session, telegram_id)
 
-def get_or_create_client(db, telegram_user):
 
-    client = db.query(Client).filter(
-        Client.telegram_id == telegram_user.id
-    ).first()
-
-    if client:
-        return client
-
-    client = Client(
-        telegram_id=telegram_user.id,
-        username=telegram_user.username,
-        first_name=telegram_user.first_name,
-        last_name=telegram_user.last_name
-    )
-
-    db.add(client)
-    db.commit()
-    db.refresh(client)
-
-    return client
\ No newline at end of file
+async def get_or_create_client(telegram_user):
+    """Найти клиента или зарегистрировать нового"""
+    async with session_scope() as session:
+        return await client_repo.get_or_create(session, telegram_user)
@@ -0,0 +1,112 @@
+# app/bot/services/event_service.py
+"""
+Асинхронный сервис событий календаря для Telegram бота
+"""
+from app.db.engine import AsyncSessionLocal, session_scope
+from app.repositories import event_repo, ticket_repo
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def create_event(data: dict):
+    """Создать новое событие"""
+    try:
+        async with session_scope() as session:
+            return await event_repo.add_event(
+                session,
+                title=data.get("title"),
+                event_type=data.get("event_type"),
+                color=data.get("color", "primary"),
+                start_date=data.get("start_date"),
+                end_date=data.get("end_date"),
+                is_all_day=data.get("is_all_day", False),
+                master_id=data.get("master_id"),
+                client_id=data.get("client_id"),
+                ticket_id=data.get("ticket_id"),
+                description=data.get("description"),
+                location=data.get("location"),
+                reminder_minutes=data.get("reminder_minutes", 30),
+                created_by=data.get("created_by")
+            )
+    except Exception as e:
+        logger.error(f"Error creating event: {e}")
+        raise
+
+async def get_events(start_date: datetime = None, end_date: datetime = None):
+    """Получить события за период"""
+    async with AsyncSessionLocal() as session:
+        return await event_repo.get_events(session, start_date, end_date)
+
+async def get_event(event_id: int):
+    """Получить событие по ID"""
+    async with AsyncSessionLocal() as session:
+        return await event_repo.get_event(session, event_id)
+
+async def update_event(event_id: int, data: dict):
+    """Обновить событие"""
+    try:
+        async with session_scope() as session:
+            event = await event_repo.get_event(session, event_id)
+            if not event:
+                return None
+
+            for key, value in data.items():
+                if hasattr(event, key):
+                    setattr(event, key, value)
+            return event
+    except Exception as e:
+        logger.error(f"Error updating event {event_id}: {e}")
+        raise
+
+async def delete_event(event_id: int):
+    """Удалить событие"""
+    try:
+        async with session_scope() as session:
+            event = await event_repo.get_event(session, event_id)
+            if not event:
+                return False
+            await session.delete(event)
+            return True
+    except Exception as e:
+        logger.error(f"Error deleting event {event_id}: {e}")
+        raise
+
+async def get_master_events(master_id: int, start_date: datetime = None, end_date: datetime = None):
+    """Получить события конкретного мастера"""
+    async with AsyncSessionLocal() as session:
+        return await event_repo.get_events(session, start_date, end_date, master_id=master_id)
+
+async def get_events_for_notification():
+    """Получить события, по которым нужно отправить уведомления"""
+    now = datetime.now()
+    async with AsyncSessionLocal() as session:
+        return await event_repo.get_events_for_notification(
+            session, now, now + timedelta(minutes=30)
+        )
+
+async def create_event_from_ticket(ticket_id: int, master_id: int = None):
+    """Автоматически создать событие на основе заявки"""
+    try:
+        async with session_scope() as session:
+            ticket = await ticket_repo.get_ticket(session, ticket_id, with_people=False)
+            if not ticket:
+                return None
+
+            return await event_repo.add_event(
+                session,
+                title=f"Ремонт {ticket.brand} - #{ticket.id}",
+                event_type="repair",
+                color="primary",
+                start_date=ticket.created_at + timedelta(hours=1),
+                end_date=ticket.created_at + timedelta(hours=3),
+                master_id=master_id,
+                client_id=ticket.client_id,
+                ticket_id=ticket.id,
+                description=ticket.problem,
+                location=f"Филиал: {ticket.branch}",
+                reminder_minutes=30
+            )
+    except Exception as e:
+        logger.error(f"Error creating event from ticket: {e}")
+        return None
@@ -1,208 +1,184 @@
-# app/services/master_service.py
-from app.models.master import Master
-from app.database import SessionLocal
+# app/bot/services/master_service.py
+"""
+Асинхронный сервис мастеров для Telegram бота
+"""
+from app.db.engine import AsyncSessionLocal, session_scope
+from app.repositories import master_repo
 import logging
 
 logger = logging.getLogger(__name__)
 
-def create_master(db: SessionLocal, master_data: dict):
+MASTER_FIELDS = (
+    'name', 'surname', 'phone', 'telegram_id', 'specialization', 'experience',
+    'skills', 'rating', 'rating_count', 'status', 'completed_orders',
+    'active_orders', 'notes'
+)
+
+async def create_master(master_data: dict):
     """Создание нового мастера"""
     try:
-        # Проверяем существование мастера по Telegram ID
-        if master_data.get('telegram_id'):
-            existing = db.query(Master).filter(
-                Master.telegram_id == str(master_data['telegram_id'])
-            ).first()
-            if existing:
-                return existing
-        
-        # Создаем мастера со всеми полями, включая skills
-        master = Master(
-            name=master_data.get('name', ''),
-            surname=master_data.get('surname', ''),
-            phone=master_data.get('phone', ''),
-            telegram_id=str(master_data.get('telegram_id')) if master_data.get('telegram_id') else None,
-            specialization=master_data.get('specialization', ''),
-            experience=master_data.get('experience', 0),
-            skills=master_data.get('skills', ''),  # ДОБАВЛЯЕМ ПОЛЕ SKILLS
-            rating=master_data.get('rating', 0.0),
-            rating_count=master_data.get('rating_count', 0),
-            status=master_data.get('status', 'active'),
-            completed_orders=master_data.get('completed_orders', 0),
-            active_orders=master_data.get('active_orders', 0),
-            notes=master_data.get('notes', '')  # ДОБАВЛЯЕМ ПОЛЕ NOTES
-        )
-        
-        db.add(master)
-        db.commit()
-        db.refresh(master)
-        
+        async with session_scope() as session:
+            # Проверяем существование мастера по Telegram ID
+            if master_data.get('telegram_id'):
+                existing = await master_repo.get_by_telegram_id(session, master_data['telegram_id'])
+                if existing:
+                    return existing
+
+            master = await master_repo.add_master(
+                session,
+                name=master_data.get('name', ''),
+                surname=master_data.get('surname', ''),
+                phone=master_data.get('phone', ''),
+                telegram_id=str(master_data.get('telegram_id')) if master_data.get('telegram_id') else None,
+                specialization=master_data.get('specialization', ''),
+                experience=master_data.get('experience', 0),
+                skills=master_data.get('skills', ''),
+                rating=master_data.get('rating', 0.0),
+                rating_count=master_data.get('rating_count', 0),
+                status=master_data.get('status', 'active'),
+                completed_orders=master_data.get('completed_orders', 0),
+                active_orders=master_data.get('active_orders', 0),
+                notes=master_data.get('notes', '')
+            )
+
         logger.info(f"✅ Создан новый мастер: {master.name} {master.surname or ''} (ID: {master.id})")
-        logger.info(f"   📋 Навыки: {master.skills or 'не указаны'}")
         return master
-        
+
     except Exception as e:
-        db.rollback()
         logger.error(f"❌ Ошибка при создании мастера: {e}")
         raise
 
-def get_all_masters(db: SessionLocal = None):
+async def get_all_masters(order_by_rating: bool = False):
     """Получение всех мастеров"""
-    if db is None:
-        db = SessionLocal()
-        close_db = True
-    else:
-        close_db = False
-    
     try:
-        masters = db.query(Master).all()
-        return masters
+        async with AsyncSessionLocal() as session:
+            return await master_repo.get_all_masters(session, order_by_rating=order_by_rating)
     except Exception as e:
         logger.error(f"❌ Ошибка при получении списка мастеров: {e}")
         return []
-    finally:
-        if close_db:
-            db.close()
 
-def get_master_by_telegram_id(db: SessionLocal, telegram_id: str):
+async def get_rated_masters(limit: int = None):
+    """Мастера с оценками, лучшие сверху"""
+    try:
+        async with AsyncSessionLocal() as session:
+            return await master_repo.get_rated_masters(session, limit=limit)
+    except Exception as e:
+        logger.error(f"❌ Ошибка при получении рейтинга мастеров: {e}")
+        return []
+
+async def get_master_by_telegram_id(telegram_id):
     """Получение мастера по Telegram ID"""
     try:
-        master = db.query(Master).filter(
-            Master.telegram_id == str(telegram_id)
-        ).first()
-        return master
+        async with AsyncSessionLocal() as session:
+            return await master_repo.get_by_telegram_id(session, telegram_id)
     except Exception as e:
         logger.error(f"❌ Ошибка при получении мастера по Telegram ID {telegram_id}: {e}")
         return None
 
-def update_master(db: SessionLocal, master_id: int, master_data: dict):
+async def update_master(master_id: int, master_data: dict):
     """Обновление данных мастера"""
     try:
-        master = db.query(Master).filter(Master.id == master_id).first()
-        if not master:
-            return None
-        
-        # Обновляем существующие поля
-        if 'name' in master_data:
-            master.name = master_data['name']
-        if 'surname' in master_data:
-            master.surname = master_data['surname']
-        if 'phone' in master_data:
-            master.phone = master_data['phone']
-        if 'telegram_id' in master_data:
-            master.telegram_id = str(master_data['telegram_id'])
-        if 'specialization' in master_data:
-            master.specialization = master_data['specialization']
-        if 'experience' in master_data:
-            master.experience = master_data['experience']
-        if 'skills' in master_data:  # ДОБАВЛЯЕМ ОБНОВЛЕНИЕ НАВЫКОВ
-            master.skills = master_data['skills']
-        if 'rating' in master_data:
-            master.rating = master_data['rating']
-        if 'rating_count' in master_data:
-            master.rating_count = master_data['rating_count']
-        if 'status' in master_data:
-            master.status = master_data['status']
-        if 'completed_orders' in master_data:
-            master.completed_orders = master_data['completed_orders']
-        if 'active_orders' in master_data:
-            master.active_orders = master_data['active_orders']
-        if 'notes' in master_data:  # ДОБАВЛЯЕМ ОБНОВЛЕНИЕ ЗАМЕТОК
-            master.notes = master_data['notes']
-        
-        db.commit()
-        db.refresh(master)
+        async with session_scope() as session:
+            master = await master_repo.get_master(session, master_id)
+            if not master:
+                return None
+
+            for field in MASTER_FIELDS:
+                if field in master_data:
+                    value = master_data[field]
+                    if field == 'telegram_id':
+                        value = str(value)
+                    setattr(master, field, value)
+
         logger.info(f"✅ Обновлен мастер ID: {master_id}")
-        if master.skills:
-            logger.info(f"   📋 Навыки: {master.skills}")
         return master
-        
+
     except Exception as e:
-        db.rollback()
         logger.error(f"❌ Ошибка при обновлении мастера {master_id}: {e}")
         raise
 
-def delete_master(db: SessionLocal, master_id: int):
+async def delete_master(master_id: int):
     """Удаление мастера"""
     try:
-        master = db.query(Master).filter(Master.id == master_id).first()
-        if master:
-            db.delete(master)
-            db.commit()
-            logger.info(f"✅ Удален мастер ID: {master_id}")
-            return True
-        return False
+        async with session_scope() as session:
+            master = await master_repo.get_master(session, master_id)
+            if not master:
+                return False
+            await session.delete(master)
+
+        logger.info(f"✅ Удален мастер ID: {master_id}")
+        return True
     except Exception as e:
-        db.rollback()
         logger.error(f"❌ Ошибка при удалении мастера {master_id}: {e}")
         raise
 
-def update_master_rating(db: SessionLocal, master_id: int, new_rating: int):
-    """Обновление рейтинга мастера"""
+async def update_master_rating(master_id: int, new_rating: int):
+    """Обновление рейтинга мастера
+
+    Возвращает (master, old_rating, old_count) или None, если мастер не найден.
+    """
     try:
-        master = db.query(Master).filter(Master.id == master_id).first()
-        if not master:
-            return None
-        
-        # Рассчитываем новый рейтинг
-        if master.rating_count > 0:
-            master.rating = (
-                (master.rating * master.rating_count + new_rating) 
-                / (master.rating_count + 1)
-            )
-        else:
-            master.rating = new_rating
-        
-        master.rating_count += 1
-        db.commit()
-        db.refresh(master)
-        
+        async with session_scope() as session:
+            master = await master_repo.get_master(session, master_id)
+            if not master:
+                return None
+
+            old_rating = master.rating or 0
+            old_count = master.rating_count or 0
+
+            # Рассчитываем новый рейтинг
+            if old_count > 0:
+                master.rating = (old_rating * old_count + new_rating) / (old_count + 1)
+            else:
+                master.rating = new_rating
+
+            master.rating_count = old_count + 1
+
         logger.info(f"⭐ Обновлен рейтинг мастера {master_id}: {master.rating:.2f} ({master.rating_count} оценок)")
-        return master
-        
+        return master, old_rating, old_count
+
     except Exception as e:
-        db.rollback()
         logger.error(f"❌ Ошибка при обновлении рейтинга мастера {master_id}: {e}")
         raise
 
-def get_master_with_skills(db: SessionLocal, master_id: int):
-    """Получение мастера с навыками в виде массива"""
+async def get_or_create_master(master_info: dict):
+    """Найти или создать мастера в базе по данным из MASTERS"""
     try:
-        master = db.query(Master).filter(Master.id == master_id).first()
-        if not master:
-            return None
-        
-        # Преобразуем строку навыков в массив
-        skills_list = []
-        if master.skills:
-            skills_list = [s.strip() for s in master.skills.split(',') if s.strip()]
-        
-        # Создаем словарь с данными
-        master_data = {
-            "id": master.id,
-            "name": master.name,
-            "surname": master.surname,
-            "full_name": f"{master.name} {master.surname or ''}".strip(),
-            "phone": master.phone,
-            "telegram_id": master.telegram_id,
-            "specialization": master.specialization,
-            "experience": master.experience,
-            "skills_string": master.skills,  # Исходная строка
-            "skills": skills_list,  # Массив навыков
-            "rating": master.rating,
-            "rating_count": master.rating_count,
-            "status": master.status,
-            "completed_orders": master.completed_orders,
-            "active_orders": master.active_orders,
-            "notes": master.notes,
-            "created_at": master.created_at,
-            "updated_at": master.updated_at
-        }
-        
-        return master_data
-        
+        async with session_scope() as session:
+            telegram_id_str = str(master_info.get('telegram_id', ''))
+
+            if telegram_id_str:
+                master = await master_repo.get_by_telegram_id(session, telegram_id_str)
+                if master:
+                    return master
+
+            # Если не нашли по telegram_id, ищем по имени
+            master = await master_repo.get_by_name(session, master_info['name'])
+            if master:
+                # Обновляем telegram_id если его нет
+                if not master.telegram_id and telegram_id_str:
+                    master.telegram_id = telegram_id_str
+                    logger.info(f"Обновлен telegram_id для мастера {master.id}")
+                return master
+
+            master = await master_repo.add_master(
+                session,
+                name=master_info['name'],
+                surname=master_info.get('surname', ''),
+                phone=str(master_info.get('phone', '')),
+                telegram_id=telegram_id_str,
+                specialization=master_info.get('profession', ''),
+                experience=master_info.get('experience', 0),
+                status='active',
+                rating=0.0,
+                skills=master_info.get('skills', ''),
+                active_orders=0,
+                completed_orders=0,
+                rating_count=0
+            )
+            logger.info(f"Создан новый мастер: id={master.id}, name={master.name}, telegram_id={master.telegram_id}")
+            return master
+
     except Exception as e:
-        logger.error(f"❌ Ошибка при получении мастера {master_id}: {e}")
+        logger.error(f"Ошибка при поиске/создании мастера: {e}", exc_info=True)
         return None
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,309 +1,289 @@
 # app/bot/services/ticket_service.py
-from app.database import SessionLocal
+"""
+Асинхронный сервис заявок для Telegram бота
+
+Все функции - корутины поверх AsyncSessionLocal, поэтому медленный
+запрос к MySQL не останавливает обработку остальных апдейтов.
+"""
+from app.db.engine import AsyncSessionLocal, session_scope
 from app.models.ticket import Ticket, DeliveryMethod
-from app.models.master import Master
-from app.services.client_service import get_or_create_client
-from app.bot.loader import bot
-from sqlalchemy.orm import joinedload
+from app.repositories import ticket_repo, client_repo, master_repo
+from app.core import rollups, ticket_query
+from app.core.ticket_query import TicketQuery
 import json
 from datetime import datetime
 
 GROUP_ID = -1003664975361
 
-def create_ticket(data, telegram_user=None):
+async def create_ticket(data, telegram_user=None):
     """Создание заявки для всех 3 способов"""
-    db = SessionLocal()
     try:
-        # Для клиентов из Telegram
-        if telegram_user:
-            client = get_or_create_client(db, telegram_user)
-            client_id = client.id
-            walkin_name = None
-            walkin_phone = None
-        else:
-            # Для клиентов без Telegram (walk-in)
-            client_id = None
-            walkin_name = data.get("walkin_name")
-            walkin_phone = data.get("walkin_phone")
-        
-        # Создаем заявку
-        ticket = Ticket(
-            client_id=client_id,
-            delivery_method=DeliveryMethod(data.get("delivery_method", DeliveryMethod.PICKUP.value)),
-            
-            # Поля для доставки
-            delivery_address=data.get("delivery_address"),
-            delivery_phone=data.get("delivery_phone"),
-            delivery_date=data.get("delivery_date"),
-            delivery_notes=data.get("delivery_notes"),
-            
-            # Поля для walk-in клиентов
-            walkin_name=walkin_name,
-            walkin_phone=walkin_phone,
-            
-            # Общие поля
-            branch=data.get("branch"),
-            category=data.get("category"),
-            subcategory=data.get("subcategory"),
-            brand=data.get("brand"),
-            problem=data.get("problem"),
-            urgency=data.get("urgency"),
-            status="Новая",
-            photos=json.dumps(data.get("photos", [])),
-            created_at=datetime.now()
-        )
-        
-        db.add(ticket)
-        db.commit()
-        db.refresh(ticket)
-        
-        return ticket.id
-        
+        async with session_scope() as session:
+            # Для клиентов из Telegram
+            if telegram_user:
+                client = await client_repo.get_or_create(session, telegram_user)
+                client_id = client.id
+                walkin_name = None
+                walkin_phone = None
+            else:
+                # Для клиентов без Telegram (walk-in)
+                client_id = None
+                walkin_name = data.get("walkin_name")
+                walkin_phone = data.get("walkin_phone")
+
+            ticket = await ticket_repo.add_ticket(
+                session,
+                client_id=client_id,
+                delivery_method=DeliveryMethod(data.get("delivery_method", DeliveryMethod.PICKUP.value)),
+
+                # Поля для доставки
+                delivery_address=data.get("delivery_address"),
+                delivery_phone=data.get("delivery_phone"),
+                delivery_date=data.get("delivery_date"),
+                delivery_notes=data.get("delivery_notes"),
+
+                # Поля для walk-in клиентов
+                walkin_name=walkin_name,
+                walkin_phone=walkin_phone,
+
+                # Общие поля
+                branch=data.get("branch"),
+                category=data.get("category"),
+                subcategory=data.get("subcategory"),
+                brand=data.get("brand"),
+                problem=data.get("problem"),
+                urgency=data.get("urgency"),
+                status="Новая",
+                photos=json.dumps(data.get("photos", [])),
+                created_at=datetime.now()
+            )
+
+            return ticket.id
+
     except Exception as e:
-        db.rollback()
         print(f"Error creating ticket: {e}")
         raise
-    finally:
-        db.close()
 
-def get_ticket(ticket_id: int):
-    """Получить заявку по ID"""
-    db = SessionLocal()
+async def get_ticket(ticket_id: int):
+    """Получить заявку по ID (с клиентом и мастером)"""
     try:
-        ticket = db.query(Ticket).options(
-            joinedload(Ticket.client),
-            joinedload(Ticket.master)
-        ).filter(Ticket.id == ticket_id).first()
-        return ticket
+        async with AsyncSessionLocal() as session:
+            return await ticket_repo.get_ticket(session, ticket_id)
     except Exception as e:
         print(f"Error getting ticket {ticket_id}: {e}")
         return None
-    finally:
-        db.close()
 
-def update_ticket_status(ticket_id: int, new_status: str):
+async def update_ticket_status(ticket_id: int, new_status: str):
     """Обновить статус заявки"""
-    db = SessionLocal()
-    try:
-        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-        if ticket:
-            ticket.status = new_status
-            if new_status == "✅ Готово":
-                ticket.completed_at = datetime.now()
-            db.commit()
-            return True
-        return False
-    except Exception as e:
-        db.rollback()
-        print(f"Error updating ticket status: {e}")
-        return False
-    finally:
-        db.close()
+    return await update_status(ticket_id, new_status)
 
-def assign_master(ticket_id: int, master_telegram_id: int):
+async def assign_master(ticket_id: int, master_telegram_id: int):
     """Назначить мастера на заявку"""
-    db = SessionLocal()
     try:
-        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-        master = db.query(Master).filter(Master.telegram_id == str(master_telegram_id)).first()
-        
-        if ticket and master:
-            ticket.master_id = master.id
-            ticket.status = "🧪 Диагностика"
-            db.commit()
-            return True, ticket, master
-        return False, None, None
+        async with session_scope() as session:
+            ticket = await ticket_repo.get_ticket(session, ticket_id, with_people=False)
+            master = await master_repo.get_by_telegram_id(session, master_telegram_id)
+
+            if ticket and master:
+                ticket.master_id = master.id
+                ticket.status = "🧪 Диагностика"
+                return True, ticket, master
+            return False, None, None
     except Exception as e:
-        db.rollback()
         print(f"Error assigning master: {e}")
         return False, None, None
-    finally:
-        db.close()
 
-def create_walkin_ticket(client_name: str, client_phone: str, branch: str, 
-                         category: str, brand: str, problem: str):
+async def create_walkin_ticket(client_name: str, client_phone: str, branch: str,
+                               category: str, brand: str, problem: str):
     """Создание заявки для клиента без предварительной заявки"""
-    db = SessionLocal()
     try:
-        ticket = Ticket(
-            delivery_method=DeliveryMethod.WALKIN.value,
-            walkin_name=client_name,
-            walkin_phone=client_phone,
-            branch=branch,
-            category=category,
-            brand=brand,
-            problem=problem,
-            status="Новая",
-            urgency="🔵 Обычная",
-            created_at=datetime.now()
-        )
-        
-        db.add(ticket)
-        db.commit()
-        db.refresh(ticket)
-        
-        return ticket.id
-        
+        async with session_scope() as session:
+            ticket = await ticket_repo.add_ticket(
+                session,
+                delivery_method=DeliveryMethod.WALKIN.value,
+                walkin_name=client_name,
+                walkin_phone=client_phone,
+                branch=branch,
+                category=category,
+                brand=brand,
+                problem=problem,
+                status="Новая",
+                urgency="🔵 Обычная",
+                created_at=datetime.now()
+            )
+            return ticket.id
+
     except Exception as e:
-        db.rollback()
         print(f"Error creating walk-in ticket: {e}")
         raise
-    finally:
-        db.close()
 
-def get_all_tickets_with_details():
+def _ticket_details(ticket: Ticket) -> dict:
+    """Краткое представление заявки для списков"""
+    # Определяем имя клиента
+    client_name = ""
+    if ticket.client:
+        client_name = ticket.client.name or "Клиент"
+    elif ticket.walkin_name:
+        client_name = ticket.walkin_name
+
+    # Определяем телефон
+    client_phone = ""
+    if ticket.client and ticket.client.phone:
+        client_phone = ticket.client.phone
+    elif ticket.walkin_phone:
+        client_phone = ticket.walkin_phone
+    elif ticket.delivery_phone:
+        client_phone = ticket.delivery_phone
+
+    # Определяем способ получения
+    delivery_method_text = {
+        DeliveryMethod.PICKUP.value: "🚶 Самовывоз",
+        DeliveryMethod.DELIVERY.value: "🚚 Доставка",
+        DeliveryMethod.WALKIN.value: "🏪 В сервисе"
+    }.get(ticket.delivery_method, "Не указан")
+
+    return {
+        "id": ticket.id,
+        "client_name": client_name,
+        "client_phone": client_phone,
+        "delivery_method": delivery_method_text,
+        "category": ticket.category,
+        "brand": ticket.brand,
+        "problem": ticket.problem[:50] + "..." if ticket.problem and len(ticket.problem) > 50 else ticket.problem or "",
+        "status": ticket.status,
+        "master_name": ticket.master.name if ticket.master else "Не назначен",
+        "master_id": ticket.master.id if ticket.master else None,
+        "created_at": ticket.created_at.strftime("%d.%m.%Y %H:%M") if ticket.created_at else ""
+    }
+
+async def get_all_tickets_with_details():
     """Получить все заявки с деталями"""
-    db = SessionLocal()
-    
     try:
-        tickets = db.query(Ticket).options(
-            joinedload(Ticket.client),
-            joinedload(Ticket.master)
-        ).order_by(Ticket.created_at.desc()).all()
-        
-        result = []
-        for ticket in tickets:
-            # Определяем имя клиента
-            client_name = ""
-            if ticket.client:
-                client_name = ticket.client.name or "Клиент"
-            elif ticket.walkin_name:
-                client_name = ticket.walkin_name
-            
-            # Определяем телефон
-            client_phone = ""
-            if ticket.client and ticket.client.phone:
-                client_phone = ticket.client.phone
-            elif ticket.walkin_phone:
-                client_phone = ticket.walkin_phone
-            elif ticket.delivery_phone:
-                client_phone = ticket.delivery_phone
-            
-            # Определяем способ получения
-            delivery_method_text = {
-                DeliveryMethod.PICKUP.value: "🚶 Самовывоз",
-                DeliveryMethod.DELIVERY.value: "🚚 Доставка",
-                DeliveryMethod.WALKIN.value: "🏪 В сервисе"
-            }.get(ticket.delivery_method, "Не указан")
-            
-            result.append({
-                "id": ticket.id,
-                "client_name": client_name,
-                "client_phone": client_phone,
-                "delivery_method": delivery_method_text,
-                "category": ticket.category,
-                "brand": ticket.brand,
-                "problem": ticket.problem[:50] + "..." if ticket.problem and len(ticket.problem) > 50 else ticket.problem or "",
-                "status": ticket.status,
-                "master_name": ticket.master.name if ticket.master else "Не назначен",
-                "master_id": ticket.master.id if ticket.master else None,
-                "created_at": ticket.created_at.strftime("%d.%m.%Y %H:%M") if ticket.created_at else ""
-            })
-        
-        return result
-        
+        async with AsyncSessionLocal() as session:
+            tickets = await ticket_repo.get_all_tickets(session)
+            return [_ticket_details(ticket) for ticket in tickets]
     except Exception as e:
         print(f"Error getting tickets: {e}")
         return []
-    finally:
-        db.close()
 
-def get_client_tickets(client_telegram_id: int):
-    """Получить заявки клиента по его Telegram ID"""
-    db = SessionLocal()
+async def get_tickets_page(cursor: str = None, limit: int = 10, statuses=None):
+    """Страница списка заявок: (заявки, курсор следующей страницы)"""
     try:
-        from app.models.client import Client
-        client = db.query(Client).filter(Client.telegram_id == str(client_telegram_id)).first()
-        
-        if not client:
-            return []
-        
-        tickets = db.query(Ticket).filter(
-            Ticket.client_id == client.id
-        ).order_by(Ticket.created_at.desc()).all()
-        
-        return tickets
+        query = TicketQuery(statuses=statuses, cursor=cursor, limit=limit)
+        async with AsyncSessionLocal() as session:
+            rows, next_cursor = await ticket_repo.query_tickets(session, query)
+            return [ticket_query.to_dict(row) for row in rows], next_cursor
+    except Exception as e:
+        print(f"Error getting tickets page: {e}")
+        return [], None
+
+async def get_status_counts():
+    """{статус: количество} по всем заявкам из счетчиков статусов"""
+    try:
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(rollups.status_counts)
+    except Exception as e:
+        print(f"Error getting status counts: {e}")
+        return {}
+
+async def get_recent_tickets(limit: int = 20):
+    """Последние заявки с клиентом и мастером"""
+    try:
+        async with AsyncSessionLocal() as session:
+            return await ticket_repo.get_all_tickets(session, limit=limit)
+    except Exception as e:
+        print(f"Error getting recent tickets: {e}")
+        return []
+
+async def get_client_tickets(client_telegram_id: int, active_only: bool = False, limit: int = None):
+    """Получить заявки клиента по его Telegram ID
+
+    Возвращает None, если клиент ещё не зарегистрирован.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            client = await client_repo.get_by_telegram_id(session, client_telegram_id)
+            if not client:
+                return None
+
+            return await ticket_repo.get_client_tickets(
+                session, client.id, active_only=active_only, limit=limit
+            )
     except Exception as e:
         print(f"Error getting client tickets: {e}")
         return []
-    finally:
-        db.close()
 
-def get_active_tickets():
+async def get_master_tickets(master_telegram_id: int):
+    """Получить мастера и его заявки по Telegram ID
+
+    Возвращает (None, []), если мастер не зарегистрирован.
+    """
+    async with AsyncSessionLocal() as session:
+        master = await master_repo.get_by_telegram_id(session, master_telegram_id)
+        if not master:
+            return None, []
+
+        tickets = await ticket_repo.get_master_tickets(session, master.id)
+        return master, tickets
+
+async def get_active_tickets():
     """Получить активные заявки (не завершенные)"""
-    db = SessionLocal()
     try:
-        tickets = db.query(Ticket).filter(
-            Ticket.status != "✅ Готово"
-        ).order_by(Ticket.created_at.desc()).all()
-        return tickets
+        async with AsyncSessionLocal() as session:
+            return await ticket_repo.get_active_tickets(session)
     except Exception as e:
         print(f"Error getting active tickets: {e}")
         return []
-    finally:
-        db.close()
 
-def get_ticket_by_id(ticket_id: int):
+async def get_ticket_by_id(ticket_id: int):
     """Альтернативное название для get_ticket"""
-    return get_ticket(ticket_id)
+    return await get_ticket(ticket_id)
 
-# app/bot/services/ticket_service.py
-# Добавьте эту функцию после существующих функций
-
-def assign_master_by_telegram(ticket_id: int, master_telegram_id: int):
+async def assign_master_by_telegram(ticket_id: int, master_telegram_id: int):
     """Назначить мастера на заявку по Telegram ID"""
-    db = SessionLocal()
     try:
-        # Находим заявку
-        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-        if not ticket:
-            return False, "Заявка не найдена"
-        
-        # Проверяем, не назначен ли уже мастер
-        if ticket.master_id:
-            # Получаем имя уже назначенного мастера
-            current_master = db.query(Master).filter(Master.id == ticket.master_id).first()
-            master_name = current_master.name if current_master else "Неизвестно"
-            return False, f"На эту заявку уже назначен мастер ({master_name})"
-        
-        # Находим мастера по Telegram ID
-        master = db.query(Master).filter(Master.telegram_id == str(master_telegram_id)).first()
-        if not master:
-            return False, "Мастер не найден в базе данных"
-        
-        # Назначаем мастера
-        ticket.master_id = master.id
-        ticket.status = "🧪 Диагностика"
-        
-        # Увеличиваем счетчик активных заказов у мастера
-        master.active_orders = (master.active_orders or 0) + 1
-        
-        db.commit()
-        db.refresh(ticket)
-        
-        return True, f"Мастер {master.name} назначен на заявку #{ticket_id}"
-        
+        async with session_scope() as session:
+            # Находим заявку
+            ticket = await ticket_repo.get_ticket(session, ticket_id, with_people=False)
+            if not ticket:
+                return False, "Заявка не найдена"
+
+            # Проверяем, не назначен ли уже мастер
+            if ticket.master_id:
+                # Получаем имя уже назначенного мастера
+                current_master = await master_repo.get_master(session, ticket.master_id)
+                master_name = current_master.name if current_master else "Неизвестно"
+                return False, f"На эту заявку уже назначен мастер ({master_name})"
+
+            # Находим мастера по Telegram ID
+            master = await master_repo.get_by_telegram_id(session, master_telegram_id)
+            if not master:
+                return False, "Мастер не найден в базе данных"
+
+            # Назначаем мастера
+            ticket.master_id = master.id
+            ticket.status = "🧪 Диагностика"
+
+            # Увеличиваем счетчик активных заказов у мастера
+            master.active_orders = (master.active_orders or 0) + 1
+
+            return True, f"Мастер {master.name} назначен на заявку #{ticket_id}"
+
     except Exception as e:
-        db.rollback()
         print(f"Error assigning master by telegram: {e}")
         return False, f"Ошибка: {str(e)}"
-    finally:
-        db.close()
-def update_status(ticket_id: int, new_status: str):
+
+async def update_status(ticket_id: int, new_status: str):
     """Обновить статус заявки"""
-    db = SessionLocal()
     try:
-        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-        if not ticket:
-            return False
-        
-        ticket.status = new_status
-        db.commit()
-        return True
-        
+        async with session_scope() as session:
+            ticket = await ticket_repo.get_ticket(session, ticket_id, with_people=False)
+            if not ticket:
+                return False
+
+            ticket.status = new_status
+            return True
+
     except Exception as e:
-        db.rollback()
         print(f"Error updating ticket status: {e}")
         return False
-    finally:
-        db.close()        
\ No newline at end of file
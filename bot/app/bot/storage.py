@@ -0,0 +1,450 @@
+# app/bot/storage.py
+"""
+Хранилище состояний диалогов (FSM) с записью в SQLite или Redis
+
+MemoryStorage теряет недозаполненные заявки при каждом перезапуске и не
+позволяет передать диалог другому процессу бота. CachedStorage держит
+состояния в памяти процесса: чтение и запись в хендлерах не ждут диска
+или сети. Измененные записи раз в FSM_FLUSH_INTERVAL секунд пачкой
+уходят в хранилище (SQLite или Redis), при остановке бота - сразу все.
+После перезапуска запись читается из хранилища при первом обращении.
+
+Диалог без обращений дольше FSM_STATE_TTL секунд считается брошенным и
+удаляется из памяти и из хранилища (в Redis - через EXPIRE). В памяти
+не больше FSM_MAX_ENTRIES записей: при переполнении вытесняется давно
+не использованная (LRU), из SQLite/Redis она прочитается заново. С
+FSM_STORAGE_URL=memory (VolatileBackend) вытесненный диалог теряется,
+зато память процесса не растет. Число записей и примерный объем в
+байтах - stats(), раз в несколько минут они пишутся в лог.
+
+Несколько процессов могут работать с одним хранилищем, но сообщения
+одного чата должен обрабатывать один процесс: кэш не перечитывает
+запись, измененную другим процессом.
+
+Выбор - FSM_STORAGE_URL (app/config.py), см. make_storage().
+"""
+import asyncio
+import copy
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from aiogram.dispatcher.storage import BaseStorage
+
+from app.config import FSM_STORAGE_URL, FSM_STATE_TTL, FSM_FLUSH_INTERVAL, FSM_MAX_ENTRIES
+from app.core.fastjson import dumps
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class FSMRecord:
+    """Состояние, данные и bucket одного (chat, user)"""
+
+    __slots__ = ("state", "data", "bucket", "touched", "size")
+
+    def __init__(self, state=None, data=None, bucket=None, size: int = 0):
+        self.state = state
+        self.data = data or {}
+        self.bucket = bucket or {}
+        self.touched = time.monotonic()
+        # Размер в JSON на момент последней записи - оценка занятой памяти
+        self.size = size
+
+    @property
+    def empty(self) -> bool:
+        return self.state is None and not self.data and not self.bucket
+
+    def dump(self) -> bytes:
+        return dumps({"state": self.state, "data": self.data, "bucket": self.bucket})
+
+    @classmethod
+    def load(cls, value):
+        raw = json.loads(value)
+        return cls(raw.get("state"), raw.get("data"), raw.get("bucket"), len(value))
+
+
+class VolatileBackend:
+    """Без записи: состояния живут только в памяти процесса"""
+
+    persistent = False
+
+    async def load(self, key: str):
+        return None
+
+    async def save(self, items: dict):
+        pass
+
+    async def expire(self, ttl: float) -> int:
+        return 0
+
+    async def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """Таблица fsm_storage в отдельном файле SQLite (один поток на соединение)"""
+
+    persistent = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fsm-sqlite")
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS fsm_storage ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_fsm_storage_updated_at ON fsm_storage (updated_at)"
+            )
+        return self._conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _load(self, key):
+        row = self._connect().execute(
+            "SELECT value FROM fsm_storage WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _save(self, items):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT INTO fsm_storage (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                [(key, value.decode(), now) for key, value in items.items() if value is not None]
+            )
+            conn.executemany(
+                "DELETE FROM fsm_storage WHERE key = ?",
+                [(key,) for key, value in items.items() if value is None]
+            )
+
+    def _expire(self, ttl):
+        conn = self._connect()
+        with conn:
+            return conn.execute(
+                "DELETE FROM fsm_storage WHERE updated_at < ?", (time.time() - ttl,)
+            ).rowcount
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def load(self, key: str):
+        """Сохраненное значение или None"""
+        return await self._run(self._load, key)
+
+    async def save(self, items: dict):
+        """{key: bytes} - записать, {key: None} - удалить; одной транзакцией"""
+        await self._run(self._save, items)
+
+    async def expire(self, ttl: float) -> int:
+        return await self._run(self._expire, ttl)
+
+    async def close(self):
+        await self._run(self._close)
+
+
+class RedisBackend:
+    """Ключи <prefix><chat>:<user> в Redis, SET с EX = FSM_STATE_TTL"""
+
+    persistent = True
+
+    def __init__(self, url: str, ttl: float, prefix: str = "somon:fsm:", client=None):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError(
+                    f"FSM_STORAGE_URL={url} требует пакет redis (pip install \"redis>=5\")"
+                )
+            client = aioredis.from_url(url)
+        self._client = client
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    async def load(self, key: str):
+        return await self._client.get(self.prefix + key)
+
+    async def save(self, items: dict):
+        if not items:
+            return
+        # Одна транзакция MULTI/EXEC на всю пачку
+        async with self._client.pipeline(transaction=True) as pipe:
+            for key, value in items.items():
+                if value is None:
+                    pipe.delete(self.prefix + key)
+                else:
+                    pipe.set(self.prefix + key, value, ex=self.ttl if self.ttl > 0 else None)
+            await pipe.execute()
+
+    async def expire(self, ttl: float) -> int:
+        # Ключи истекают в самом Redis
+        return 0
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class CachedStorage(BaseStorage):
+    """FSM-хранилище aiogram: память процесса + отложенная запись в backend"""
+
+    def __init__(self, backend, ttl: float = FSM_STATE_TTL,
+                 flush_interval: float = FSM_FLUSH_INTERVAL, max_entries: int = FSM_MAX_ENTRIES):
+        self.backend = backend
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        # key -> FSMRecord, от давно использованных к недавним
+        self._records = OrderedDict()
+        self._loading = {}
+        self._dirty = set()
+        # Вытесненные до записи: key -> значение для backend (None - удалить)
+        self._evicted = {}
+        # Пачка, которую сейчас пишет backend.save (читается вместо backend)
+        self._saving = {}
+        self.bytes = 0
+        self._task = None
+        self._last_expire = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.flushed_keys = 0
+        self.flush_errors = 0
+        self.load_errors = 0
+        self.expired = 0
+        self.evictions = 0
+
+    # Записи в памяти
+
+    async def _record(self, chat, user) -> FSMRecord:
+        chat, user = self.check_address(chat=chat, user=user)
+        key = f"{chat}:{user}"
+        record = self._records.get(key)
+        if record is None:
+            self.misses += 1
+            self._start()
+            if key not in self._loading:
+                self._loading[key] = asyncio.ensure_future(self._load(key))
+            record = await asyncio.shield(self._loading[key])
+            self._loading.pop(key, None)
+        else:
+            self.hits += 1
+            self._records.move_to_end(key)
+        record.touched = time.monotonic()
+        return record
+
+    async def _load(self, key: str) -> FSMRecord:
+        try:
+            if key in self._evicted:
+                value = self._evicted[key]
+            elif key in self._saving:
+                value = self._saving[key]
+            else:
+                value = await self.backend.load(key)
+            record = FSMRecord.load(value) if value else FSMRecord()
+        except Exception as e:
+            self.load_errors += 1
+            logger.error(f"FSM storage: cannot load {key}: {e}")
+            record = FSMRecord()
+        if key not in self._records:
+            self._records[key] = record
+            self.bytes += record.size
+            self._evict_overflow()
+        return self._records[key]
+
+    def _drop(self, key: str):
+        record = self._records.pop(key)
+        self.bytes -= record.size
+        if key in self._dirty:
+            self._dirty.discard(key)
+            if self.backend.persistent:
+                self._evicted[key] = None if record.empty else record.dump()
+
+    def _evict_overflow(self):
+        while len(self._records) > self.max_entries:
+            key = next(iter(self._records))
+            self._drop(key)
+            self.evictions += 1
+
+    def _changed(self, chat, user):
+        chat, user = self.check_address(chat=chat, user=user)
+        self._dirty.add(f"{chat}:{user}")
+        self._start()
+
+    def _start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._flush_loop())
+
+    # Интерфейс BaseStorage
+
+    async def get_state(self, *, chat=None, user=None, default=None):
+        record = await self._record(chat, user)
+        return record.state if record.state is not None else self.resolve_state(default)
+
+    async def get_data(self, *, chat=None, user=None, default=None):
+        record = await self._record(chat, user)
+        return copy.deepcopy(record.data if record.data or default is None else default)
+
+    async def set_state(self, *, chat=None, user=None, state=None):
+        record = await self._record(chat, user)
+        record.state = self.resolve_state(state)
+        self._changed(chat, user)
+
+    async def set_data(self, *, chat=None, user=None, data=None):
+        record = await self._record(chat, user)
+        record.data = copy.deepcopy(data) if data else {}
+        self._changed(chat, user)
+
+    async def update_data(self, *, chat=None, user=None, data=None, **kwargs):
+        record = await self._record(chat, user)
+        if data:
+            record.data.update(copy.deepcopy(data))
+        record.data.update(kwargs)
+        self._changed(chat, user)
+
+    async def reset_state(self, *, chat=None, user=None, with_data=True):
+        record = await self._record(chat, user)
+        record.state = None
+        if with_data:
+            record.data = {}
+        self._changed(chat, user)
+
+    def has_bucket(self):
+        return True
+
+    async def get_bucket(self, *, chat=None, user=None, default=None):
+        record = await self._record(chat, user)
+        return copy.deepcopy(record.bucket if record.bucket or default is None else default)
+
+    async def set_bucket(self, *, chat=None, user=None, bucket=None):
+        record = await self._record(chat, user)
+        record.bucket = copy.deepcopy(bucket) if bucket else {}
+        self._changed(chat, user)
+
+    async def update_bucket(self, *, chat=None, user=None, bucket=None, **kwargs):
+        record = await self._record(chat, user)
+        if bucket:
+            record.bucket.update(copy.deepcopy(bucket))
+        record.bucket.update(kwargs)
+        self._changed(chat, user)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        await self.backend.close()
+
+    async def wait_closed(self):
+        pass
+
+    # Запись в backend
+
+    async def flush(self) -> int:
+        """Записать все измененные записи; пустые удаляются"""
+        if not self._dirty and not self._evicted:
+            return 0
+        keys, self._dirty = self._dirty, set()
+        evicted, self._evicted = self._evicted, {}
+        items = dict(evicted)
+        for key in keys:
+            record = self._records.get(key)
+            value = None if record is None or record.empty else record.dump()
+            if record is not None:
+                size = len(value) if value else 0
+                self.bytes += size - record.size
+                record.size = size
+            items[key] = value
+        self._saving = items
+        try:
+            await self.backend.save(items)
+        except Exception as e:
+            self.flush_errors += 1
+            for key, value in items.items():
+                if key in self._records:
+                    # Текущее значение запишется следующим flush
+                    self._dirty.add(key)
+                else:
+                    # Вытеснена до или во время save; более новое значение
+                    # (изменена и снова вытеснена) уже лежит в _evicted
+                    self._evicted.setdefault(key, value)
+            logger.error(f"FSM storage: cannot save {len(items)} records: {e}")
+            return 0
+        finally:
+            self._saving = {}
+        self.flushes += 1
+        self.flushed_keys += len(items)
+        return len(items)
+
+    async def expire(self) -> int:
+        """Удалить брошенные диалоги из памяти и из backend"""
+        deadline = time.monotonic() - self.ttl
+        stale = [
+            key for key, record in self._records.items()
+            if record.touched < deadline and key not in self._dirty
+        ]
+        for key in stale:
+            self._drop(key)
+        self.expired += len(stale)
+        try:
+            await self.backend.expire(self.ttl)
+        except Exception as e:
+            logger.error(f"FSM storage: cannot expire old records: {e}")
+        return len(stale)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if time.monotonic() - self._last_expire > min(self.ttl, 600):
+                self._last_expire = time.monotonic()
+                await self.expire()
+                logger.info(
+                    f"FSM storage: {len(self._records)} entries, ~{self.bytes} bytes, "
+                    f"{self.evictions} evicted, {self.expired} expired"
+                )
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self._records),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "dirty": len(self._dirty),
+            "hits": self.hits,
+            "misses": self.misses,
+            "flushes": self.flushes,
+            "flushed_keys": self.flushed_keys,
+            "flush_errors": self.flush_errors,
+            "load_errors": self.load_errors,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+def make_storage(url: str = FSM_STORAGE_URL):
+    """FSM-хранилище по FSM_STORAGE_URL"""
+    if not url or url == "memory":
+        return CachedStorage(VolatileBackend())
+    if url.startswith("sqlite:///"):
+        return CachedStorage(SQLiteBackend(url[len("sqlite:///"):]))
+    if url.startswith(("redis://", "rediss://")):
+        return CachedStorage(RedisBackend(url, FSM_STATE_TTL))
+    raise ValueError(f"Неизвестное FSM-хранилище: {url}")
@@ -0,0 +1,66 @@
+# app/bot/subscribers.py
+"""
+Уведомления Telegram как подписчики шины доменных событий
+
+Изменения, сделанные в боте, хендлеры уже объявляют сами (с контекстом
+диалога). Здесь - то, что меняется из веб-админки (origin == "web"):
+новая заявка уходит в группу мастеров, назначенный мастер получает
+заявку в личные сообщения. Подписка - в on_startup бота, поэтому
+отправка идет в его event loop.
+"""
+import logging
+
+from app.bot.config import MASTER_GROUP_ID
+from app.bot.handlers.common import build_master_keyboard, build_master_select_keyboard
+from app.bot.services import ticket_service
+from app.core.event_bus import bus
+from app.models.domain_events import TicketCreated, MasterAssigned
+
+logger = logging.getLogger(__name__)
+
+
+def _client_lines(ticket) -> str:
+    if ticket.client:
+        return f"👤 Клиент: {ticket.client.name or ''}\n📞 Телефон: {ticket.client.phone or ''}"
+    return f"👤 Клиент: {ticket.walkin_name or ''}\n📞 Телефон: {ticket.walkin_phone or ''}"
+
+
+def register_subscribers(bot):
+    """Подписать уведомления (вызывать внутри event loop бота)"""
+
+    async def announce_web_ticket(event: TicketCreated):
+        if event.origin != "web":
+            return
+        ticket = await ticket_service.get_ticket(event.ticket_id)
+        if not ticket:
+            return
+        await bot.send_message(
+            MASTER_GROUP_ID,
+            f"📢 Новая заявка из веб-админки #{ticket.id}\n\n"
+            f"{_client_lines(ticket)}\n\n"
+            f"📍 Филиал: {ticket.branch or ''}\n"
+            f"📂 Категория: {ticket.category or ''}\n"
+            f"🏷 Бренд: {ticket.brand or ''}\n"
+            f"🛠 Проблема: {ticket.problem or ''}\n"
+            f"⚡ Срочность: {ticket.urgency or ''}\n\n"
+            f"Выберите мастера:",
+            reply_markup=build_master_select_keyboard(ticket.id)
+        )
+
+    async def notify_assigned_master(event: MasterAssigned):
+        if event.origin != "web" or not event.master_id:
+            return
+        ticket = await ticket_service.get_ticket(event.ticket_id)
+        if not ticket or not ticket.master or not ticket.master.telegram_id:
+            return
+        await bot.send_message(
+            int(ticket.master.telegram_id),
+            f"🛠 Вам назначена заявка #{ticket.id}\n"
+            f"📱 Устройство: {ticket.brand or ''}\n"
+            f"🔧 Проблема: {(ticket.problem or '')[:100]}...",
+            reply_markup=build_master_keyboard(ticket.id, ticket.status)
+        )
+
+    bus.subscribe(TicketCreated, announce_web_ticket, "telegram.announce_web_ticket")
+    bus.subscribe(MasterAssigned, notify_assigned_master, "telegram.notify_assigned_master")
+    logger.info("✅ Уведомления о событиях подписаны")
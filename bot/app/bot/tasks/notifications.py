@@ -1,14 +1,14 @@
 # app/bot/tasks/notifications.py
 import asyncio
 from aiogram import Bot
-from app.services import event_service
+from app.bot.services import event_service
 from datetime import datetime
 
 async def check_event_notifications(bot: Bot):
     """Проверка и отправка уведомлений о событиях"""
     while True:
         try:
-            events = event_service.get_events_for_notification()
+            events = await event_service.get_events_for_notification()
             
             for event in events:
                 if event.master and event.master.telegram_id:
@@ -31,7 +31,7 @@ async def check_event_notifications(bot: Bot):
                     )
                     
                     # Отмечаем, что уведомление отправлено
-                    event_service.update_event(event.id, {"notification_sent": True})
+                    await event_service.update_event(event.id, {"notification_sent": True})
         
         except Exception as e:
             print(f"Error in notification task: {e}")
@@ -15,6 +15,20 @@ MASTERS_CHAT_ID = int(
 ADMIN_IDS = list(
     map(int, os.getenv("ADMIN_IDS", "").split(","))
 )
+
+# ─────────────────────────────
+# BOT FSM (состояния диалогов)
+# ─────────────────────────────
+# Хранилище (app/bot/storage.py): "memory" - только в памяти процесса,
+# "sqlite:///fsm_storage.db" - файл SQLite, "redis://[:пароль@]host:6379/0" - Redis
+FSM_STORAGE_URL = os.getenv("FSM_STORAGE_URL", "sqlite:///fsm_storage.db")
+# Брошенный диалог удаляется через столько секунд без изменений
+FSM_STATE_TTL = float(os.getenv("FSM_STATE_TTL", str(24 * 3600)))
+# Изменения записываются в хранилище пачкой раз в столько секунд
+FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", "1"))
+# Максимум диалогов в памяти процесса, лишние вытесняются (LRU)
+FSM_MAX_ENTRIES = int(os.getenv("FSM_MAX_ENTRIES", "10000"))
+
 # ─────────────────────────────
 # DATABASE (MySQL / XAMPP)
 # ─────────────────────────────
@@ -29,6 +43,71 @@ DATABASE_URL = (
     f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
+# Пулы соединений: у веб-админки и бота отдельные бюджеты
+WEB_DB_POOL_SIZE = int(os.getenv("WEB_DB_POOL_SIZE", "10"))
+WEB_DB_MAX_OVERFLOW = int(os.getenv("WEB_DB_MAX_OVERFLOW", "5"))
+BOT_DB_POOL_SIZE = int(os.getenv("BOT_DB_POOL_SIZE", "5"))
+BOT_DB_MAX_OVERFLOW = int(os.getenv("BOT_DB_MAX_OVERFLOW", "2"))
+# MySQL закрывает простаивающие соединения (wait_timeout), пересоздаем раньше
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# Пул потоков для синхронных запросов к БД из async-эндпоинтов
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "8"))
+# Сколько задач может ждать свободный поток, прежде чем отвечать 503
+DB_EXECUTOR_QUEUE_LIMIT = int(os.getenv("DB_EXECUTOR_QUEUE_LIMIT", "32"))
+
+# Кэш результатов /api/statistics: время жизни (сек) и число записей
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "60"))
+STATS_CACHE_MAX_ENTRIES = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "256"))
+
+# Сверка счетчиков parts_count / ticket_count (сек), 0 - не запускать
+COUNTERS_RECONCILE_INTERVAL = float(os.getenv("COUNTERS_RECONCILE_INTERVAL", "3600"))
+
+# Списки заявок: размер страницы по умолчанию и максимальный
+TICKETS_PAGE_SIZE = int(os.getenv("TICKETS_PAGE_SIZE", "50"))
+TICKETS_PAGE_SIZE_MAX = int(os.getenv("TICKETS_PAGE_SIZE_MAX", "200"))
+
+# Поиск заявок: результатов по умолчанию и максимум
+TICKET_SEARCH_LIMIT = int(os.getenv("TICKET_SEARCH_LIMIT", "20"))
+TICKET_SEARCH_LIMIT_MAX = int(os.getenv("TICKET_SEARCH_LIMIT_MAX", "50"))
+
+# Лента изменений заявок: записей за запрос по умолчанию и максимум
+TICKET_CHANGES_LIMIT = int(os.getenv("TICKET_CHANGES_LIMIT", "200"))
+TICKET_CHANGES_LIMIT_MAX = int(os.getenv("TICKET_CHANGES_LIMIT_MAX", "1000"))
+# Сколько дней хранится журнал и как часто (сек) он очищается, 0 - не очищать
+TICKET_CHANGES_RETENTION_DAYS = int(os.getenv("TICKET_CHANGES_RETENTION_DAYS", "7"))
+TICKET_CHANGES_PRUNE_INTERVAL = float(os.getenv("TICKET_CHANGES_PRUNE_INTERVAL", "3600"))
+# Пропуск в seq моложе этого (сек) - транзакция еще может зафиксироваться
+TICKET_CHANGES_SETTLE = float(os.getenv("TICKET_CHANGES_SETTLE", "5"))
+
+# WebSocket-обновления заявок: опрос ленты (сек), очередь сообщений на
+# клиента и время на отправку одного сообщения (сек)
+REALTIME_POLL_INTERVAL = float(os.getenv("REALTIME_POLL_INTERVAL", "1"))
+REALTIME_CLIENT_QUEUE = int(os.getenv("REALTIME_CLIENT_QUEUE", "100"))
+REALTIME_SEND_TIMEOUT = float(os.getenv("REALTIME_SEND_TIMEOUT", "5"))
+# Изменения за это окно (сек) после первого уходят одним сообщением
+REALTIME_COALESCE_WINDOW = float(os.getenv("REALTIME_COALESCE_WINDOW", "0.1"))
+# Сжатие сообщений WebSocket (permessage-deflate), если клиент его поддерживает
+REALTIME_WS_DEFLATE = os.getenv("REALTIME_WS_DEFLATE", "1").lower() in ("1", "true", "yes")
+
+# Обмен событиями между процессами (воркеры uvicorn, бот): пусто - один
+# процесс, "redis://[:пароль@]host:6379" - Redis (pip install "redis>=5");
+# префикс имен каналов. python -m app.main запускает веб-админку с
+# reload=True в отдельном процессе от бота - там нужен Redis
+REALTIME_BACKPLANE_URL = os.getenv("REALTIME_BACKPLANE_URL", "")
+REALTIME_BACKPLANE_PREFIX = os.getenv("REALTIME_BACKPLANE_PREFIX", "somon:")
+
+# Шина доменных событий: время на обработку события одним подписчиком (сек)
+EVENT_HANDLER_TIMEOUT = float(os.getenv("EVENT_HANDLER_TIMEOUT", "10"))
+
+# SSE-потоки (бейдж склада): пинг, чтобы прокси не закрывали соединение (сек)
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "25"))
+
+# Ответы больше этого размера (байт) сжимаются gzip, если клиент его принимает
+HTTP_GZIP_MIN_SIZE = int(os.getenv("HTTP_GZIP_MIN_SIZE", "1024"))
+
 # ─────────────────────────────
 # WEB ADMIN (FastAPI)
 # ─────────────────────────────
@@ -0,0 +1,286 @@
+# app/core/backplane.py
+"""
+Pub/sub между процессами: воркеры uvicorn и процесс бота
+
+Сокеты и SSE-клиенты живут в памяти своего воркера. Чтобы изменение,
+зафиксированное в любом процессе, дошло до всех вкладок, процессы
+обмениваются сообщениями через общий канал (app/core/fanout.py решает,
+что именно пересылать).
+
+Реализации (REALTIME_BACKPLANE_URL):
+    ""                    - LocalBackplane: один процесс, сеть не нужна
+    "redis://host:6379"   - RedisBackplane: Redis через redis.asyncio
+                            (pip install "redis>=5")
+
+Сообщение - JSON {"sender": <id процесса>, "data": ...}; свои сообщения
+процесс не обрабатывает повторно. Доставка "не более одного раза": пока
+соединение с Redis восстанавливается, сообщения теряются. Изменения
+заявок при этом все равно приходят из ленты (опрос БД в realtime.py).
+
+LocalBackplane годится только для одного процесса. python -m app.main
+запускает uvicorn с reload=True: веб-админка работает в дочернем
+процессе, бот - в родительском, и без Redis события между ними не
+ходят (см. warn_if_local()).
+"""
+import asyncio
+import json
+import logging
+import threading
+import uuid
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:
+    aioredis = None
+    RedisError = OSError
+
+from app.config import REALTIME_BACKPLANE_URL, REALTIME_BACKPLANE_PREFIX
+from app.core.fastjson import dumps
+
+logger = logging.getLogger(__name__)
+
+# Очередь исходящих сообщений: при недоступном сервере лишнее отбрасывается
+OUTBOX_LIMIT = 1000
+
+
+class Backplane:
+    """Общая часть: обработчики каналов, конверт, метрики"""
+
+    def __init__(self, prefix: str = REALTIME_BACKPLANE_PREFIX):
+        self.prefix = prefix
+        self.sender = uuid.uuid4().hex[:12]
+        self._handlers = {}
+        self._loop = None
+        self._thread = None
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.handler_errors = 0
+
+    def on(self, channel: str, handler):
+        """Корутина handler(data) для сообщений других процессов"""
+        handlers = self._handlers.setdefault(channel, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    @property
+    def loop(self):
+        """Event loop, в котором запущен backplane"""
+        return self._loop
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.get_ident()
+
+    async def close(self):
+        self._loop = None
+
+    def publish(self, channel: str, data):
+        """Отправить data остальным процессам; можно вызывать из любого потока"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self.dropped += 1
+            return
+        payload = dumps({"sender": self.sender, "data": data})
+        if threading.get_ident() == self._thread:
+            self._send(channel, payload)
+        else:
+            loop.call_soon_threadsafe(self._send, channel, payload)
+
+    def _send(self, channel: str, payload: bytes):
+        raise NotImplementedError
+
+    def _receive(self, channel: str, payload: bytes):
+        """Разобрать конверт и запустить обработчики канала"""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Backplane: malformed message on {channel}")
+            return
+        if message.get("sender") == self.sender:
+            return
+        self.received += 1
+        for handler in self._handlers.get(channel, ()):
+            asyncio.ensure_future(self._run(handler, message.get("data")))
+
+    async def _run(self, handler, data):
+        try:
+            await handler(data)
+        except Exception as e:
+            self.handler_errors += 1
+            logger.error(f"Backplane handler {handler.__name__} failed: {e}")
+
+    def stats(self):
+        return {
+            "backend": type(self).__name__,
+            "sender": self.sender,
+            "started": self.started,
+            "channels": sorted(self._handlers),
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "handler_errors": self.handler_errors,
+        }
+
+
+class LocalBroker:
+    """Общая "шина" для LocalBackplane в одном процессе"""
+
+    def __init__(self):
+        self.members = set()
+
+
+class LocalBackplane(Backplane):
+    """Без сети: доставка участникам одного LocalBroker
+
+    По умолчанию у каждого экземпляра свой брокер, то есть других
+    процессов нет. Несколько экземпляров с общим брокером ведут себя
+    как воркеры с общим Redis - так backplane проверяется без сервера.
+    """
+
+    def __init__(self, broker: LocalBroker = None, **kwargs):
+        super().__init__(**kwargs)
+        self.broker = broker or LocalBroker()
+
+    async def start(self):
+        await super().start()
+        self.broker.members.add(self)
+
+    async def close(self):
+        self.broker.members.discard(self)
+        await super().close()
+
+    def _send(self, channel: str, payload: bytes):
+        self.published += 1
+        for member in list(self.broker.members):
+            loop = member._loop
+            if member is not self and loop is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(member._receive, channel, payload)
+
+
+class RedisBackplane(Backplane):
+    """PUBLISH из очереди и SUBSCRIBE с переподключением (redis.asyncio)
+
+    client - готовый клиент redis.asyncio.Redis; по умолчанию создается
+    из url при start().
+    """
+
+    def __init__(self, url: str, reconnect_max: float = 10.0, client=None, **kwargs):
+        super().__init__(**kwargs)
+        if client is None and aioredis is None:
+            raise RuntimeError(
+                f"REALTIME_BACKPLANE_URL={url} требует пакет redis (pip install \"redis>=5\")"
+            )
+        self.url = url
+        self.reconnect_max = reconnect_max
+        self._client = client
+        self._outbox = None
+        self._tasks = []
+        self.reconnects = 0
+        self.connected = False
+
+    async def start(self):
+        await super().start()
+        if self._client is None:
+            self._client = aioredis.from_url(self.url)
+        self._outbox = asyncio.Queue(maxsize=OUTBOX_LIMIT)
+        self._tasks = [
+            asyncio.create_task(self._publisher()),
+            asyncio.create_task(self._subscriber()),
+        ]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await self._client.aclose()
+        await super().close()
+
+    def _send(self, channel: str, payload: bytes):
+        try:
+            self._outbox.put_nowait((self.prefix + channel, payload))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _backoff(self, delay: float) -> float:
+        self.reconnects += 1
+        await asyncio.sleep(delay)
+        return min(delay * 2, self.reconnect_max)
+
+    async def _publisher(self):
+        while True:
+            channel, payload = await self._outbox.get()
+            try:
+                await self._client.publish(channel, payload)
+                self.published += 1
+            except (RedisError, OSError) as e:
+                # Пул клиента переподключится сам, это сообщение потеряно
+                self.dropped += 1
+                logger.warning(f"Backplane: publish failed ({e})")
+
+    async def _subscriber(self):
+        delay = 0.5
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                channels = [self.prefix + channel for channel in self._handlers]
+                if channels:
+                    await pubsub.subscribe(*channels)
+                self.connected = True
+                delay = 0.5
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        channel = message["channel"]
+                        if isinstance(channel, bytes):
+                            channel = channel.decode()
+                        self._receive(channel[len(self.prefix):], message["data"])
+            except (RedisError, OSError) as e:
+                logger.warning(f"Backplane: subscriber disconnected ({e})")
+            finally:
+                self.connected = False
+                await pubsub.aclose()
+            delay = await self._backoff(delay)
+
+    def stats(self):
+        return {
+            **super().stats(),
+            "server": self.url,
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "outbox": self._outbox.qsize() if self._outbox else 0,
+        }
+
+
+def make_backplane(url: str = REALTIME_BACKPLANE_URL) -> Backplane:
+    if not url:
+        return LocalBackplane()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackplane(url)
+    raise ValueError(f"Неизвестный backplane: {url}")
+
+
+backplane = make_backplane()
+
+
+def warn_if_local(reason: str) -> bool:
+    """Громко предупредить, если процессов несколько, а backplane локальный
+
+    reason - почему процессов несколько (reload uvicorn, --workers, бот
+    отдельно). Возвращает True, если предупреждение выдано.
+    """
+    if not isinstance(backplane, LocalBackplane):
+        return False
+    message = (
+        f"REALTIME_BACKPLANE_URL не задан, а процессов несколько ({reason}). "
+        "События и рассылки не дойдут до других процессов: уведомления бота о "
+        "правках из веб-админки, бейдж склада и сокеты других воркеров. "
+        "Задайте REALTIME_BACKPLANE_URL=redis://host:6379"
+    )
+    logger.warning(message)
+    print(f"⚠️ {message}")
+    return True
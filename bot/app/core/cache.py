@@ -0,0 +1,198 @@
+# app/core/cache.py
+"""
+Кэш результатов статистики: TTL и ограничение размера (LRU)
+
+Ключ - имя эндпоинта и его параметры после подстановки значений по
+умолчанию. Каждая запись помнит таблицы, из которых посчитана, и
+удаляется, не дожидаясь истечения TTL, когда сессия фиксирует изменения
+в этих таблицах:
+- commit в этом процессе (веб или бот) сбрасывает записи синхронно
+  (app/models/written_tables.py), до возврата из commit();
+- о commit в другом процессе сообщает TablesWritten через backplane.
+  Подписка - subscribe_invalidation() в startup веб-приложения.
+
+Пример:
+    @router.get("/trends")
+    @cached("tickets")
+    @offload()
+    def get_trends(period: str = "week"): ...
+"""
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict, Counter
+
+from app.config import STATS_CACHE_TTL, STATS_CACHE_MAX_ENTRIES
+from app.core.event_bus import bus
+from app.models import written_tables
+from app.models.domain_events import TablesWritten
+
+
+class CacheStats:
+    """Попадания и промахи одного эндпоинта"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def to_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0.0
+        }
+
+
+class ResultCache:
+    """Потокобезопасный TTL + LRU кэш с инвалидацией по таблицам"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (истекает в, таблицы, значение); порядок - от давно читанных
+        self._entries = OrderedDict()
+        self._stats = {}
+        # Номер изменения таблицы: результат, посчитанный до записи в
+        # таблицу и завершившийся после нее, в кэш не попадает
+        self._generations = Counter()
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _endpoint(self, name: str) -> CacheStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = CacheStats()
+        return stats
+
+    def lookup(self, endpoint: str, key):
+        """(найдено, значение) с учетом TTL"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            stats = self._endpoint(endpoint)
+            if entry is None:
+                stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            stats.hits += 1
+            return True, entry[2]
+
+    def generation(self, tables):
+        with self._lock:
+            return tuple(self._generations[table] for table in tables)
+
+    def store(self, key, value, tables, generation, ttl: float = None):
+        """Сохранить результат, если таблицы не менялись с начала расчета"""
+        with self._lock:
+            if generation != tuple(self._generations[table] for table in tables):
+                return
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (expires_at, frozenset(tables), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tables) -> int:
+        """Удалить записи, посчитанные по любой из таблиц"""
+        tables = set(tables)
+        with self._lock:
+            for table in tables:
+                self._generations[table] += 1
+            stale = [key for key, (_, depends, _) in self._entries.items() if depends & tables]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = sum(stats.hits for stats in self._stats.values())
+            misses = sum(stats.misses for stats in self._stats.values())
+            return {
+                "ttl": self.ttl,
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses) * 100, 1) if hits + misses else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "endpoints": {
+                    name: stats.to_dict()
+                    for name, stats in sorted(self._stats.items())
+                }
+            }
+
+
+stats_cache = ResultCache(STATS_CACHE_TTL, STATS_CACHE_MAX_ENTRIES)
+
+
+def cached(*tables, ttl: float = None, cache: ResultCache = stats_cache):
+    """Декоратор: кэшировать результат эндпоинта, зависящий от tables
+
+    Работает и с обычными, и с async функциями (в том числе поверх
+    offload - тогда попадание в кэш не занимает поток пула).
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        endpoint = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        def key_for(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (endpoint,) + tuple(sorted(bound.arguments.items()))
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                key = key_for(args, kwargs)
+                found, value = cache.lookup(endpoint, key)
+                if found:
+                    return value
+                generation = cache.generation(tables)
+                value = await fn(*args, **kwargs)
+                cache.store(key, value, tables, generation, ttl)
+                return value
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                key = key_for(args, kwargs)
+                found, value = cache.lookup(endpoint, key)
+                if found:
+                    return value
+                generation = cache.generation(tables)
+                value = fn(*args, **kwargs)
+                cache.store(key, value, tables, generation, ttl)
+                return value
+
+        return wrapper
+    return decorator
+
+
+# Инвалидация: свои commit - синхронно, чужие - событием шины
+
+written_tables.on_commit(stats_cache.invalidate)
+
+
+def subscribe_invalidation(cache: ResultCache = stats_cache):
+    """Подписать cache на TablesWritten других процессов; внутри event loop"""
+    async def invalidate_written_tables(domain_event):
+        cache.invalidate(domain_event.tables)
+
+    return bus.subscribe(
+        TablesWritten, invalidate_written_tables, "stats_cache.invalidate", remote=True, local=False
+    )
@@ -0,0 +1,137 @@
+# app/core/change_feed.py
+"""
+Лента изменений заявок: GET /api/tickets/changes?since=<cursor>
+
+Курсор - seq последней полученной записи журнала ticket_changes
+(app/models/ticket_change.py). Без since лента отдает только текущий
+курсор: клиент сначала берет его, затем загружает список и дальше
+запрашивает изменения после курсора.
+
+В ответе каждая заявка встречается один раз с последней операцией и
+текущими данными (формат /api/admin/tickets), у удаленных ticket = null.
+
+seq выдается при вставке, а фиксируются транзакции в другом порядке:
+пропуск в seq может оказаться еще не зафиксированной записью. Лента
+останавливается перед пропуском моложе TICKET_CHANGES_SETTLE секунд;
+более старые пропуски - откаченные транзакции. Если журнал после since
+уже очищен, курсор считается устаревшим (ChangeFeedExpired) - клиент
+загружает список заново.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, delete
+
+from app.config import (
+    TICKET_CHANGES_LIMIT, TICKET_CHANGES_LIMIT_MAX,
+    TICKET_CHANGES_RETENTION_DAYS, TICKET_CHANGES_PRUNE_INTERVAL, TICKET_CHANGES_SETTLE
+)
+from app.database import engine
+from app.models.ticket_change import TicketChange, CREATED, DELETED
+from app.services.ticket_service_compat import ticket_rows_by_id
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeFeedExpired(LookupError):
+    """Записи после курсора удалены очисткой журнала"""
+
+
+def batch_size(limit: int = None) -> int:
+    if not limit or limit < 1:
+        return TICKET_CHANGES_LIMIT
+    return min(limit, TICKET_CHANGES_LIMIT_MAX)
+
+
+def head(db) -> int:
+    """Курсор "сейчас": seq последней записи журнала"""
+    return db.execute(select(func.max(TicketChange.seq))).scalar() or 0
+
+
+def _settled(rows, since: int, now: datetime):
+    """Записи до первого свежего пропуска в seq"""
+    settle = timedelta(seconds=TICKET_CHANGES_SETTLE)
+    previous = since
+    for row in rows:
+        if row.seq != previous + 1 and now - row.changed_at < settle:
+            break
+        yield row
+        previous = row.seq
+
+
+def changes_since(db, since: int = None, limit: int = None) -> dict:
+    """{"changes", "cursor", "has_more"} после курсора since"""
+    if since is None:
+        return {"changes": [], "cursor": head(db), "has_more": False}
+    if since < 0:
+        raise ValueError("Курсор не может быть отрицательным")
+
+    limit = batch_size(limit)
+    rows = db.execute(
+        select(TicketChange.seq, TicketChange.ticket_id, TicketChange.op, TicketChange.changed_at)
+        .where(TicketChange.seq > since)
+        .order_by(TicketChange.seq)
+        .limit(limit + 1)
+    ).all()
+    if rows and rows[0].seq > since + 1:
+        # Ничего не осталось до пропуска - он мог попасть в очистку
+        oldest = db.execute(select(func.min(TicketChange.seq))).scalar()
+        if oldest == rows[0].seq:
+            raise ChangeFeedExpired(f"Курсор {since} устарел, загрузите список заново")
+
+    settled = list(_settled(rows[:limit], since, datetime.now()))
+    # Остановка на свежем пропуске - не повод запрашивать сразу же
+    has_more = len(rows) > limit and len(settled) == limit
+
+    # Последняя операция по каждой заявке; созданная и измененная в одной
+    # пачке остается созданной
+    latest = {}
+    for row in settled:
+        op = row.op
+        if op != DELETED and latest.get(row.ticket_id) == CREATED:
+            op = CREATED
+        latest[row.ticket_id] = op
+    tickets = ticket_rows_by_id(db, [ticket_id for ticket_id, op in latest.items() if op != DELETED])
+
+    changes = []
+    for ticket_id, op in latest.items():
+        ticket = tickets.get(ticket_id)
+        # Заявка удалена позже - ее удаление придет следующими записями
+        if ticket is None:
+            op = DELETED
+        changes.append({"ticket_id": ticket_id, "op": op, "ticket": ticket})
+    return {
+        "changes": changes,
+        "cursor": settled[-1].seq if settled else since,
+        "has_more": has_more
+    }
+
+
+def prune(conn, days: int = TICKET_CHANGES_RETENTION_DAYS) -> int:
+    """Удалить записи старше days дней, оставив последнюю"""
+    last = conn.execute(select(func.max(TicketChange.seq))).scalar()
+    if last is None:
+        return 0
+    before = datetime.now() - timedelta(days=days)
+    result = conn.execute(
+        delete(TicketChange).where(TicketChange.changed_at < before, TicketChange.seq < last)
+    )
+    return result.rowcount
+
+
+def prune_all() -> int:
+    with engine.begin() as conn:
+        return prune(conn)
+
+
+async def prune_periodically(interval: float = TICKET_CHANGES_PRUNE_INTERVAL):
+    """Фоновая задача: очистка журнала в пуле db_executor"""
+    from app.core.executor import run_db
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_db("change_feed.prune", prune_all)
+        except Exception as e:
+            logger.error(f"Error pruning ticket changes: {e}")
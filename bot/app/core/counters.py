@@ -0,0 +1,113 @@
+# app/core/counters.py
+"""
+Сверка денормализованных счетчиков (app/models/counters.py)
+
+Счетчики поддерживаются слушателями сессии, но массовые правки в обход
+ORM (SQL в phpMyAdmin, импорт) их не обновляют. Сверка пересчитывает
+значения из исходных таблиц и исправляет только разошедшиеся строки.
+
+Вручную: python -m app.core.counters reconcile
+В веб-приложении сверка запускается раз в COUNTERS_RECONCILE_INTERVAL секунд.
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import update, select, func
+
+from app.config import COUNTERS_RECONCILE_INTERVAL
+from app.database import engine
+from app.models.client import Client
+from app.models.counters import COUNTERS, last_ticket_subquery
+from app.models.part import Part
+from app.models.stock_counter import PartStockCounter, LOW_STOCK
+
+logger = logging.getLogger(__name__)
+
+
+def _count_subquery(child, foreign_key, parent):
+    return (
+        select(func.count())
+        .select_from(child)
+        .where(getattr(child, foreign_key) == parent.__table__.c.id)
+        .scalar_subquery()
+    )
+
+
+def reconcile(conn) -> dict:
+    """Исправить расхождения, вернуть {таблица.колонка: исправлено строк}"""
+    fixed = reconcile_relationships(conn)
+    fixed[f"part_stock_counters.{LOW_STOCK}"] = reconcile_low_stock(conn)
+    return fixed
+
+
+def reconcile_relationships(conn) -> dict:
+    """parts_count, ticket_count и last_ticket_at (ревизия 0005)"""
+    fixed = {}
+    for child, foreign_key, parent, column in COUNTERS:
+        table = parent.__table__
+        actual = _count_subquery(child, foreign_key, parent)
+        result = conn.execute(
+            update(table).where(table.c[column] != actual).values({column: actual})
+        )
+        fixed[f"{table.name}.{column}"] = result.rowcount
+
+    clients = Client.__table__
+    actual = last_ticket_subquery(clients)
+    result = conn.execute(
+        update(clients)
+        .where(clients.c.last_ticket_at.is_distinct_from(actual))
+        .values(last_ticket_at=actual)
+    )
+    fixed["clients.last_ticket_at"] = result.rowcount
+    return fixed
+
+
+def reconcile_low_stock(conn) -> int:
+    """Счетчик запчастей с низким запасом (app/models/stock_counter.py)"""
+    table = PartStockCounter.__table__
+    actual = select(func.count()).select_from(Part).where(Part.is_low_stock).scalar_subquery()
+    result = conn.execute(
+        update(table).where(table.c.name == LOW_STOCK, table.c.count != actual).values(count=actual)
+    )
+    if conn.execute(select(table.c.count).where(table.c.name == LOW_STOCK)).first() is None:
+        conn.execute(table.insert().values(name=LOW_STOCK, count=actual))
+        return 1
+    return result.rowcount
+
+
+def reconcile_all() -> dict:
+    """Сверка в отдельной транзакции"""
+    with engine.begin() as conn:
+        fixed = reconcile(conn)
+    drift = {name: rows for name, rows in fixed.items() if rows}
+    if drift:
+        logger.warning(f"Counters drift repaired: {drift}")
+    return fixed
+
+
+async def reconcile_periodically(interval: float = COUNTERS_RECONCILE_INTERVAL):
+    """Фоновая задача: сверка в пуле db_executor раз в interval секунд"""
+    from app.core.executor import run_db
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_db("counters.reconcile", reconcile_all)
+        except Exception as e:
+            logger.error(f"Error reconciling counters: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.core.counters")
+    parser.add_argument("command", choices=["reconcile"])
+    parser.parse_args(argv)
+
+    fixed = reconcile_all()
+    print("✅ Сверка счетчиков завершена")
+    for name, rows in fixed.items():
+        print(f"   {name}: исправлено строк - {rows}")
+
+
+if __name__ == "__main__":
+    main()
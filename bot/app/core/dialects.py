@@ -0,0 +1,114 @@
+# app/core/dialects.py
+"""
+SQL-функции дат, которые по-разному пишутся в MySQL и SQLite
+
+Статистика работает на MySQL, а тесты и бенчмарки - на SQLite.
+Выражения собираются через sql_functions(bind), новый диалект
+добавляется регистрацией класса в DIALECTS.
+"""
+from sqlalchemy import func, cast, type_coerce, Integer, Float, literal, literal_column, and_, or_
+from sqlalchemy.dialects import mysql, sqlite
+
+
+class MySQLFunctions:
+    """MySQL / MariaDB"""
+
+    def day(self, column):
+        """Дата без времени"""
+        return func.date(column)
+
+    def week(self, column):
+        """Понедельник недели"""
+        return func.subdate(func.date(column), func.weekday(column))
+
+    def month(self, column):
+        """Первое число месяца"""
+        return func.date_format(column, "%Y-%m-01")
+
+    def weekday(self, column):
+        """День недели: 0 = понедельник, 6 = воскресенье"""
+        return func.weekday(column)
+
+    def format_datetime(self, column):
+        """Строка "ДД.ММ.ГГГГ ЧЧ:ММ" (NULL остается NULL)"""
+        return func.date_format(column, "%d.%m.%Y %H:%i")
+
+    def hours_between(self, start, end):
+        return func.timestampdiff(literal_column("SECOND"), start, end) / 3600.0
+
+    def greatest(self, *values):
+        return func.greatest(*values)
+
+    def fulltext(self, columns, words):
+        """(условие, релевантность): все слова, каждое - как префикс
+
+        Нужен FULLTEXT-индекс ровно по columns.
+        """
+        expr = mysql.match(*columns, against=" ".join(f"+{word}*" for word in words))
+        expr = expr.in_boolean_mode()
+        return expr, type_coerce(expr, Float)
+
+    def upsert_add(self, table, keys: dict, column: str, delta: int):
+        """INSERT строки с column = delta или column + delta, если ключ уже есть"""
+        stmt = mysql.insert(table).values(**keys, **{column: delta})
+        return stmt.on_duplicate_key_update({column: table.c[column] + delta})
+
+
+class SQLiteFunctions:
+    """SQLite (даты хранятся строками ISO)"""
+
+    def day(self, column):
+        return func.date(column)
+
+    def week(self, column):
+        return func.date(column, "weekday 0", "-6 days")
+
+    def month(self, column):
+        return func.strftime("%Y-%m-01", column)
+
+    def weekday(self, column):
+        # strftime('%w') дает 0 = воскресенье
+        return (cast(func.strftime("%w", column), Integer) + 6) % 7
+
+    def format_datetime(self, column):
+        return func.strftime("%d.%m.%Y %H:%M", column)
+
+    def hours_between(self, start, end):
+        return (func.julianday(end) - func.julianday(start)) * 24.0
+
+    def greatest(self, *values):
+        # Скалярный max(a, b, ...) в SQLite
+        return func.max(*values)
+
+    def fulltext(self, columns, words):
+        # Без полнотекстового индекса: LIKE по каждому слову, релевантность 1
+        condition = and_(*(
+            or_(*(column.contains(word, autoescape=True) for column in columns))
+            for word in words
+        ))
+        return condition, literal(1.0)
+
+    def upsert_add(self, table, keys: dict, column: str, delta: int):
+        stmt = sqlite.insert(table).values(**keys, **{column: delta})
+        return stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: table.c[column] + delta}
+        )
+
+
+DIALECTS = {
+    "mysql": MySQLFunctions(),
+    "mariadb": MySQLFunctions(),
+    "sqlite": SQLiteFunctions(),
+}
+
+
+def sql_functions(bind):
+    """Функции для движка/соединения/сессии (по имени диалекта)"""
+    if hasattr(bind, "get_bind"):
+        bind = bind.get_bind()
+    name = bind.dialect.name
+    try:
+        return DIALECTS[name]
+    except KeyError:
+        raise ValueError(f"Диалект {name} не поддерживается статистикой")
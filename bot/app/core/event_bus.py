@@ -0,0 +1,206 @@
+# app/core/event_bus.py
+"""
+Шина доменных событий внутри процесса
+
+Сервисы и слушатели сессии не уведомляют Telegram и не трогают сокеты
+сами: они откладывают событие в сессию через emit(session, event).
+После успешного commit события уходят подписчикам, после rollback -
+отбрасываются. Типы событий - app/models/domain_events.py.
+
+Подписчик - корутина. Он выполняется в том event loop, из которого
+подписался: уведомления Telegram - в цикле бота, хаб WebSocket - в цикле
+uvicorn. Подписчики одного события работают параллельно, каждый со своим
+таймаутом; ошибка одного подписчика попадает в лог и метрики и не
+мешает остальным. Порядок доставки разных событий одному подписчику не
+гарантируется.
+
+События других процессов (воркеров uvicorn, бота) приходят через
+app/core/fanout.py и публикуются с remote=True; подписчик с
+remote=False их не получает, подписчик с local=False получает только их.
+
+Пример (внутри запущенного event loop, например в startup):
+    async def on_created(event: TicketCreated): ...
+    bus.subscribe(TicketCreated, on_created)
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import EVENT_HANDLER_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriberStats:
+    """Доставки одному подписчику"""
+
+    def __init__(self):
+        self.delivered = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.dropped = 0
+        self.run_total = 0.0
+        self.run_max = 0.0
+
+    def to_dict(self):
+        finished = self.delivered + self.failed or 1
+        return {
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "dropped": self.dropped,
+            "run_avg_ms": round(self.run_total / finished * 1000, 2),
+            "run_max_ms": round(self.run_max * 1000, 2)
+        }
+
+
+class Subscription:
+    def __init__(self, event_types, handler, name: str, loop, timeout: float, remote: bool, local: bool):
+        self.event_types = event_types
+        self.handler = handler
+        self.name = name
+        self.loop = loop
+        self.timeout = timeout
+        self.remote = remote
+        self.local = local
+        self.stats = SubscriberStats()
+
+
+class EventBus:
+    """Подписки по типу события (с учетом наследования)"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._subscriptions = []
+        self.published = 0
+        self.received_remote = 0
+
+    def subscribe(self, event_types, handler, name: str = None, timeout: float = None,
+                  remote: bool = True, local: bool = True):
+        """Подписать корутину handler(event) на тип или кортеж типов
+
+        Вызывается внутри запущенного event loop - в нем и будет
+        выполняться handler. remote=False - только события этого процесса,
+        local=False - только события других процессов.
+        """
+        if not isinstance(event_types, tuple):
+            event_types = (event_types,)
+        subscription = Subscription(
+            event_types, handler,
+            name or f"{handler.__module__.rsplit('.', 1)[-1]}.{handler.__name__}",
+            asyncio.get_running_loop(),
+            self.timeout if timeout is None else timeout,
+            remote,
+            local
+        )
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, domain_event, remote: bool = False):
+        """Разослать событие; можно вызывать из любого потока"""
+        with self._lock:
+            subscriptions = [
+                s for s in self._subscriptions
+                if isinstance(domain_event, s.event_types) and (s.remote if remote else s.local)
+            ]
+            if remote:
+                self.received_remote += 1
+            else:
+                self.published += 1
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for subscription in subscriptions:
+            loop = subscription.loop
+            if loop.is_closed():
+                subscription.stats.dropped += 1
+                continue
+            delivery = self._deliver(subscription, domain_event)
+            if loop is running:
+                loop.create_task(delivery)
+            else:
+                try:
+                    asyncio.run_coroutine_threadsafe(delivery, loop)
+                except RuntimeError:
+                    delivery.close()
+                    subscription.stats.dropped += 1
+
+    async def _deliver(self, subscription: Subscription, domain_event):
+        stats = subscription.stats
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(subscription.handler(domain_event), subscription.timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            stats.failed += 1
+            logger.error(f"Event handler {subscription.name} timed out on {type(domain_event).__name__}")
+        except Exception as e:
+            stats.failed += 1
+            logger.error(f"Event handler {subscription.name} failed on {domain_event}: {e}", exc_info=True)
+        else:
+            stats.delivered += 1
+        finally:
+            run = time.perf_counter() - started
+            stats.run_total += run
+            stats.run_max = max(stats.run_max, run)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "published": self.published,
+                "received_remote": self.received_remote,
+                "subscribers": {
+                    s.name: {
+                        "events": [t.__name__ for t in s.event_types],
+                        "remote": s.remote,
+                        "local": s.local,
+                        **s.stats.to_dict()
+                    }
+                    for s in self._subscriptions
+                }
+            }
+
+
+bus = EventBus(EVENT_HANDLER_TIMEOUT)
+
+
+# Публикация после commit: события копятся в session.info
+
+_PENDING = "domain_events_pending"
+
+
+def emit(session, domain_event):
+    """Отложить событие до commit сессии (AsyncSession - тоже)"""
+    session = getattr(session, "sync_session", session)
+    session.info.setdefault(_PENDING, []).append(domain_event)
+
+
+def origin(session) -> str:
+    """Откуда изменение: "web" (SessionLocal) или "bot" (AsyncSessionLocal)"""
+    return session.info.get("origin", "web")
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    for domain_event in session.info.pop(_PENDING, ()):
+        try:
+            bus.publish(domain_event)
+        except Exception as e:
+            logger.error(f"Error publishing {domain_event}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,144 @@
+# app/core/executor.py
+"""
+Общий пул потоков для синхронной работы с БД из async-эндпоинтов
+
+Эндпоинты FastAPI объявлены как `async def`, а запросы через SessionLocal
+блокирующие. Чтобы медленный запрос статистики не замораживал event loop
+uvicorn, такие вызовы выполняются в ограниченном пуле потоков.
+Если пул и очередь заполнены, запрос сразу получает 503.
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.config import DB_EXECUTOR_WORKERS, DB_EXECUTOR_QUEUE_LIMIT
+
+
+class EndpointStats:
+    """Время ожидания потока и время выполнения для одного эндпоинта"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+
+    def to_dict(self):
+        finished = self.calls or 1
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "wait_avg_ms": round(self.wait_total / finished * 1000, 2),
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "run_avg_ms": round(self.run_total / finished * 1000, 2),
+            "run_max_ms": round(self.run_max * 1000, 2)
+        }
+
+
+class DBExecutor:
+    """Ограниченный пул потоков с лимитом очереди и метриками"""
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {}
+
+    def _endpoint(self, name: str) -> EndpointStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = EndpointStats()
+        return stats
+
+    def _call(self, name, submitted_at, fn, args, kwargs):
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            finished_at = time.perf_counter()
+            wait = started_at - submitted_at
+            run = finished_at - started_at
+            with self._lock:
+                stats = self._endpoint(name)
+                stats.calls += 1
+                stats.errors += int(failed)
+                stats.wait_total += wait
+                stats.run_total += run
+                stats.wait_max = max(stats.wait_max, wait)
+                stats.run_max = max(stats.run_max, run)
+
+    async def run(self, name: str, fn, *args, **kwargs):
+        """Выполнить синхронную функцию в пуле и дождаться результата"""
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                self._endpoint(name).rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Сервер перегружен, повторите запрос позже",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._pool,
+                self._call, name, time.perf_counter(), fn, args, kwargs
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "pending": self._pending,
+                "queued": max(self._pending - self.workers, 0),
+                "endpoints": {
+                    name: stats.to_dict()
+                    for name, stats in sorted(self._stats.items())
+                }
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+db_executor = DBExecutor(DB_EXECUTOR_WORKERS, DB_EXECUTOR_QUEUE_LIMIT)
+
+
+async def run_db(name: str, fn, *args, **kwargs):
+    """Короткая запись для db_executor.run(...)"""
+    return await db_executor.run(name, fn, *args, **kwargs)
+
+
+def offload(name: str = None):
+    """Декоратор: синхронный эндпоинт выполняется в пуле db_executor
+
+    Сигнатура функции сохраняется, поэтому FastAPI видит те же параметры.
+    """
+    def decorator(fn):
+        endpoint = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await db_executor.run(endpoint, fn, *args, **kwargs)
+
+        return wrapper
+    return decorator
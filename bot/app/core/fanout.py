@@ -0,0 +1,128 @@
+# app/core/fanout.py
+"""
+Пересылка событий между процессами через app/core/backplane.py
+
+Канал "events": доменные события, зафиксированные в этом процессе,
+уходят остальным и там публикуются в шину с remote=True. Поэтому хаб
+WebSocket любого воркера просыпается сразу после commit в другом
+воркере или в боте, бейдж склада пересчитывается везде, а уведомления
+Telegram о правках из веб-админки доходят до процесса бота.
+
+Канал "realtime": произвольные сообщения hub.broadcast() для всех
+сокетов всех воркеров. Изменения заявок по этому каналу не идут: каждый
+воркер читает их из своей ленты, иначе клиенты получили бы их дважды.
+
+Запуск - start_fanout() в startup веб-приложения и в on_startup бота;
+повторный вызов в том же процессе ничего не делает, после stop_fanout()
+можно запустить снова.
+"""
+import asyncio
+import logging
+import os
+import threading
+import typing
+from dataclasses import fields
+from datetime import datetime
+
+from app.core.backplane import backplane, warn_if_local
+from app.core.event_bus import bus
+from app.core.realtime import hub
+from app.models.domain_events import DomainEvent
+
+logger = logging.getLogger(__name__)
+
+EVENTS = "events"
+REALTIME = "realtime"
+
+_lock = threading.Lock()
+_started = False
+_forward = None
+
+
+def _event_types(cls=DomainEvent):
+    types = {cls.__name__: cls}
+    for subclass in cls.__subclasses__():
+        types.update(_event_types(subclass))
+    return types
+
+
+EVENT_TYPES = _event_types()
+
+
+def _datetime_fields(cls):
+    hints = typing.get_type_hints(cls)
+    return {
+        name for name, hint in hints.items()
+        if hint is datetime or datetime in typing.get_args(hint)
+    }
+
+
+DATETIME_FIELDS = {name: _datetime_fields(cls) for name, cls in EVENT_TYPES.items()}
+
+
+def encode_event(domain_event) -> dict:
+    data = {field.name: getattr(domain_event, field.name) for field in fields(domain_event)}
+    data["type"] = type(domain_event).__name__
+    return data
+
+
+def decode_event(data: dict):
+    """Событие из encode_event (datetime приходит строкой ISO)"""
+    data = dict(data)
+    name = data.pop("type")
+    for field in DATETIME_FIELDS[name]:
+        if isinstance(data.get(field), str):
+            data[field] = datetime.fromisoformat(data[field])
+    return EVENT_TYPES[name](**data)
+
+
+async def _forward_event(domain_event):
+    backplane.publish(EVENTS, encode_event(domain_event))
+
+
+async def _receive_event(data):
+    try:
+        domain_event = decode_event(data)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Fanout: unknown event {data!r}: {e}")
+        return
+    bus.publish(domain_event, remote=True)
+
+
+async def _receive_broadcast(data):
+    hub.publish(data)
+
+
+async def start_fanout():
+    """Подключиться к backplane (один раз на процесс, в текущем event loop)"""
+    global _started, _forward
+    with _lock:
+        if _started:
+            return
+        _started = True
+    backplane.on(EVENTS, _receive_event)
+    backplane.on(REALTIME, _receive_broadcast)
+    # uvicorn --workers N читает то же WEB_CONCURRENCY
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        warn_if_local(f"WEB_CONCURRENCY={os.getenv('WEB_CONCURRENCY')}")
+    await backplane.start()
+    _forward = bus.subscribe(DomainEvent, _forward_event, "fanout.forward", remote=False)
+    logger.info(f"Fanout: {type(backplane).__name__} started")
+
+
+async def stop_fanout():
+    """Закрыть backplane, если он запущен в текущем event loop"""
+    global _started, _forward
+    if backplane.started and backplane.loop is asyncio.get_running_loop():
+        await backplane.close()
+        if _forward is not None:
+            bus.unsubscribe(_forward)
+            _forward = None
+        with _lock:
+            _started = False
+
+
+def broadcast(message: dict):
+    """Сообщение всем сокетам всех процессов"""
+    hub.publish(message)
+    backplane.publish(REALTIME, message)
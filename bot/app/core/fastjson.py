@@ -0,0 +1,63 @@
+# app/core/fastjson.py
+"""
+Быстрая сериализация JSON для списков
+
+FastJSONResponse кодирует ответ через orjson, если он установлен
+(pip install orjson), иначе - стандартным json. Эндпоинт возвращает
+готовый ответ, поэтому FastAPI не прогоняет данные через
+jsonable_encoder: datetime, date, Decimal и Enum кодируются здесь.
+
+packb - то же в MessagePack (pip install msgpack) для клиентов,
+которые его запросили; без пакета MSGPACK = False.
+
+Пример:
+    return FastJSONResponse({"success": True, "data": rows})
+"""
+import json
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK = msgpack is not None
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def packb(content) -> bytes:
+    """MessagePack с теми же правилами для datetime, Decimal и Enum"""
+    return msgpack.packb(content, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse с orjson и без jsonable_encoder"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,127 @@
+# app/core/http_cache.py
+"""
+Условные GET для списков и опрашиваемых эндпоинтов: ETag и 304
+
+Дашборд и боковая панель регулярно перезапрашивают одни и те же данные.
+Перед вызовом эндпоинта считается отпечаток таблиц, из которых строится
+ответ, одним маленьким запросом: версии таблиц из table_versions
+(app/models/table_version.py), для tickets - последний seq журнала
+ticket_changes. Оба счетчика меняются в транзакции записи, в любом
+процессе, при любой правке или удалении. ETag - хэш пути, параметров
+запроса и отпечатка. Если он совпал с If-None-Match, эндпоинт не
+вызывается и ничего не сериализуется: ответ 304 без тела.
+
+Cache-Control: no-cache, поэтому браузер сам повторяет запрос с
+If-None-Match и подставляет тело из своего кэша - fetch() в шаблонах
+менять не нужно. Last-Modified не отдается: времени изменения у
+версии нет.
+
+Пример:
+    @router.get("/stats/all")
+    @conditional("parts", "part_categories", "part_suppliers")
+    @offload()
+    def get_part_stats(): ...
+"""
+import functools
+import hashlib
+import inspect
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import select, func
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.core.executor import run_db
+from app.core.fastjson import FastJSONResponse
+from app.models.table_version import TableVersion
+from app.models.ticket_change import TicketChange
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _version(name: str):
+    if name == "tickets":
+        return select(func.max(TicketChange.seq))
+    return select(TableVersion.version).where(TableVersion.name == name)
+
+
+def fingerprint_statement(tables):
+    """SELECT (версия) по каждой таблице"""
+    return select(*(_version(name).scalar_subquery() for name in tables))
+
+
+def table_fingerprint(tables) -> tuple:
+    db = SessionLocal()
+    try:
+        return tuple(db.execute(fingerprint_statement(tables)).one())
+    finally:
+        db.close()
+
+
+def make_etag(request: Request, fingerprint) -> str:
+    """Слабый ETag: тело одно и то же, но может отдаваться сжатым"""
+    key = f"{request.url.path}?{request.url.query}|{fingerprint!r}"
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:]
+    return any(
+        candidate.strip() in (etag, opaque)
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _with_request(signature):
+    """Сигнатура эндпоинта и имя параметра Request (добавляется, если нет)"""
+    for parameter in signature.parameters.values():
+        if parameter.annotation is Request:
+            return signature, parameter.name, False
+    name = "http_cache_request"
+    parameters = [
+        *signature.parameters.values(),
+        inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+    ]
+    return signature.replace(parameters=parameters), name, True
+
+
+def conditional(*tables):
+    """Декоратор: ETag по отпечатку tables и 304 на совпавший If-None-Match
+
+    Ставится над offload (или над обычной функцией - она выполняется в
+    пуле потоков, как это делает FastAPI). Ответ, который эндпоинт
+    вернул не объектом Response, кодируется через FastJSONResponse.
+    """
+    def decorator(fn):
+        signature, request_name, added = _with_request(inspect.signature(fn))
+        endpoint = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.pop(request_name) if added else kwargs[request_name]
+            # Отпечаток до вызова: запись между ним и ответом даст лишний
+            # 200 на следующем опросе, но не устаревшее тело под новым ETag
+            fingerprint = await run_db(f"{endpoint}.etag", table_fingerprint, tables)
+            etag = make_etag(request, fingerprint)
+            headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+
+            if inspect.iscoroutinefunction(fn):
+                result = await fn(*args, **kwargs)
+            else:
+                result = await run_in_threadpool(fn, *args, **kwargs)
+            if not isinstance(result, Response):
+                result = FastJSONResponse(result)
+            if result.status_code == 200:
+                result.headers.update(headers)
+            return result
+
+        wrapper.__signature__ = signature
+        return wrapper
+    return decorator
@@ -0,0 +1,124 @@
+# app/core/pagination.py
+"""
+Keyset-пагинация списков заявок по (колонка сортировки, id)
+
+Страница - строки "после курсора" в порядке sort DESC, id DESC (или ASC).
+Запрос читает limit + 1 строку по индексу (колонка, id), поэтому время
+ответа не растет с глубиной истории, в отличие от OFFSET.
+Курсор - значение колонки и id последней строки страницы, короткая
+строка без спецсимволов: помещается в URL и в callback_data Telegram.
+
+NULL в MySQL и SQLite меньше любого значения: при DESC такие строки идут
+последними, при ASC - первыми. Условие курсора учитывает это явно.
+
+Пример:
+    stmt = keyset_page(select(Ticket), Ticket.created_at, Ticket.id, cursor, limit)
+    tickets, next_cursor = split_page(db.execute(stmt).scalars().all(), limit)
+"""
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from app.config import TICKETS_PAGE_SIZE, TICKETS_PAGE_SIZE_MAX
+
+_CURSOR_TIME = "%Y%m%d%H%M%S%f"
+
+
+def page_size(limit: int = None) -> int:
+    """Размер страницы с ограничением сверху"""
+    if not limit or limit < 1:
+        return TICKETS_PAGE_SIZE
+    return min(limit, TICKETS_PAGE_SIZE_MAX)
+
+
+def _encode_value(value) -> str:
+    if value is None:
+        return "n"
+    if isinstance(value, datetime):
+        return "t" + value.strftime(_CURSOR_TIME)
+    if isinstance(value, int):
+        return f"i{value}"
+    encoded = base64.urlsafe_b64encode(str(value).encode()).decode().rstrip("=")
+    return "s" + encoded
+
+
+def _decode_value(raw: str):
+    kind, payload = raw[:1], raw[1:]
+    if kind == "n" and not payload:
+        return None
+    if kind == "t":
+        return datetime.strptime(payload, _CURSOR_TIME)
+    if kind == "i":
+        return int(payload)
+    if kind == "s":
+        return base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)).decode()
+    raise ValueError(raw)
+
+
+def encode_cursor(value, row_id: int) -> str:
+    return f"{_encode_value(value)}.{row_id}"
+
+
+def decode_cursor(cursor: str):
+    """(значение, id); ValueError для испорченного курсора"""
+    try:
+        value, _, row_id = cursor.rpartition(".")
+        return _decode_value(value), int(row_id)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Некорректный курсор: {cursor}")
+
+
+def cursor_position(cursor: str, column):
+    """(значение, id) курсора для сортировки по column
+
+    ValueError, если курсор испорчен или получен при другой сортировке.
+    """
+    value, row_id = decode_cursor(cursor)
+    if value is not None and not isinstance(value, column.type.python_type):
+        raise ValueError(f"Курсор не подходит к сортировке: {cursor}")
+    return value, row_id
+
+
+def _after(column, id_column, value, row_id, descending: bool):
+    """Строки строго после (value, row_id) в порядке сортировки"""
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < row_id)
+        return or_(
+            column < value,
+            and_(column == value, id_column < row_id),
+            column.is_(None)
+        )
+    if value is None:
+        return or_(column.is_not(None), and_(column.is_(None), id_column > row_id))
+    return or_(column > value, and_(column == value, id_column > row_id))
+
+
+def keyset_page(stmt, column, id_column, cursor: str = None, limit: int = None, descending: bool = True):
+    """Условие "после курсора", сортировка и LIMIT limit + 1
+
+    Подходит и для select(), и для db.query(). Условие записано через OR, а
+    не сравнением кортежей: так MySQL использует диапазон по индексу.
+    """
+    if cursor:
+        value, row_id = cursor_position(cursor, column)
+        stmt = stmt.where(_after(column, id_column, value, row_id, descending))
+    if descending:
+        stmt = stmt.order_by(column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(column.asc(), id_column.asc())
+    return stmt.limit(page_size(limit) + 1)
+
+
+def split_page(rows, limit: int = None, sort_key: str = "created_at"):
+    """(строки страницы, курсор следующей страницы или None)
+
+    sort_key - атрибут строки со значением колонки сортировки.
+    """
+    limit = page_size(limit)
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(getattr(last, sort_key), last.id)
@@ -0,0 +1,148 @@
+# app/core/pools.py
+"""
+Центральная фабрика движков SQLAlchemy
+
+Все движки создаются здесь с настройками пула из app/config.py.
+Веб-админка и бот получают отдельные бюджеты соединений, а по каждому
+пулу собирается телеметрия: время ожидания соединения, занятые
+соединения, выходы за pool_size и таймауты.
+"""
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from app.config import (
+    WEB_DB_POOL_SIZE, WEB_DB_MAX_OVERFLOW,
+    BOT_DB_POOL_SIZE, BOT_DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_POOL_TIMEOUT
+)
+
+POOL_BUDGETS = {
+    "web": {"pool_size": WEB_DB_POOL_SIZE, "max_overflow": WEB_DB_MAX_OVERFLOW},
+    "bot": {"pool_size": BOT_DB_POOL_SIZE, "max_overflow": BOT_DB_MAX_OVERFLOW},
+}
+
+
+class PoolTelemetry:
+    """Счетчики одного пула"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_events = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def record_overflow(self):
+        with self._lock:
+            self.overflow_events += 1
+
+    def to_dict(self):
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "overflow_events": self.overflow_events,
+                "checkout_wait_avg_ms": round(self.wait_total / (self.checkouts or 1) * 1000, 2),
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 2),
+            }
+        if self.pool is not None:
+            data.update({
+                "pool_size": self.pool.size(),
+                "checked_out": self.pool.checkedout(),
+                "checked_in": self.pool.checkedin(),
+                "overflow": max(self.pool.overflow(), 0),
+            })
+        return data
+
+
+_telemetry = {}
+
+
+def _telemetry_for(name: str) -> PoolTelemetry:
+    if name not in _telemetry:
+        _telemetry[name] = PoolTelemetry(name)
+    return _telemetry[name]
+
+
+class _TimedCheckout:
+    """Замер ожидания соединения внутри QueuePool._do_get"""
+
+    telemetry = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.telemetry:
+                self.telemetry.record_wait(0, timed_out=True)
+            raise
+        if self.telemetry:
+            self.telemetry.record_wait(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options(subsystem: str) -> dict:
+    return {
+        **POOL_BUDGETS[subsystem],
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+
+
+def _attach(pool, subsystem: str):
+    telemetry = _telemetry_for(subsystem)
+    telemetry.pool = pool
+    pool.telemetry = telemetry
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Счетчик overflow увеличивается до открытия соединения
+        if pool.overflow() > 0:
+            telemetry.record_overflow()
+
+
+def make_engine(url, subsystem: str = "web", **kwargs):
+    """Синхронный движок с пулом подсистемы"""
+    engine = create_engine(url, poolclass=TimedQueuePool, **_pool_options(subsystem), **kwargs)
+    _attach(engine.pool, subsystem)
+    return engine
+
+
+def make_async_engine(url, subsystem: str = "bot", **kwargs):
+    """Асинхронный движок с пулом подсистемы"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(url, poolclass=TimedAsyncQueuePool, **_pool_options(subsystem), **kwargs)
+    _attach(engine.sync_engine.pool, subsystem)
+    return engine
+
+
+def pool_stats() -> dict:
+    """Телеметрия всех созданных пулов"""
+    return {name: telemetry.to_dict() for name, telemetry in sorted(_telemetry.items())}
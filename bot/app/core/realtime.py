@@ -1,17 +1,368 @@
-class Manager:
+# app/core/realtime.py
+"""
+Общий хаб обновлений заявок для WebSocket-клиентов
 
-    def __init__(self):
-        self.clients = []
+Изменения ищет один опросчик ленты app/core/change_feed.py на весь
+процесс, а не каждый сокет: запрос к БД не зависит от числа вкладок.
+Событие заявки из шины app/core/event_bus.py будит опросчик сразу:
+commit в этом процессе (веб или бот) или, через backplane
+(app/core/fanout.py), в другом воркере. Без backplane изменения из
+других процессов приходят не позже чем через REALTIME_POLL_INTERVAL
+секунд. Изменения за REALTIME_COALESCE_WINDOW после пробуждения уходят
+одним сообщением.
 
-    async def connect(self, ws):
+Хаб держит в памяти список заявок (формат /api/admin/tickets), пока
+подключен хотя бы один клиент. Новый клиент получает его снимком,
+дальше - только отличия от снимка в виде операций JSON Patch (RFC 6902)
+с путями по id заявки: вместо всего списка - несколько полей.
+
+Сообщение кодируется один раз на кодировку и кладется в очередь каждого
+клиента. Отправкой занимается отдельная задача клиента, поэтому
+медленный сокет не задерживает остальных. Клиент, у которого очередь
+переполнилась или отправка дольше REALTIME_SEND_TIMEOUT, отключается
+(код 1013) и должен переподключиться - он получит новый снимок.
+
+Сообщения (/ws?encoding=msgpack - бинарные кадры MessagePack, если
+установлен пакет msgpack, иначе и по умолчанию - текстовые кадры JSON):
+    {"type": "snapshot", "cursor": N, "tickets": {"<id>": {...}, ...}}
+    {"type": "patch", "cursor": N, "ops": [
+        {"op": "add", "path": "/<id>", "value": {...}},
+        {"op": "replace", "path": "/<id>/status", "value": "Готово"},
+        {"op": "remove", "path": "/<id>"}]}
+Если журнал изменений после курсора уже очищен, всем клиентам заново
+отправляется снимок.
+"""
+import asyncio
+import logging
+
+from app.config import (
+    REALTIME_POLL_INTERVAL, REALTIME_CLIENT_QUEUE, REALTIME_SEND_TIMEOUT,
+    REALTIME_COALESCE_WINDOW
+)
+from app.database import SessionLocal
+from app.core import change_feed
+from app.core.event_bus import bus
+from app.core.executor import run_db
+from app.core.fastjson import dumps, packb, MSGPACK
+from app.models.domain_events import TicketEvent
+from app.services.ticket_service_compat import all_ticket_rows
+
+logger = logging.getLogger(__name__)
+
+# Код закрытия "перегрузка, попробуйте позже"
+CLOSE_TRY_AGAIN = 1013
+
+ENCODINGS = ("json", "msgpack")
+
+
+class Frame:
+    """Сообщение, закодированное не больше одного раза на кодировку"""
+
+    __slots__ = ("message", "_encoded")
+
+    def __init__(self, message: dict):
+        self.message = message
+        self._encoded = {}
+
+    def encode(self, encoding: str):
+        """str для json (текстовый кадр), bytes для msgpack"""
+        data = self._encoded.get(encoding)
+        if data is None:
+            if encoding == "msgpack":
+                data = packb(self.message)
+            else:
+                data = dumps(self.message).decode()
+            self._encoded[encoding] = data
+        return data
+
+
+def ticket_patch(state: dict, changes) -> list:
+    """Операции JSON Patch для изменений ленты; state обновляется
+
+    Строки в state заменяются целиком и не меняются на месте, поэтому
+    неглубокая копия state - согласованный снимок.
+    """
+    ops = []
+    for change in changes:
+        ticket_id = change["ticket_id"]
+        row = change["ticket"]
+        old = state.get(ticket_id)
+        if row is None:
+            if old is not None:
+                del state[ticket_id]
+                ops.append({"op": "remove", "path": f"/{ticket_id}"})
+            continue
+        state[ticket_id] = row
+        if old is None:
+            ops.append({"op": "add", "path": f"/{ticket_id}", "value": row})
+            continue
+        for field, value in row.items():
+            if old.get(field) != value:
+                ops.append({"op": "replace", "path": f"/{ticket_id}/{field}", "value": value})
+    return ops
+
+
+class Subscriber:
+    """Один сокет: своя очередь и своя задача отправки"""
+
+    def __init__(self, ws, queue_size: int, encoding: str = "json"):
+        self.ws = ws
+        self.encoding = encoding
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.task = None
+        self.evicted = False
+        self.sent = 0
+
+
+class TicketHub:
+    """Один опросчик ленты изменений и рассылка всем подписчикам"""
+
+    def __init__(self, poll_interval: float, queue_size: int, send_timeout: float,
+                 coalesce_window: float = 0.0):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.coalesce_window = coalesce_window
+        self.subscribers = set()
+        self.cursor = None
+        # {id заявки: строка} на момент cursor; None - не загружен
+        self.state = None
+        self._snapshot = None
+        self._state_lock = None
+        self._loop = None
+        self._wakeup = None
+        self._poller = None
+        self._subscription = None
+        self.connects = 0
+        self.disconnects = 0
+        self.evictions = 0
+        self.peak_connected = 0
+        self.published = 0
+        self.sent = 0
+        self.bytes_sent = 0
+        self.snapshots = 0
+        self.patches = 0
+        self.polls = 0
+        self.poll_errors = 0
+
+    # Подключение
+
+    async def connect(self, ws, encoding: str = "json") -> Subscriber:
+        if encoding not in ENCODINGS or (encoding == "msgpack" and not MSGPACK):
+            encoding = "json"
         await ws.accept()
-        self.clients.append(ws)
+        self._start()
+        subscriber = Subscriber(ws, self.queue_size, encoding)
+        async with self._state_lock:
+            if self.state is None:
+                await self._load()
+            subscriber.task = asyncio.create_task(self._send_loop(subscriber))
+            self.subscribers.add(subscriber)
+            subscriber.queue.put_nowait(self._snapshot_frame())
+        self.connects += 1
+        self.peak_connected = max(self.peak_connected, len(self.subscribers))
+        return subscriber
 
-    def disconnect(self, ws):
-        self.clients.remove(ws)
+    def disconnect(self, subscriber: Subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.discard(subscriber)
+            self.disconnects += 1
+        if subscriber.task is not None:
+            subscriber.task.cancel()
+
+    def _evict(self, subscriber: Subscriber, reason: str):
+        if subscriber.evicted:
+            return
+        subscriber.evicted = True
+        self.evictions += 1
+        logger.warning(f"Realtime: slow client evicted ({reason})")
+        self.disconnect(subscriber)
+        asyncio.create_task(self._close(subscriber.ws))
+
+    async def _close(self, ws):
+        try:
+            await ws.close(code=CLOSE_TRY_AGAIN)
+        except Exception:
+            pass
+
+    # Снимок
+
+    async def _load(self):
+        """Список и курсор одним чтением (вызывается под _state_lock)"""
+        self.cursor, rows = await run_db("realtime.snapshot", _snapshot)
+        self.state = {row["id"]: row for row in rows}
+        self._snapshot = None
+        self.snapshots += 1
+
+    def _snapshot_frame(self) -> Frame:
+        """Снимок текущего state, общий для клиентов до следующего изменения"""
+        if self._snapshot is None:
+            self._snapshot = Frame({
+                "type": "snapshot",
+                "cursor": self.cursor,
+                "tickets": dict(self.state),
+            })
+        return self._snapshot
+
+    # Рассылка
+
+    def publish(self, message: dict):
+        """Поставить сообщение в очередь каждому клиенту"""
+        self._enqueue(Frame(message))
+
+    def _enqueue(self, frame: Frame):
+        self.published += 1
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._evict(subscriber, "queue full")
 
     async def broadcast(self, data):
-        for c in self.clients:
-            await c.send_json(data)
+        """Прежний интерфейс: разослать произвольные данные"""
+        self.publish(data)
+
+    async def _send_loop(self, subscriber: Subscriber):
+        ws = subscriber.ws
+        while True:
+            frame = await subscriber.queue.get()
+            data = frame.encode(subscriber.encoding)
+            try:
+                if isinstance(data, bytes):
+                    await asyncio.wait_for(ws.send_bytes(data), self.send_timeout)
+                else:
+                    await asyncio.wait_for(ws.send_text(data), self.send_timeout)
+            except asyncio.TimeoutError:
+                self._evict(subscriber, "send timeout")
+                return
+            except Exception:
+                # Сокет закрыт - обработчик эндпоинта вызовет disconnect
+                self.disconnect(subscriber)
+                return
+            subscriber.sent += 1
+            self.sent += 1
+            self.bytes_sent += len(data)
+
+    # Опрос ленты изменений
+
+    def _start(self):
+        if self._poller is None or self._poller.done():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._state_lock = asyncio.Lock()
+            self._poller = asyncio.create_task(self._poll_loop())
+            if self._subscription is not None:
+                bus.unsubscribe(self._subscription)
+            self._subscription = bus.subscribe(TicketEvent, self._on_ticket_event, "realtime.wake")
+
+    async def _on_ticket_event(self, domain_event):
+        self._wakeup.set()
+
+    def wake(self):
+        """Проверить ленту сейчас; можно вызывать из любого потока"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+
+    async def _poll_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                # Пачка изменений (импорт, массовая смена статусов) - одно сообщение
+                if self.coalesce_window > 0:
+                    await asyncio.sleep(self.coalesce_window)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self.subscribers:
+                # Без клиентов список не нужен, при подключении загрузится заново
+                self.state = None
+                self._snapshot = None
+                self.cursor = None
+                continue
+            try:
+                async with self._state_lock:
+                    await self.poll()
+            except Exception as e:
+                self.poll_errors += 1
+                logger.error(f"Realtime: error polling ticket changes: {e}")
+
+    async def poll(self):
+        """Разослать одним сообщением все изменения после текущего курсора"""
+        if self.state is None:
+            await self._load()
+        ops = []
+        while True:
+            self.polls += 1
+            try:
+                batch = await run_db("realtime.poll", _changes, self.cursor)
+            except change_feed.ChangeFeedExpired:
+                # Пропущенные изменения не восстановить - всем новый снимок
+                await self._load()
+                self._enqueue(self._snapshot_frame())
+                return
+            ops.extend(ticket_patch(self.state, batch["changes"]))
+            self.cursor = batch["cursor"]
+            if not batch["has_more"]:
+                break
+        if ops:
+            self._snapshot = None
+            self.patches += 1
+            self.publish({"type": "patch", "cursor": self.cursor, "ops": ops})
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+        if self._subscription is not None:
+            bus.unsubscribe(self._subscription)
+        for subscriber in list(self.subscribers):
+            self.disconnect(subscriber)
+
+    def stats(self):
+        return {
+            "connected": len(self.subscribers),
+            "peak_connected": self.peak_connected,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "evictions": self.evictions,
+            "published": self.published,
+            "sent": self.sent,
+            "bytes_sent": self.bytes_sent,
+            "snapshots": self.snapshots,
+            "patches": self.patches,
+            "tickets": len(self.state) if self.state is not None else None,
+            "polls": self.polls,
+            "poll_errors": self.poll_errors,
+            "cursor": self.cursor,
+            "queue_size": self.queue_size,
+            "queued_max": max((s.queue.qsize() for s in self.subscribers), default=0),
+            "msgpack": MSGPACK,
+        }
+
+
+def _snapshot():
+    """(курсор, список): курсор читается первым, изменения после него
+    повторно применятся к списку без вреда"""
+    db = SessionLocal()
+    try:
+        cursor = change_feed.head(db)
+        return cursor, all_ticket_rows(db)
+    finally:
+        db.close()
+
+
+def _changes(since: int):
+    db = SessionLocal()
+    try:
+        return change_feed.changes_since(db, since)
+    finally:
+        db.close()
+
 
-manager = Manager()
+hub = TicketHub(
+    REALTIME_POLL_INTERVAL, REALTIME_CLIENT_QUEUE, REALTIME_SEND_TIMEOUT, REALTIME_COALESCE_WINDOW
+)
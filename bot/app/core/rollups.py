@@ -0,0 +1,126 @@
+# app/core/rollups.py
+"""
+Чтение и пересчет агрегатов заявок (app/models/rollup.py)
+
+Текущие значения поддерживаются слушателем сессии. Полный пересчет нужен
+после ручных правок tickets в обход ORM или при расхождении:
+    python -m app.core.rollups rebuild
+"""
+from datetime import datetime, date, time, timedelta
+import argparse
+
+from sqlalchemy import select, delete, func, case, and_, or_, literal, false
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.core.dialects import sql_functions
+from app.core.timeseries import bucket_query
+from app.models.ticket import Ticket
+from app.models.rollup import TicketDailyRollup, TicketStatusCounter, DEFAULT_STATUS
+
+Rollup = TicketDailyRollup
+
+
+def rebuild(conn):
+    """Пересчитать агрегаты из tickets внутри транзакции conn"""
+    sql = sql_functions(conn)
+    status = func.coalesce(Ticket.status, DEFAULT_STATUS)
+
+    conn.execute(delete(TicketDailyRollup))
+    conn.execute(delete(TicketStatusCounter))
+
+    day = sql.day(Ticket.created_at)
+    branch = func.coalesce(Ticket.branch, literal(""))
+    category = func.coalesce(Ticket.category, literal(""))
+    conn.execute(
+        TicketDailyRollup.__table__.insert().from_select(
+            ["day", "branch", "category", "status", "count"],
+            select(day, branch, category, status, func.count())
+            .where(Ticket.created_at.isnot(None))
+            .group_by(day, branch, category, status)
+        )
+    )
+    conn.execute(
+        TicketStatusCounter.__table__.insert().from_select(
+            ["status", "count"],
+            select(status, func.count()).group_by(status)
+        )
+    )
+
+
+def _as_day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def split_window(start: datetime, end: datetime):
+    """(условие по агрегату, условие по tickets) для created_at в [start, end]
+
+    Целые дни внутри периода читаются из агрегата (полуоткрытый диапазон
+    дней), неполные первый и последний день - из tickets по индексу
+    created_at. Сумма совпадает с COUNT(*) ... BETWEEN start AND end.
+    """
+    first, last = _as_day(start), _as_day(end)
+    if first >= last:
+        return false(), Ticket.created_at.between(start, end)
+    whole_days = and_(Rollup.day > first, Rollup.day < last)
+    edges = or_(
+        and_(Ticket.created_at >= start, Ticket.created_at < datetime.combine(first + timedelta(days=1), time.min)),
+        and_(Ticket.created_at >= datetime.combine(last, time.min), Ticket.created_at <= end)
+    )
+    return whole_days, edges
+
+
+def sum_where(*conditions):
+    """SUM(count) по строкам агрегата, подходящим под условия"""
+    if not conditions:
+        return func.coalesce(func.sum(Rollup.count), 0)
+    return func.coalesce(func.sum(case((and_(*conditions), Rollup.count), else_=0)), 0)
+
+
+def status_counts(db) -> dict:
+    """{статус: количество заявок} по всем заявкам"""
+    rows = db.query(TicketStatusCounter.status, TicketStatusCounter.count).all()
+    return {status: int(count) for status, count in rows if count}
+
+
+def created_on(db, day) -> int:
+    """Заявок создано за день"""
+    return int(db.query(sum_where()).filter(Rollup.day == _as_day(day)).scalar())
+
+
+def counts_by(db, column, *conditions) -> dict:
+    """{значение column: количество заявок}, column - branch/category/status"""
+    rows = (
+        db.query(column, func.sum(Rollup.count))
+        .filter(*conditions)
+        .group_by(column)
+        .all()
+    )
+    return {value: int(count) for value, count in rows if count}
+
+
+def trend_query(bind, granularity: str, start, end, *filters):
+    """bucket_query по агрегату: ряд количества заявок за [start, end)"""
+    return bucket_query(
+        bind, Rollup.day, granularity, _as_day(start), _as_day(end), *filters,
+        value=func.sum(Rollup.count)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.core.rollups")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args(argv)
+
+    with engine.begin() as conn:
+        rebuild(conn)
+    with Session(engine) as db:
+        counts = status_counts(db)
+        days = db.query(func.count()).select_from(Rollup).scalar()
+    print(f"✅ Агрегаты пересчитаны: {sum(counts.values())} заявок, {days} строк по дням")
+    for status, count in sorted(counts.items()):
+        print(f"   {status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
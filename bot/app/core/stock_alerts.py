@@ -0,0 +1,112 @@
+# app/core/stock_alerts.py
+"""
+SSE-поток счетчика запчастей с низким запасом для бейджа в сайдбаре
+
+Вкладки держат открытым GET /api/parts/low-stock/stream. Пока остатки не
+пересекают min_stock, поток не трогает БД: раз в SSE_KEEPALIVE секунд
+уходит только комментарий-пинг. Событие LowStockCrossed из шины
+(app/core/event_bus.py) один раз читает счетчик и, если число изменилось,
+рассылает его всем вкладкам. У каждой вкладки очередь на одно значение:
+медленный клиент получает последнее число, а не всю историю.
+
+Формат:
+    event: low_stock
+    data: {"count": 3}
+"""
+import asyncio
+import logging
+
+from app.config import SSE_KEEPALIVE
+from app.core.event_bus import bus
+from app.core.executor import run_db
+from app.core.fastjson import dumps
+from app.models.domain_events import LowStockCrossed
+from app.services.part_service import get_low_stock_count
+
+logger = logging.getLogger(__name__)
+
+
+def sse_message(event: str, data) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+class LowStockStream:
+    """Последнее значение счетчика и очереди подключенных вкладок"""
+
+    def __init__(self, keepalive: float):
+        self.keepalive = keepalive
+        self.clients = set()
+        self.count = None
+        self._subscription = None
+        self._stale = False
+        self._refreshing = False
+        self.pushes = 0
+        self.reads = 0
+
+    def _subscribe(self):
+        if self._subscription is None:
+            self._subscription = bus.subscribe(LowStockCrossed, self._on_crossed, "stock_alerts.low_stock")
+
+    async def _read(self) -> int:
+        self.reads += 1
+        return await run_db("stock_alerts.count", get_low_stock_count)
+
+    async def _on_crossed(self, domain_event):
+        if not self.clients:
+            # Значение устарело; следующий клиент прочитает его заново
+            self.count = None
+            return
+        # Пачка событий (массовая правка склада) - одно-два чтения, а не по
+        # чтению на событие
+        self._stale = True
+        if self._refreshing:
+            return
+        self._refreshing = True
+        try:
+            while self._stale:
+                self._stale = False
+                count = await self._read()
+                if count != self.count:
+                    self.count = count
+                    self.push(count)
+        finally:
+            self._refreshing = False
+
+    def push(self, count: int):
+        self.pushes += 1
+        for queue in list(self.clients):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(count)
+
+    async def events(self, request):
+        """Генератор SSE для StreamingResponse"""
+        self._subscribe()
+        queue = asyncio.Queue(maxsize=1)
+        self.clients.add(queue)
+        try:
+            if self.count is None:
+                self.count = await self._read()
+            yield f"retry: 5000\n{sse_message('low_stock', {'count': self.count})}"
+            while True:
+                try:
+                    count = await asyncio.wait_for(queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_message("low_stock", {"count": count})
+        finally:
+            self.clients.discard(queue)
+
+    def stats(self):
+        return {
+            "clients": len(self.clients),
+            "count": self.count,
+            "reads": self.reads,
+            "pushes": self.pushes,
+        }
+
+
+low_stock_stream = LowStockStream(SSE_KEEPALIVE)
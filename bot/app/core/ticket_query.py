@@ -0,0 +1,192 @@
+# app/core/ticket_query.py
+"""
+Фильтры, сортировка и постраничная выдача списка заявок
+
+Один построитель запроса для веб-админки и бота:
+- фильтры по нескольким статусам, филиалам, категориям, мастерам,
+  срочности и способу получения, диапазон дат создания;
+- сортировка по ключам из SORT_KEYS, у каждого есть индекс (колонка, id);
+- keyset-страницы (app/core/pagination.py);
+- выбираются только колонки списка, клиент и мастер - через LEFT JOIN;
+  другой набор колонок (формат веб-админки) - statement(columns).
+
+Ошибки во входных данных (дата, ключ сортировки, курсор) - ValueError.
+
+Пример:
+    query = TicketQuery(statuses=["Новая"], branches=["Центр"], sort="updated_at")
+    page = fetch_page(db, query)  # {"items": [...], "next_cursor": ...}
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.core.pagination import keyset_page, split_page, cursor_position
+from app.models.client import Client
+from app.models.master import Master
+from app.models.ticket import Ticket, DeliveryMethod
+
+# Ключ сортировки -> колонка (индексы: ревизии 0002 и 0007)
+SORT_KEYS = {
+    "created_at": Ticket.created_at,
+    "updated_at": Ticket.updated_at,
+    "id": Ticket.id,
+    "status": Ticket.status,
+    "branch": Ticket.branch,
+    "category": Ticket.category,
+}
+
+# Колонки, которые нужны списку заявок
+LIST_COLUMNS = (
+    Ticket.id,
+    Ticket.created_at,
+    Ticket.updated_at,
+    Ticket.status,
+    Ticket.branch,
+    Ticket.category,
+    Ticket.brand,
+    Ticket.urgency,
+    Ticket.delivery_method,
+    Ticket.client_id,
+    Ticket.master_id,
+    Ticket.walkin_name,
+    Ticket.walkin_phone,
+    Client.name.label("client_name"),
+    Client.phone.label("client_phone"),
+    Master.name.label("master_name"),
+)
+
+
+def list_select(columns=LIST_COLUMNS):
+    """SELECT колонок списка с клиентом и мастером, без фильтров и порядка"""
+    return (
+        select(*columns)
+        .outerjoin(Client, Client.id == Ticket.client_id)
+        .outerjoin(Master, Master.id == Ticket.master_id)
+    )
+
+
+def parse_date(value):
+    """Дата фильтра из ISO-строки (YYYY-MM-DD или с временем)"""
+    if value is None or value == "" or isinstance(value, datetime):
+        return value or None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Некорректная дата: {value}")
+
+
+def _values(values):
+    """Пустые значения из списка фильтра отбрасываются"""
+    return [value for value in (values or []) if value not in (None, "")]
+
+
+class TicketQuery:
+    """Параметры списка заявок"""
+
+    def __init__(
+        self,
+        statuses=None,
+        branches=None,
+        categories=None,
+        master_ids=None,
+        urgencies=None,
+        delivery_methods=None,
+        unassigned: bool = False,
+        date_from=None,
+        date_to=None,
+        sort: str = "created_at",
+        descending: bool = True,
+        cursor: str = None,
+        limit: int = None
+    ):
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Неизвестный ключ сортировки: {sort}")
+        try:
+            self.delivery_methods = [DeliveryMethod(value) for value in _values(delivery_methods)]
+        except ValueError as e:
+            raise ValueError(f"Неизвестный способ получения: {e}")
+        self.statuses = _values(statuses)
+        self.branches = _values(branches)
+        self.categories = _values(categories)
+        self.master_ids = _values(master_ids)
+        self.urgencies = _values(urgencies)
+        self.unassigned = unassigned
+        self.date_from = parse_date(date_from)
+        self.date_to = parse_date(date_to)
+        # date_to без времени - весь этот день включительно
+        self.whole_day_to = isinstance(date_to, str) and len(date_to) == 10
+        if cursor:
+            # Испорченный курсор - ошибка входных данных, а не запроса
+            cursor_position(cursor, SORT_KEYS[sort])
+        self.sort = sort
+        self.descending = descending
+        self.cursor = cursor
+        self.limit = limit
+
+    def conditions(self):
+        """WHERE-условия фильтров (без курсора)"""
+        conditions = []
+        for column, values in (
+            (Ticket.status, self.statuses),
+            (Ticket.branch, self.branches),
+            (Ticket.category, self.categories),
+            (Ticket.master_id, self.master_ids),
+            (Ticket.urgency, self.urgencies),
+            (Ticket.delivery_method, self.delivery_methods),
+        ):
+            if len(values) == 1:
+                conditions.append(column == values[0])
+            elif values:
+                conditions.append(column.in_(values))
+        if self.unassigned:
+            conditions.append(Ticket.master_id.is_(None))
+        if self.date_from is not None:
+            conditions.append(Ticket.created_at >= self.date_from)
+        if self.date_to is not None:
+            if self.whole_day_to:
+                conditions.append(Ticket.created_at < self.date_to + timedelta(days=1))
+            else:
+                conditions.append(Ticket.created_at <= self.date_to)
+        return conditions
+
+    def statement(self, columns=LIST_COLUMNS):
+        """SELECT колонок с фильтрами, курсором и LIMIT
+
+        columns должны включать Ticket.id и колонку сортировки - по ним
+        page() строит курсор следующей страницы.
+        """
+        stmt = list_select(columns).where(*self.conditions())
+        return keyset_page(
+            stmt, SORT_KEYS[self.sort], Ticket.id, self.cursor, self.limit, self.descending
+        )
+
+    def page(self, rows):
+        """(строки страницы, курсор следующей) из результата statement()"""
+        return split_page(rows, self.limit, self.sort)
+
+
+def to_dict(row) -> dict:
+    """Строка списка в JSON-формате API"""
+    delivery_method = row.delivery_method
+    return {
+        "id": row.id,
+        "client_id": row.client_id,
+        "client_name": row.client_name or row.walkin_name or "Клиент",
+        "client_phone": row.client_phone or row.walkin_phone or "",
+        "status": row.status,
+        "master_id": row.master_id,
+        "master_name": row.master_name or "Не назначен",
+        "branch": row.branch or "",
+        "category": row.category or "",
+        "brand": row.brand or "",
+        "urgency": row.urgency or "",
+        "delivery_method": delivery_method.value if delivery_method else "",
+        "created_at": row.created_at.isoformat() if row.created_at else "",
+        "updated_at": row.updated_at.isoformat() if row.updated_at else ""
+    }
+
+
+def fetch_page(db, query: TicketQuery) -> dict:
+    """Страница заявок через синхронную сессию"""
+    rows, next_cursor = query.page(db.execute(query.statement()).all())
+    return {"items": [to_dict(row) for row in rows], "next_cursor": next_cursor}
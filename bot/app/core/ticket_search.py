@@ -0,0 +1,244 @@
+# app/core/ticket_search.py
+"""
+Поиск заявок для приема: телефон, имя клиента, бренд и текст проблемы
+
+Каждый источник - отдельный запрос по своему индексу с ограничением
+CANDIDATES строк:
+- телефон: префикс *_phone_key заявки и клиента (конец номера) и, для
+  запроса короче местного номера, префикс *_phone_local_key (начало
+  номера без кода страны), app/models/search.py;
+- имя: префикс clients.name и tickets.walkin_name;
+- текст: FULLTEXT (problem, brand) в MySQL, LIKE в SQLite.
+Баллы источников складываются, лучшие заявки дочитываются одним
+запросом с колонками списка, совпадения подсвечиваются <mark>.
+
+Пример:
+    result = search_tickets(db, "0064")
+    result["items"][0]["highlights"]  # {"client_phone": "+99290000<mark>0064</mark>"}
+"""
+import html
+import re
+
+from sqlalchemy import select, update, bindparam, and_
+
+from app.config import TICKET_SEARCH_LIMIT, TICKET_SEARCH_LIMIT_MAX
+from app.core.dialects import sql_functions
+from app.core.ticket_query import LIST_COLUMNS, to_dict
+from app.models.client import Client
+from app.models.master import Master
+from app.models.ticket import Ticket
+from app.models.search import (
+    PHONE_FIELDS, LOCAL_PHONE_DIGITS, phone_key, phone_local_key, phone_digits, phone_query_key
+)
+
+# Строк-кандидатов из каждого источника
+CANDIDATES = 200
+
+# Колонки FULLTEXT-индекса (ревизия 0008)
+TEXT_COLUMNS = (Ticket.problem, Ticket.brand)
+
+PHONE_WEIGHT = 3.0
+NAME_WEIGHT = 2.0
+
+MIN_PHONE_DIGITS = 3
+MIN_WORD_LENGTH = 2
+SNIPPET_LENGTH = 160
+
+
+def search_limit(limit: int = None) -> int:
+    if not limit or limit < 1:
+        return TICKET_SEARCH_LIMIT
+    return min(limit, TICKET_SEARCH_LIMIT_MAX)
+
+
+def parse_query(q: str):
+    """(цифры телефона или "", слова, фраза для префикса имени)
+
+    Запрос только из цифр и знаков номера ищется как телефон.
+    """
+    phrase = " ".join((q or "").split())
+    if re.fullmatch(r"[\d\s()+-]+", phrase) and len(phone_digits(phrase)) >= MIN_PHONE_DIGITS:
+        return phone_digits(phrase), [], ""
+    words = [word for word in re.findall(r"\w+", phrase) if len(word) >= MIN_WORD_LENGTH]
+    return "", words, phrase
+
+
+def _recent_ids(db, *conditions):
+    stmt = (
+        select(Ticket.id)
+        .where(*conditions)
+        .order_by(Ticket.id.desc())
+        .limit(CANDIDATES)
+    )
+    return db.execute(stmt).scalars().all()
+
+
+def _client_ticket_ids(db, condition):
+    """Заявки клиентов, найденных по condition"""
+    client_ids = db.execute(select(Client.id).where(condition).limit(CANDIDATES)).scalars().all()
+    if not client_ids:
+        return []
+    return _recent_ids(db, Ticket.client_id.in_(client_ids))
+
+
+def _starts_with(column, prefix: str):
+    """column LIKE 'prefix%' диапазоном: индекс работает и в SQLite"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(column >= prefix, column < upper)
+
+
+def _phone_conditions(digits):
+    """(условия по клиентам, условия по заявкам) - по одному на индекс
+
+    "2233" ищется как конец номера, "9011" - еще и как начало местного
+    номера 901112233. Запрос не короче местного номера - это номер
+    целиком, его достаточно искать с конца.
+    """
+    key = phone_query_key(digits)
+    client = [_starts_with(Client.phone_key, key)]
+    ticket = [_starts_with(column, key) for column in (Ticket.walkin_phone_key, Ticket.delivery_phone_key)]
+    if len(digits) < LOCAL_PHONE_DIGITS:
+        client.append(_starts_with(Client.phone_local_key, digits))
+        ticket += [
+            _starts_with(column, digits)
+            for column in (Ticket.walkin_phone_local_key, Ticket.delivery_phone_local_key)
+        ]
+    return client, ticket
+
+
+def _phone_scores(db, digits, scores):
+    client_conditions, ticket_conditions = _phone_conditions(digits)
+    ids = set()
+    for condition in client_conditions:
+        ids.update(_client_ticket_ids(db, condition))
+    for condition in ticket_conditions:
+        ids.update(_recent_ids(db, condition))
+    for ticket_id in ids:
+        scores[ticket_id] = scores.get(ticket_id, 0) + PHONE_WEIGHT
+
+
+def _name_scores(db, phrase, scores):
+    ids = set(_client_ticket_ids(db, Client.name.startswith(phrase, autoescape=True)))
+    ids.update(_recent_ids(db, Ticket.walkin_name.startswith(phrase, autoescape=True)))
+    for ticket_id in ids:
+        scores[ticket_id] = scores.get(ticket_id, 0) + NAME_WEIGHT
+
+
+def _text_scores(db, words, scores):
+    condition, relevance = sql_functions(db).fulltext(TEXT_COLUMNS, words)
+    rows = db.execute(
+        select(Ticket.id, relevance.label("relevance"))
+        .where(condition)
+        .order_by(relevance.desc(), Ticket.id.desc())
+        .limit(CANDIDATES)
+    ).all()
+    for ticket_id, score in rows:
+        scores[ticket_id] = scores.get(ticket_id, 0) + float(score or 0)
+
+
+def _spans(text: str, words=(), digits: str = ""):
+    spans = []
+    for word in words:
+        spans += [m.span() for m in re.finditer(re.escape(word), text, re.IGNORECASE)]
+    if digits:
+        # Цифры номера могут быть разделены пробелами, скобками, дефисами
+        pattern = r"\D{0,2}".join(digits[-LOCAL_PHONE_DIGITS:])
+        spans += [m.span() for m in re.finditer(pattern, text)]
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def highlight(text, words=(), digits: str = "", snippet: bool = False):
+    """HTML с <mark> вокруг совпадений или None, если совпадений нет
+
+    snippet - обрезать длинный текст до окна вокруг первого совпадения.
+    """
+    if not text:
+        return None
+    spans = _spans(text, words, digits)
+    if not spans:
+        return None
+    start, end = 0, len(text)
+    if snippet and len(text) > SNIPPET_LENGTH:
+        start = max(0, spans[0][0] - SNIPPET_LENGTH // 3)
+        end = min(len(text), start + SNIPPET_LENGTH)
+    parts = ["…" if start > 0 else ""]
+    position = start
+    for span_start, span_end in spans:
+        if span_end <= start or span_start >= end:
+            continue
+        span_start, span_end = max(span_start, start), min(span_end, end)
+        parts.append(html.escape(text[position:span_start]))
+        parts.append(f"<mark>{html.escape(text[span_start:span_end])}</mark>")
+        position = span_end
+    parts.append(html.escape(text[position:end]))
+    parts.append("…" if end < len(text) else "")
+    return "".join(parts)
+
+
+def search_tickets(db, q: str, limit: int = None) -> dict:
+    """{"items": [...], "query": q}: лучшие заявки по сумме баллов"""
+    digits, words, phrase = parse_query(q)
+    scores = {}
+    if digits:
+        _phone_scores(db, digits, scores)
+    if phrase:
+        _name_scores(db, phrase, scores)
+    if words:
+        _text_scores(db, words, scores)
+
+    best = sorted(scores, key=lambda ticket_id: (scores[ticket_id], ticket_id), reverse=True)
+    best = best[:search_limit(limit)]
+    if not best:
+        return {"items": [], "query": q}
+
+    rows = db.execute(
+        select(*LIST_COLUMNS, Ticket.problem, Ticket.delivery_phone)
+        .outerjoin(Client, Client.id == Ticket.client_id)
+        .outerjoin(Master, Master.id == Ticket.master_id)
+        .where(Ticket.id.in_(best))
+    ).all()
+    by_id = {row.id: row for row in rows}
+
+    items = []
+    for ticket_id in best:
+        row = by_id.get(ticket_id)
+        if row is None:
+            continue
+        item = to_dict(row)
+        item["score"] = round(scores[ticket_id], 3)
+        item["problem"] = row.problem or ""
+        name_words = [phrase] if phrase else []
+        highlights = {
+            "problem": highlight(row.problem, words, snippet=True),
+            "brand": highlight(row.brand, words),
+            "client_name": highlight(row.client_name or row.walkin_name, name_words),
+            "client_phone": highlight(row.client_phone or row.walkin_phone, digits=digits),
+            "delivery_phone": highlight(row.delivery_phone, digits=digits),
+        }
+        item["highlights"] = {field: value for field, value in highlights.items() if value}
+        items.append(item)
+    return {"items": items, "query": q}
+
+
+def rebuild_phone_keys(conn, batch: int = 5000):
+    """Пересчитать *_phone_key и *_phone_local_key для всех строк (после вставки в обход ORM)"""
+    for model, field, key_field, local_field in PHONE_FIELDS:
+        table = model.__table__
+        rows = conn.execute(select(table.c.id, table.c[field])).all()
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values({key_field: bindparam("key"), local_field: bindparam("local_key")})
+        )
+        params = [
+            {"row_id": row_id, "key": phone_key(phone), "local_key": phone_local_key(phone)}
+            for row_id, phone in rows
+        ]
+        for start in range(0, len(params), batch):
+            conn.execute(stmt, params[start:start + batch])
@@ -0,0 +1,100 @@
+# app/core/timeseries.py
+"""
+Ряды "количество по дням / неделям / месяцам" одним GROUP BY
+
+Запрос фильтрует по диапазону column >= start AND column < end, поэтому
+может использовать индекс по дате. Пустые интервалы дозаполняются нулями
+в Python.
+
+Пример (синхронная сессия):
+    start, end = series_range("day", 7)
+    rows = db.execute(bucket_query(db, Ticket.created_at, "day", start, end)).all()
+    series = fill_series(rows, "day", start, end)  # [(date, count), ...]
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select, func, literal_column
+
+from app.core.dialects import sql_functions
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def _floor(granularity: str, moment: datetime) -> date:
+    day = moment.date() if isinstance(moment, datetime) else moment
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Неизвестная гранулярность: {granularity}")
+
+
+def _next(granularity: str, bucket: date) -> date:
+    if granularity == "day":
+        return bucket + timedelta(days=1)
+    if granularity == "week":
+        return bucket + timedelta(days=7)
+    if bucket.month == 12:
+        return bucket.replace(year=bucket.year + 1, month=1)
+    return bucket.replace(month=bucket.month + 1)
+
+
+def _previous(granularity: str, bucket: date) -> date:
+    if granularity == "day":
+        return bucket - timedelta(days=1)
+    if granularity == "week":
+        return bucket - timedelta(days=7)
+    if bucket.month == 1:
+        return bucket.replace(year=bucket.year - 1, month=12)
+    return bucket.replace(month=bucket.month - 1)
+
+
+def series_range(granularity: str, periods: int, now: datetime = None):
+    """[start, end) для последних `periods` интервалов, включая текущий"""
+    first = _floor(granularity, now or datetime.now())
+    end = _next(granularity, first)
+    for _ in range(periods - 1):
+        first = _previous(granularity, first)
+    return datetime.combine(first, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
+
+def bucket_starts(granularity: str, start: datetime, end: datetime):
+    """Начала всех интервалов в [start, end)"""
+    buckets = []
+    bucket = _floor(granularity, start)
+    while datetime.combine(bucket, datetime.min.time()) < end:
+        buckets.append(bucket)
+        bucket = _next(granularity, bucket)
+    return buckets
+
+
+def bucket_query(bind, column, granularity: str, start: datetime, end: datetime, *filters, value=None):
+    """SELECT bucket, COUNT(*) ... WHERE start <= column < end GROUP BY bucket
+
+    value заменяет COUNT(*), например SUM(count) для заранее агрегированных
+    таблиц. Для колонки типа Date start и end передаются датами.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Неизвестная гранулярность: {granularity}")
+    bucket = getattr(sql_functions(bind), granularity)(column)
+    return (
+        select(bucket.label("bucket"), (value if value is not None else func.count()).label("count"))
+        .where(column >= start, column < end, *filters)
+        .group_by(literal_column("bucket"))
+    )
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def fill_series(rows, granularity: str, start: datetime, end: datetime):
+    """Ряд [(начало интервала, количество)] с нулями для пустых интервалов"""
+    counts = {_as_date(bucket): int(count) for bucket, count in rows}
+    return [(bucket, counts.get(bucket, 0)) for bucket in bucket_starts(granularity, start, end)]
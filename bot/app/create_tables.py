@@ -1,9 +0,0 @@
-import asyncio
-from app.db.session import engine
-from app.db.base import Base
-
-async def init():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-asyncio.run(init())
\ No newline at end of file
@@ -1,6 +1,6 @@
 # app/database.py
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app.core.pools import make_engine
 
 # XAMPP MySQL connection
 DATABASE_URL = "mysql+pymysql://root:@localhost/service_center"
@@ -8,13 +8,15 @@ DATABASE_URL = "mysql+pymysql://root:@localhost/service_center"
 # Создаем базовый класс для моделей
 Base = declarative_base()
 
-# Создаем движок
-engine = create_engine(DATABASE_URL)
+# Создаем движок (пул веб-админки, настройки в app/config.py)
+engine = make_engine(DATABASE_URL, "web")
 
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
-    bind=engine
+    bind=engine,
+    # Источник изменений для доменных событий (app/core/event_bus.py)
+    info={"origin": "web"}
 )
 
 # ✅ FASTAPI dependency
@@ -0,0 +1,43 @@
+# app/db/engine.py
+"""
+Асинхронный движок БД для бота (aiomysql)
+
+Бот работает в своём event loop, поэтому все запросы из хендлеров
+идут через AsyncSessionLocal и не блокируют обработку апдейтов.
+"""
+from contextlib import asynccontextmanager
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from app.core.pools import make_async_engine
+from app.database import DATABASE_URL as SYNC_DATABASE_URL
+
+# Та же база, что и у веб-админки, только через асинхронный драйвер
+ASYNC_DATABASE_URL = make_url(SYNC_DATABASE_URL).set(drivername="mysql+aiomysql")
+
+# Отдельный бюджет соединений, чтобы бот не конкурировал с веб-админкой
+engine = make_async_engine(ASYNC_DATABASE_URL, "bot", echo=False)
+
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+    # Источник изменений для доменных событий (app/core/event_bus.py)
+    info={"origin": "bot"}
+)
+
+async def get_session() -> AsyncSession:
+    async with AsyncSessionLocal() as session:
+        yield session
+
+@asynccontextmanager
+async def session_scope():
+    """Сессия с транзакцией: commit при успехе, rollback при ошибке"""
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
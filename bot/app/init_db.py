@@ -2,18 +2,20 @@
 """
 Скрипт для инициализации базы данных и создания всех таблиц
 Запуск: python -m app.init_db
+
+Таблицы и индексы создаются ревизиями схемы (то же, что
+python -m app.schema upgrade), а не create_all: иначе база осталась бы
+без таблицы schema_revisions и индексов из ревизий.
 """
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import engine, Base
+from app import schema
 
 # Импортируем все модели через __init__.py
-from app.models import (
-    Client, Master, Ticket, PartCategory, 
-    PartSupplier, Part, PartTransaction
-)
+import app.models  # noqa: F401
 
 import logging
 
@@ -25,10 +27,11 @@ def create_tables():
     try:
         logger.info("🚀 Начинаем создание таблиц в базе данных...")
         
-        # Создаем все таблицы
-        Base.metadata.create_all(bind=engine)
+        # Применяем все ревизии схемы
+        done = schema.upgrade(engine)
         
-        logger.info("✅ Все таблицы успешно созданы!")
+        logger.info(f"✅ Все таблицы успешно созданы! Ревизий применено: {len(done)}, "
+                    f"текущая: {schema.current(engine)}")
         
         # Выводим список созданных таблиц
         from sqlalchemy import inspect
@@ -51,6 +54,8 @@ def drop_tables():
         confirm = input("Вы уверены? (yes/no): ")
         if confirm.lower() == 'yes':
             Base.metadata.drop_all(bind=engine)
+            # Без журнала ревизий следующий запуск создаст таблицы заново
+            schema.schema_revisions.drop(engine, checkfirst=True)
             logger.info("✅ Все таблицы удалены")
         else:
             logger.info("❌ Операция отменена")
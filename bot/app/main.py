@@ -2,12 +2,25 @@
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import RedirectResponse
 from starlette.middleware.sessions import SessionMiddleware
-from app.database import engine, Base
-from app.routers import admin_pages, auth, admin, tickets, clients, masters
+from app.database import engine
+from app import schema
+from app.routers import admin_pages, auth, admin, tickets, clients, masters, websocket
 from app.api.routes import router
 from app.api.parts_api import router as parts_api_router  # Импорт API для запчастей
+from app.core.executor import db_executor
+from app.core.counters import reconcile_periodically
+from app.core.change_feed import prune_periodically
+from app.core.realtime import hub
+from app.core.fanout import start_fanout, stop_fanout
+from app.core.backplane import warn_if_local
+from app.core.cache import subscribe_invalidation
+from app.config import (
+    COUNTERS_RECONCILE_INTERVAL, HTTP_GZIP_MIN_SIZE, TICKET_CHANGES_PRUNE_INTERVAL,
+    REALTIME_WS_DEFLATE
+)
 import uvicorn
 import asyncio
 import threading
@@ -22,7 +35,7 @@ app = FastAPI(
 )
 
 # ============================================
-# ИМПОРТ МОДЕЛЕЙ ДЛЯ СОЗДАНИЯ ТАБЛИЦ
+# ИМПОРТ МОДЕЛЕЙ
 # ============================================
 
 # Основные модели
@@ -32,16 +45,24 @@ from app.models import ticket, client, master
 from app.models.part import Part, PartCategory, PartSupplier, PartTransaction
 
 # ============================================
-# СОЗДАНИЕ ТАБЛИЦ В БАЗЕ ДАННЫХ
+# МИГРАЦИИ СХЕМЫ БАЗЫ ДАННЫХ
 # ============================================
 
-try:
-    Base.metadata.create_all(bind=engine)
-    print("✅ Таблицы в базе данных проверены/созданы")
-    print("   - Клиенты, Мастера, Заявки")
-    print("   - Запчасти, Категории, Поставщики, Транзакции")
-except Exception as e:
-    print(f"⚠️ Ошибка при создании таблиц: {e}")
+# Ревизии применяются отдельным шагом перед запуском, а не каждым
+# воркером: python -m app.schema upgrade
+
+@app.on_event("startup")
+def check_schema():
+    """Предупредить, если база отстает от последней ревизии"""
+    try:
+        current, head = schema.current(engine), schema.head()
+        if current == head:
+            print(f"✅ Схема БД актуальна (ревизия {current})")
+        else:
+            print(f"⚠️ Схема БД на ревизии {current}, последняя - {head}: "
+                  f"выполните python -m app.schema upgrade")
+    except Exception as e:
+        print(f"⚠️ Ошибка при проверке схемы: {e}")
 
 # ============================================
 # MIDDLEWARE
@@ -64,6 +85,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Сжатие JSON-списков и страниц (304 из app/core/http_cache.py без тела)
+app.add_middleware(GZipMiddleware, minimum_size=HTTP_GZIP_MIN_SIZE)
+
 # ============================================
 # СТАТИЧЕСКИЕ ФАЙЛЫ
 # ============================================
@@ -82,6 +106,37 @@ async def root():
 async def health_check():
     return {"status": "ok", "tables": "created"}
 
+@app.on_event("startup")
+async def start_counters_reconcile():
+    """Периодическая сверка parts_count / ticket_count"""
+    if COUNTERS_RECONCILE_INTERVAL > 0:
+        asyncio.create_task(reconcile_periodically(COUNTERS_RECONCILE_INTERVAL))
+
+@app.on_event("startup")
+async def start_ticket_changes_prune():
+    """Очистка журнала изменений заявок старше TICKET_CHANGES_RETENTION_DAYS"""
+    if TICKET_CHANGES_PRUNE_INTERVAL > 0:
+        asyncio.create_task(prune_periodically(TICKET_CHANGES_PRUNE_INTERVAL))
+
+@app.on_event("startup")
+async def subscribe_stats_cache():
+    """Сброс кэша статистики по изменениям таблиц в других процессах"""
+    subscribe_invalidation()
+
+@app.on_event("startup")
+async def start_backplane():
+    """События и рассылки между воркерами и ботом (REALTIME_BACKPLANE_URL)"""
+    try:
+        await start_fanout()
+    except Exception as e:
+        print(f"⚠️ Ошибка при запуске backplane: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_db_executor():
+    await stop_fanout()
+    await hub.close()
+    db_executor.shutdown()
+
 # ============================================
 # ПОДКЛЮЧЕНИЕ ВСЕХ РОУТЕРОВ
 # ============================================
@@ -94,6 +149,7 @@ app.include_router(tickets.router)         # Заявки
 app.include_router(admin.router)           # Админка
 app.include_router(masters.router)         # Мастера
 app.include_router(parts_api_router)       # API для запчастей
+app.include_router(websocket.router)       # Обновления заявок (WebSocket)
 
 # ============================================
 # ФУНКЦИИ ДЛЯ ЗАПУСКА
@@ -150,12 +206,18 @@ def run_web_admin():
         print("   Логин: manager / Пароль: manager123")
         print("="*60 + "\n")
         
+        # reload=True: приложение работает в дочернем процессе uvicorn,
+        # бот - в этом; события между ними идут только через Redis
+        warn_if_local("uvicorn reload=True: веб-админка и бот в разных процессах")
+        
         uvicorn.run(
             "app.main:app",
             host="0.0.0.0",
             port=8000,
             reload=True,
-            log_level="info"
+            log_level="info",
+            # Сжатие кадров WebSocket (снимок списка заявок)
+            ws_per_message_deflate=REALTIME_WS_DEFLATE
         )
     except Exception as e:
         print(f"🌐 Ошибка в веб-админке: {e}")
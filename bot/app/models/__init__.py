@@ -16,6 +16,30 @@ from app.models.part import PartCategory, PartSupplier, Part, PartTransaction
 # Затем модель событий (зависит от всех выше)
 from app.models.event import Event
 
+# Агрегаты заявок для статистики (регистрирует слушатель сессии)
+from app.models.rollup import TicketDailyRollup, TicketStatusCounter
+
+# Счетчики связей (регистрирует слушатели сессии)
+from app.models import counters
+
+# Ключи поиска по телефону (регистрирует слушатели атрибутов)
+from app.models import search
+
+# Журнал изменений заявок (регистрирует слушатель сессии)
+from app.models.ticket_change import TicketChange
+
+# Доменные события после commit (регистрирует слушатель сессии)
+from app.models import domain_events
+
+# Таблицы, измененные транзакцией (регистрирует слушатели сессии)
+from app.models import written_tables
+
+# Счетчик запчастей с низким запасом (регистрирует слушатели сессии)
+from app.models.stock_counter import PartStockCounter
+
+# Версии таблиц для ETag (регистрирует слушатель сессии)
+from app.models.table_version import TableVersion
+
 # Экспортируем все модели
 __all__ = [
     'Client',
@@ -26,5 +50,10 @@ __all__ = [
     'PartSupplier',
     'Part',
     'PartTransaction',
-    'Event'  # Добавляем Event
+    'Event',  # Добавляем Event
+    'TicketDailyRollup',
+    'TicketStatusCounter',
+    'TicketChange',
+    'PartStockCounter',
+    'TableVersion'
 ]
\ No newline at end of file
@@ -12,6 +12,10 @@ class Client(Base):
     username = Column(String(100), nullable=True)
     name = Column(String(200), nullable=True)
     phone = Column(String(20), nullable=True)
+    # Цифры телефона в обратном порядке для поиска (app/models/search.py)
+    phone_key = Column(String(20), nullable=True)
+    # Местный номер (последние 9 цифр) для поиска по началу номера
+    phone_local_key = Column(String(20), nullable=True)
     email = Column(String(100), nullable=True)
     address = Column(Text, nullable=True)
     notes = Column(Text, nullable=True)
@@ -19,6 +23,10 @@ class Client(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
+    # Счетчики по заявкам (app/models/counters.py), сверка: python -m app.core.counters
+    ticket_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_ticket_at = Column(DateTime, nullable=True)
+    
     # Связь с заявками
     tickets = relationship("Ticket", back_populates="client")
     
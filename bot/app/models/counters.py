@@ -0,0 +1,143 @@
+# app/models/counters.py
+"""
+Денормализованные счетчики связей
+
+part_categories.parts_count, part_suppliers.parts_count,
+clients.ticket_count и clients.last_ticket_at обновляются слушателями
+сессии в той же транзакции, что и вставка, перенос или удаление
+запчасти/заявки. Списки читают их одним запросом вместо count() на
+каждую строку. Измененные родительские таблицы отмечаются в
+app/models/written_tables.py (версии для ETag, сброс кэша статистики).
+Расхождения исправляет сверка: python -m app.core.counters
+"""
+from collections import Counter
+
+from sqlalchemy import event, update, select, func
+from sqlalchemy.orm import Session
+
+from app.core.dialects import sql_functions
+from app.models.client import Client
+from app.models.part import Part, PartCategory, PartSupplier
+from app.models.ticket import Ticket
+from app.models.tracking import track_previous, previous_value
+from app.models.written_tables import mark_written
+
+# (модель, внешний ключ, родитель, колонка-счетчик)
+COUNTERS = [
+    (Part, "category_id", PartCategory, "parts_count"),
+    (Part, "supplier_id", PartSupplier, "parts_count"),
+    (Ticket, "client_id", Client, "ticket_count"),
+]
+
+track_previous(Part.category_id, Part.supplier_id, Ticket.client_id)
+
+_PREVIOUS = "counters_previous_parents"
+
+
+def _specs_for(obj):
+    return [spec for spec in COUNTERS if isinstance(obj, spec[0])]
+
+
+@event.listens_for(Session, "before_flush")
+def _remember_previous_parents(session, flush_context, instances):
+    """Старые внешние ключи - до flush, пока строки в базе не изменились"""
+    previous = {}
+    for obj in (*session.dirty, *session.deleted):
+        for spec in _specs_for(obj):
+            try:
+                previous[(obj, spec[1])] = previous_value(obj, spec[1])
+            except LookupError:
+                pass
+    session.info[_PREVIOUS] = previous
+
+
+@event.listens_for(Session, "after_flush")
+def _update_counters(session, flush_context):
+    """Новые внешние ключи заполнены flush - применяем изменения счетчиков"""
+    previous = session.info.pop(_PREVIOUS, {})
+    deltas = Counter()
+    # Клиенты: новая последняя заявка / пересчет после удаления или переноса
+    latest = {}
+    recompute = set()
+
+    def moved_in(spec, obj, parent_id):
+        deltas[(spec[2], spec[3], parent_id)] += 1
+        if spec[2] is Client and obj.created_at is not None:
+            latest[parent_id] = max(latest.get(parent_id, obj.created_at), obj.created_at)
+
+    def moved_out(spec, parent_id):
+        deltas[(spec[2], spec[3], parent_id)] -= 1
+        if spec[2] is Client:
+            recompute.add(parent_id)
+
+    for obj in session.new:
+        for spec in _specs_for(obj):
+            parent_id = getattr(obj, spec[1])
+            if parent_id is not None:
+                moved_in(spec, obj, parent_id)
+
+    for obj in session.deleted:
+        for spec in _specs_for(obj):
+            parent_id = previous.get((obj, spec[1]))
+            if parent_id is not None:
+                moved_out(spec, parent_id)
+
+    for obj in session.dirty:
+        for spec in _specs_for(obj):
+            if (obj, spec[1]) not in previous:
+                continue
+            old_id, new_id = previous[(obj, spec[1])], getattr(obj, spec[1])
+            if old_id == new_id:
+                continue
+            if old_id is not None:
+                moved_out(spec, old_id)
+            if new_id is not None:
+                moved_in(spec, obj, new_id)
+
+    if not deltas:
+        return
+
+    conn = session.connection()
+    parents = {parent.__tablename__ for (parent, _, _), delta in deltas.items() if delta}
+    if latest or recompute:
+        parents.add(Client.__tablename__)
+    mark_written(session, parents)
+    for (parent, column, parent_id), delta in sorted(deltas.items(), key=str):
+        if delta:
+            table = parent.__table__
+            conn.execute(
+                update(table)
+                .where(table.c.id == parent_id)
+                .values({column: table.c[column] + delta})
+            )
+
+    clients = Client.__table__
+    greatest = sql_functions(conn).greatest
+    for client_id, created_at in latest.items():
+        if client_id in recompute:
+            continue
+        conn.execute(
+            update(clients)
+            .where(clients.c.id == client_id)
+            .values(last_ticket_at=greatest(func.coalesce(clients.c.last_ticket_at, created_at), created_at))
+        )
+    for client_id in recompute:
+        conn.execute(
+            update(clients)
+            .where(clients.c.id == client_id)
+            .values(last_ticket_at=last_ticket_subquery(clients))
+        )
+
+
+def last_ticket_subquery(clients):
+    """(SELECT MAX(created_at) FROM tickets WHERE client_id = clients.id)"""
+    return (
+        select(func.max(Ticket.created_at))
+        .where(Ticket.client_id == clients.c.id)
+        .scalar_subquery()
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_previous_parents(session):
+    session.info.pop(_PREVIOUS, None)
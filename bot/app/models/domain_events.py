@@ -0,0 +1,159 @@
+# app/models/domain_events.py
+"""
+Доменные события и их сбор из flush сессии
+
+События выводятся из изменений ORM-объектов, поэтому их получают все
+пути записи: сервисы веб-админки, асинхронные сервисы бота, API. Они
+откладываются в сессию и публикуются шиной app/core/event_bus.py только
+после commit. origin - "web" или "bot" (info сессии), подписчик по нему
+понимает, уведомил ли уже кто-то Telegram.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.event_bus import emit, origin
+from app.models.event import Event
+from app.models.master import Master
+from app.models.part import Part
+from app.models.ticket import Ticket
+from app.models.tracking import track_previous, previous_value
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    origin: str
+
+
+@dataclass(frozen=True)
+class TicketEvent(DomainEvent):
+    ticket_id: int
+
+
+@dataclass(frozen=True)
+class TicketCreated(TicketEvent):
+    client_id: Optional[int]
+    delivery_method: Optional[str]
+
+
+@dataclass(frozen=True)
+class TicketStatusChanged(TicketEvent):
+    old_status: Optional[str]
+    new_status: Optional[str]
+
+
+@dataclass(frozen=True)
+class MasterAssigned(TicketEvent):
+    master_id: Optional[int]
+    previous_master_id: Optional[int]
+
+
+@dataclass(frozen=True)
+class TicketDeleted(TicketEvent):
+    pass
+
+
+@dataclass(frozen=True)
+class StockChanged(DomainEvent):
+    part_id: int
+    old_stock: Optional[int]
+    new_stock: int
+    min_stock: Optional[int]
+
+
+@dataclass(frozen=True)
+class LowStockCrossed(DomainEvent):
+    """Запчасть стала ниже минимального запаса (low=True) или вышла из него"""
+    part_id: int
+    low: bool
+
+
+@dataclass(frozen=True)
+class CalendarEventCreated(DomainEvent):
+    event_id: int
+    master_id: Optional[int]
+    start_date: Optional[datetime]
+
+
+@dataclass(frozen=True)
+class MasterRated(DomainEvent):
+    master_id: int
+    rating: Optional[float]
+    rating_count: int
+
+
+@dataclass(frozen=True)
+class TablesWritten(DomainEvent):
+    """Таблицы, измененные транзакцией (app/models/written_tables.py)
+
+    Кэши этого процесса сбрасываются синхронно после commit; событие
+    нужно кэшам других процессов (app/core/cache.py).
+    """
+    tables: tuple
+
+
+track_previous(Ticket.status, Ticket.master_id, Part.stock, Master.rating_count)
+
+
+def _changed(obj, field):
+    """(было, стало), если поле изменено в этой сессии, иначе None"""
+    try:
+        before = previous_value(obj, field)
+    except LookupError:
+        before = None
+    after = getattr(obj, field)
+    return None if before == after else (before, after)
+
+
+def _ticket_events(obj, source):
+    status = _changed(obj, "status")
+    if status:
+        yield TicketStatusChanged(origin=source, ticket_id=obj.id, old_status=status[0], new_status=status[1])
+    master = _changed(obj, "master_id")
+    if master:
+        yield MasterAssigned(origin=source, ticket_id=obj.id, master_id=master[1], previous_master_id=master[0])
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_domain_events(session, flush_context):
+    """История атрибутов в after_flush еще доступна, id уже присвоены"""
+    source = origin(session)
+
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            method = obj.delivery_method
+            emit(session, TicketCreated(
+                origin=source, ticket_id=obj.id, client_id=obj.client_id,
+                delivery_method=getattr(method, "value", method)
+            ))
+        elif isinstance(obj, Event):
+            emit(session, CalendarEventCreated(
+                origin=source, event_id=obj.id, master_id=obj.master_id, start_date=obj.start_date
+            ))
+
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, Ticket):
+            for domain_event in _ticket_events(obj, source):
+                emit(session, domain_event)
+        elif isinstance(obj, Part):
+            stock = _changed(obj, "stock")
+            if stock:
+                emit(session, StockChanged(
+                    origin=source, part_id=obj.id, old_stock=stock[0], new_stock=stock[1],
+                    min_stock=obj.min_stock
+                ))
+        elif isinstance(obj, Master):
+            rated = _changed(obj, "rating_count")
+            if rated and (rated[1] or 0) > (rated[0] or 0):
+                emit(session, MasterRated(
+                    origin=source, master_id=obj.id, rating=obj.rating, rating_count=rated[1]
+                ))
+
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            emit(session, TicketDeleted(origin=source, ticket_id=obj.id))
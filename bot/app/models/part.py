@@ -1,6 +1,8 @@
 # app/models/part.py
 from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import case, and_
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
 from app.database import Base
 
@@ -13,6 +15,8 @@ class PartCategory(Base):
     description = Column(Text, nullable=True)
     icon = Column(String(50), default="fas fa-box")
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Количество запчастей (app/models/counters.py)
+    parts_count = Column(Integer, default=0, server_default="0", nullable=False)
     
     # Связи
     parts = relationship("Part", back_populates="category")
@@ -33,6 +37,8 @@ class PartSupplier(Base):
     notes = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Количество запчастей (app/models/counters.py)
+    parts_count = Column(Integer, default=0, server_default="0", nullable=False)
     
     # Связи
     parts = relationship("Part", back_populates="supplier")
@@ -79,7 +85,8 @@ class Part(Base):
     # Связи
     transactions = relationship("PartTransaction", back_populates="part")
     
-    @property
+    # hybrid_property: то же правило работает в select() без загрузки объектов
+    @hybrid_property
     def status(self):
         if self.stock <= 0:
             return "out"
@@ -90,10 +97,31 @@ class Part(Base):
         else:
             return "high"
     
-    @property
+    @status.expression
+    def status(cls):
+        return case(
+            (cls.stock <= 0, "out"),
+            (cls.stock < cls.min_stock, "low"),
+            (cls.stock < cls.min_stock * 2, "medium"),
+            else_="high"
+        )
+    
+    @hybrid_property
     def total_value(self):
         return self.purchase_price * self.stock
     
+    # Активная запчасть ниже минимального запаса (бейдж склада, статистика)
+    @hybrid_property
+    def is_low_stock(self):
+        return bool(
+            self.is_active and self.stock is not None and self.min_stock is not None
+            and self.stock < self.min_stock
+        )
+    
+    @is_low_stock.expression
+    def is_low_stock(cls):
+        return and_(cls.is_active == True, cls.stock < cls.min_stock)
+    
     def __repr__(self):
         return f"<Part(id={self.id}, name={self.name}, sku={self.sku})>"
 
@@ -0,0 +1,130 @@
+# app/models/rollup.py
+"""
+Агрегаты заявок для дашбордов
+
+ticket_daily_rollup - количество заявок по дню создания, филиалу,
+категории и текущему статусу. ticket_status_counters - количество заявок
+в каждом статусе. Обе таблицы обновляются слушателем before_flush в той
+же транзакции, что и создание, изменение статуса или удаление заявки
+(веб, бот, синхронные и асинхронные сессии). Поэтому статистика читает
+O(дней) строк вместо всей таблицы tickets.
+
+Пересчет с нуля: python -m app.core.rollups rebuild
+"""
+from collections import Counter
+from datetime import datetime
+import logging
+
+from sqlalchemy import Column, Integer, String, Date, event
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.core.dialects import sql_functions
+from app.models.ticket import Ticket
+from app.models.tracking import track_previous, previous_value
+
+logger = logging.getLogger(__name__)
+
+# Статус, который получает заявка без явного статуса
+DEFAULT_STATUS = Ticket.__table__.c.status.default.arg
+
+# Поля заявки, от которых зависит ключ агрегата
+KEY_FIELDS = ("created_at", "branch", "category", "status")
+
+
+class TicketDailyRollup(Base):
+    __tablename__ = "ticket_daily_rollup"
+
+    day = Column(Date, primary_key=True)
+    # Пустая строка вместо NULL: поля входят в первичный ключ
+    branch = Column(String(100), primary_key=True, default="")
+    category = Column(String(100), primary_key=True, default="")
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TicketDailyRollup({self.day}, {self.branch}, {self.category}, {self.status}: {self.count})>"
+
+
+class TicketStatusCounter(Base):
+    __tablename__ = "ticket_status_counters"
+
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TicketStatusCounter({self.status}: {self.count})>"
+
+
+def rollup_key(created_at, branch, category, status):
+    """(день, филиал, категория, статус) с заменой NULL как в таблице"""
+    day = created_at.date() if isinstance(created_at, datetime) else created_at
+    return (day, branch or "", category or "", status or DEFAULT_STATUS)
+
+
+# Прежний ключ нужен, чтобы вычесть заявку из старой строки агрегата
+track_previous(*(getattr(Ticket, field) for field in KEY_FIELDS))
+
+
+def _current_key(ticket):
+    return rollup_key(ticket.created_at, ticket.branch, ticket.category, ticket.status)
+
+
+def _previous_key(ticket):
+    return rollup_key(*(previous_value(ticket, field) for field in KEY_FIELDS))
+
+
+def apply_deltas(conn, deltas):
+    """Прибавить изменения {ключ: +-n} к агрегатам"""
+    sql = sql_functions(conn)
+    by_status = Counter()
+    for (day, branch, category, status), delta in sorted(deltas.items(), key=str):
+        if not delta or day is None:
+            continue
+        conn.execute(sql.upsert_add(
+            TicketDailyRollup.__table__,
+            {"day": day, "branch": branch, "category": category, "status": status},
+            "count", delta
+        ))
+    for (_, _, _, status), delta in deltas.items():
+        by_status[status] += delta
+    for status, delta in sorted(by_status.items()):
+        if delta:
+            conn.execute(sql.upsert_add(
+                TicketStatusCounter.__table__, {"status": status}, "count", delta
+            ))
+
+
+@event.listens_for(Session, "before_flush")
+def _track_ticket_changes(session, flush_context, instances):
+    """Изменения заявок попадают в агрегаты в той же транзакции"""
+    deltas = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            # Дата нужна для ключа до INSERT
+            if obj.created_at is None:
+                obj.created_at = datetime.now()
+            deltas[_current_key(obj)] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            try:
+                deltas[_previous_key(obj)] -= 1
+            except LookupError as e:
+                logger.warning(f"Rollup: unknown previous {e} for ticket {obj.id}, run rebuild")
+
+    for obj in session.dirty:
+        if isinstance(obj, Ticket) and session.is_modified(obj):
+            try:
+                previous = _previous_key(obj)
+            except LookupError as e:
+                logger.warning(f"Rollup: unknown previous {e} for ticket {obj.id}, run rebuild")
+                continue
+            current = _current_key(obj)
+            if previous != current:
+                deltas[previous] -= 1
+                deltas[current] += 1
+
+    if any(deltas.values()):
+        apply_deltas(session.connection(), deltas)
@@ -0,0 +1,62 @@
+# app/models/search.py
+"""
+Ключи поиска заявок по телефону
+
+Телефоны записаны по-разному (+992 90 000 00 64, 900000064, 90-000-00-64),
+а на приеме называют номер целиком, последние цифры или первые цифры
+местного номера. В колонках *_phone_key хранятся цифры номера в обратном
+порядке, поэтому поиск по концу номера - это LIKE 'ключ%' по обычному
+индексу. В *_phone_local_key - местный номер без кода страны (последние
+LOCAL_PHONE_DIGITS цифр) в прямом порядке: поиск по его началу - тоже
+LIKE 'цифры%' по индексу.
+
+Ключ обновляется при присваивании телефона (веб, бот). Для строк,
+вставленных в обход ORM: app.core.ticket_search.rebuild_phone_keys.
+"""
+import re
+
+from sqlalchemy import event
+
+from app.models.client import Client
+from app.models.ticket import Ticket
+
+# Длина местного номера: из запроса берутся последние цифры, код страны
+# и восьмерка в начале на результат не влияют
+LOCAL_PHONE_DIGITS = 9
+
+# (модель, телефон, ключ конца номера, ключ начала местного номера)
+PHONE_FIELDS = [
+    (Client, "phone", "phone_key", "phone_local_key"),
+    (Ticket, "walkin_phone", "walkin_phone_key", "walkin_phone_local_key"),
+    (Ticket, "delivery_phone", "delivery_phone_key", "delivery_phone_local_key"),
+]
+
+
+def phone_digits(value) -> str:
+    return re.sub(r"\D", "", value or "")
+
+
+def phone_key(phone):
+    """Ключ для хранения: все цифры номера в обратном порядке"""
+    return phone_digits(phone)[::-1] or None
+
+
+def phone_local_key(phone):
+    """Ключ для хранения: местный номер (последние цифры) как есть"""
+    return phone_digits(phone)[-LOCAL_PHONE_DIGITS:] or None
+
+
+def phone_query_key(fragment) -> str:
+    """Ключ для поиска: последние цифры запроса в обратном порядке"""
+    return phone_digits(fragment)[-LOCAL_PHONE_DIGITS:][::-1]
+
+
+def _sync_key(model, field: str, key_field: str, local_field: str):
+    @event.listens_for(getattr(model, field), "set")
+    def _set_phone_key(target, value, oldvalue, initiator):
+        setattr(target, key_field, phone_key(value))
+        setattr(target, local_field, phone_local_key(value))
+
+
+for _model, _field, _key_field, _local_field in PHONE_FIELDS:
+    _sync_key(_model, _field, _key_field, _local_field)
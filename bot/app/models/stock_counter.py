@@ -0,0 +1,91 @@
+# app/models/stock_counter.py
+"""
+Счетчик запчастей с низким запасом
+
+part_stock_counters.count для LOW_STOCK - число активных запчастей с
+stock < min_stock (Part.is_low_stock). Слушатель сессии меняет его в той
+же транзакции, что и создание, правку остатка/минимума/активности или
+удаление запчасти, и откладывает событие LowStockCrossed: после commit
+бейдж склада обновляется по SSE (app/core/stock_alerts.py). Расхождения
+после правок в обход ORM исправляет python -m app.core.counters reconcile.
+"""
+import logging
+
+from sqlalchemy import Column, Integer, String, event
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.core.dialects import sql_functions
+from app.core.event_bus import emit, origin
+from app.models.domain_events import LowStockCrossed
+from app.models.part import Part
+from app.models.tracking import track_previous, previous_value
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK = "low_stock"
+
+# Поля, от которых зависит Part.is_low_stock
+FIELDS = ("is_active", "stock", "min_stock")
+
+
+class PartStockCounter(Base):
+    __tablename__ = "part_stock_counters"
+
+    name = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<PartStockCounter({self.name}: {self.count})>"
+
+
+track_previous(*(getattr(Part, field) for field in FIELDS))
+
+_PREVIOUS = "stock_counter_previous"
+
+
+def _was_low(values) -> bool:
+    is_active, stock, min_stock = values
+    return bool(is_active and stock is not None and min_stock is not None and stock < min_stock)
+
+
+@event.listens_for(Session, "before_flush")
+def _remember_previous_stock(session, flush_context, instances):
+    """Прежние поля - до flush, как в app/models/counters.py"""
+    previous = {}
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Part):
+            try:
+                previous[obj] = _was_low([previous_value(obj, field) for field in FIELDS])
+            except LookupError as e:
+                logger.warning(f"Low stock: unknown previous {e} for part {obj.id}, run reconcile")
+    session.info[_PREVIOUS] = previous
+
+
+@event.listens_for(Session, "after_flush")
+def _update_low_stock(session, flush_context):
+    """Значения по умолчанию (stock=0, min_stock=5) уже заполнены flush"""
+    previous = session.info.pop(_PREVIOUS, {})
+    crossed = {}
+
+    for obj in session.new:
+        if isinstance(obj, Part) and obj.is_low_stock:
+            crossed[obj.id] = True
+    for obj in session.dirty:
+        if isinstance(obj, Part) and obj in previous and previous[obj] != obj.is_low_stock:
+            crossed[obj.id] = obj.is_low_stock
+    for obj in session.deleted:
+        if isinstance(obj, Part) and previous.get(obj):
+            crossed[obj.id] = False
+
+    if not crossed:
+        return
+    delta = sum(1 if low else -1 for low in crossed.values())
+    if delta:
+        conn = session.connection()
+        conn.execute(sql_functions(conn).upsert_add(
+            PartStockCounter.__table__, {"name": LOW_STOCK}, "count", delta
+        ))
+    source = origin(session)
+    for part_id, low in crossed.items():
+        emit(session, LowStockCrossed(origin=source, part_id=part_id, low=low))
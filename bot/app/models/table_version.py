@@ -0,0 +1,46 @@
+# app/models/table_version.py
+"""
+Номера версий таблиц для ETag (app/core/http_cache.py)
+
+table_versions.version растет на единицу в той же транзакции, что и
+запись в таблицу через сессию: app/models/written_tables.py увеличивает
+его один раз за транзакцию на каждую измененную таблицу - и записанную
+через объекты, и через Query.update/delete, и Core-запросами слушателей
+(счетчики). В отличие от MAX(updated_at), номер меняется и при двух
+правках в одну секунду, и при удалении, и у таблиц без updated_at.
+
+tickets не считаются: для них версия - seq журнала ticket_changes
+(app/models/ticket_change.py), так правки заявок не ждут блокировку
+одной строки. Правки в обход сессии версию не меняют.
+"""
+from sqlalchemy import Column, String, BigInteger, update, insert, select
+
+from app.database import Base
+
+# Версии этих таблиц берутся из других журналов
+UNVERSIONED = {"tickets", "ticket_changes", "table_versions"}
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TableVersion({self.name}: {self.version})>"
+
+
+def bump(conn, names):
+    """Увеличить версии таблиц names (строки создаются при первой записи)"""
+    names = sorted(names)
+    table = TableVersion.__table__
+    result = conn.execute(
+        update(table).where(table.c.name.in_(names)).values(version=table.c.version + 1)
+    )
+    if result.rowcount < len(names):
+        existing = set(conn.execute(select(table.c.name).where(table.c.name.in_(names))).scalars())
+        missing = [name for name in names if name not in existing]
+        if missing:
+            conn.execute(insert(table), [{"name": name, "version": 1} for name in missing])
+
@@ -1,5 +1,7 @@
 # app/models/ticket.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -30,14 +32,20 @@ class Ticket(Base):
     # Поля для доставки
     delivery_address = Column(Text, nullable=True)
     delivery_phone = Column(String(20), nullable=True)
+    # Цифры телефона в обратном порядке для поиска (app/models/search.py)
+    delivery_phone_key = Column(String(20), nullable=True)
+    # Местный номер (последние 9 цифр) для поиска по началу номера
+    delivery_phone_local_key = Column(String(20), nullable=True)
     delivery_date = Column(DateTime, nullable=True)
     delivery_notes = Column(Text, nullable=True)
     
     # Поля для клиента в сервисе
     walkin_name = Column(String(100), nullable=True)
     walkin_phone = Column(String(20), nullable=True)
+    walkin_phone_key = Column(String(20), nullable=True)
+    walkin_phone_local_key = Column(String(20), nullable=True)
     
-    # Существующие поля - УДАЛЯЕМ total_price и completed_at
+    # Существующие поля - УДАЛЯЕМ total_price
     branch = Column(String(100))
     category = Column(String(100))
     subcategory = Column(String(100))
@@ -49,6 +57,8 @@ class Ticket(Base):
     
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    # Когда заявка стала "✅ Готово" (ставится при смене статуса, ревизия 0013)
+    completed_at = Column(DateTime, nullable=True)
     
     # Связи с другими моделями
     client = relationship("Client", back_populates="tickets")
@@ -70,4 +80,15 @@ class Ticket(Base):
     )
     
     def __repr__(self):
-        return f"<Ticket(id={self.id}, status={self.status})>"
\ No newline at end of file
+        return f"<Ticket(id={self.id}, status={self.status})>"
+
+DONE_STATUS = "✅ Готово"
+
+
+@event.listens_for(Ticket.status, "set", active_history=True)
+def _track_completion(target, value, oldvalue, initiator):
+    """completed_at - время последнего перехода в "✅ Готово", иначе None"""
+    if value == DONE_STATUS and oldvalue != DONE_STATUS:
+        target.completed_at = datetime.now()
+    elif value != DONE_STATUS and oldvalue == DONE_STATUS:
+        target.completed_at = None
@@ -0,0 +1,58 @@
+# app/models/ticket_change.py
+"""
+Журнал изменений заявок для ленты /api/tickets/changes
+
+Каждое создание, изменение и удаление заявки через сессию (веб, бот,
+синхронные и асинхронные сессии) добавляет строку с возрастающим seq в
+той же транзакции. Клиент хранит последний seq и получает только то,
+что изменилось после него (app/core/change_feed.py). Правки в обход ORM
+в журнал не попадают.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, event, insert
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.ticket import Ticket
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+class TicketChange(Base):
+    __tablename__ = "ticket_changes"
+    # AUTOINCREMENT в SQLite: seq не переиспользуется после очистки журнала
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # Без внешнего ключа: запись об удалении переживает заявку
+    ticket_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.now, index=True)
+
+    def __repr__(self):
+        return f"<TicketChange({self.seq}: {self.op} #{self.ticket_id})>"
+
+
+@event.listens_for(Session, "after_flush")
+def _log_ticket_changes(session, flush_context):
+    """id новых заявок известны только после flush"""
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            changes.append((obj.id, CREATED))
+    for obj in session.dirty:
+        if isinstance(obj, Ticket) and session.is_modified(obj):
+            changes.append((obj.id, UPDATED))
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            changes.append((obj.id, DELETED))
+
+    if changes:
+        now = datetime.now()
+        session.connection().execute(insert(TicketChange.__table__), [
+            {"ticket_id": ticket_id, "op": op, "changed_at": now}
+            for ticket_id, op in changes
+        ])
@@ -0,0 +1,34 @@
+# app/models/tracking.py
+"""
+Прежние значения полей для слушателей сессии (агрегаты и счетчики)
+"""
+from sqlalchemy import event, inspect
+
+
+def _keep_previous(target, value, oldvalue, initiator):
+    return value
+
+
+def track_previous(*attributes):
+    """Загружать старое значение при присваивании (active_history)
+
+    Без этого поле, перезаписанное у истекшего после commit объекта,
+    не хранит прежнего значения - и его не из чего вычесть.
+    """
+    for attribute in attributes:
+        event.listen(attribute, "set", _keep_previous, active_history=True, retval=True)
+
+
+def previous_value(obj, field):
+    """Значение поля до изменений в текущей сессии
+
+    LookupError - поле перезаписано, а прежнее значение неизвестно.
+    """
+    history = inspect(obj).attrs[field].load_history()
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    if history.added:
+        raise LookupError(field)
+    return None
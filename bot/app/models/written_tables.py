@@ -0,0 +1,95 @@
+# app/models/written_tables.py
+"""
+Таблицы, измененные транзакцией
+
+Слушатели сессии собирают таблицы объектов при flush и таблицы
+Query.update/delete и update()/delete() через session.execute. Слушатель,
+который сам пишет в другие таблицы через session.connection() (счетчики
+app/models/counters.py), сообщает о них через mark_written(). По этим
+таблицам:
+- в той же транзакции, один раз, растет table_versions (ETag,
+  app/models/table_version.py);
+- после commit синхронно, в потоке commit, вызываются обработчики
+  on_commit() - сброс кэша статистики этого процесса (app/core/cache.py):
+  чтение сразу после commit уже не получит старый результат;
+- в шину уходит TablesWritten - для кэшей других процессов (backplane).
+"""
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.event_bus import emit, origin
+from app.models.domain_events import TablesWritten
+from app.models.table_version import UNVERSIONED, bump
+
+logger = logging.getLogger(__name__)
+
+_WRITTEN = "written_tables"
+
+_commit_hooks = []
+
+
+def on_commit(hook):
+    """Вызывать hook(tables) после commit, изменившего таблицы tables"""
+    _commit_hooks.append(hook)
+    return hook
+
+
+def remove_commit_hook(hook):
+    if hook in _commit_hooks:
+        _commit_hooks.remove(hook)
+
+
+def flushed_tables(session) -> set:
+    """Таблицы новых, измененных и удаленных объектов текущего flush"""
+    return {
+        obj.__table__.name
+        for obj in (*session.new, *session.deleted, *(o for o in session.dirty if session.is_modified(o)))
+        if hasattr(obj, "__table__")
+    }
+
+
+def mark_written(session, names):
+    """Отметить запись в таблицы names в текущей транзакции"""
+    written = session.info.setdefault(_WRITTEN, set())
+    names = set(names) - written
+    if not names:
+        return
+    written.update(names)
+    # Строка версии блокируется до commit - поэтому один раз за транзакцию
+    versioned = names - UNVERSIONED
+    if versioned:
+        bump(session.connection(), versioned)
+    emit(session, TablesWritten(origin=origin(session), tables=tuple(sorted(names))))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    mark_written(session, flushed_tables(session))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    """Query.update/delete и ORM update()/delete() проходят мимо flush"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            mark_written(orm_execute_state.session, {mapper.local_table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session):
+    written = session.info.pop(_WRITTEN, None)
+    if not written:
+        return
+    for hook in list(_commit_hooks):
+        try:
+            hook(written)
+        except Exception as e:
+            logger.error(f"Commit hook {hook} failed on {sorted(written)}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written_tables(session):
+    session.info.pop(_WRITTEN, None)
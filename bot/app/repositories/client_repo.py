@@ -0,0 +1,28 @@
+# app/repositories/client_repo.py
+"""
+Асинхронные запросы к клиентам
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.client import Client
+
+async def get_by_telegram_id(session: AsyncSession, telegram_id):
+    result = await session.execute(
+        select(Client).where(Client.telegram_id == str(telegram_id))
+    )
+    return result.scalars().first()
+
+async def get_or_create(session: AsyncSession, telegram_user) -> Client:
+    client = await get_by_telegram_id(session, telegram_user.id)
+    if client:
+        return client
+
+    client = Client(
+        telegram_id=str(telegram_user.id),
+        name=telegram_user.full_name,
+        username=telegram_user.username
+    )
+    session.add(client)
+    await session.flush()
+    return client
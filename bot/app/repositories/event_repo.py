@@ -0,0 +1,55 @@
+# app/repositories/event_repo.py
+"""
+Асинхронные запросы к событиям календаря
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.event import Event
+
+def _with_people(stmt):
+    return stmt.options(
+        selectinload(Event.master),
+        selectinload(Event.client)
+    )
+
+async def get_event(session: AsyncSession, event_id: int):
+    result = await session.execute(
+        _with_people(select(Event)).where(Event.id == event_id)
+    )
+    return result.scalars().first()
+
+async def get_events(
+    session: AsyncSession,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    master_id: int = None
+):
+    stmt = _with_people(select(Event))
+    if master_id:
+        stmt = stmt.where(Event.master_id == master_id)
+    if start_date:
+        stmt = stmt.where(Event.start_date >= start_date)
+    if end_date:
+        stmt = stmt.where(Event.start_date <= end_date)
+    result = await session.execute(stmt.order_by(Event.start_date))
+    return result.scalars().all()
+
+async def get_events_for_notification(session: AsyncSession, now: datetime, until: datetime):
+    result = await session.execute(
+        _with_people(select(Event)).where(
+            Event.notification_sent == False,
+            Event.start_date <= until,
+            Event.start_date >= now
+        )
+    )
+    return result.scalars().all()
+
+async def add_event(session: AsyncSession, **fields) -> Event:
+    event = Event(**fields)
+    session.add(event)
+    await session.flush()
+    return event
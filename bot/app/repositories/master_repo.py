@@ -0,0 +1,45 @@
+# app/repositories/master_repo.py
+"""
+Асинхронные запросы к мастерам
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.master import Master
+
+async def get_master(session: AsyncSession, master_id: int):
+    return await session.get(Master, master_id)
+
+async def get_by_telegram_id(session: AsyncSession, telegram_id):
+    result = await session.execute(
+        select(Master).where(Master.telegram_id == str(telegram_id))
+    )
+    return result.scalars().first()
+
+async def get_by_name(session: AsyncSession, name: str):
+    result = await session.execute(
+        select(Master).where(Master.name == name)
+    )
+    return result.scalars().first()
+
+async def get_all_masters(session: AsyncSession, order_by_rating: bool = False):
+    stmt = select(Master)
+    if order_by_rating:
+        stmt = stmt.order_by(Master.rating.desc())
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+async def get_rated_masters(session: AsyncSession, limit: int = None):
+    stmt = select(Master).where(
+        Master.rating_count > 0
+    ).order_by(Master.rating.desc())
+    if limit:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+async def add_master(session: AsyncSession, **fields) -> Master:
+    master = Master(**fields)
+    session.add(master)
+    await session.flush()
+    return master
@@ -0,0 +1,179 @@
+# app/repositories/part_repo.py
+"""
+Асинхронные запросы к складу запчастей
+"""
+from sqlalchemy import select, func, or_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.part import Part, PartCategory, PartSupplier, PartTransaction
+
+def _with_refs(stmt):
+    return stmt.options(
+        selectinload(Part.category),
+        selectinload(Part.supplier)
+    )
+
+# ========================
+# CATEGORIES
+# ========================
+
+async def get_categories_with_counts(session: AsyncSession):
+    """Категории вместе с количеством запчастей - одним запросом"""
+    counts = (
+        select(Part.category_id, func.count(Part.id).label("parts_count"))
+        .group_by(Part.category_id)
+        .subquery()
+    )
+    result = await session.execute(
+        select(PartCategory, func.coalesce(counts.c.parts_count, 0))
+        .outerjoin(counts, counts.c.category_id == PartCategory.id)
+        .order_by(PartCategory.id)
+    )
+    return result.all()
+
+async def get_category(session: AsyncSession, category_id: int):
+    return await session.get(PartCategory, category_id)
+
+async def add_category(session: AsyncSession, **fields) -> PartCategory:
+    category = PartCategory(**fields)
+    session.add(category)
+    await session.flush()
+    return category
+
+async def count_parts_in_category(session: AsyncSession, category_id: int) -> int:
+    result = await session.execute(
+        select(func.count(Part.id)).where(Part.category_id == category_id)
+    )
+    return result.scalar() or 0
+
+# ========================
+# SUPPLIERS
+# ========================
+
+async def get_suppliers_with_counts(session: AsyncSession):
+    """Поставщики вместе с количеством запчастей - одним запросом"""
+    counts = (
+        select(Part.supplier_id, func.count(Part.id).label("parts_count"))
+        .group_by(Part.supplier_id)
+        .subquery()
+    )
+    result = await session.execute(
+        select(PartSupplier, func.coalesce(counts.c.parts_count, 0))
+        .outerjoin(counts, counts.c.supplier_id == PartSupplier.id)
+        .order_by(PartSupplier.id)
+    )
+    return result.all()
+
+async def get_supplier(session: AsyncSession, supplier_id: int):
+    return await session.get(PartSupplier, supplier_id)
+
+async def add_supplier(session: AsyncSession, **fields) -> PartSupplier:
+    supplier = PartSupplier(**fields)
+    session.add(supplier)
+    await session.flush()
+    return supplier
+
+async def count_parts_by_supplier(session: AsyncSession, supplier_id: int) -> int:
+    result = await session.execute(
+        select(func.count(Part.id)).where(Part.supplier_id == supplier_id)
+    )
+    return result.scalar() or 0
+
+# ========================
+# PARTS
+# ========================
+
+async def get_all_parts(session: AsyncSession):
+    result = await session.execute(_with_refs(select(Part)))
+    return result.scalars().all()
+
+async def get_part(session: AsyncSession, part_id: int, with_refs: bool = True):
+    stmt = select(Part).where(Part.id == part_id)
+    if with_refs:
+        stmt = _with_refs(stmt)
+    result = await session.execute(stmt)
+    return result.scalars().first()
+
+async def get_by_sku(session: AsyncSession, sku: str):
+    result = await session.execute(select(Part).where(Part.sku == sku))
+    return result.scalars().first()
+
+async def add_part(session: AsyncSession, **fields) -> Part:
+    part = Part(**fields)
+    session.add(part)
+    await session.flush()
+    return part
+
+async def get_low_stock_parts(session: AsyncSession):
+    result = await session.execute(
+        select(Part)
+        .options(selectinload(Part.category))
+        .where(Part.is_active == True, Part.stock < Part.min_stock)
+    )
+    return result.scalars().all()
+
+async def search_parts(session: AsyncSession, query: str, limit: int = None):
+    """Поиск по названию, артикулу и бренду на стороне БД"""
+    pattern = f"%{query}%"
+    stmt = select(Part).where(
+        or_(
+            Part.name.ilike(pattern),
+            Part.sku.ilike(pattern),
+            Part.brand.ilike(pattern)
+        )
+    ).order_by(Part.name)
+    if limit:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+async def count_search_parts(session: AsyncSession, query: str) -> int:
+    pattern = f"%{query}%"
+    result = await session.execute(
+        select(func.count(Part.id)).where(
+            or_(
+                Part.name.ilike(pattern),
+                Part.sku.ilike(pattern),
+                Part.brand.ilike(pattern)
+            )
+        )
+    )
+    return result.scalar() or 0
+
+async def add_transaction(session: AsyncSession, **fields) -> PartTransaction:
+    transaction = PartTransaction(**fields)
+    session.add(transaction)
+    return transaction
+
+async def get_stock_totals(session: AsyncSession):
+    """Сводка по складу: позиции, низкий запас, стоимость"""
+    result = await session.execute(
+        select(
+            func.count(Part.id),
+            func.sum(case((Part.stock < Part.min_stock, 1), else_=0)),
+            func.sum(Part.purchase_price * Part.stock),
+            func.sum(Part.sale_price * Part.stock)
+        ).where(Part.is_active == True)
+    )
+    return result.one()
+
+async def get_category_totals(session: AsyncSession):
+    """Количество и стоимость активных запчастей по категориям"""
+    result = await session.execute(
+        select(
+            PartCategory.id,
+            PartCategory.name,
+            func.count(Part.id),
+            func.sum(Part.purchase_price * Part.stock),
+            func.sum(Part.sale_price * Part.stock)
+        )
+        .outerjoin(Part, (Part.category_id == PartCategory.id) & (Part.is_active == True))
+        .group_by(PartCategory.id, PartCategory.name)
+        .order_by(PartCategory.id)
+    )
+    return result.all()
+
+async def count_suppliers(session: AsyncSession) -> int:
+    result = await session.execute(select(func.count(PartSupplier.id)))
+    return result.scalar() or 0
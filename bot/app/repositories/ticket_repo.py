@@ -1,11 +1,64 @@
+# app/repositories/ticket_repo.py
+"""
+Асинхронные запросы к заявкам
+
+Функции репозитория получают готовую AsyncSession и не делают commit -
+транзакцией управляет сервис, который их вызывает.
+"""
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.models import Ticket
+from sqlalchemy.orm import selectinload
 
-async def get_all_tickets(session: AsyncSession):
-    result = await session.execute(
-        select(Ticket).order_by(Ticket.created_at.desc())
+from app.models.ticket import Ticket
+from app.core.ticket_query import TicketQuery
+
+DONE_STATUS = "✅ Готово"
+
+def _with_people(stmt):
+    """Сразу подгружаем клиента и мастера - ленивая загрузка в asyncio недоступна"""
+    return stmt.options(
+        selectinload(Ticket.client),
+        selectinload(Ticket.master)
     )
+
+async def get_ticket(session: AsyncSession, ticket_id: int, with_people: bool = True):
+    stmt = select(Ticket).where(Ticket.id == ticket_id)
+    if with_people:
+        stmt = _with_people(stmt)
+    result = await session.execute(stmt)
+    return result.scalars().first()
+
+async def add_ticket(session: AsyncSession, **fields) -> Ticket:
+    ticket = Ticket(**fields)
+    session.add(ticket)
+    await session.flush()
+    return ticket
+
+async def get_all_tickets(session: AsyncSession, limit: int = None):
+    stmt = _with_people(select(Ticket)).order_by(Ticket.created_at.desc())
+    if limit:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+async def query_tickets(session: AsyncSession, query: TicketQuery):
+    """(строки списка, курсор следующей страницы) по app/core/ticket_query.py"""
+    result = await session.execute(query.statement())
+    return query.page(result.all())
+
+async def get_client_tickets(
+    session: AsyncSession,
+    client_id: int,
+    active_only: bool = False,
+    limit: int = None
+):
+    stmt = _with_people(select(Ticket)).where(Ticket.client_id == client_id)
+    if active_only:
+        stmt = stmt.where(Ticket.status != DONE_STATUS)
+    stmt = stmt.order_by(Ticket.created_at.desc())
+    if limit:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
     return result.scalars().all()
 
 async def get_master_tickets(
@@ -13,6 +66,16 @@ async def get_master_tickets(
     master_id: int
 ):
     result = await session.execute(
-        select(Ticket).where(Ticket.master_id == master_id)
+        select(Ticket)
+        .where(Ticket.master_id == master_id)
+        .order_by(Ticket.created_at.desc())
+    )
+    return result.scalars().all()
+
+async def get_active_tickets(session: AsyncSession):
+    result = await session.execute(
+        select(Ticket)
+        .where(Ticket.status != DONE_STATUS)
+        .order_by(Ticket.created_at.desc())
     )
     return result.scalars().all()
@@ -1,6 +1,7 @@
 # app/routers/masters.py
 from fastapi import APIRouter, HTTPException
 from app.database import SessionLocal
+from app.core.executor import offload
 from app.models.master import Master
 from app.services.master_service import create_master, get_all_masters, update_master, delete_master
 from pydantic import BaseModel
@@ -35,7 +36,8 @@ class MasterUpdate(BaseModel):
     notes: Optional[str] = None
 
 @router.get("")
-async def get_masters():
+@offload()
+def get_masters():
     """Получить всех мастеров"""
     db = SessionLocal()
     try:
@@ -68,7 +70,8 @@ async def get_masters():
         db.close()
 
 @router.post("")
-async def create_master_endpoint(master: MasterCreate):
+@offload()
+def create_master_endpoint(master: MasterCreate):
     """Создать нового мастера"""
     db = SessionLocal()
     try:
@@ -83,7 +86,8 @@ async def create_master_endpoint(master: MasterCreate):
         db.close()
 
 @router.put("/{master_id}")
-async def update_master_endpoint(master_id: int, master: MasterUpdate):
+@offload()
+def update_master_endpoint(master_id: int, master: MasterUpdate):
     """Обновить мастера"""
     db = SessionLocal()
     try:
@@ -100,7 +104,8 @@ async def update_master_endpoint(master_id: int, master: MasterUpdate):
         db.close()
 
 @router.delete("/{master_id}")
-async def delete_master_endpoint(master_id: int):
+@offload()
+def delete_master_endpoint(master_id: int):
     """Удалить мастера"""
     db = SessionLocal()
     try:
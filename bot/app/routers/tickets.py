@@ -1,7 +1,7 @@
 # app/routers/tickets.py
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.ticket import Ticket, DeliveryMethod
 from app.models.client import Client
 from pydantic import BaseModel
@@ -9,6 +9,13 @@ from typing import Optional, List
 from datetime import datetime
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse  # Добавьте этот импорт
+from sqlalchemy import select
+from app.config import TICKETS_PAGE_SIZE
+from app.core import rollups
+from app.core.pagination import keyset_page, split_page
+from app.core.executor import offload
+from app.core.http_cache import conditional
+from app.core.change_feed import changes_since, ChangeFeedExpired
 
 
 router = APIRouter(prefix="/api", tags=["tickets"])
@@ -24,11 +31,10 @@ class WalkinTicketCreate(BaseModel):
     urgency: str = "⏳ Обычная"
 
 @router.post("/walkin-tickets")
-async def create_walkin_ticket_web(
-    ticket_data: WalkinTicketCreate,
-    db: Session = Depends(get_db)
-):
+@offload()
+def create_walkin_ticket_web(ticket_data: WalkinTicketCreate):
     """Создание заявки для клиента в сервисе (без предварительной заявки)"""
+    db = SessionLocal()
     try:
         ticket = Ticket(
             delivery_method=DeliveryMethod.WALKIN.value,
@@ -46,7 +52,7 @@ async def create_walkin_ticket_web(
         db.commit()
         db.refresh(ticket)
         
-        # Здесь можно добавить уведомление в Telegram
+        # Мастеров уведомляет подписчик TicketCreated (app/bot/subscribers.py)
         
         return {
             "success": True,
@@ -57,6 +63,8 @@ async def create_walkin_ticket_web(
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        db.close()
 
 @router.get("/admin/walkin", response_class=HTMLResponse)
 async def walkin_ticket_page(request: Request):
@@ -66,19 +74,56 @@ async def walkin_ticket_page(request: Request):
         {"request": request}
     )
 
+@router.get("/tickets/changes")
+def get_ticket_changes(
+    since: Optional[int] = None,
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Заявки, созданные, измененные или удаленные после курсора since
+
+    Без since - только текущий курсор. Ответ: {"changes", "cursor",
+    "has_more"}; при has_more сразу запрашивается следующая пачка.
+    """
+    try:
+        return changes_since(db, since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # Оставьте существующий код если есть
 @router.get("/tickets")
-def get_tickets(db: Session = Depends(get_db)):
-    tickets = db.query(Ticket).all()
+@conditional("tickets")
+def get_tickets(
+    cursor: Optional[str] = None,
+    limit: int = TICKETS_PAGE_SIZE,
+    with_total: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Заявки страницами от новых к старым (?cursor=<next_cursor>)"""
+    try:
+        stmt = keyset_page(select(Ticket), Ticket.created_at, Ticket.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    tickets, next_cursor = split_page(db.execute(stmt).scalars().all(), limit)
 
-    return [
-        {
-            "id": t.id,
-            "title": t.problem,
-            "device": t.brand,
-            "client": t.client_id,
-            "status": t.status,
-            "created_at": t.created_at
-        }
-        for t in tickets
-    ]
+    result = {
+        "items": [
+            {
+                "id": t.id,
+                "title": t.problem,
+                "device": t.brand,
+                "client": t.client_id,
+                "status": t.status,
+                "created_at": t.created_at
+            }
+            for t in tickets
+        ],
+        "next_cursor": next_cursor
+    }
+    if with_total:
+        by_status = rollups.status_counts(db)
+        result["total"] = sum(by_status.values())
+        result["by_status"] = by_status
+    return result
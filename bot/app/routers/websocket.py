@@ -1,21 +1,23 @@
-from fastapi import APIRouter, WebSocket
-import app.bot.services.ticket_service as ticket_service
-import asyncio
+# app/routers/websocket.py
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.core.realtime import hub
 
 router = APIRouter()
 
-connections = []
-
 @router.websocket("/ws")
-async def websocket_endpoint(ws: WebSocket):
-
-    await ws.accept()
-    connections.append(ws)
-
-    while True:
-
-        tickets = ticket_service.get_all_tickets()
-
-        await ws.send_json(tickets)
-
-        await asyncio.sleep(2)
+async def websocket_endpoint(ws: WebSocket, encoding: str = "json"):
+    """Изменения заявок из общего хаба (app/core/realtime.py)
+
+    Сначала приходит снимок списка {"type": "snapshot"}, затем
+    {"type": "patch"} с операциями JSON Patch по id заявки.
+    encoding=msgpack - бинарные кадры MessagePack.
+    """
+    subscriber = await hub.connect(ws, encoding)
+    try:
+        # Входящие сообщения не нужны, ждем закрытия сокета
+        while True:
+            await ws.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.disconnect(subscriber)
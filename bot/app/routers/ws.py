@@ -1,24 +1,10 @@
-from fastapi import APIRouter, WebSocket
-
-router = APIRouter()
-
-clients = []
-
-@router.websocket("/ws")
-async def websocket_endpoint(ws: WebSocket):
-
-    await ws.accept()
-
-    clients.append(ws)
-
-    try:
-        while True:
-            await ws.receive_text()
-    except:
-        clients.remove(ws)
+# app/routers/ws.py
+# Прежний модуль: сокет и рассылка теперь в общем хабе
+from app.core import fanout
+from app.core.realtime import hub
+from app.routers.websocket import router, websocket_endpoint
 
 
 async def broadcast(data):
-
-    for c in clients:
-        await c.send_json(data)
\ No newline at end of file
+    # Всем сокетам всех воркеров (app/core/fanout.py)
+    fanout.broadcast(data)
@@ -0,0 +1,118 @@
+# app/schema/__init__.py
+"""
+Версионные миграции схемы БД
+
+Каждая ревизия - модуль в app/schema/versions с атрибутами
+revision, down_revision, description и функциями upgrade(conn),
+downgrade(conn). Ревизия с irreversible = True не откатывается.
+Примененные ревизии записываются в таблицу schema_revisions.
+
+Ревизии не вызывают код приложения (пересчеты из app/core и т.п.):
+нужная логика копируется в ревизию на момент ее написания, иначе
+старая ревизия на новой версии кода сделает не то, что делала.
+
+Схема обновляется отдельным шагом перед запуском приложения, а не в
+каждом воркере:
+    python -m app.schema upgrade | downgrade <rev> | current | history
+"""
+import importlib
+import logging
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import MetaData, Table, Column, String, DateTime, select, delete, insert
+
+from app.schema import versions
+
+logger = logging.getLogger(__name__)
+
+BASE = "base"
+
+_metadata = MetaData()
+
+schema_revisions = Table(
+    "schema_revisions", _metadata,
+    Column("revision", String(32), primary_key=True),
+    Column("description", String(200)),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+
+def load_revisions():
+    """Все ревизии по порядку, с проверкой цепочки down_revision"""
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+    ]
+    modules.sort(key=lambda module: module.revision)
+
+    previous = None
+    for module in modules:
+        if module.down_revision != previous:
+            raise RuntimeError(
+                f"Ревизия {module.revision} ссылается на {module.down_revision}, "
+                f"ожидалась {previous}"
+            )
+        previous = module.revision
+    return modules
+
+
+def applied_revisions(conn) -> set:
+    schema_revisions.create(conn, checkfirst=True)
+    return set(conn.execute(select(schema_revisions.c.revision)).scalars())
+
+
+def head() -> str:
+    revisions = load_revisions()
+    return revisions[-1].revision if revisions else BASE
+
+
+def current(engine) -> str:
+    with engine.begin() as conn:
+        applied = applied_revisions(conn)
+    return max(applied) if applied else BASE
+
+
+def upgrade(engine, target: str = None):
+    """Применить ревизии до target (по умолчанию до последней)"""
+    done = []
+    for module in load_revisions():
+        if target and module.revision > target:
+            break
+        with engine.begin() as conn:
+            if module.revision in applied_revisions(conn):
+                continue
+            logger.info(f"⬆️ {module.revision}: {module.description}")
+            module.upgrade(conn)
+            conn.execute(insert(schema_revisions).values(
+                revision=module.revision,
+                description=module.description,
+                applied_at=datetime.utcnow()
+            ))
+        done.append(module.revision)
+    return done
+
+
+def downgrade(engine, target: str):
+    """Откатить ревизии новее target (target='base' - откатить все)"""
+    revisions = load_revisions()
+    blocked = [
+        module.revision for module in revisions
+        if getattr(module, "irreversible", False) and (target == BASE or module.revision > target)
+    ]
+    if blocked:
+        raise RuntimeError(f"Ревизии {', '.join(blocked)} не откатываются, выберите target не ниже {blocked[-1]}")
+    done = []
+    for module in reversed(revisions):
+        if target != BASE and module.revision <= target:
+            break
+        with engine.begin() as conn:
+            if module.revision not in applied_revisions(conn):
+                continue
+            logger.info(f"⬇️ {module.revision}: {module.description}")
+            module.downgrade(conn)
+            conn.execute(delete(schema_revisions).where(
+                schema_revisions.c.revision == module.revision
+            ))
+        done.append(module.revision)
+    return done
@@ -0,0 +1,48 @@
+# app/schema/__main__.py
+"""
+CLI миграций схемы
+Запуск: python -m app.schema upgrade [ревизия]
+        python -m app.schema downgrade <ревизия> (не ниже 0001)
+        python -m app.schema current
+        python -m app.schema history
+"""
+import argparse
+import logging
+
+from app.database import engine
+from app import schema
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграции схемы БД")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    up = commands.add_parser("upgrade", help="Применить ревизии")
+    up.add_argument("target", nargs="?", help="До какой ревизии (по умолчанию последняя)")
+
+    down = commands.add_parser("downgrade", help="Откатить ревизии")
+    down.add_argument("target", help="До какой ревизии откатить (0001 не откатывается)")
+
+    commands.add_parser("current", help="Текущая ревизия базы")
+    commands.add_parser("history", help="Список ревизий")
+
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        done = schema.upgrade(engine, args.target)
+        logger.info(f"✅ Применено ревизий: {len(done)}, текущая: {schema.current(engine)}")
+    elif args.command == "downgrade":
+        done = schema.downgrade(engine, args.target)
+        logger.info(f"✅ Откачено ревизий: {len(done)}, текущая: {schema.current(engine)}")
+    elif args.command == "current":
+        print(schema.current(engine))
+    else:
+        current = schema.current(engine)
+        for module in schema.load_revisions():
+            marker = " (current)" if module.revision == current else ""
+            print(f"{module.revision}  {module.description}{marker}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# app/schema/ops.py
+"""
+Операции для ревизий, работающие и на MySQL, и на SQLite
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+
+def has_index(conn, table: str, name: str) -> bool:
+    return any(index["name"] == name for index in inspect(conn).get_indexes(table))
+
+
+def create_index(conn, name: str, table: str, columns, unique: bool = False):
+    """CREATE INDEX, если такого индекса еще нет"""
+    if has_index(conn, table, name):
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+
+
+def create_fulltext_index(conn, name: str, table: str, columns):
+    """FULLTEXT-индекс; только MySQL, в SQLite поиск идет через LIKE"""
+    if conn.dialect.name not in ("mysql", "mariadb") or has_index(conn, table, name):
+        return
+    conn.execute(text(f"CREATE FULLTEXT INDEX {name} ON {table} ({', '.join(columns)})"))
+
+
+def drop_index(conn, name: str, table: str):
+    if not has_index(conn, table, name):
+        return
+    if conn.dialect.name == "mysql":
+        conn.execute(text(f"DROP INDEX {name} ON {table}"))
+    else:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+
+def has_column(conn, table: str, name: str) -> bool:
+    return any(column["name"] == name for column in inspect(conn).get_columns(table))
+
+
+def add_column(conn, table: str, column):
+    """ALTER TABLE ADD COLUMN по колонке модели, если ее еще нет"""
+    if has_column(conn, table, column.name):
+        return
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+
+
+def drop_column(conn, table: str, name: str):
+    if not has_column(conn, table, name):
+        return
+    conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}"))
@@ -0,0 +1 @@
+# app/schema/versions/__init__.py
@@ -0,0 +1,166 @@
+# app/schema/versions/v0001_initial_schema.py
+"""
+Исходная схема: таблицы, которые раньше создавались через create_all
+
+Определения таблиц - копия моделей на момент ревизии: колонки, которые
+добавлены позже (счетчики, ключи телефонов, completed_at), создают свои
+ревизии. Существующие таблицы не трогаются (checkfirst), поэтому
+ревизия безопасно применяется к уже работающей базе. По той же причине
+она не откатывается: в рабочей базе это таблицы с данными, а не
+созданные ревизией (irreversible - downgrade до base отказывается).
+"""
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, Float, Text, DateTime, Boolean, Enum, ForeignKey
+)
+
+revision = "0001"
+down_revision = None
+description = "Исходная схема"
+irreversible = True
+
+metadata = MetaData()
+
+clients = Table(
+    "clients", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("telegram_id", String(50), unique=True, index=True, nullable=True),
+    Column("username", String(100), nullable=True),
+    Column("name", String(200), nullable=True),
+    Column("phone", String(20), nullable=True),
+    Column("email", String(100), nullable=True),
+    Column("address", Text, nullable=True),
+    Column("notes", Text, nullable=True),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+masters = Table(
+    "masters", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("telegram_id", String(50), unique=True, index=True, nullable=True),
+    Column("name", String(100), nullable=False),
+    Column("surname", String(100), nullable=True),
+    Column("phone", String(20), nullable=True),
+    Column("specialization", String(200), nullable=True),
+    Column("experience", Integer),
+    Column("skills", Text, nullable=True),
+    Column("rating", Float),
+    Column("rating_count", Integer),
+    Column("status", String(20)),
+    Column("completed_orders", Integer),
+    Column("active_orders", Integer),
+    Column("notes", Text, nullable=True),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+tickets = Table(
+    "tickets", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("client_id", Integer, ForeignKey("clients.id")),
+    Column("master_id", Integer, ForeignKey("masters.id"), nullable=True),
+    # Enum(DeliveryMethod) хранит имена членов
+    Column("delivery_method", Enum("PICKUP", "DELIVERY", "WALKIN", name="deliverymethod"), nullable=False),
+    Column("delivery_address", Text, nullable=True),
+    Column("delivery_phone", String(20), nullable=True),
+    Column("delivery_date", DateTime, nullable=True),
+    Column("delivery_notes", Text, nullable=True),
+    Column("walkin_name", String(100), nullable=True),
+    Column("walkin_phone", String(20), nullable=True),
+    Column("branch", String(100)),
+    Column("category", String(100)),
+    Column("subcategory", String(100)),
+    Column("brand", String(100)),
+    Column("problem", Text),
+    Column("photos", Text),
+    Column("urgency", String(50)),
+    Column("status", String(50)),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+part_categories = Table(
+    "part_categories", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("description", Text, nullable=True),
+    Column("icon", String(50)),
+    Column("created_at", DateTime),
+)
+
+part_suppliers = Table(
+    "part_suppliers", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(200), nullable=False),
+    Column("contact_person", String(100), nullable=True),
+    Column("phone", String(20), nullable=True),
+    Column("email", String(100), nullable=True),
+    Column("address", Text, nullable=True),
+    Column("notes", Text, nullable=True),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+)
+
+parts = Table(
+    "parts", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(200), nullable=False),
+    Column("sku", String(50), unique=True, index=True, nullable=False),
+    Column("brand", String(100), nullable=True),
+    Column("purchase_price", Float),
+    Column("sale_price", Float),
+    Column("stock", Integer),
+    Column("min_stock", Integer),
+    Column("location", String(100), nullable=True),
+    Column("category_id", Integer, ForeignKey("part_categories.id")),
+    Column("supplier_id", Integer, ForeignKey("part_suppliers.id"), nullable=True),
+    Column("description", Text, nullable=True),
+    Column("notes", Text, nullable=True),
+    Column("image_url", String(500), nullable=True),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+part_transactions = Table(
+    "part_transactions", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("part_id", Integer, ForeignKey("parts.id")),
+    Column("transaction_type", String(20)),
+    Column("quantity", Integer),
+    Column("price", Float),
+    Column("ticket_id", Integer, ForeignKey("tickets.id"), nullable=True),
+    Column("notes", Text, nullable=True),
+    Column("created_by", Integer, nullable=True),
+    Column("created_at", DateTime),
+)
+
+events = Table(
+    "events", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(200), nullable=False),
+    Column("event_type", String(50), nullable=False),
+    Column("color", String(50)),
+    Column("start_date", DateTime, nullable=False),
+    Column("end_date", DateTime, nullable=True),
+    Column("is_all_day", Boolean),
+    Column("master_id", Integer, ForeignKey("masters.id"), nullable=True),
+    Column("client_id", Integer, ForeignKey("clients.id"), nullable=True),
+    Column("ticket_id", Integer, ForeignKey("tickets.id"), nullable=True),
+    Column("description", Text, nullable=True),
+    Column("location", String(200), nullable=True),
+    Column("notification_sent", Boolean),
+    Column("reminder_minutes", Integer),
+    Column("created_by", Integer, nullable=True),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    raise RuntimeError("Ревизия 0001 не откатывается: таблицы с данными удаляются только вручную")
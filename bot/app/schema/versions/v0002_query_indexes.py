@@ -0,0 +1,30 @@
+# app/schema/versions/v0002_query_indexes.py
+"""
+Индексы под списки, фильтры и статистику заявок, склад и уведомления
+"""
+from app.schema.ops import create_index, drop_index
+
+revision = "0002"
+down_revision = "0001"
+description = "Индексы для списков, фильтров и статистики"
+
+INDEXES = [
+    ("ix_tickets_created_at", "tickets", ["created_at"]),
+    ("ix_tickets_status_created_at", "tickets", ["status", "created_at"]),
+    ("ix_tickets_master_created_at", "tickets", ["master_id", "created_at"]),
+    ("ix_tickets_client_created_at", "tickets", ["client_id", "created_at"]),
+    ("ix_tickets_branch", "tickets", ["branch"]),
+    ("ix_tickets_category", "tickets", ["category"]),
+    ("ix_part_transactions_part_created_at", "part_transactions", ["part_id", "created_at"]),
+    ("ix_events_notification_start", "events", ["notification_sent", "start_date"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+
+
+def downgrade(conn):
+    for name, table, columns in reversed(INDEXES):
+        drop_index(conn, name, table)
@@ -0,0 +1,25 @@
+# app/schema/versions/v0003_kpi_covering_indexes.py
+"""
+Покрывающие индексы для KPI статистики
+
+Агрегат по окну created_at с разбивкой по статусу читается из индекса
+(created_at, status) без обращения к строкам таблицы. Индекс только по
+created_at становится лишним - он является префиксом нового.
+"""
+from app.schema.ops import create_index, drop_index
+
+revision = "0003"
+down_revision = "0002"
+description = "Покрывающие индексы для KPI статистики"
+
+
+def upgrade(conn):
+    create_index(conn, "ix_tickets_created_at_status", "tickets", ["created_at", "status"])
+    drop_index(conn, "ix_tickets_created_at", "tickets")
+    create_index(conn, "ix_clients_created_at", "clients", ["created_at"])
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_clients_created_at", "clients")
+    create_index(conn, "ix_tickets_created_at", "tickets", ["created_at"])
+    drop_index(conn, "ix_tickets_created_at_status", "tickets")
@@ -0,0 +1,76 @@
+# app/schema/versions/v0004_ticket_rollups.py
+"""
+Агрегаты заявок для дашбордов: по дням и по статусам
+
+Таблицы заполняются пересчетом из tickets, дальше поддерживаются
+слушателем сессии (app/models/rollup.py). Таблицы и пересчет - копия
+моделей и app.core.rollups.rebuild на момент ревизии.
+"""
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, Date, table, column, select, delete, func, literal
+)
+
+revision = "0004"
+down_revision = "0003"
+description = "Агрегаты заявок для статистики"
+
+metadata = MetaData()
+
+TABLES = [
+    Table(
+        "ticket_daily_rollup", metadata,
+        Column("day", Date, primary_key=True),
+        Column("branch", String(100), primary_key=True),
+        Column("category", String(100), primary_key=True),
+        Column("status", String(50), primary_key=True),
+        Column("count", Integer, nullable=False),
+    ),
+    Table(
+        "ticket_status_counters", metadata,
+        Column("status", String(50), primary_key=True),
+        Column("count", Integer, nullable=False),
+    ),
+]
+
+DEFAULT_STATUS = "Новая"
+
+tickets = table("tickets", column("created_at"), column("branch"), column("category"), column("status"))
+daily_rollup = table("ticket_daily_rollup", column("day"), column("branch"), column("category"),
+                     column("status"), column("count"))
+status_counters = table("ticket_status_counters", column("status"), column("count"))
+
+
+def fill(conn):
+    status = func.coalesce(tickets.c.status, DEFAULT_STATUS)
+    # DATE() одинаково пишется в MySQL и SQLite
+    day = func.date(tickets.c.created_at)
+    branch = func.coalesce(tickets.c.branch, literal(""))
+    category = func.coalesce(tickets.c.category, literal(""))
+
+    conn.execute(delete(daily_rollup))
+    conn.execute(delete(status_counters))
+    conn.execute(
+        daily_rollup.insert().from_select(
+            ["day", "branch", "category", "status", "count"],
+            select(day, branch, category, status, func.count())
+            .where(tickets.c.created_at.isnot(None))
+            .group_by(day, branch, category, status)
+        )
+    )
+    conn.execute(
+        status_counters.insert().from_select(
+            ["status", "count"],
+            select(status, func.count()).select_from(tickets).group_by(status)
+        )
+    )
+
+
+def upgrade(conn):
+    for rollup_table in TABLES:
+        rollup_table.create(conn, checkfirst=True)
+    fill(conn)
+
+
+def downgrade(conn):
+    for rollup_table in reversed(TABLES):
+        rollup_table.drop(conn, checkfirst=True)
@@ -0,0 +1,64 @@
+# app/schema/versions/v0005_relationship_counters.py
+"""
+Денормализованные счетчики: запчасти в категориях и у поставщиков,
+заявки и дата последней заявки у клиентов
+
+Колонки заполняются пересчетом (копия app.core.counters.reconcile_relationships
+на момент ревизии), дальше их поддерживают слушатели сессии
+(app/models/counters.py).
+"""
+from sqlalchemy import Column, Integer, DateTime, table, column, select, update, func
+
+from app.schema.ops import add_column, drop_column
+
+revision = "0005"
+down_revision = "0004"
+description = "Счетчики parts_count, ticket_count, last_ticket_at"
+
+# (таблица, колонка на момент ревизии)
+COLUMNS = [
+    ("part_categories", Column("parts_count", Integer, server_default="0", nullable=False)),
+    ("part_suppliers", Column("parts_count", Integer, server_default="0", nullable=False)),
+    ("clients", Column("ticket_count", Integer, server_default="0", nullable=False)),
+    ("clients", Column("last_ticket_at", DateTime, nullable=True)),
+]
+
+
+parts = table("parts", column("category_id"), column("supplier_id"))
+tickets = table("tickets", column("client_id"), column("created_at"))
+
+# (родитель, колонка счетчика, дочерняя таблица, внешний ключ)
+COUNTS = [
+    (table("part_categories", column("id"), column("parts_count")), "parts_count", parts, "category_id"),
+    (table("part_suppliers", column("id"), column("parts_count")), "parts_count", parts, "supplier_id"),
+    (table("clients", column("id"), column("ticket_count")), "ticket_count", tickets, "client_id"),
+]
+
+
+def fill(conn):
+    for parent, counter, child, foreign_key in COUNTS:
+        actual = (
+            select(func.count()).select_from(child)
+            .where(child.c[foreign_key] == parent.c.id)
+            .scalar_subquery()
+        )
+        conn.execute(update(parent).values({counter: actual}))
+
+    clients = table("clients", column("id"), column("last_ticket_at"))
+    last_ticket = (
+        select(func.max(tickets.c.created_at))
+        .where(tickets.c.client_id == clients.c.id)
+        .scalar_subquery()
+    )
+    conn.execute(update(clients).values(last_ticket_at=last_ticket))
+
+
+def upgrade(conn):
+    for table_name, new_column in COLUMNS:
+        add_column(conn, table_name, new_column)
+    fill(conn)
+
+
+def downgrade(conn):
+    for table_name, new_column in reversed(COLUMNS):
+        drop_column(conn, table_name, new_column.name)
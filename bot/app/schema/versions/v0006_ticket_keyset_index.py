@@ -0,0 +1,63 @@
+# app/schema/versions/v0006_ticket_keyset_index.py
+"""
+Индекс для keyset-пагинации заявок (app/core/pagination.py)
+
+Страница списка - диапазон по (created_at, id) в обратном порядке.
+Заявки без даты создания не попали бы ни на одну страницу, поэтому
+дата заполняется из updated_at (или текущим временем), а агрегаты
+пересчитываются с учетом этих заявок. Пересчет - копия
+app.core.rollups.rebuild на момент ревизии.
+"""
+from sqlalchemy import table, column, select, delete, func, literal, text
+
+from app.schema.ops import create_index, drop_index
+
+revision = "0006"
+down_revision = "0005"
+description = "Индекс (created_at, id) для пагинации заявок"
+
+DEFAULT_STATUS = "Новая"
+
+tickets = table("tickets", column("created_at"), column("branch"), column("category"), column("status"))
+daily_rollup = table("ticket_daily_rollup", column("day"), column("branch"), column("category"),
+                     column("status"), column("count"))
+status_counters = table("ticket_status_counters", column("status"), column("count"))
+
+
+def rebuild(conn):
+    status = func.coalesce(tickets.c.status, DEFAULT_STATUS)
+    # DATE() одинаково пишется в MySQL и SQLite
+    day = func.date(tickets.c.created_at)
+    branch = func.coalesce(tickets.c.branch, literal(""))
+    category = func.coalesce(tickets.c.category, literal(""))
+
+    conn.execute(delete(daily_rollup))
+    conn.execute(delete(status_counters))
+    conn.execute(
+        daily_rollup.insert().from_select(
+            ["day", "branch", "category", "status", "count"],
+            select(day, branch, category, status, func.count())
+            .where(tickets.c.created_at.isnot(None))
+            .group_by(day, branch, category, status)
+        )
+    )
+    conn.execute(
+        status_counters.insert().from_select(
+            ["status", "count"],
+            select(status, func.count()).select_from(tickets).group_by(status)
+        )
+    )
+
+
+def upgrade(conn):
+    filled = conn.execute(text(
+        "UPDATE tickets SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )).rowcount
+    if filled:
+        rebuild(conn)
+    create_index(conn, "ix_tickets_created_at_id", "tickets", ["created_at", "id"])
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_tickets_created_at_id", "tickets")
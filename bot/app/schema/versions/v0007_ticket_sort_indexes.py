@@ -0,0 +1,28 @@
+# app/schema/versions/v0007_ticket_sort_indexes.py
+"""
+Индексы для сортировок списка заявок (app/core/ticket_query.py)
+
+Keyset-страница по ключу сортировки читает индекс (колонка, id).
+Для branch и category подходят одноколоночные индексы ревизии 0002:
+InnoDB и SQLite хранят в них первичный ключ.
+"""
+from app.schema.ops import create_index, drop_index
+
+revision = "0007"
+down_revision = "0006"
+description = "Индексы сортировок списка заявок"
+
+INDEXES = [
+    ("ix_tickets_updated_at_id", "tickets", ["updated_at", "id"]),
+    ("ix_tickets_status_id", "tickets", ["status", "id"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+
+
+def downgrade(conn):
+    for name, table, columns in reversed(INDEXES):
+        drop_index(conn, name, table)
@@ -0,0 +1,80 @@
+# app/schema/versions/v0008_ticket_search.py
+"""
+Поиск заявок (app/core/ticket_search.py)
+
+- ключи телефонов: цифры в обратном порядке, индекс для LIKE 'ключ%'
+  (заполнение - копия rebuild_phone_keys на момент ревизии);
+- индексы префикса имени клиента и имени клиента в сервисе;
+- FULLTEXT (problem, brand) - только MySQL.
+"""
+import re
+
+from sqlalchemy import Column, String, table, column, select, update, bindparam
+
+from app.schema.ops import add_column, drop_column, create_index, create_fulltext_index, drop_index
+
+revision = "0008"
+down_revision = "0007"
+description = "Поиск заявок: ключи телефонов, имена, FULLTEXT"
+
+# (таблица, колонка ключа); колонки - String(20) NULL
+COLUMNS = [
+    ("clients", "phone_key"),
+    ("tickets", "walkin_phone_key"),
+    ("tickets", "delivery_phone_key"),
+]
+
+INDEXES = [
+    ("ix_clients_phone_key", "clients", ["phone_key"]),
+    ("ix_tickets_walkin_phone_key", "tickets", ["walkin_phone_key"]),
+    ("ix_tickets_delivery_phone_key", "tickets", ["delivery_phone_key"]),
+    ("ix_clients_name", "clients", ["name"]),
+    ("ix_tickets_walkin_name", "tickets", ["walkin_name"]),
+]
+
+FULLTEXT = ("ft_tickets_problem_brand", "tickets", ["problem", "brand"])
+
+# (таблица, телефон, ключ)
+PHONE_KEYS = [
+    ("clients", "phone", "phone_key"),
+    ("tickets", "walkin_phone", "walkin_phone_key"),
+    ("tickets", "delivery_phone", "delivery_phone_key"),
+]
+
+BATCH = 5000
+
+
+def phone_key(phone):
+    """Все цифры номера в обратном порядке"""
+    return re.sub(r"\D", "", phone or "")[::-1] or None
+
+
+def fill(conn):
+    for table_name, field, key_field in PHONE_KEYS:
+        rows_table = table(table_name, column("id"), column(field), column(key_field))
+        rows = conn.execute(select(rows_table.c.id, rows_table.c[field])).all()
+        stmt = (
+            update(rows_table)
+            .where(rows_table.c.id == bindparam("row_id"))
+            .values({key_field: bindparam("key")})
+        )
+        params = [{"row_id": row_id, "key": phone_key(phone)} for row_id, phone in rows]
+        for start in range(0, len(params), BATCH):
+            conn.execute(stmt, params[start:start + BATCH])
+
+
+def upgrade(conn):
+    for table_name, name in COLUMNS:
+        add_column(conn, table_name, Column(name, String(20), nullable=True))
+    fill(conn)
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+    create_fulltext_index(conn, *FULLTEXT)
+
+
+def downgrade(conn):
+    drop_index(conn, FULLTEXT[0], FULLTEXT[1])
+    for name, table, columns in reversed(INDEXES):
+        drop_index(conn, name, table)
+    for table_name, name in reversed(COLUMNS):
+        drop_column(conn, table_name, name)
@@ -0,0 +1,27 @@
+# app/schema/versions/v0009_updated_at_indexes.py
+"""
+Индексы updated_at для отпечатков ETag (app/core/http_cache.py)
+
+MAX(updated_at) по индексу - одно чтение вместо обхода таблицы.
+У tickets такой индекс уже есть (ix_tickets_updated_at_id, ревизия 0007).
+"""
+from app.schema.ops import create_index, drop_index
+
+revision = "0009"
+down_revision = "0008"
+description = "Индексы updated_at для ETag"
+
+INDEXES = [
+    ("ix_parts_updated_at", "parts", ["updated_at"]),
+    ("ix_clients_updated_at", "clients", ["updated_at"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+
+
+def downgrade(conn):
+    for name, table, columns in reversed(INDEXES):
+        drop_index(conn, name, table)
@@ -0,0 +1,31 @@
+# app/schema/versions/v0010_ticket_changes.py
+"""
+Журнал изменений заявок для ленты /api/tickets/changes
+
+Журнал начинается пустым: клиенты берут текущий курсор и загружают
+список заново (app/core/change_feed.py). Таблица - копия модели
+TicketChange на момент ревизии.
+"""
+from sqlalchemy import MetaData, Table, Column, Integer, BigInteger, String, DateTime
+
+revision = "0010"
+down_revision = "0009"
+description = "Журнал изменений заявок"
+
+ticket_changes = Table(
+    "ticket_changes", MetaData(),
+    # AUTOINCREMENT в SQLite: seq не переиспользуется после очистки журнала
+    Column("seq", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+    Column("ticket_id", Integer, nullable=False),
+    Column("op", String(10), nullable=False),
+    Column("changed_at", DateTime, nullable=False, index=True),
+    sqlite_autoincrement=True,
+)
+
+
+def upgrade(conn):
+    ticket_changes.create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    ticket_changes.drop(conn, checkfirst=True)
@@ -0,0 +1,44 @@
+# app/schema/versions/v0011_low_stock_counter.py
+"""
+Счетчик запчастей с низким запасом (app/models/stock_counter.py)
+
+Таблица (копия модели PartStockCounter на момент ревизии) заполняется
+пересчетом из parts (копия app.core.counters.reconcile_low_stock), дальше
+счетчик поддерживается слушателем сессии.
+"""
+from sqlalchemy import MetaData, Table, Column, Integer, String, table, column, select, delete, func, literal, true
+
+revision = "0011"
+down_revision = "0010"
+description = "Счетчик запчастей с низким запасом"
+
+
+LOW_STOCK = "low_stock"
+
+part_stock_counters = Table(
+    "part_stock_counters", MetaData(),
+    Column("name", String(50), primary_key=True),
+    Column("count", Integer, nullable=False),
+)
+
+parts = table("parts", column("is_active"), column("stock"), column("min_stock"))
+counters = table("part_stock_counters", column("name"), column("count"))
+
+
+def fill(conn):
+    low = (
+        select(func.count()).select_from(parts)
+        .where(parts.c.is_active == true(), parts.c.stock < parts.c.min_stock)
+        .scalar_subquery()
+    )
+    conn.execute(delete(counters).where(counters.c.name == LOW_STOCK))
+    conn.execute(counters.insert().from_select(["name", "count"], select(literal(LOW_STOCK), low)))
+
+
+def upgrade(conn):
+    part_stock_counters.create(conn, checkfirst=True)
+    fill(conn)
+
+
+def downgrade(conn):
+    part_stock_counters.drop(conn, checkfirst=True)
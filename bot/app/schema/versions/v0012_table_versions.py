@@ -0,0 +1,30 @@
+# app/schema/versions/v0012_table_versions.py
+"""
+Версии таблиц для ETag (app/models/table_version.py)
+
+Строки создаются с версией 0; таблицы, которых нет в списке, получат
+строку при первой записи.
+"""
+from sqlalchemy import MetaData, Table, Column, String, BigInteger, insert
+
+revision = "0012"
+down_revision = "0011"
+description = "Версии таблиц для ETag"
+
+# Определение на момент ревизии, не зависит от текущих моделей
+table_versions = Table(
+    "table_versions", MetaData(),
+    Column("name", String(64), primary_key=True),
+    Column("version", BigInteger, nullable=False, default=0),
+)
+
+TABLES = ["clients", "masters", "parts", "part_categories", "part_suppliers", "part_transactions", "events"]
+
+
+def upgrade(conn):
+    table_versions.create(conn, checkfirst=True)
+    conn.execute(insert(table_versions), [{"name": name, "version": 0} for name in TABLES])
+
+
+def downgrade(conn):
+    table_versions.drop(conn, checkfirst=True)
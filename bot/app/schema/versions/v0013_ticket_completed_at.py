@@ -0,0 +1,23 @@
+# app/schema/versions/v0013_ticket_completed_at.py
+"""
+Время выполнения заявки: tickets.completed_at
+
+Дальше колонку заполняет слушатель смены статуса (app/models/ticket.py).
+У заявок, выполненных до ревизии, времени нет - они не входят в среднее
+время ремонта (statistics_api.weekday_panel).
+"""
+from sqlalchemy import Column, DateTime
+
+from app.schema.ops import add_column, drop_column
+
+revision = "0013"
+down_revision = "0012"
+description = "Время выполнения заявки"
+
+
+def upgrade(conn):
+    add_column(conn, "tickets", Column("completed_at", DateTime, nullable=True))
+
+
+def downgrade(conn):
+    drop_column(conn, "tickets", "completed_at")
@@ -0,0 +1,67 @@
+# app/schema/versions/v0014_phone_local_keys.py
+"""
+Поиск по началу номера: *_phone_local_key (app/models/search.py)
+
+Местный номер - последние 9 цифр телефона в прямом порядке, индекс для
+LIKE 'цифры%'. Заполнение - копия phone_local_key на момент ревизии.
+"""
+import re
+
+from sqlalchemy import Column, String, table, column, select, update, bindparam
+
+from app.schema.ops import add_column, drop_column, create_index, drop_index
+
+revision = "0014"
+down_revision = "0013"
+description = "Поиск по началу номера телефона"
+
+LOCAL_PHONE_DIGITS = 9
+BATCH = 5000
+
+# (таблица, телефон, ключ)
+COLUMNS = [
+    ("clients", "phone", "phone_local_key"),
+    ("tickets", "walkin_phone", "walkin_phone_local_key"),
+    ("tickets", "delivery_phone", "delivery_phone_local_key"),
+]
+
+INDEXES = [
+    ("ix_clients_phone_local_key", "clients", ["phone_local_key"]),
+    ("ix_tickets_walkin_phone_local_key", "tickets", ["walkin_phone_local_key"]),
+    ("ix_tickets_delivery_phone_local_key", "tickets", ["delivery_phone_local_key"]),
+]
+
+
+def local_key(phone):
+    return re.sub(r"\D", "", phone or "")[-LOCAL_PHONE_DIGITS:] or None
+
+
+def fill(conn):
+    for table_name, field, key_field in COLUMNS:
+        rows_table = table(table_name, column("id"), column(field), column(key_field))
+        rows = conn.execute(
+            select(rows_table.c.id, rows_table.c[field]).where(rows_table.c[field].isnot(None))
+        ).all()
+        stmt = (
+            update(rows_table)
+            .where(rows_table.c.id == bindparam("row_id"))
+            .values({key_field: bindparam("key")})
+        )
+        params = [{"row_id": row_id, "key": local_key(phone)} for row_id, phone in rows]
+        for start in range(0, len(params), BATCH):
+            conn.execute(stmt, params[start:start + BATCH])
+
+
+def upgrade(conn):
+    for table_name, field, key_field in COLUMNS:
+        add_column(conn, table_name, Column(key_field, String(20), nullable=True))
+    fill(conn)
+    for name, table_name, columns in INDEXES:
+        create_index(conn, name, table_name, columns)
+
+
+def downgrade(conn):
+    for name, table_name, columns in reversed(INDEXES):
+        drop_index(conn, name, table_name)
+    for table_name, field, key_field in reversed(COLUMNS):
+        drop_column(conn, table_name, key_field)
@@ -2,7 +2,8 @@
 from app.database import SessionLocal
 from app.models.part import Part, PartCategory, PartSupplier, PartTransaction
 from sqlalchemy.orm import joinedload
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, case, select
+from app.models.stock_counter import PartStockCounter, LOW_STOCK
 import logging
 from datetime import datetime
 
@@ -19,14 +20,12 @@ def get_all_categories():
         categories = db.query(PartCategory).all()
         result = []
         for cat in categories:
-            # Подсчитываем количество запчастей в категории
-            parts_count = db.query(Part).filter(Part.category_id == cat.id).count()
             result.append({
                 "id": cat.id,
                 "name": cat.name,
                 "description": cat.description,
                 "icon": cat.icon,
-                "count": parts_count,
+                "count": cat.parts_count,
                 "created_at": cat.created_at.isoformat() if cat.created_at else None
             })
         return result
@@ -107,42 +106,37 @@ def delete_category(category_id):
 # PART CRUD
 # ========================
 
+# Поля списка запчастей в порядке колонок PARTS_LIST_COLUMNS
+PARTS_LIST_FIELDS = (
+    "id", "name", "sku", "brand", "category_id", "category_name", "category_icon",
+    "purchase_price", "sale_price", "stock", "min_stock", "status",
+    "supplier_id", "supplier_name", "description", "notes", "image_url",
+    "location", "total_value", "is_active", "created_at", "updated_at"
+)
+
+PARTS_LIST_COLUMNS = (
+    Part.id, Part.name, Part.sku, Part.brand, Part.category_id,
+    func.coalesce(PartCategory.name, "Без категории"),
+    func.coalesce(PartCategory.icon, "fas fa-box"),
+    Part.purchase_price, Part.sale_price, Part.stock, Part.min_stock, Part.status,
+    Part.supplier_id, PartSupplier.name, Part.description, Part.notes, Part.image_url,
+    Part.location, Part.total_value, Part.is_active, Part.created_at, Part.updated_at
+)
+
 def get_all_parts():
-    """Получить все запчасти"""
+    """Получить все запчасти
+
+    Только нужные колонки, строки - кортежами без ORM-объектов. Даты
+    остаются datetime: их кодирует FastJSONResponse (app/core/fastjson.py).
+    """
     db = SessionLocal()
     try:
-        parts = db.query(Part).options(
-            joinedload(Part.category),
-            joinedload(Part.supplier)
-        ).all()
-        
-        result = []
-        for part in parts:
-            result.append({
-                "id": part.id,
-                "name": part.name,
-                "sku": part.sku,
-                "brand": part.brand,
-                "category_id": part.category_id,
-                "category_name": part.category.name if part.category else "Без категории",
-                "category_icon": part.category.icon if part.category else "fas fa-box",
-                "purchase_price": part.purchase_price,
-                "sale_price": part.sale_price,
-                "stock": part.stock,
-                "min_stock": part.min_stock,
-                "status": part.status,
-                "supplier_id": part.supplier_id,
-                "supplier_name": part.supplier.name if part.supplier else None,
-                "description": part.description,
-                "notes": part.notes,
-                "image_url": part.image_url,
-                "location": part.location,
-                "total_value": part.total_value,
-                "is_active": part.is_active,
-                "created_at": part.created_at.isoformat() if part.created_at else None,
-                "updated_at": part.updated_at.isoformat() if part.updated_at else None
-            })
-        return result
+        rows = db.execute(
+            select(*PARTS_LIST_COLUMNS)
+            .outerjoin(PartCategory, PartCategory.id == Part.category_id)
+            .outerjoin(PartSupplier, PartSupplier.id == Part.supplier_id)
+        )
+        return [dict(zip(PARTS_LIST_FIELDS, row)) for row in rows]
     except Exception as e:
         logger.error(f"Error getting parts: {e}")
         return []
@@ -371,6 +365,18 @@ def adjust_stock(part_id, quantity, transaction_type="in", notes=""):
     finally:
         db.close()
 
+def get_low_stock_count():
+    """Количество активных запчастей ниже минимального запаса (счетчик)"""
+    db = SessionLocal()
+    try:
+        return low_stock_count(db)
+    finally:
+        db.close()
+
+def low_stock_count(db) -> int:
+    count = db.query(PartStockCounter.count).filter(PartStockCounter.name == LOW_STOCK).scalar()
+    return int(count or 0)
+
 def get_low_stock_parts():
     """Получить запчасти с низким запасом"""
     db = SessionLocal()
@@ -408,7 +414,6 @@ def get_all_suppliers():
         suppliers = db.query(PartSupplier).all()
         result = []
         for supplier in suppliers:
-            parts_count = db.query(Part).filter(Part.supplier_id == supplier.id).count()
             result.append({
                 "id": supplier.id,
                 "name": supplier.name,
@@ -418,7 +423,7 @@ def get_all_suppliers():
                 "address": supplier.address,
                 "notes": supplier.notes,
                 "is_active": supplier.is_active,
-                "parts_count": parts_count,
+                "parts_count": supplier.parts_count,
                 "created_at": supplier.created_at.isoformat() if supplier.created_at else None
             })
         return result
@@ -585,60 +590,89 @@ def get_part_transactions(part_id, limit=50):
 # STATISTICS
 # ========================
 
+def category_aggregates(db):
+    """Агрегаты склада по категориям одним GROUP BY category_id
+
+    Возвращает {category_id: {...}}, ключ None - запчасти без категории.
+    Поля без префикса считают все запчасти, active_* - только активные.
+    Итоги по складу - сумма значений словаря.
+    """
+    active = Part.is_active == True
+    purchase = Part.purchase_price * Part.stock
+    sale = Part.sale_price * Part.stock
+    low = Part.stock < Part.min_stock
+
+    def total(value, condition=None):
+        if condition is not None:
+            value = case((condition, value), else_=0)
+        return func.coalesce(func.sum(value), 0)
+
+    columns = {
+        "parts": func.count(Part.id),
+        "active_parts": total(1, active),
+        "stock": total(Part.stock),
+        "low_stock": total(1, low),
+        "active_low_stock": total(1, and_(active, low)),
+        "purchase_value": total(purchase),
+        "sale_value": total(sale),
+        "active_purchase_value": total(purchase, active),
+        "active_sale_value": total(sale, active),
+    }
+    rows = db.query(
+        Part.category_id, *(column.label(name) for name, column in columns.items())
+    ).group_by(Part.category_id).all()
+
+    return {
+        row.category_id: {name: getattr(row, name) or 0 for name in columns}
+        for row in rows
+    }
+
+def sum_aggregates(aggregates):
+    """Итог по всем категориям для результата category_aggregates"""
+    totals = {}
+    for values in aggregates.values():
+        for name, value in values.items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
 def get_part_statistics():
     """Получить статистику по запчастям"""
     db = SessionLocal()
     try:
-        total_parts = db.query(Part).filter(Part.is_active == True).count()
-        total_categories = db.query(PartCategory).count()
-        total_suppliers = db.query(PartSupplier).count()
-        low_stock = db.query(Part).filter(
-            Part.is_active == True,
-            Part.stock < Part.min_stock
-        ).count()
-        
-        # Закупочная стоимость склада
-        purchase_value = db.query(func.sum(Part.purchase_price * Part.stock)).scalar() or 0
+        # Один проход по parts вместо трех запросов на каждую категорию
+        aggregates = category_aggregates(db)
+        totals = sum_aggregates(aggregates)
+        categories = db.query(PartCategory.id, PartCategory.name).all()
+        total_suppliers = db.query(func.count(PartSupplier.id)).scalar()
         
-        # Продажная стоимость склада
-        sale_value = db.query(func.sum(Part.sale_price * Part.stock)).scalar() or 0
+        # Закупочная и продажная стоимость склада (все запчасти)
+        purchase_value = totals.get("purchase_value", 0)
+        sale_value = totals.get("sale_value", 0)
         
         # Потенциальная прибыль
         potential_profit = sale_value - purchase_value
         
-        # Статистика по категориям
+        # Статистика по категориям (только активные запчасти)
         categories_stats = []
-        categories = db.query(PartCategory).all()
-        for cat in categories:
-            cat_parts = db.query(Part).filter(
-                Part.category_id == cat.id,
-                Part.is_active == True
-            ).count()
-            
-            cat_purchase_value = db.query(func.sum(Part.purchase_price * Part.stock)).filter(
-                Part.category_id == cat.id,
-                Part.is_active == True
-            ).scalar() or 0
-            
-            cat_sale_value = db.query(func.sum(Part.sale_price * Part.stock)).filter(
-                Part.category_id == cat.id,
-                Part.is_active == True
-            ).scalar() or 0
+        for cat_id, cat_name in categories:
+            cat = aggregates.get(cat_id, {})
+            cat_purchase_value = cat.get("active_purchase_value", 0)
+            cat_sale_value = cat.get("active_sale_value", 0)
             
             categories_stats.append({
-                "id": cat.id,
-                "name": cat.name,
-                "parts_count": cat_parts,
+                "id": cat_id,
+                "name": cat_name,
+                "parts_count": int(cat.get("active_parts", 0)),
                 "purchase_value": float(cat_purchase_value),
                 "sale_value": float(cat_sale_value),
                 "profit": float(cat_sale_value - cat_purchase_value)
             })
         
         return {
-            "total_parts": total_parts,
-            "total_categories": total_categories,
+            "total_parts": int(totals.get("active_parts", 0)),
+            "total_categories": len(categories),
             "total_suppliers": total_suppliers,
-            "low_stock": low_stock,
+            "low_stock": int(totals.get("active_low_stock", 0)),
             "purchase_value": float(purchase_value),
             "sale_value": float(sale_value),
             "potential_profit": float(potential_profit),
@@ -6,6 +6,10 @@ from app.database import SessionLocal
 from app.models.ticket import Ticket, DeliveryMethod
 from app.models.master import Master
 from app.models.client import Client
+from app.models.rollup import TicketDailyRollup
+from app.core import rollups
+from app.core.dialects import sql_functions
+from app.core.ticket_query import LIST_COLUMNS, TicketQuery, list_select
 from sqlalchemy.orm import joinedload
 import json
 from datetime import datetime
@@ -14,66 +18,68 @@ from datetime import datetime
 # ФУНКЦИИ ДЛЯ ВЕБ-АДМИНКИ
 # ========================
 
+DELIVERY_METHOD_TEXT = {
+    DeliveryMethod.PICKUP: "Самовывоз",
+    DeliveryMethod.DELIVERY: "Доставка",
+    DeliveryMethod.WALKIN: "В сервисе"
+}
+
+def _admin_columns(bind):
+    """Колонки списка (app/core/ticket_query.py) и поля формата веб-админки
+
+    Строки читаются кортежами, без ORM-объектов; дата для таблицы
+    форматируется в SQL.
+    """
+    sql = sql_functions(bind)
+    return LIST_COLUMNS + (
+        sql.format_datetime(Ticket.created_at).label("created_at_text"),
+        Client.telegram_id.label("client_telegram_id"),
+        Ticket.problem,
+        Ticket.subcategory,
+        Ticket.photos,
+        Ticket.delivery_address,
+        Ticket.delivery_phone,
+        Ticket.delivery_date,
+        Ticket.delivery_notes
+    )
+
+def _ticket_rows(rows):
+    """Строки с колонками _admin_columns в формат веб-админки"""
+    result = []
+    for row in rows:
+        result.append({
+            "id": row.id,
+            "client_name": (row.client_name or "") if row.client_id is not None else (row.walkin_name or ""),
+            "client_phone": row.client_phone or row.walkin_phone or "",
+            "delivery_method": DELIVERY_METHOD_TEXT.get(row.delivery_method, "Не указан"),
+            "category": row.category or "",
+            "brand": row.brand or "",
+            "problem": row.problem or "",
+            "status": row.status or "Новая",
+            "master_name": row.master_name or "Не назначен",
+            "created_at": row.created_at_text or "",
+            # Добавляем все поля для веб-админки
+            "client_id": row.client_id,
+            "master_id": row.master_id,
+            "branch": row.branch or "",
+            "subcategory": row.subcategory or "",
+            "urgency": row.urgency or "",
+            "photos": json.loads(row.photos) if row.photos else [],
+            "delivery_address": row.delivery_address or "",
+            "delivery_phone": row.delivery_phone or "",
+            "delivery_date": str(row.delivery_date) if row.delivery_date else "",
+            "delivery_notes": row.delivery_notes or "",
+            "walkin_name": row.walkin_name or "",
+            "walkin_phone": row.walkin_phone or "",
+            "client_telegram_id": row.client_telegram_id
+        })
+    return result
+
 def get_all_tickets():
     """Получить все заявки (старый формат для веб-админки)"""
     db = SessionLocal()
     try:
-        tickets = db.query(Ticket).options(
-            joinedload(Ticket.client),
-            joinedload(Ticket.master)
-        ).order_by(Ticket.created_at.desc()).all()
-        
-        result = []
-        for ticket in tickets:
-            # Определяем имя клиента
-            client_name = ""
-            if ticket.client:
-                client_name = ticket.client.name or ""
-            elif ticket.walkin_name:
-                client_name = ticket.walkin_name
-            
-            # Определяем телефон
-            client_phone = ""
-            if ticket.client and ticket.client.phone:
-                client_phone = ticket.client.phone
-            elif ticket.walkin_phone:
-                client_phone = ticket.walkin_phone
-            
-            # Определяем способ получения
-            delivery_method_text = {
-                DeliveryMethod.PICKUP.value: "Самовывоз",
-                DeliveryMethod.DELIVERY.value: "Доставка",
-                DeliveryMethod.WALKIN.value: "В сервисе"
-            }.get(ticket.delivery_method, "Не указан")
-            
-            result.append({
-                "id": ticket.id,
-                "client_name": client_name,
-                "client_phone": client_phone,
-                "delivery_method": delivery_method_text,
-                "category": ticket.category or "",
-                "brand": ticket.brand or "",
-                "problem": ticket.problem or "",
-                "status": ticket.status or "Новая",
-                "master_name": ticket.master.name if ticket.master else "Не назначен",
-                "created_at": ticket.created_at.strftime("%d.%m.%Y %H:%M") if ticket.created_at else "",
-                # Добавляем все поля для веб-админки
-                "client_id": ticket.client_id,
-                "master_id": ticket.master_id,
-                "branch": ticket.branch or "",
-                "subcategory": ticket.subcategory or "",
-                "urgency": ticket.urgency or "",
-                "photos": json.loads(ticket.photos) if ticket.photos else [],
-                "delivery_address": ticket.delivery_address or "",
-                "delivery_phone": ticket.delivery_phone or "",
-                "delivery_date": str(ticket.delivery_date) if ticket.delivery_date else "",
-                "delivery_notes": ticket.delivery_notes or "",
-                "walkin_name": ticket.walkin_name or "",
-                "walkin_phone": ticket.walkin_phone or "",
-                "client_telegram_id": ticket.client.telegram_id if ticket.client else None
-            })
-        
-        return result
+        return all_ticket_rows(db)
         
     except Exception as e:
         print(f"Error getting all tickets: {e}")
@@ -81,6 +87,41 @@ def get_all_tickets():
     finally:
         db.close()
 
+def get_tickets_page(cursor=None, limit=None, with_total=False):
+    """Страница заявок от новых к старым - TicketQuery без фильтров
+
+    Возвращает {"items", "next_cursor"}; с with_total - еще "total" и
+    "by_status" из счетчиков статусов (без обхода tickets).
+    Некорректный курсор - ValueError.
+    """
+    query = TicketQuery(cursor=cursor, limit=limit)
+    db = SessionLocal()
+    try:
+        rows, next_cursor = query.page(db.execute(query.statement(_admin_columns(db))).all())
+        result = {
+            "items": _ticket_rows(rows),
+            "next_cursor": next_cursor
+        }
+        if with_total:
+            by_status = rollups.status_counts(db)
+            result["total"] = sum(by_status.values())
+            result["by_status"] = by_status
+        return result
+    finally:
+        db.close()
+
+def ticket_rows_by_id(db, ticket_ids) -> dict:
+    """{id: заявка в формате веб-админки} для существующих из ticket_ids"""
+    if not ticket_ids:
+        return {}
+    stmt = list_select(_admin_columns(db)).where(Ticket.id.in_(ticket_ids))
+    return {row["id"]: row for row in _ticket_rows(db.execute(stmt))}
+
+def all_ticket_rows(db) -> list:
+    """Весь список в формате веб-админки (от новых к старым) в сессии db"""
+    stmt = list_select(_admin_columns(db)).order_by(Ticket.created_at.desc(), Ticket.id.desc())
+    return _ticket_rows(db.execute(stmt))
+
 def get_ticket(ticket_id):
     """Получить заявку по ID (старый формат)"""
     db = SessionLocal()
@@ -193,27 +234,23 @@ def get_statistics():
     """Получить статистику"""
     db = SessionLocal()
     try:
-        total_tickets = db.query(Ticket).count()
-        new_tickets = db.query(Ticket).filter(Ticket.status == "Новая").count()
-        in_progress = db.query(Ticket).filter(Ticket.status.in_(["В работе", "🧪 Диагностика", "🔧 В ремонте"])).count()
-        completed = db.query(Ticket).filter(Ticket.status == "✅ Готово").count()
+        # Заявки - из агрегатов (app/models/rollup.py), без обхода tickets
+        by_status = rollups.status_counts(db)
+        total_tickets = sum(by_status.values())
+        new_tickets = by_status.get("Новая", 0)
+        in_progress = sum(by_status.get(status, 0) for status in ["В работе", "🧪 Диагностика", "🔧 В ремонте"])
+        completed = by_status.get("✅ Готово", 0)
         
         total_masters = db.query(Master).count()
         active_masters = db.query(Master).filter(Master.status == "active").count()
         
         # Статистика за сегодня
-        today = datetime.now().date()
-        today_tickets = db.query(Ticket).filter(
-            db.func.date(Ticket.created_at) == today
-        ).count()
+        today_tickets = rollups.created_on(db, datetime.now().date())
         
         # Статистика по филиалам
-        branches = db.query(Ticket.branch).distinct().all()
-        branch_stats = {}
-        for branch in branches:
-            if branch[0]:
-                count = db.query(Ticket).filter(Ticket.branch == branch[0]).count()
-                branch_stats[branch[0]] = count
+        branch_stats = rollups.counts_by(
+            db, TicketDailyRollup.branch, TicketDailyRollup.branch != ""
+        )
         
         return {
             "tickets": {
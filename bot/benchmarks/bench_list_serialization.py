@@ -0,0 +1,162 @@
+# benchmarks/bench_list_serialization.py
+"""
+Списки заявок и запчастей: ORM-объекты + jsonable_encoder против
+выборки нужных колонок + FastJSONResponse (app/core/fastjson.py)
+
+Замеряются процессорное время (time.process_time) и пик памяти Python
+(tracemalloc) на полный путь "запрос -> тело ответа" для
+GET /api/admin/tickets (весь список) и GET /api/parts.
+
+Запуск (из папки bot): python -m benchmarks.bench_list_serialization --tickets 100000 --parts 100000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import joinedload
+
+from app.database import SessionLocal
+from app.core import fastjson
+from app.models import Ticket, Part
+from app.services import part_service
+from app.services.ticket_service_compat import get_all_tickets, DELIVERY_METHOD_TEXT
+from benchmarks.common import (
+    make_database, add_database_args, seed_people, seed_tickets, seed_parts
+)
+
+
+def tickets_before():
+    """Прежний get_all_tickets: объекты Ticket с клиентом и мастером"""
+    db = SessionLocal()
+    try:
+        tickets = db.query(Ticket).options(
+            joinedload(Ticket.client),
+            joinedload(Ticket.master)
+        ).order_by(Ticket.created_at.desc()).all()
+        result = []
+        for ticket in tickets:
+            client = ticket.client
+            result.append({
+                "id": ticket.id,
+                "client_name": (client.name or "") if client else (ticket.walkin_name or ""),
+                "client_phone": (client.phone if client and client.phone else ticket.walkin_phone) or "",
+                "delivery_method": DELIVERY_METHOD_TEXT.get(ticket.delivery_method, "Не указан"),
+                "category": ticket.category or "",
+                "brand": ticket.brand or "",
+                "problem": ticket.problem or "",
+                "status": ticket.status or "Новая",
+                "master_name": ticket.master.name if ticket.master else "Не назначен",
+                "created_at": ticket.created_at.strftime("%d.%m.%Y %H:%M") if ticket.created_at else "",
+                "client_id": ticket.client_id,
+                "master_id": ticket.master_id,
+                "branch": ticket.branch or "",
+                "subcategory": ticket.subcategory or "",
+                "urgency": ticket.urgency or "",
+                "photos": json.loads(ticket.photos) if ticket.photos else [],
+                "delivery_address": ticket.delivery_address or "",
+                "delivery_phone": ticket.delivery_phone or "",
+                "delivery_date": str(ticket.delivery_date) if ticket.delivery_date else "",
+                "delivery_notes": ticket.delivery_notes or "",
+                "walkin_name": ticket.walkin_name or "",
+                "walkin_phone": ticket.walkin_phone or "",
+                "client_telegram_id": client.telegram_id if client else None
+            })
+        return result
+    finally:
+        db.close()
+
+
+def parts_before():
+    """Прежний get_all_parts: объекты Part с категорией и поставщиком"""
+    db = SessionLocal()
+    try:
+        parts = db.query(Part).options(
+            joinedload(Part.category),
+            joinedload(Part.supplier)
+        ).all()
+        return [{
+            "id": part.id,
+            "name": part.name,
+            "sku": part.sku,
+            "brand": part.brand,
+            "category_id": part.category_id,
+            "category_name": part.category.name if part.category else "Без категории",
+            "category_icon": part.category.icon if part.category else "fas fa-box",
+            "purchase_price": part.purchase_price,
+            "sale_price": part.sale_price,
+            "stock": part.stock,
+            "min_stock": part.min_stock,
+            "status": part.status,
+            "supplier_id": part.supplier_id,
+            "supplier_name": part.supplier.name if part.supplier else None,
+            "description": part.description,
+            "notes": part.notes,
+            "image_url": part.image_url,
+            "location": part.location,
+            "total_value": part.total_value,
+            "is_active": part.is_active,
+            "created_at": part.created_at.isoformat() if part.created_at else None,
+            "updated_at": part.updated_at.isoformat() if part.updated_at else None
+        } for part in parts]
+    finally:
+        db.close()
+
+
+def body_before(rows) -> bytes:
+    """Как FastAPI сериализует возвращенный dict по умолчанию"""
+    content = jsonable_encoder({"success": True, "data": rows})
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def body_after(rows) -> bytes:
+    return fastjson.dumps({"success": True, "data": rows})
+
+
+def profile(fn, repeat: int):
+    """(мс процессора - медиана, пик памяти МБ, размер тела КБ)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        body = fn()
+        timings.append((time.process_time() - started) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sorted(timings)[len(timings) // 2], peak / 2 ** 20, len(body) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=20_000)
+    parser.add_argument("--masters", type=int, default=30)
+    parser.add_argument("--parts", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=200)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    engine, _ = make_database("serialization", args.url)
+    print(f"Генерация: {args.tickets} заявок, {args.parts} запчастей...")
+    seed_people(engine, args.clients, args.masters)
+    seed_tickets(engine, args.tickets, args.clients, args.masters)
+    seed_parts(engine, args.categories, args.parts)
+    SessionLocal.configure(bind=engine)
+
+    cases = [
+        ("заявки: ORM + jsonable_encoder", lambda: body_before(tickets_before())),
+        ("заявки: колонки + fastjson", lambda: body_after(get_all_tickets())),
+        ("запчасти: ORM + jsonable_encoder", lambda: body_before(parts_before())),
+        ("запчасти: колонки + fastjson", lambda: body_after(part_service.get_all_parts())),
+    ]
+    print(f"\norjson: {'да' if fastjson.orjson is not None else 'нет, стандартный json'}")
+    print(f"{'вариант':<36}{'CPU мс':>10}{'пик МБ':>10}{'тело КБ':>10}")
+    for name, fn in cases:
+        cpu_ms, peak_mb, size_kb = profile(fn, args.repeat)
+        print(f"{name:<36}{cpu_ms:>10.1f}{peak_mb:>10.1f}{size_kb:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_part_statistics.py
+"""
+Статистика склада: запросы на каждую категорию против одного GROUP BY
+
+Сравниваются part_service.get_part_statistics (/api/parts/stats/all,
+боковая панель опрашивает его каждые 30 секунд) и панель запчастей
+статистики в прежнем и текущем виде.
+
+Запуск (из папки bot): python -m benchmarks.bench_part_statistics --categories 200 --parts 100000
+"""
+import argparse
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.api.statistics_api import parts_panel
+from app.models import Part, PartCategory, PartSupplier
+from app.services import part_service
+from benchmarks.common import make_database, add_database_args, seed_parts, measure, report
+
+
+def part_statistics_before(db):
+    """Прежний get_part_statistics: три запроса на каждую категорию"""
+    db.query(Part).filter(Part.is_active == True).count()
+    db.query(PartCategory).count()
+    db.query(PartSupplier).count()
+    db.query(Part).filter(Part.is_active == True, Part.stock < Part.min_stock).count()
+    db.query(func.sum(Part.purchase_price * Part.stock)).scalar()
+    db.query(func.sum(Part.sale_price * Part.stock)).scalar()
+    for cat in db.query(PartCategory).all():
+        db.query(Part).filter(Part.category_id == cat.id, Part.is_active == True).count()
+        db.query(func.sum(Part.purchase_price * Part.stock)).filter(
+            Part.category_id == cat.id, Part.is_active == True
+        ).scalar()
+        db.query(func.sum(Part.sale_price * Part.stock)).filter(
+            Part.category_id == cat.id, Part.is_active == True
+        ).scalar()
+
+
+def parts_panel_before(db):
+    """Прежняя панель /api/statistics/parts-stats: два запроса на категорию"""
+    db.query(Part).count()
+    db.query(func.sum(Part.stock)).scalar()
+    db.query(func.sum(Part.purchase_price * Part.stock)).scalar()
+    db.query(Part).filter(Part.stock < Part.min_stock).count()
+    for cat in db.query(PartCategory).all():
+        db.query(Part).filter(Part.category_id == cat.id).count()
+        db.query(func.sum(Part.purchase_price * Part.stock)).filter(Part.category_id == cat.id).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--parts", type=int, default=100_000)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    engine, Session = make_database("parts", args.url)
+    print(f"Генерация: {args.categories} категорий, {args.parts} запчастей...")
+    seed_parts(engine, args.categories, args.parts)
+    SessionLocal.configure(bind=engine)
+
+    db = Session()
+    try:
+        report("/api/parts/stats/all", [
+            ("запросы на категорию", *measure(engine, lambda: part_statistics_before(db), args.repeat)),
+            ("GROUP BY category_id", *measure(engine, part_service.get_part_statistics, args.repeat)),
+        ])
+        report("/api/statistics/parts-stats", [
+            ("запросы на категорию", *measure(engine, lambda: parts_panel_before(db), args.repeat)),
+            ("GROUP BY category_id", *measure(engine, lambda: parts_panel(db), args.repeat)),
+        ])
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/bench_statistics_kpi.py
+"""
+KPI для /api/statistics/overview и /comparison: отдельные count(),
+SUM(CASE) по окну tickets и текущая версия - заявки из агрегата по дням
+(ticket_daily_rollup), клиенты счетчиками-подзапросами
+
+Запуск (из папки bot): python -m benchmarks.bench_statistics_kpi --tickets 1000000
+На MySQL: ... --url mysql+pymysql://root:@localhost/somon_bench (база будет очищена)
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, case, and_
+
+from app.api.statistics_api import (
+    DONE_STATUS, IN_PROGRESS_STATUSES, _ticket_window_counts, _client_window_counts
+)
+from app.models import Client, Master, Ticket
+from benchmarks.common import (
+    make_database, add_database_args, seed_people, seed_tickets, measure, report
+)
+
+
+def overview_before(db, start, end):
+    """Прежняя версия: отдельный count() на каждый показатель"""
+    prev_start, prev_end = start - (end - start), end - (end - start)
+    db.query(Ticket).filter(Ticket.created_at.between(start, end)).count()
+    db.query(Client).filter(Client.created_at.between(start, end)).count()
+    db.query(func.avg(Master.rating)).filter(Master.rating_count > 0).scalar()
+    db.query(Ticket).filter(
+        Ticket.created_at.between(start, end), Ticket.status == DONE_STATUS
+    ).count()
+    db.query(Ticket).filter(
+        Ticket.created_at.between(start, end), Ticket.status.in_(IN_PROGRESS_STATUSES)
+    ).count()
+    db.query(Ticket).filter(Ticket.created_at.between(prev_start, prev_end)).count()
+
+
+def _ticket_case_counts(db, start, end, prev_start, prev_end, with_statuses=True):
+    """Вариант с одним проходом SUM(CASE) по объединенному окну"""
+    def count_if(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    current = Ticket.created_at.between(start, end)
+    counters = [count_if(current), count_if(Ticket.created_at.between(prev_start, prev_end))]
+    if with_statuses:
+        counters += [
+            count_if(and_(current, Ticket.status == DONE_STATUS)),
+            count_if(and_(current, Ticket.status.in_(IN_PROGRESS_STATUSES)))
+        ]
+    db.query(*counters).filter(Ticket.created_at.between(min(start, prev_start), max(end, prev_end))).one()
+    db.query(
+        count_if(Client.created_at.between(start, end)),
+        count_if(Client.created_at.between(prev_start, prev_end))
+    ).filter(Client.created_at.between(min(start, prev_start), max(end, prev_end))).one()
+
+
+def overview_case(db, start, end):
+    prev_start, prev_end = start - (end - start), end - (end - start)
+    _ticket_case_counts(db, start, end, prev_start, prev_end)
+    db.query(func.avg(Master.rating)).filter(Master.rating_count > 0).scalar()
+
+
+def overview_after(db, start, end):
+    prev_start, prev_end = start - (end - start), end - (end - start)
+    _ticket_window_counts(db, start, end, prev_start, prev_end)
+    _client_window_counts(db, start, end, prev_start, prev_end)
+    db.query(func.avg(Master.rating)).filter(Master.rating_count > 0).scalar()
+
+
+def comparison_before(db, start, end, prev_start, prev_end):
+    db.query(Ticket).filter(Ticket.created_at.between(start, end)).count()
+    db.query(Client).filter(Client.created_at.between(start, end)).count()
+    db.query(func.avg(Master.rating)).scalar()
+    db.query(Ticket).filter(Ticket.created_at.between(prev_start, prev_end)).count()
+    db.query(Client).filter(Client.created_at.between(prev_start, prev_end)).count()
+    db.query(func.avg(Master.rating)).scalar()
+
+
+def comparison_case(db, start, end, prev_start, prev_end):
+    _ticket_case_counts(db, start, end, prev_start, prev_end, with_statuses=False)
+    db.query(func.avg(Master.rating)).scalar()
+
+
+def comparison_after(db, start, end, prev_start, prev_end):
+    _ticket_window_counts(db, start, end, prev_start, prev_end, with_statuses=False)
+    _client_window_counts(db, start, end, prev_start, prev_end)
+    db.query(func.avg(Master.rating)).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--clients", type=int, default=50_000)
+    parser.add_argument("--masters", type=int, default=30)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    engine, Session = make_database("kpi", args.url)
+    print(f"Генерация: {args.tickets} заявок, {args.clients} клиентов...")
+    seed_people(engine, args.clients, args.masters)
+    seed_tickets(engine, args.tickets, args.clients, args.masters)
+
+    now = datetime.now()
+    start, end = now - timedelta(days=30), now
+    # Квартал и предыдущий квартал, как в /comparison?period=quarter
+    quarter_start = now - timedelta(days=90)
+    prev_start, prev_end = quarter_start - timedelta(days=90), now - timedelta(days=90)
+
+    db = Session()
+    try:
+        report("/api/statistics/overview (30 дней)", [
+            ("count() на показатель", *measure(engine, lambda: overview_before(db, start, end), args.repeat)),
+            ("SUM(CASE) на таблицу", *measure(engine, lambda: overview_case(db, start, end), args.repeat)),
+            ("агрегаты по дням", *measure(engine, lambda: overview_after(db, start, end), args.repeat)),
+        ])
+        report("/api/statistics/comparison (квартал)", [
+            ("count() на показатель", *measure(
+                engine, lambda: comparison_before(db, quarter_start, now, prev_start, prev_end), args.repeat)),
+            ("SUM(CASE) на таблицу", *measure(
+                engine, lambda: comparison_case(db, quarter_start, now, prev_start, prev_end), args.repeat)),
+            ("агрегаты по дням", *measure(
+                engine, lambda: comparison_after(db, quarter_start, now, prev_start, prev_end), args.repeat)),
+        ])
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_ticket_search.py
+"""
+Поиск заявок на приеме: загрузка всего списка в браузер против
+/api/admin/tickets/search (индексы ключей телефонов и имен, FULLTEXT)
+
+Прежний способ - GET /api/admin/tickets со всеми заявками и фильтр в
+браузере; здесь он замерен как get_all_tickets плюс фильтр в Python.
+Цель - меньше 50 мс на 1M заявок (FULLTEXT есть только в MySQL, в SQLite
+текст ищется через LIKE по всей таблице).
+
+Запуск (из папки bot): python -m benchmarks.bench_ticket_search --tickets 200000
+На MySQL: ... --url mysql+pymysql://root:@localhost/somon_bench (база будет очищена)
+"""
+import argparse
+
+from app.database import SessionLocal
+from app.core.ticket_search import search_tickets
+from app.services.ticket_service_compat import get_all_tickets
+from benchmarks.common import (
+    make_database, add_database_args, seed_people, seed_tickets, measure, report
+)
+
+QUERIES = [
+    ("последние цифры телефона", "0064"),
+    ("номер целиком", "+992 90 000 00 64"),
+    ("имя клиента", "Клиент 6"),
+    ("слово из проблемы", "экран"),
+]
+
+
+def search_before(q: str):
+    """Все заявки в память и поиск подстроки, как делала страница заявок"""
+    q = q.lower()
+    return [
+        ticket for ticket in get_all_tickets()
+        if q in ticket["client_name"].lower()
+        or q in ticket["client_phone"]
+        or q in ticket["brand"].lower()
+        or q in ticket["problem"].lower()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=20_000)
+    parser.add_argument("--masters", type=int, default=30)
+    add_database_args(parser)
+    args = parser.parse_args()
+
+    engine, Session = make_database("search", args.url)
+    print(f"Генерация: {args.clients} клиентов, {args.tickets} заявок...")
+    seed_people(engine, args.clients, args.masters)
+    seed_tickets(engine, args.tickets, args.clients, args.masters)
+    SessionLocal.configure(bind=engine)
+
+    db = Session()
+    try:
+        report("Весь список в браузер", [
+            (name, *measure(engine, lambda: search_before(q), 1))
+            for name, q in QUERIES[:1]
+        ])
+        report("/api/admin/tickets/search", [
+            (name, *measure(engine, lambda: search_tickets(db, q), args.repeat))
+            for name, q in QUERIES
+        ])
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
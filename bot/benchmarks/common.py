@@ -0,0 +1,200 @@
+# benchmarks/common.py
+"""
+Общие утилиты бенчмарков: тестовая база SQLite, генерация данных,
+подсчет SQL-запросов и замер времени
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import schema
+from app.models import Client, Master, Ticket, DeliveryMethod, PartCategory, PartSupplier, Part
+from app.core import rollups, counters, ticket_search
+
+STATUSES = ["Новая", "🧪 Диагностика", "🔧 В ремонте", "В работе", "✅ Готово"]
+BRANCHES = ["Центр", "Сино", "Фирдавси", "Шохмансур"]
+CATEGORIES = ["Телефон", "Ноутбук", "Планшет", "Телевизор", "Другое"]
+BRANDS = ["Samsung", "Apple", "Xiaomi", "Huawei", "Lenovo", "HP", "LG"]
+PROBLEMS = [
+    "Не включается", "Разбит экран", "Не заряжается", "Быстро садится батарея",
+    "Нет звука", "Перегревается и выключается", "Не работает камера", "Залит водой"
+]
+
+CHUNK = 50_000
+
+
+def make_database(name: str, url: str = None):
+    """Пустая база с актуальной схемой (все ревизии применены)
+
+    По умолчанию - временный файл SQLite. Для замеров на MySQL передайте
+    url пустой базы, например mysql+pymysql://root:@localhost/somon_bench
+    """
+    if url is None:
+        path = os.path.join(tempfile.gettempdir(), f"somon_bench_{name}.db")
+        if os.path.exists(path):
+            os.remove(path)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    schema.upgrade(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def add_database_args(parser):
+    parser.add_argument("--url", help="URL пустой базы (по умолчанию временный SQLite)")
+    parser.add_argument("--repeat", type=int, default=5)
+
+
+def _insert_chunked(engine, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            with engine.begin() as conn:
+                conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+
+
+def seed_people(engine, clients: int, masters: int, days: int = 365, seed: int = 1):
+    rnd = random.Random(seed)
+    now = datetime.now()
+    _insert_chunked(engine, Client.__table__, (
+        {
+            "telegram_id": str(100000 + i),
+            "name": f"Клиент {i}",
+            "phone": f"+99290{i:07d}",
+            "created_at": now - timedelta(minutes=rnd.randint(0, days * 24 * 60))
+        }
+        for i in range(clients)
+    ))
+    _insert_chunked(engine, Master.__table__, (
+        {
+            "name": f"Мастер {i}",
+            "rating": round(rnd.uniform(3, 5), 2),
+            "rating_count": rnd.randint(0, 50),
+            "status": "active",
+            "completed_orders": rnd.randint(0, 500)
+        }
+        for i in range(masters)
+    ))
+
+
+def seed_tickets(engine, tickets: int, clients: int, masters: int, days: int = 365, seed: int = 2):
+    """Заявки, равномерно распределенные по последним `days` дням"""
+    rnd = random.Random(seed)
+    now = datetime.now()
+
+    def rows():
+        for _ in range(tickets):
+            created = now - timedelta(minutes=rnd.randint(0, days * 24 * 60))
+            # Каждая десятая - клиент в сервисе без Telegram
+            walkin = rnd.random() < 0.1
+            number = rnd.randint(0, 9_999_999)
+            yield {
+                "client_id": None if walkin else rnd.randint(1, clients),
+                "walkin_name": f"Гость {number}" if walkin else None,
+                "walkin_phone": f"+992 93 {number:07d}" if walkin else None,
+                "master_id": rnd.randint(1, masters) if rnd.random() < 0.8 else None,
+                "delivery_method": DeliveryMethod.PICKUP,
+                "branch": rnd.choice(BRANCHES),
+                "category": rnd.choice(CATEGORIES),
+                "brand": rnd.choice(BRANDS),
+                "problem": rnd.choice(PROBLEMS),
+                "urgency": "Обычная",
+                "status": rnd.choice(STATUSES),
+                "created_at": created,
+                "updated_at": created + timedelta(hours=rnd.randint(1, 72))
+            }
+
+    _insert_chunked(engine, Ticket.__table__, rows())
+
+    # Массовая вставка идет мимо ORM, агрегаты, счетчики и ключи поиска
+    # пересчитываются целиком
+    with engine.begin() as conn:
+        rollups.rebuild(conn)
+        counters.reconcile(conn)
+        ticket_search.rebuild_phone_keys(conn)
+
+
+def seed_parts(engine, categories: int, parts: int, suppliers: int = 20, seed: int = 3):
+    """Категории, поставщики и запчасти, равномерно разложенные по категориям"""
+    rnd = random.Random(seed)
+    _insert_chunked(engine, PartCategory.__table__, (
+        {"name": f"Категория {i}", "icon": "fa-cog"} for i in range(categories)
+    ))
+    _insert_chunked(engine, PartSupplier.__table__, (
+        {"name": f"Поставщик {i}"} for i in range(suppliers)
+    ))
+
+    def rows():
+        for i in range(parts):
+            purchase = round(rnd.uniform(10, 500), 2)
+            yield {
+                "name": f"Запчасть {i}",
+                "sku": f"SKU-{i:07d}",
+                "purchase_price": purchase,
+                "sale_price": round(purchase * rnd.uniform(1.1, 1.6), 2),
+                "stock": rnd.randint(0, 40),
+                "min_stock": 5,
+                # Часть запчастей без категории и неактивных
+                "category_id": rnd.randint(1, categories) if rnd.random() < 0.98 else None,
+                "supplier_id": rnd.randint(1, suppliers),
+                "is_active": rnd.random() < 0.95
+            }
+
+    _insert_chunked(engine, Part.__table__, rows())
+
+    with engine.begin() as conn:
+        counters.reconcile(conn)
+
+
+class QueryCounter:
+    """Считает SQL-запросы, отправленные через engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    @contextmanager
+    def track(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def measure(engine, fn, repeat: int = 5):
+    """(запросов за вызов, медиана мс) для fn()"""
+    counter = QueryCounter(engine)
+    with counter.track():
+        fn()
+    queries = counter.count
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return queries, statistics.median(timings)
+
+
+def report(title: str, results):
+    """results: [(название, запросов, мс), ...]"""
+    print(f"\n{title}")
+    print(f"{'вариант':<30}{'запросов':>10}{'мс (медиана)':>16}")
+    for name, queries, ms in results:
+        print(f"{name:<30}{queries:>10}{ms:>16.1f}")
@@ -0,0 +1,39 @@
+# tests/conftest.py
+"""
+Общие настройки тестов: python -m pytest -q tests (из каталога bot)
+
+app.bot.loader при импорте создает Bot(BOT_TOKEN) и Dispatcher, а
+app/services/__init__.py тянет его через ticket_service. Для тестов
+вместо него - пустой модуль без бота; пакет app.bot подключается без
+своего __init__ (регистрация хендлеров тестам не нужна).
+"""
+import os
+import sys
+import types
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if "app.bot" not in sys.modules:
+    package = types.ModuleType("app.bot")
+    package.__path__ = [os.path.join(ROOT, "app", "bot")]
+    loader = types.ModuleType("app.bot.loader")
+    loader.bot = None
+    loader.dp = None
+    sys.modules["app.bot"] = package
+    sys.modules["app.bot.loader"] = loader
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Пустая база SQLite со всеми ревизиями схемы: (engine, Session)"""
+    from app import schema
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    schema.upgrade(engine)
+    yield engine, sessionmaker(bind=engine)
+    engine.dispose()
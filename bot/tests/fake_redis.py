@@ -0,0 +1,122 @@
+# tests/fake_redis.py
+"""
+Заменитель клиента redis.asyncio для тестов без сервера Redis
+
+Только то, что используют RedisBackplane и RedisBackend: publish,
+pubsub().subscribe/listen, get, pipeline(set/delete/execute), aclose.
+Клиенты с общим FakeServer видят одни и те же ключи и каналы - как
+процессы с общим Redis. disconnect() рвет подписки и ломает следующие
+команды, как пропавший сервер.
+"""
+import asyncio
+import time
+
+
+class FakeServer:
+    def __init__(self):
+        self.values = {}
+        self.channels = {}
+        self.down = False
+        self.commands = []
+
+    def check(self):
+        if self.down:
+            raise ConnectionError("fake redis is down")
+
+    def disconnect(self):
+        self.down = True
+        for queues in self.channels.values():
+            for queue in queues:
+                queue.put_nowait(None)
+        self.channels.clear()
+
+
+def _encode(value):
+    return value.encode() if isinstance(value, str) else value
+
+
+class FakePubSub:
+    def __init__(self, server: FakeServer):
+        self.server = server
+        self.queue = asyncio.Queue()
+        self.subscribed = []
+
+    async def subscribe(self, *channels):
+        self.server.check()
+        for channel in channels:
+            self.server.channels.setdefault(_encode(channel), []).append(self.queue)
+            self.subscribed.append(_encode(channel))
+
+    async def listen(self):
+        while True:
+            message = await self.queue.get()
+            if message is None:
+                raise ConnectionError("fake redis connection lost")
+            yield message
+
+    async def aclose(self):
+        for channel in self.subscribed:
+            queues = self.server.channels.get(channel, [])
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.queued.append(("SET", key, value, ex))
+        return self
+
+    def delete(self, key):
+        self.queued.append(("DEL", key))
+        return self
+
+    async def execute(self):
+        server = self.client.server
+        server.check()
+        for command in self.queued:
+            server.commands.append(command)
+            if command[0] == "SET":
+                _, key, value, ex = command
+                server.values[_encode(key)] = (_encode(value), time.monotonic() + ex if ex else None)
+            else:
+                server.values.pop(_encode(command[1]), None)
+        self.queued = []
+
+
+class FakeRedis:
+    def __init__(self, server: FakeServer = None):
+        self.server = server or FakeServer()
+        self.closed = False
+
+    async def publish(self, channel, data):
+        self.server.check()
+        queues = list(self.server.channels.get(_encode(channel), ()))
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": _encode(channel), "data": _encode(data)})
+        return len(queues)
+
+    def pubsub(self):
+        return FakePubSub(self.server)
+
+    async def get(self, key):
+        self.server.check()
+        value, expires_at = self.server.values.get(_encode(key), (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            return None
+        return value
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        self.closed = True
@@ -0,0 +1,139 @@
+# tests/test_fanout.py
+import asyncio
+
+from app.core import fanout
+from app.core.backplane import LocalBackplane, LocalBroker, RedisBackplane
+from app.core.event_bus import bus
+from app.core.fanout import EVENTS, REALTIME, encode_event, decode_event
+from app.models.domain_events import TicketStatusChanged
+
+from fake_redis import FakeRedis, FakeServer
+
+
+def _status_event(ticket_id=7):
+    return TicketStatusChanged(origin="web", ticket_id=ticket_id, old_status="Новая", new_status="✅ Готово")
+
+
+async def _until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "не дождались"
+        await asyncio.sleep(0.01)
+
+
+def test_encode_decode_roundtrip():
+    event = _status_event()
+    assert decode_event(encode_event(event)) == event
+
+
+def test_local_backplane_delivers_to_other_members_only():
+    async def run():
+        broker = LocalBroker()
+        first, second = LocalBackplane(broker), LocalBackplane(broker)
+        got_first, got_second = [], []
+
+        async def on_first(data):
+            got_first.append(data)
+
+        async def on_second(data):
+            got_second.append(data)
+
+        first.on("ch", on_first)
+        second.on("ch", on_second)
+        await first.start()
+        await second.start()
+        first.publish("ch", {"n": 1})
+        await _until(lambda: got_second)
+        await asyncio.sleep(0.05)
+        await first.close()
+        await second.close()
+        return got_first, got_second
+
+    got_first, got_second = asyncio.run(run())
+    assert got_first == []
+    assert got_second == [{"n": 1}]
+
+
+def test_fanout_forwards_local_events_and_republishes_remote_ones():
+    async def run():
+        peer = LocalBackplane(fanout.backplane.broker)
+        forwarded, broadcasts, remote_seen, local_only_seen = [], [], [], []
+
+        async def on_events(data):
+            forwarded.append(data)
+
+        async def on_realtime(data):
+            broadcasts.append(data)
+
+        async def remote_handler(event):
+            remote_seen.append(event)
+
+        async def local_handler(event):
+            local_only_seen.append(event)
+
+        peer.on(EVENTS, on_events)
+        peer.on(REALTIME, on_realtime)
+        await peer.start()
+        await fanout.start_fanout()
+        subscriptions = [
+            bus.subscribe(TicketStatusChanged, remote_handler, "test.remote"),
+            bus.subscribe(TicketStatusChanged, local_handler, "test.local", remote=False),
+        ]
+        try:
+            # Событие этого процесса уходит остальным
+            bus.publish(_status_event(1))
+            await _until(lambda: forwarded)
+
+            # Событие другого процесса - только подписчикам с remote=True
+            # и без повторной пересылки
+            peer.publish(EVENTS, encode_event(_status_event(2)))
+            await _until(lambda: len(remote_seen) == 2)
+
+            fanout.broadcast({"type": "ping"})
+            await _until(lambda: broadcasts)
+            await asyncio.sleep(0.05)
+        finally:
+            for subscription in subscriptions:
+                bus.unsubscribe(subscription)
+            await fanout.stop_fanout()
+            await peer.close()
+        return forwarded, broadcasts, remote_seen, local_only_seen
+
+    forwarded, broadcasts, remote_seen, local_only_seen = asyncio.run(run())
+    assert [decode_event(data).ticket_id for data in forwarded] == [1]
+    assert [event.ticket_id for event in remote_seen] == [1, 2]
+    assert [event.ticket_id for event in local_only_seen] == [1]
+    assert broadcasts == [{"type": "ping"}]
+
+
+def test_redis_backplane_resubscribes_after_disconnect():
+    async def run():
+        server = FakeServer()
+        sender = RedisBackplane("redis://test", client=FakeRedis(server), reconnect_max=0.1)
+        receiver = RedisBackplane("redis://test", client=FakeRedis(server), reconnect_max=0.1)
+        got = []
+
+        async def on_message(data):
+            got.append(data)
+
+        receiver.on("ch", on_message)
+        await sender.start()
+        await receiver.start()
+        await _until(lambda: receiver.connected)
+        sender.publish("ch", 1)
+        await _until(lambda: got == [1])
+
+        server.disconnect()
+        await _until(lambda: not receiver.connected)
+        server.down = False
+        await _until(lambda: receiver.connected)
+        sender.publish("ch", 2)
+        await _until(lambda: got == [1, 2])
+        stats = receiver.stats()
+        await sender.close()
+        await receiver.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["reconnects"] >= 1
+    assert stats["received"] == 2
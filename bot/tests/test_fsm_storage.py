@@ -0,0 +1,167 @@
+# tests/test_fsm_storage.py
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from app.bot.storage import CachedStorage, RedisBackend, SQLiteBackend, VolatileBackend
+
+from fake_redis import FakeRedis, FakeServer
+
+
+class MemoryBackend:
+    """Словарь вместо SQLite; fail=True - save падает"""
+
+    persistent = True
+
+    def __init__(self):
+        self.values = {}
+        self.fail = False
+        self.saving = None
+
+    async def load(self, key):
+        return self.values.get(key)
+
+    async def save(self, items):
+        if self.saving is not None:
+            await self.saving
+        if self.fail:
+            raise ConnectionError("backend is down")
+        for key, value in items.items():
+            if value is None:
+                self.values.pop(key, None)
+            else:
+                self.values[key] = value
+
+    async def expire(self, ttl):
+        return 0
+
+    async def close(self):
+        pass
+
+
+def _storage(backend, **kwargs):
+    kwargs.setdefault("flush_interval", 3600)
+    return CachedStorage(backend, **kwargs)
+
+
+def test_flush_writes_and_new_storage_reads_back(tmp_path):
+    async def run():
+        path = str(tmp_path / "fsm.db")
+        first = _storage(SQLiteBackend(path))
+        await first.set_state(chat=1, user=2, state="Form:phone")
+        await first.update_data(chat=1, user=2, name="Иван")
+        await first.close()
+
+        second = _storage(SQLiteBackend(path))
+        state = await second.get_state(chat=1, user=2)
+        data = await second.get_data(chat=1, user=2)
+        await second.close()
+        return state, data
+
+    assert asyncio.run(run()) == ("Form:phone", {"name": "Иван"})
+
+
+def test_lru_keeps_max_entries_and_reloads_evicted():
+    async def run():
+        backend = MemoryBackend()
+        storage = _storage(backend, max_entries=2)
+        for chat in (1, 2, 3):
+            await storage.set_state(chat=chat, user=chat, state=f"S{chat}")
+        entries = storage.stats()["entries"]
+        # Вытесненная до flush запись читается из _evicted, не теряется
+        state = await storage.get_state(chat=1, user=1)
+        await storage.close()
+        return entries, storage.evictions, state, sorted(backend.values)
+
+    entries, evictions, state, keys = asyncio.run(run())
+    assert entries == 2
+    assert evictions >= 1
+    assert state == "S1"
+    assert keys == ["1:1", "2:2", "3:3"]
+
+
+def test_volatile_backend_forgets_evicted():
+    async def run():
+        storage = _storage(VolatileBackend(), max_entries=1)
+        await storage.set_state(chat=1, user=1, state="S1")
+        await storage.set_state(chat=2, user=2, state="S2")
+        state = await storage.get_state(chat=1, user=1)
+        await storage.close()
+        return state
+
+    assert asyncio.run(run()) is None
+
+
+def test_expire_drops_idle_flushed_records():
+    async def run():
+        backend = MemoryBackend()
+        storage = _storage(backend, ttl=60)
+        await storage.set_state(chat=1, user=1, state="S1")
+        await storage.set_state(chat=2, user=2, state="S2")
+        await storage.flush()
+        storage._records["1:1"].touched = time.monotonic() - 120
+        expired = await storage.expire()
+        entries = storage.stats()["entries"]
+        await storage.close()
+        return expired, entries
+
+    assert asyncio.run(run()) == (1, 1)
+
+
+def test_reset_deletes_record_from_backend():
+    async def run():
+        backend = MemoryBackend()
+        storage = _storage(backend)
+        await storage.set_state(chat=1, user=1, state="S1")
+        await storage.flush()
+        stored = dict(backend.values)
+        await storage.reset_state(chat=1, user=1)
+        await storage.close()
+        return stored, backend.values
+
+    stored, after = asyncio.run(run())
+    assert list(stored) == ["1:1"]
+    assert after == {}
+
+
+def test_failed_flush_keeps_records_evicted_during_save():
+    async def run():
+        backend = MemoryBackend()
+        storage = _storage(backend, max_entries=1)
+        await storage.set_state(chat=1, user=1, state="S1")
+
+        backend.fail = True
+        backend.saving = asyncio.get_running_loop().create_future()
+        flush = asyncio.ensure_future(storage.flush())
+        await asyncio.sleep(0)
+        # Пока save ждет, запись 1:1 вытесняется уже чистой
+        await storage.get_state(chat=2, user=2)
+        backend.saving.set_result(None)
+        assert await flush == 0
+
+        backend.fail, backend.saving = False, None
+        await storage.flush()
+        return storage.flush_errors, backend.values, await storage.get_state(chat=1, user=1)
+
+    errors, values, state = asyncio.run(run())
+    assert errors == 1
+    assert "1:1" in values
+    assert state == "S1"
+
+
+def test_redis_backend_roundtrip():
+    async def run():
+        server = FakeServer()
+        first = _storage(RedisBackend("redis://fake", ttl=60, client=FakeRedis(server)))
+        await first.update_data(chat=5, user=6, phone="+992900000000")
+        await first.close()
+
+        second = _storage(RedisBackend("redis://fake", ttl=60, client=FakeRedis(server)))
+        data = await second.get_data(chat=5, user=6)
+        await second.close()
+        return data
+
+    assert asyncio.run(run()) == {"phone": "+992900000000"}
@@ -0,0 +1,98 @@
+# tests/test_http_cache.py
+from app.core.http_cache import fingerprint_statement
+from app.models import Client, Part, PartCategory, PartTransaction, Ticket
+
+TABLES = ("tickets", "part_categories", "part_suppliers")
+
+
+def _fingerprint(Session):
+    with Session() as db:
+        return tuple(db.execute(fingerprint_statement(TABLES)).one())
+
+
+def test_every_commit_changes_fingerprint(database):
+    engine, Session = database
+    seen = [_fingerprint(Session)]
+
+    with Session() as db:
+        category = PartCategory(name="Экраны")
+        db.add(category)
+        db.commit()
+        seen.append(_fingerprint(Session))
+
+        # Две правки подряд, в одну и ту же секунду
+        category.name = "Дисплеи"
+        db.commit()
+        seen.append(_fingerprint(Session))
+        category.description = "Модули в сборе"
+        db.commit()
+        seen.append(_fingerprint(Session))
+
+        db.delete(category)
+        db.commit()
+        seen.append(_fingerprint(Session))
+
+        client = Client(telegram_id="10", name="Тест")
+        db.add(client)
+        db.flush()
+        db.add(Ticket(client_id=client.id, problem="Не включается"))
+        db.commit()
+        seen.append(_fingerprint(Session))
+
+    assert len(set(seen)) == len(seen)
+
+
+def test_several_flushes_bump_once_and_rollback_keeps_fingerprint(database):
+    engine, Session = database
+    before = _fingerprint(Session)
+
+    with Session() as db:
+        category = PartCategory(name="Батареи")
+        db.add(category)
+        db.flush()
+        category.name = "Аккумуляторы"
+        db.flush()
+        db.rollback()
+    assert _fingerprint(Session) == before
+
+    with Session() as db:
+        category = PartCategory(name="Батареи")
+        db.add(category)
+        db.flush()
+        category.name = "Аккумуляторы"
+        db.commit()
+    after = _fingerprint(Session)
+    assert after[1] == before[1] + 1
+
+
+def _versions(Session, *tables):
+    with Session() as db:
+        return tuple(db.execute(fingerprint_statement(tables)).one())
+
+
+def test_counter_updates_and_bulk_delete_bump_their_tables(database):
+    engine, Session = database
+    with Session() as db:
+        category = PartCategory(name="Экраны")
+        client = Client(telegram_id="11", name="Тест")
+        db.add_all([category, client])
+        db.commit()
+        category_id, client_id = category.id, client.id
+
+    # Запчасть меняет parts_count категории, заявка - ticket_count клиента
+    before = _versions(Session, "part_categories", "clients")
+    with Session() as db:
+        part = Part(name="Модуль", sku="M-1", category_id=category_id)
+        db.add_all([part, Ticket(client_id=client_id, problem="Разбит экран")])
+        db.flush()
+        db.add(PartTransaction(part_id=part.id, transaction_type="in", quantity=1))
+        db.commit()
+        part_id = part.id
+    after = _versions(Session, "part_categories", "clients")
+    assert after[0] != before[0] and after[1] != before[1]
+
+    before = _versions(Session, "part_transactions")
+    with Session() as db:
+        db.query(PartTransaction).filter(PartTransaction.part_id == part_id).delete()
+        db.commit()
+    assert _versions(Session, "part_transactions") != before
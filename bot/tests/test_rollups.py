@@ -0,0 +1,52 @@
+# tests/test_rollups.py
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.core import rollups
+from app.models import Ticket
+from app.models.rollup import TicketDailyRollup, TicketStatusCounter
+
+
+def _snapshot(engine):
+    """Ненулевые строки обоих агрегатов"""
+    with engine.connect() as conn:
+        daily = {
+            (row.day, row.branch, row.category, row.status): row.count
+            for row in conn.execute(select(TicketDailyRollup.__table__))
+            if row.count
+        }
+        statuses = {
+            row.status: row.count
+            for row in conn.execute(select(TicketStatusCounter.__table__))
+            if row.count
+        }
+    return daily, statuses
+
+
+def test_listener_deltas_match_rebuild(database):
+    engine, Session = database
+    with Session() as db:
+        tickets = [
+            Ticket(problem="a", branch="Центр", category="Телефон", created_at=datetime(2024, 5, 1, 10)),
+            Ticket(problem="b", branch="Центр", category="Телефон", created_at=datetime(2024, 5, 1, 18)),
+            Ticket(problem="c", branch=None, category="Ноутбук", created_at=datetime(2024, 5, 2, 9)),
+            Ticket(problem="d", branch="Север", status="В работе", created_at=datetime(2024, 5, 3, 12)),
+        ]
+        db.add_all(tickets)
+        db.commit()
+
+        tickets[0].status = "✅ Готово"
+        tickets[1].branch = "Север"
+        tickets[2].created_at = datetime(2024, 5, 4, 9)
+        db.commit()
+
+        tickets[0].status = "В работе"
+        db.delete(tickets[3])
+        db.commit()
+
+    live = _snapshot(engine)
+    with engine.begin() as conn:
+        rollups.rebuild(conn)
+    assert _snapshot(engine) == live
+    assert sum(live[1].values()) == 3
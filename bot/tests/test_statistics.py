@@ -0,0 +1,73 @@
+# tests/test_statistics.py
+from datetime import datetime, timedelta
+
+from app.api.statistics_api import weekday_panel
+from app.models import Ticket
+
+MONDAY = datetime(2026, 3, 9, 10, 0)
+
+
+def test_status_change_sets_and_clears_completed_at(database):
+    engine, Session = database
+    with Session() as db:
+        ticket = Ticket(problem="Не включается")
+        db.add(ticket)
+        db.commit()
+        assert ticket.completed_at is None
+
+        ticket.status = "✅ Готово"
+        db.commit()
+        completed_at = ticket.completed_at
+        assert completed_at is not None
+
+        # Повторная установка того же статуса время не сдвигает
+        ticket.status = "✅ Готово"
+        db.commit()
+        assert ticket.completed_at == completed_at
+
+        ticket.status = "🔧 В ремонте"
+        db.commit()
+        assert ticket.completed_at is None
+
+
+def test_weekday_panel_uses_completion_time(database):
+    engine, Session = database
+    with Session() as db:
+        for hours in (4, 8):
+            ticket = Ticket(problem="Разбит экран", created_at=MONDAY, status="✅ Готово")
+            db.add(ticket)
+            db.flush()
+            ticket.completed_at = MONDAY + timedelta(hours=hours)
+        # Выполнена до появления completed_at - в среднее не входит
+        db.add(Ticket(problem="Нет звука", created_at=MONDAY, status="✅ Готово"))
+        db.flush()
+        db.query(Ticket).filter(Ticket.problem == "Нет звука").update({"completed_at": None})
+        db.add(Ticket(problem="Не заряжается", created_at=MONDAY + timedelta(days=2)))
+        db.commit()
+
+        panel = weekday_panel(db)
+
+    by_day = {row["day"]: row for row in panel}
+    assert [row["day"] for row in panel][0] == "Понедельник"
+    assert by_day["Понедельник"]["orders"] == 3
+    assert by_day["Понедельник"]["avgTime"] == "6.0ч"
+    assert by_day["Среда"]["orders"] == 1
+    assert by_day["Среда"]["avgTime"] == "—"
+    assert by_day["Вторник"]["orders"] == 0
+    assert sum(row["percentage"] for row in panel) == 100.0
+
+
+def test_weekday_panel_skips_tickets_without_created_at(database):
+    engine, Session = database
+    with Session() as db:
+        db.add(Ticket(problem="Разбит экран", created_at=MONDAY))
+        db.add(Ticket(problem="Без даты"))
+        db.flush()
+        # Слушатель агрегатов заполняет created_at - обнуляем в обход ORM
+        db.query(Ticket).filter(Ticket.problem == "Без даты").update({"created_at": None})
+        db.commit()
+
+        panel = weekday_panel(db)
+
+    assert sum(row["orders"] for row in panel) == 1
+    assert panel[0]["orders"] == 1
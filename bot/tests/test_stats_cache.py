@@ -0,0 +1,120 @@
+# tests/test_stats_cache.py
+import asyncio
+
+from app.core.cache import ResultCache, cached, subscribe_invalidation
+from app.core.event_bus import bus
+from app.models import Client, Ticket, written_tables
+from app.models.domain_events import TablesWritten
+
+
+def test_commit_invalidates_entries_of_written_tables(database):
+    engine, Session = database
+    cache = ResultCache(ttl=60, max_entries=10)
+    hook = written_tables.on_commit(cache.invalidate)
+    calls = []
+
+    @cached("clients", cache=cache)
+    def clients_count():
+        calls.append(1)
+        with Session() as db:
+            return db.query(Client).count()
+
+    @cached("parts", cache=cache)
+    def parts_marker():
+        calls.append(1)
+        return "parts"
+
+    try:
+        assert clients_count() == 0
+        parts_marker()
+        assert clients_count() == 0
+        assert len(calls) == 2
+
+        with Session() as db:
+            db.add(Client(telegram_id="1", name="Тест", phone="+992900000001"))
+            db.commit()
+
+        # Сразу после commit, без event loop и ожидания шины
+        assert clients_count() == 1
+        parts_marker()
+    finally:
+        written_tables.remove_commit_hook(hook)
+
+    # Пересчитан только clients_count, запись parts осталась
+    assert len(calls) == 3
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_only_remote_tables_written_invalidates_through_bus():
+    cache = ResultCache(ttl=60, max_entries=10)
+
+    @cached("tickets", cache=cache)
+    def marker():
+        return object()
+
+    async def run():
+        subscription = subscribe_invalidation(cache)
+        try:
+            first = marker()
+            # Свои события уже обработаны синхронно при commit
+            bus.publish(TablesWritten(origin="web", tables=("tickets",)))
+            await asyncio.sleep(0.05)
+            local = marker()
+            bus.publish(TablesWritten(origin="bot", tables=("tickets",)), remote=True)
+            await asyncio.sleep(0.05)
+            return first, local, marker()
+        finally:
+            bus.unsubscribe(subscription)
+
+    first, local, remote = asyncio.run(run())
+    assert first is local
+    assert remote is not first
+
+
+def test_rollback_does_not_invalidate(database):
+    engine, Session = database
+    cache = ResultCache(ttl=60, max_entries=10)
+    hook = written_tables.on_commit(cache.invalidate)
+
+    @cached("clients", cache=cache)
+    def marker():
+        return object()
+
+    try:
+        first = marker()
+        with Session() as db:
+            db.add(Client(telegram_id="2", name="Тест", phone="+992900000002"))
+            db.flush()
+            db.rollback()
+            # Следующая транзакция не наследует таблицы отмененной
+            db.commit()
+        second = marker()
+    finally:
+        written_tables.remove_commit_hook(hook)
+
+    assert first is second
+
+
+def test_counter_update_invalidates_parent_table(database):
+    engine, Session = database
+    cache = ResultCache(ttl=60, max_entries=10)
+    hook = written_tables.on_commit(cache.invalidate)
+
+    @cached("clients", cache=cache)
+    def marker():
+        return object()
+
+    try:
+        with Session() as db:
+            client = Client(telegram_id="3", name="Тест", phone="+992900000003")
+            db.add(client)
+            db.commit()
+            first = marker()
+            # Заявка меняет clients.ticket_count Core-запросом слушателя
+            db.add(Ticket(client_id=client.id, problem="Нет звука"))
+            db.commit()
+        second = marker()
+    finally:
+        written_tables.remove_commit_hook(hook)
+
+    assert first is not second
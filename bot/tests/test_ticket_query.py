@@ -0,0 +1,82 @@
+# tests/test_ticket_query.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.pagination import encode_cursor
+from app.core.ticket_query import TicketQuery, fetch_page
+from app.models import Ticket
+
+
+@pytest.mark.parametrize("cursor", [
+    "garbage",
+    "t2024.1",          # дата не разбирается
+    "i12.abc",          # id не число
+    "x1.5",             # неизвестный тип значения
+    "n1.5",             # у NULL нет значения
+])
+def test_broken_cursor_is_value_error(cursor):
+    with pytest.raises(ValueError):
+        TicketQuery(cursor=cursor)
+
+
+def test_cursor_from_other_sort_is_value_error():
+    cursor = encode_cursor(datetime(2024, 5, 1, 12, 0), 10)
+    TicketQuery(sort="created_at", cursor=cursor)
+    with pytest.raises(ValueError):
+        TicketQuery(sort="status", cursor=cursor)
+    with pytest.raises(ValueError):
+        TicketQuery(sort="id", cursor=encode_cursor("Новая", 10))
+
+
+def test_pages_cover_all_rows_once(database):
+    engine, Session = database
+    start = datetime(2024, 5, 1)
+    with Session() as db:
+        # Одинаковые created_at у соседей - порядок решает id
+        db.add_all(
+            Ticket(problem=f"#{n}", created_at=start + timedelta(hours=n // 2))
+            for n in range(7)
+        )
+        db.commit()
+        expected = [ticket.id for ticket in db.query(Ticket).order_by(
+            Ticket.created_at.desc(), Ticket.id.desc()
+        )]
+
+        seen, cursor = [], None
+        while True:
+            page = fetch_page(db, TicketQuery(cursor=cursor, limit=3))
+            seen += [item["id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    assert seen == expected
+
+
+def test_admin_rows_follow_ticket_query_order(database, monkeypatch):
+    from app.services import ticket_service_compat
+    from app.services.ticket_service_compat import all_ticket_rows, ticket_rows_by_id
+
+    engine, Session = database
+    monkeypatch.setattr(ticket_service_compat, "SessionLocal", Session)
+    with Session() as db:
+        db.add_all(
+            Ticket(problem=f"#{n}", walkin_name="Нигина", created_at=datetime(2024, 5, 1) + timedelta(hours=n // 2))
+            for n in range(5)
+        )
+        db.commit()
+        listed = [item["id"] for item in fetch_page(db, TicketQuery(limit=10))["items"]]
+        rows = all_ticket_rows(db)
+        by_id = ticket_rows_by_id(db, listed[:2])
+
+    page = ticket_service_compat.get_tickets_page(limit=3)
+    assert [item["id"] for item in page["items"]] == listed[:3]
+    rest = ticket_service_compat.get_tickets_page(page["next_cursor"], limit=3)
+    assert [item["id"] for item in rest["items"]] == listed[3:]
+    with pytest.raises(ValueError):
+        ticket_service_compat.get_tickets_page("garbage")
+    assert [row["id"] for row in rows] == listed
+    assert rows[0]["client_name"] == "Нигина"
+    assert rows[0]["created_at"]
+    assert sorted(by_id) == sorted(listed[:2])
@@ -0,0 +1,59 @@
+# tests/test_ticket_search.py
+import pytest
+
+from app.core.ticket_search import search_tickets, rebuild_phone_keys
+from app.models import Client, Ticket
+
+
+@pytest.fixture
+def tickets(database):
+    engine, Session = database
+    with Session() as db:
+        client = Client(telegram_id="1", name="Фарход", phone="+992 90 111 22 33")
+        db.add(client)
+        db.flush()
+        ids = {
+            "client": Ticket(client_id=client.id, problem="Не включается"),
+            "walkin": Ticket(walkin_name="Нигина", walkin_phone="93-555-44-11", problem="Разбит экран"),
+            "delivery": Ticket(delivery_phone="8 (918) 77-66-55", problem="Нет звука"),
+        }
+        db.add_all(ids.values())
+        db.commit()
+        yield Session, {name: ticket.id for name, ticket in ids.items()}
+
+
+def _found(Session, q):
+    with Session() as db:
+        return {item["id"] for item in search_tickets(db, q)["items"]}
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("2233", "client"),           # конец номера
+    ("9011", "client"),           # начало местного номера
+    ("90 111", "client"),
+    ("+992901112233", "client"),  # целиком, с кодом страны
+    ("901112233", "client"),
+    ("9355", "walkin"),
+    ("4411", "walkin"),
+    ("91877", "delivery"),
+])
+def test_phone_matches_start_and_end(tickets, q, expected):
+    Session, ids = tickets
+    assert _found(Session, q) == {ids[expected]}
+
+
+def test_middle_digits_do_not_match(tickets):
+    Session, ids = tickets
+    assert _found(Session, "1122") == set()
+
+
+def test_rebuild_fills_both_keys(tickets, database):
+    Session, ids = tickets
+    engine, _ = database
+    with engine.begin() as conn:
+        conn.execute(Client.__table__.update().values(phone_key=None, phone_local_key=None))
+    assert _found(Session, "9011") == set()
+    with engine.begin() as conn:
+        rebuild_phone_keys(conn)
+    assert _found(Session, "9011") == {ids["client"]}
+    assert _found(Session, "2233") == {ids["client"]}